@@ -22,6 +22,15 @@ interface DeviceEntry { os: string; browser: string; count: number }
 interface ActivityEntry { type: string; student_id: string; detail: string; time: string }
 interface StudentRow { student_id: string; major: string; count: number; ch?: number }
 interface HeatmapCell { day: number; hour: number; count: number }
+interface MajorStats { count: number; avgCourses: number; avgCH: number; avgProgress: number; maxCH: number; minCH: number; progressBuckets: [number, number, number, number] }
+interface Bottleneck { major: string; code: string; name: string; completed: number; unlocked: number; blockedStudents: number; blockedCourses: number; score: number }
+interface MajorProgress { major: string; students: number; avgCreditHours: number; medianCreditHours: number; complete: number; histogram: { minCH: number; maxCH: number; students: number }[] }
+interface CohortAnalytics {
+    lastRun: { id: number; startedAt: string; finishedAt: string | null; status: string; students: number; durationMs: number | null } | null;
+    running: boolean;
+    bottlenecks: Bottleneck[];
+    majors: MajorProgress[];
+}
 
 interface Stats {
     totalStudents: number;
@@ -33,11 +42,13 @@ interface Stats {
     lastWeekVisits: number;
     majorCounts: Record<string, number>;
     progressDistribution: Record<string, number>;
+    majorStats: Record<string, MajorStats>;
     topCourses: TopCourse[];
     trafficByDay: TrafficDay[];
     deviceBreakdown: DeviceEntry[];
     recentActivity: ActivityEntry[];
     heatmap: HeatmapCell[];
+    /** Most recently active students only; totalStudents counts everyone */
     students: StudentRow[];
 }
 
@@ -308,7 +319,7 @@ function DashboardInner() {
                     )}
                     {tab === 'students' && (
                         <motion.div key="students" initial={{ opacity: 0, y: 16 }} animate={{ opacity: 1, y: 0 }} exit={{ opacity: 0, y: -8 }} transition={{ duration: 0.25 }} className="space-y-6">
-                            <StudentsTab students={filteredStudents} total={stats.students.length} search={search} setSearch={setSearch} sortKey={sortKey} sortDir={sortDir} toggleSort={toggleSort} />
+                            <StudentsTab students={filteredStudents} total={stats.totalStudents} search={search} setSearch={setSearch} sortKey={sortKey} sortDir={sortDir} toggleSort={toggleSort} />
                         </motion.div>
                     )}
                     {tab === 'visitors' && (
@@ -368,7 +379,7 @@ function OverviewTab({ stats, majors, progress, maxProgress, maxTraffic, weekCha
                 {/* Major Donut */}
                 <GlassCard delay={0.15}>
                     <CardHeader icon={<PieChart className="w-4 h-4" />} title="Major Distribution" iconColor="#818cf8" />
-                    <MajorDonutSection majors={majors} total={stats.totalStudents} students={stats.students} />
+                    <MajorDonutSection majors={majors} total={stats.totalStudents} majorStats={stats.majorStats} />
                 </GlassCard>
 
                 {/* Progress Distribution */}
@@ -448,10 +459,127 @@ function OverviewTab({ stats, majors, progress, maxProgress, maxTraffic, weekCha
                     </div>
                 </GlassCard>
             </div>
+
+            {/* Cohort analytics (batch job) */}
+            <CohortAnalyticsSection />
         </>
     );
 }
 
+/* ═══════════════════════════════════════════════════════════════════
+   Cohort Analytics — summary tables written by lib/analytics.ts
+   ═══════════════════════════════════════════════════════════════════ */
+
+function CohortAnalyticsSection() {
+    const adminSecret = useAdminSecret();
+    const [data, setData] = useState<CohortAnalytics | null>(null);
+    const [major, setMajor] = useState<string | null>(null);
+    const [running, setRunning] = useState(false);
+
+    const load = useCallback(async () => {
+        try {
+            const res = await fetch('/api/admin/analytics', { headers: { 'x-admin-secret': adminSecret } });
+            if (res.ok) setData(await res.json());
+        } catch { /* ignore */ }
+    }, [adminSecret]);
+
+    useEffect(() => { load(); }, [load]);
+
+    const runNow = async () => {
+        setRunning(true);
+        try {
+            await fetch('/api/admin/analytics', { method: 'POST', headers: { 'x-admin-secret': adminSecret } });
+            await load();
+        } catch { /* ignore */ }
+        setRunning(false);
+    };
+
+    const selected = data?.majors.find(m => m.major === major) ?? data?.majors[0] ?? null;
+    const bottlenecks = useMemo(
+        () => (data && selected ? data.bottlenecks.filter(b => b.major === selected.major) : []),
+        [data, selected]
+    );
+    const maxBucket = Math.max(1, ...(selected?.histogram.map(h => h.students) ?? []));
+    const maxScore = Math.max(1, ...bottlenecks.map(b => b.score));
+
+    const run = data?.lastRun;
+    const runLabel = running || data?.running ? 'Running…'
+        : run ? `${run.status === 'failed' ? 'Failed' : `${run.students.toLocaleString()} students`} · ${timeAgo(run.finishedAt ?? run.startedAt)}`
+        : 'Never run';
+
+    return (
+        <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
+            <GlassCard delay={0.35}>
+                <CardHeader icon={<BarChart3 className="w-4 h-4" />} title="Credit Hours by Major" iconColor="#34d399"
+                    right={
+                        <button onClick={runNow} disabled={running}
+                            className="flex items-center gap-1.5 text-[10px] text-white/30 hover:text-white/60 transition-colors disabled:opacity-50">
+                            <RefreshCw className={`w-3 h-3 ${running ? 'animate-spin' : ''}`} />
+                            {runLabel}
+                        </button>
+                    } />
+                {!data || data.majors.length === 0 ? <Empty text="No analytics yet" /> : (
+                    <>
+                        <div className="flex flex-wrap gap-1.5 mt-4">
+                            {data.majors.map(m => (
+                                <button key={m.major} onClick={() => setMajor(m.major)}
+                                    className={`text-[10px] px-2.5 py-1 rounded-lg transition-colors ${m.major === selected?.major ? 'bg-white/10 text-white/70' : 'text-white/25 hover:text-white/50'}`}>
+                                    {formatMajor(m.major)}
+                                </button>
+                            ))}
+                        </div>
+                        {selected && (
+                            <>
+                                <div className="flex items-end gap-1.5 h-32 mt-5">
+                                    {selected.histogram.map(h => (
+                                        <div key={h.minCH} className="flex-1 flex flex-col items-center justify-end h-full gap-1"
+                                            title={`${h.minCH}–${h.maxCH} CH: ${h.students} students`}>
+                                            <span className="text-[9px] text-white/25 font-mono tabular-nums">{h.students || ''}</span>
+                                            <div className="w-full rounded-md bg-emerald-400/40" style={{ height: `${(h.students / maxBucket) * 100}%` }} />
+                                        </div>
+                                    ))}
+                                </div>
+                                <div className="flex gap-1.5 mt-1">
+                                    {selected.histogram.map(h => (
+                                        <span key={h.minCH} className="flex-1 text-center text-[9px] text-white/20 font-mono">{h.minCH}</span>
+                                    ))}
+                                </div>
+                                <p className="text-[10px] text-white/25 mt-3 tabular-nums">
+                                    {selected.students} students · mean {selected.avgCreditHours} CH · median {selected.medianCreditHours} CH · {selected.complete} complete
+                                </p>
+                            </>
+                        )}
+                    </>
+                )}
+            </GlassCard>
+
+            <GlassCard delay={0.4} scrollable>
+                <CardHeader icon={<Zap className="w-4 h-4" />} title="Prerequisite Bottlenecks" iconColor="#f472b6"
+                    right={<span className="text-[10px] text-white/20">{selected ? formatMajor(selected.major) : ''}</span>} />
+                <div className="space-y-1 mt-4">
+                    {bottlenecks.map((b, i) => (
+                        <div key={b.code} className="flex items-center gap-3 rounded-xl px-3 py-2 -mx-1 hover:bg-white/[0.025]"
+                            title={`${b.blockedCourses} locked course slots · ${b.unlocked} can take it now · ${b.completed} completed`}>
+                            <span className="text-[10px] font-mono text-white/15 w-5 shrink-0 tabular-nums">{i + 1}</span>
+                            <div className="flex-1 min-w-0">
+                                <p className="text-xs text-white/55 truncate font-medium">{b.name}</p>
+                                <div className="h-1 rounded-full bg-white/5 mt-1.5">
+                                    <div className="h-full rounded-full bg-pink-400/50" style={{ width: `${(b.score / maxScore) * 100}%` }} />
+                                </div>
+                            </div>
+                            <div className="text-right shrink-0">
+                                <p className="text-xs font-bold text-white/30 tabular-nums">{b.blockedStudents}</p>
+                                <p className="text-[9px] text-white/15">blocked</p>
+                            </div>
+                        </div>
+                    ))}
+                    {bottlenecks.length === 0 && <Empty text="No bottlenecks" />}
+                </div>
+            </GlassCard>
+        </div>
+    );
+}
+
 /* ═══════════════════════════════════════════════════════════════════
    Students Tab
    ═══════════════════════════════════════════════════════════════════ */
@@ -469,7 +597,7 @@ function StudentsTab({ students, total, search, setSearch, sortKey, sortDir, tog
     return (
         <GlassCard delay={0.05}>
             <div className="flex flex-col sm:flex-row items-start sm:items-center justify-between gap-3 mb-6">
-                <CardHeader icon={<Database className="w-4 h-4" />} title="All Students" iconColor="#a78bfa"
+                <CardHeader icon={<Database className="w-4 h-4" />} title="Recent Students" iconColor="#a78bfa"
                     right={<span className="text-[10px] text-white/20 font-mono tabular-nums">{students.length}/{total}</span>} />
                 <div className="flex items-center gap-2 px-3 py-2 rounded-xl border border-white/[0.06]"
                     style={{ background: 'linear-gradient(135deg, rgba(255,255,255,0.02), rgba(255,255,255,0.005))' }}>
@@ -691,45 +819,12 @@ function Th({ children, sortable, onClick }: { children: React.ReactNode; sortab
     );
 }
 
-function MajorDonutSection({ majors, total, students }: { majors: [string, number][]; total: number; students: StudentRow[] }) {
+function MajorDonutSection({ majors, total, majorStats }: { majors: [string, number][]; total: number; majorStats: Record<string, MajorStats> }) {
     const [hoveredMajor, setHoveredMajor] = useState<string | null>(null);
     const [selectedMajor, setSelectedMajor] = useState<string | null>(null);
     const [viewMode, setViewMode] = useState<'chart' | 'table'>('chart');
     const animTotal = useCountUp(total);
 
-    /* ── Per-major analytics ─────────────────────────────── */
-    const majorStats = useMemo(() => {
-        const stats: Record<string, {
-            count: number; avgCourses: number; avgCH: number;
-            avgProgress: number; maxCH: number; minCH: number;
-            progressBuckets: [number, number, number, number];
-        }> = {};
-        for (const [major] of majors) {
-            const ms = students.filter(s => s.major === major);
-            const totalCourses = ms.reduce((s, x) => s + x.count, 0);
-            const totalCH = ms.reduce((s, x) => s + (x.ch ?? x.count * 3), 0);
-            const chValues = ms.map(x => x.ch ?? x.count * 3);
-            const buckets: [number, number, number, number] = [0, 0, 0, 0];
-            for (const ch of chValues) {
-                const pct = Math.min((ch / 135) * 100, 100);
-                if (pct <= 25) buckets[0]++;
-                else if (pct <= 50) buckets[1]++;
-                else if (pct <= 75) buckets[2]++;
-                else buckets[3]++;
-            }
-            stats[major] = {
-                count: ms.length,
-                avgCourses: ms.length > 0 ? Math.round(totalCourses / ms.length) : 0,
-                avgCH: ms.length > 0 ? Math.round(totalCH / ms.length) : 0,
-                avgProgress: ms.length > 0 ? Math.min(Math.round((totalCH / ms.length / 135) * 100), 100) : 0,
-                maxCH: chValues.length > 0 ? Math.max(...chValues) : 0,
-                minCH: chValues.length > 0 ? Math.min(...chValues) : 0,
-                progressBuckets: buckets,
-            };
-        }
-        return stats;
-    }, [majors, students]);
-
     /* ── Donut geometry (dual-ring) ──────────────────────── */
     const size = 200;
     const cx = size / 2, cy = size / 2;
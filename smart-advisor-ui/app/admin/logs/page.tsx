@@ -1,6 +1,6 @@
 'use client';
 
-import { useEffect, useState } from 'react';
+import { useCallback, useEffect, useState } from 'react';
 import AdminGate, { useAdminSecret } from '@/components/AdminGate';
 import { Loader2 } from 'lucide-react';
 
@@ -23,16 +23,41 @@ export default function LogsPage() {
 function LogsInner() {
     const adminSecret = useAdminSecret();
     const [logs, setLogs] = useState<LogEntry[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
+    const [filters, setFilters] = useState({ student_id: '', from: '', to: '' });
+    const [applied, setApplied] = useState(filters);
 
-    useEffect(() => {
-        fetch('/api/admin/logs', {
+    const fetchPage = useCallback(async (cursor: string | null) => {
+        const params = new URLSearchParams({ limit: '100' });
+        if (cursor) params.set('cursor', cursor);
+        for (const [key, value] of Object.entries(applied)) {
+            if (value) params.set(key, value);
+        }
+        const res = await fetch(`/api/admin/logs?${params}`, {
             headers: { 'x-admin-secret': adminSecret }
-        })
-            .then(res => res.json())
-            .then(data => { setLogs(data); setLoading(false); })
-            .catch(() => setLoading(false));
-    }, [adminSecret]);
+        });
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        return res.json() as Promise<{ logs: LogEntry[]; nextCursor: string | null }>;
+    }, [adminSecret, applied]);
+
+    useEffect(() => {
+        setLoading(true);
+        fetchPage(null)
+            .then(data => { setLogs(data.logs); setNextCursor(data.nextCursor); })
+            .catch(() => { setLogs([]); setNextCursor(null); })
+            .finally(() => setLoading(false));
+    }, [fetchPage]);
+
+    const loadMore = () => {
+        if (!nextCursor || loadingMore) return;
+        setLoadingMore(true);
+        fetchPage(nextCursor)
+            .then(data => { setLogs(prev => [...prev, ...data.logs]); setNextCursor(data.nextCursor); })
+            .catch(() => { })
+            .finally(() => setLoadingMore(false));
+    };
 
     if (loading) return (
         <div className="min-h-screen flex items-center justify-center" style={{ background: '#0a0a0f' }}>
@@ -42,7 +67,42 @@ function LogsInner() {
 
     return (
         <div className="min-h-screen bg-black text-white p-6">
-            <h1 className="text-2xl font-bold mb-6">Visitor Logs (Last 100)</h1>
+            <h1 className="text-2xl font-bold mb-6">Visitor Logs</h1>
+
+            <form
+                className="flex flex-wrap items-end gap-3 mb-6 text-sm"
+                onSubmit={e => { e.preventDefault(); setApplied(filters); }}
+            >
+                <label className="flex flex-col gap-1 text-white/60">
+                    Student ID
+                    <input
+                        value={filters.student_id}
+                        onChange={e => setFilters(f => ({ ...f, student_id: e.target.value }))}
+                        className="bg-white/5 border border-white/10 rounded px-3 py-2 text-white font-mono"
+                    />
+                </label>
+                <label className="flex flex-col gap-1 text-white/60">
+                    From
+                    <input
+                        type="date"
+                        value={filters.from}
+                        onChange={e => setFilters(f => ({ ...f, from: e.target.value }))}
+                        className="bg-white/5 border border-white/10 rounded px-3 py-2 text-white"
+                    />
+                </label>
+                <label className="flex flex-col gap-1 text-white/60">
+                    To
+                    <input
+                        type="date"
+                        value={filters.to}
+                        onChange={e => setFilters(f => ({ ...f, to: e.target.value }))}
+                        className="bg-white/5 border border-white/10 rounded px-3 py-2 text-white"
+                    />
+                </label>
+                <button type="submit" className="px-4 py-2 rounded bg-white/10 hover:bg-white/20 transition-colors">
+                    Apply
+                </button>
+            </form>
 
             <div className="overflow-x-auto border border-white/10 rounded-lg">
                 <table className="w-full text-sm text-left">
@@ -90,6 +150,19 @@ function LogsInner() {
                     </tbody>
                 </table>
             </div>
+
+            {nextCursor && (
+                <div className="flex justify-center mt-6">
+                    <button
+                        onClick={loadMore}
+                        disabled={loadingMore}
+                        className="flex items-center gap-2 px-4 py-2 rounded bg-white/10 hover:bg-white/20 transition-colors text-sm disabled:opacity-50"
+                    >
+                        {loadingMore && <Loader2 className="w-4 h-4 animate-spin" />}
+                        Load more
+                    </button>
+                </div>
+            )}
         </div>
     );
 }
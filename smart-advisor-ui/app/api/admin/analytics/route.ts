@@ -0,0 +1,49 @@
+import { NextResponse } from 'next/server';
+import { ensureSchema } from '@/lib/migrations';
+import { getCohortAnalytics, runCohortAnalytics } from '@/lib/analytics';
+import { withMetrics } from '@/lib/metrics';
+
+export const dynamic = 'force-dynamic';
+export const maxDuration = 300;
+
+function authorized(request: Request): boolean {
+    const secret = request.headers.get('x-admin-secret');
+    return !!process.env.ADMIN_SECRET && secret === process.env.ADMIN_SECRET;
+}
+
+/** Latest cohort analytics: ?major= narrows to one major, ?limit= bottlenecks per major (default 10) */
+export const GET = withMetrics('/api/admin/analytics', async function GET(request: Request) {
+    if (!authorized(request)) {
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    const { searchParams } = new URL(request.url);
+    const limit = Math.min(50, Math.max(1, parseInt(searchParams.get('limit') || '10', 10) || 10));
+
+    try {
+        await ensureSchema();
+        return NextResponse.json(await getCohortAnalytics(limit, searchParams.get('major')));
+    } catch (e) {
+        console.error("Analytics API Error:", e);
+        return NextResponse.json({ error: "Failed to fetch analytics" }, { status: 500 });
+    }
+});
+
+/** Run the job now (joins a run already in progress here; 409 while another instance runs it) */
+export const POST = withMetrics('/api/admin/analytics', async function POST(request: Request) {
+    if (!authorized(request)) {
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    try {
+        await ensureSchema();
+        const result = await runCohortAnalytics();
+        if (!result) {
+            return NextResponse.json({ error: 'Analytics is already running on another instance' }, { status: 409 });
+        }
+        return NextResponse.json(result);
+    } catch (e) {
+        console.error("Analytics run failed:", e);
+        return NextResponse.json({ error: "Analytics run failed" }, { status: 500 });
+    }
+});
@@ -0,0 +1,30 @@
+import { NextResponse } from 'next/server';
+import { ensureSchema } from '@/lib/migrations';
+import { pruneVisitorLogs } from '@/lib/visitor-log';
+import { withMetrics, timeSegment } from '@/lib/metrics';
+
+export const dynamic = 'force-dynamic';
+
+/** Run the visitor log retention job now. Optional body: { days } */
+export const POST = withMetrics('/api/admin/logs/prune', async function POST(request: Request) {
+    const secret = request.headers.get('x-admin-secret');
+    if (!process.env.ADMIN_SECRET || secret !== process.env.ADMIN_SECRET) {
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    const body = await timeSegment('parse', () => request.json()).catch(() => ({}));
+    const days = Number(body?.days);
+    if (body?.days !== undefined && (!Number.isInteger(days) || days < 1)) {
+        return NextResponse.json({ error: 'days must be a positive integer' }, { status: 400 });
+    }
+
+    try {
+        await ensureSchema();
+        const started = Date.now();
+        const pruned = body?.days !== undefined ? await pruneVisitorLogs(days) : await pruneVisitorLogs();
+        return NextResponse.json({ ok: true, pruned, ms: Date.now() - started });
+    } catch (e) {
+        console.error("Visitor log prune failed:", e);
+        return NextResponse.json({ error: 'Prune failed' }, { status: 500 });
+    }
+});
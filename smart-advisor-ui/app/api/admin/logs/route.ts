@@ -1,18 +1,39 @@
 import { NextResponse } from 'next/server';
 import { getVisitorLogs } from '@/lib/database';
+import { withMetrics, timeSegment } from '@/lib/metrics';
 
 export const dynamic = 'force-dynamic';
 
-export async function GET(request: Request) {
+const DATE_RE = /^\d{4}-\d{2}-\d{2}$/;
+
+/**
+ * GET /api/admin/logs?limit=&cursor=&student_id=&from=&to=
+ * One page of visitor logs, newest first. Pass `nextCursor` back as `cursor`
+ * for the following page; it is null on the last one.
+ */
+export const GET = withMetrics('/api/admin/logs', async function GET(request: Request) {
     const secret = request.headers.get('x-admin-secret');
     if (!process.env.ADMIN_SECRET || secret !== process.env.ADMIN_SECRET) {
         return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
     }
 
+    const params = new URL(request.url).searchParams;
+    const from = params.get('from');
+    const to = params.get('to');
+    if ((from && !DATE_RE.test(from)) || (to && !DATE_RE.test(to))) {
+        return NextResponse.json({ error: 'from/to must be YYYY-MM-DD' }, { status: 400 });
+    }
+
     try {
-        const logs = await getVisitorLogs(100);
-        return NextResponse.json(logs);
+        const page = await getVisitorLogs({
+            limit: Number(params.get('limit')) || 100,
+            cursor: params.get('cursor'),
+            studentId: params.get('student_id')?.trim() || null,
+            from,
+            to,
+        });
+        return timeSegment('render', () => NextResponse.json(page));
     } catch {
         return NextResponse.json({ error: 'Failed to fetch logs' }, { status: 500 });
     }
-}
+});
@@ -0,0 +1,34 @@
+import { NextResponse } from 'next/server';
+import { getQueryStats } from '@/lib/db';
+import { gauge, renderPrometheus, METRICS_ENABLED } from '@/lib/metrics';
+
+export const dynamic = 'force-dynamic';
+
+/**
+ * Prometheus scrape target. Takes the admin secret as `x-admin-secret` or as
+ * a bearer token (Prometheus' `authorization` scrape option).
+ */
+export async function GET(request: Request) {
+    const secret = request.headers.get('x-admin-secret')
+        ?? request.headers.get('authorization')?.replace(/^Bearer\s+/i, '');
+    if (!process.env.ADMIN_SECRET || secret !== process.env.ADMIN_SECRET) {
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+    if (!METRICS_ENABLED) {
+        return NextResponse.json({ error: 'Metrics are disabled (METRICS_ENABLED=0)' }, { status: 404 });
+    }
+
+    const { pool } = getQueryStats();
+    const body = renderPrometheus()
+        + gauge('db_pool_connections', 'Postgres pool connections by state.', [
+            [{ state: 'total' }, pool.total],
+            [{ state: 'idle' }, pool.idle],
+            [{ state: 'waiting' }, pool.waiting],
+        ])
+        + gauge('db_pool_max_connections', 'Configured POSTGRES_POOL_MAX.', [[{}, pool.max]])
+        + gauge('process_uptime_seconds', 'Seconds since the server started.', [[{}, Math.round(process.uptime())]]);
+
+    return new NextResponse(body, {
+        headers: { 'Content-Type': 'text/plain; version=0.0.4; charset=utf-8', 'Cache-Control': 'no-store' },
+    });
+}
@@ -0,0 +1,24 @@
+import { NextResponse } from 'next/server';
+import { ensureSchema } from '@/lib/migrations';
+import { rebuildStats } from '@/lib/stats';
+import { withMetrics } from '@/lib/metrics';
+
+export const dynamic = 'force-dynamic';
+
+/** Recompute the stats rollups from the raw tables (repairs drift) */
+export const POST = withMetrics('/api/admin/stats/rebuild', async function POST(request: Request) {
+    const secret = request.headers.get('x-admin-secret');
+    if (!process.env.ADMIN_SECRET || secret !== process.env.ADMIN_SECRET) {
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    try {
+        await ensureSchema();
+        const started = Date.now();
+        await rebuildStats();
+        return NextResponse.json({ ok: true, ms: Date.now() - started });
+    } catch (e) {
+        console.error("Stats rebuild failed:", e);
+        return NextResponse.json({ error: 'Rebuild failed' }, { status: 500 });
+    }
+});
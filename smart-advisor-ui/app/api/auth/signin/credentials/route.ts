@@ -1,26 +1,41 @@
 import { NextRequest, NextResponse } from "next/server";
-import bcrypt from "bcryptjs";
 import { getUserByStudentId } from "@/lib/database";
+import { verifyPassword, PasswordHasherBusyError } from "@/lib/password-hasher";
+import { checkLoginAttempt, recordLoginFailure, recordLoginSuccess } from "@/lib/login-limiter";
 import { encode } from "next-auth/jwt";
+import { withMetrics, timeSegment } from "@/lib/metrics";
+import { clientIp } from "@/lib/client-info";
 
-export async function POST(req: NextRequest) {
+export const POST = withMetrics("/api/auth/signin/credentials", async function POST(req: NextRequest) {
   try {
-    const body = await req.json();
+    const body = await timeSegment("parse", () => req.json());
     const { student_id, password } = body;
 
     if (!student_id || !password) {
       return NextResponse.json({ error: "Missing credentials" }, { status: 400 });
     }
 
+    const ip = clientIp(name => req.headers.get(name));
+    const check = checkLoginAttempt(String(student_id), ip);
+    if (!check.allowed) {
+      return NextResponse.json(
+        { error: check.reason },
+        { status: 429, headers: { "Retry-After": String(check.retryAfter) } }
+      );
+    }
+
     const user = await getUserByStudentId(student_id);
     if (!user || !user.password_hash) {
+      recordLoginFailure(String(student_id));
       return NextResponse.json({ error: "Invalid credentials" }, { status: 401 });
     }
 
-    const isValid = await bcrypt.compare(password, user.password_hash);
+    const isValid = await verifyPassword(password, user.password_hash);
     if (!isValid) {
+      recordLoginFailure(String(student_id));
       return NextResponse.json({ error: "Invalid credentials" }, { status: 401 });
     }
+    recordLoginSuccess(String(student_id));
 
     const token = await encode({
       token: {
@@ -54,10 +69,16 @@ export async function POST(req: NextRequest) {
 
     return response;
   } catch (e) {
+    if (e instanceof PasswordHasherBusyError) {
+      return NextResponse.json(
+        { error: e.message },
+        { status: 503, headers: { "Retry-After": "1" } }
+      );
+    }
     console.error("Signin error:", e);
     return NextResponse.json(
       { error: "Internal server error" },
       { status: 500 }
     );
   }
-}
+});
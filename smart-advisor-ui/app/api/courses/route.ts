@@ -1,58 +1,26 @@
-import { NextResponse } from "next/server";
-import path from "path";
-import fs from "fs/promises";
-
-export async function GET() {
-    const dataDir = path.join(process.cwd(), "public/data");
+import { NextRequest, NextResponse } from "next/server";
+import { getCurriculum, etagMatches } from "@/lib/curriculum";
+import { withMetrics } from "@/lib/metrics";
 
+export const GET = withMetrics("/api/courses", async function GET(request: NextRequest) {
     try {
-        const content = await fs.readFile(path.join(dataDir, "curriculum.json"), "utf8");
-        const data = JSON.parse(content);
-
-        const courseMap: Map<string, { name: string, code: string, ch: number }> = new Map();
-
-        const processList = (list: any[]) => {
-            if (!list) return;
-            list.forEach(c => {
-                if (c.code && c.name) {
-                    let code = c.code.trim();
-                    if (code.startsWith('00') && code.length === 10) code = code.substring(2);
-
-                    const existing = courseMap.get(code);
-                    if (!existing || c.name.length > existing.name.length) {
-                        courseMap.set(code, { name: c.name.trim(), code, ch: c.ch ?? 3 });
-                    }
-                }
-            });
+        const curriculum = await getCurriculum();
+        const etag = curriculum.autocompleteEtag;
+        const headers = {
+            ETag: etag,
+            "Cache-Control": "public, no-cache",
         };
 
-        // 1. Process Shared Requirements
-        processList(data.shared.university_requirements);
-        processList(data.shared.college_requirements);
-        processList(data.shared.university_electives);
-
-        // 2. Process All Majors
-        for (const majorKey in data.majors) {
-            const majorData = data.majors[majorKey];
-            processList(majorData.university_requirements);
-            processList(majorData.college_requirements);
-            processList(majorData.university_electives);
-            processList(majorData.department_requirements);
-            processList(majorData.electives);
-            processList(majorData.work_market_requirements);
+        if (etagMatches(request.headers.get("if-none-match"), etag)) {
+            return new NextResponse(null, { status: 304, headers });
         }
 
-        const sortedCourses = Array.from(courseMap.values()).sort((a, b) => {
-            if (a.name < b.name) return -1;
-            if (a.name > b.name) return 1;
-            if (a.code < b.code) return -1;
-            if (a.code > b.code) return 1;
-            return 0;
+        return new NextResponse(curriculum.autocompleteBody, {
+            status: 200,
+            headers: { ...headers, "Content-Type": "application/json" },
         });
-
-        return NextResponse.json(sortedCourses);
     } catch (error: any) {
         console.error("Failed to load courses for autocomplete:", error);
         return NextResponse.json({ error: "Failed to load courses" }, { status: 500 });
     }
-}
+});
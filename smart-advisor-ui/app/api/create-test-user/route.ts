@@ -1,8 +1,9 @@
 import { NextResponse } from "next/server";
-import bcrypt from "bcryptjs";
+import { hashPassword } from "@/lib/password-hasher";
 import { createUser, getUserByStudentId, initDB, saveIntegrationToken } from "@/lib/database";
+import { withMetrics } from "@/lib/metrics";
 
-export async function POST() {
+export const POST = withMetrics("/api/create-test-user", async function POST() {
   try {
     await initDB();
 
@@ -14,7 +15,7 @@ export async function POST() {
     if (existing) {
       userId = existing.id;
     } else {
-      const passwordHash = await bcrypt.hash(password, 10);
+      const passwordHash = await hashPassword(password, 10);
       const user = await createUser({
         student_id: studentId,
         password_hash: passwordHash,
@@ -31,4 +32,4 @@ export async function POST() {
     console.error("Create test user error:", e);
     return NextResponse.json({ error: e.message }, { status: 500 });
   }
-}
+});
@@ -0,0 +1,62 @@
+import { NextRequest, NextResponse } from "next/server";
+import { etagMatches, getMajorBundle } from "@/lib/curriculum";
+import { withMetrics } from "@/lib/metrics";
+
+const IMMUTABLE = "public, max-age=31536000, immutable";
+
+/** Pick the best precompressed variant the client accepts (q=0 means refused) */
+function pickEncoding(acceptEncoding: string | null): "br" | "gzip" | null {
+    const accepted = new Set<string>();
+    for (const part of (acceptEncoding ?? "").split(",")) {
+        const [name, ...attrs] = part.trim().toLowerCase().split(";");
+        const q = attrs.map(a => a.trim()).find(a => a.startsWith("q="));
+        if (name && !(q && Number(q.slice(2)) === 0)) accepted.add(name);
+    }
+    if (accepted.has("br")) return "br";
+    if (accepted.has("gzip") || accepted.has("*")) return "gzip";
+    return null;
+}
+
+/**
+ * GET /api/curriculum/<major>?v=<hash>
+ * One major's merged course data plus the degree rules. With the current
+ * hash in `v` the response is cached as immutable; without it (or with a
+ * stale one) it is revalidated by ETag.
+ */
+export const GET = withMetrics("/api/curriculum/[major]", async function GET(
+    request: NextRequest,
+    { params }: { params: Promise<{ major: string }> }
+) {
+    const { major } = await params;
+    try {
+        const bundle = await getMajorBundle(major);
+        if (!bundle) {
+            return NextResponse.json({ error: "Unknown major" }, { status: 404 });
+        }
+
+        // Each encoding is a different byte sequence, so each gets its own
+        // strong validator; a 304 then never stands in for another encoding
+        const encoding = pickEncoding(request.headers.get("accept-encoding"));
+        const etag = `"${bundle.hash}${encoding === "br" ? "-br" : encoding === "gzip" ? "-gz" : ""}"`;
+        const headers: Record<string, string> = {
+            ETag: etag,
+            Vary: "Accept-Encoding",
+            "Cache-Control": request.nextUrl.searchParams.get("v") === bundle.hash ? IMMUTABLE : "public, no-cache",
+        };
+
+        if (etagMatches(request.headers.get("if-none-match"), etag)) {
+            return new NextResponse(null, { status: 304, headers });
+        }
+
+        const body = encoding ? bundle[encoding] : bundle.body;
+        if (encoding) headers["Content-Encoding"] = encoding;
+
+        return new NextResponse(new Uint8Array(body), {
+            status: 200,
+            headers: { ...headers, "Content-Type": "application/json", "Content-Length": String(body.length) },
+        });
+    } catch (error: any) {
+        console.error("Failed to load curriculum bundle:", error);
+        return NextResponse.json({ error: "Failed to load curriculum" }, { status: 500 });
+    }
+});
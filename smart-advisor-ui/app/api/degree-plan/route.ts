@@ -0,0 +1,68 @@
+import { NextRequest, NextResponse } from "next/server";
+import { getServerSession } from "next-auth";
+import { authOptions } from "@/auth";
+import { getMajorGraph, normalizeCode } from "@/lib/curriculum";
+import { loadProgress } from "@/lib/database";
+import { ensureSchema } from "@/lib/migrations";
+import { planDegree, DEFAULT_MAX_CREDITS, MIN_MAX_CREDITS, MAX_MAX_CREDITS } from "@/lib/scheduler";
+import { withMetrics, timeSegment } from "@/lib/metrics";
+
+// POST { major, completed?, maxCredits? } — semester-by-semester plan to graduation.
+// Without `completed`, the signed-in student's saved progress for `major` is used.
+export const POST = withMetrics("/api/degree-plan", async function POST(req: NextRequest) {
+    let body: any;
+    try {
+        body = await timeSegment("parse", () => req.json());
+    } catch {
+        return NextResponse.json({ error: "Invalid JSON" }, { status: 400 });
+    }
+
+    const { major, completed } = body ?? {};
+    const maxCredits = body?.maxCredits ?? DEFAULT_MAX_CREDITS;
+    if (typeof major !== "string" || !major) {
+        return NextResponse.json({ error: "Missing major" }, { status: 400 });
+    }
+    if (!Number.isInteger(maxCredits) || maxCredits < MIN_MAX_CREDITS || maxCredits > MAX_MAX_CREDITS) {
+        return NextResponse.json(
+            { error: `maxCredits must be an integer from ${MIN_MAX_CREDITS} to ${MAX_MAX_CREDITS}` },
+            { status: 400 }
+        );
+    }
+    if (completed !== undefined && !Array.isArray(completed)) {
+        return NextResponse.json({ error: "completed must be an array" }, { status: 400 });
+    }
+
+    const graph = await getMajorGraph(major);
+    if (!graph) {
+        return NextResponse.json({ error: "Unknown major" }, { status: 404 });
+    }
+
+    try {
+        let entries: any[] = completed;
+        if (!entries) {
+            const session = await timeSegment("auth", () => getServerSession(authOptions));
+            if (!session?.user) return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
+            const studentId = (session.user as any).student_id || session.user.name;
+            await ensureSchema();
+            entries = await loadProgress(studentId, major);
+        }
+
+        const codes = new Set<string>();
+        for (const c of entries) {
+            const code = typeof c === "string" ? c : c?.code;
+            if (typeof code === "string") codes.add(normalizeCode(code));
+        }
+
+        const started = performance.now();
+        const plan = planDegree(graph, codes, maxCredits);
+        const elapsed = performance.now() - started;
+
+        return NextResponse.json(
+            { major, ...plan },
+            { headers: { "Server-Timing": `scheduler;dur=${elapsed.toFixed(3)}` } }
+        );
+    } catch (e) {
+        console.error("Degree plan error:", e);
+        return NextResponse.json({ error: "Failed to build degree plan" }, { status: 500 });
+    }
+});
@@ -0,0 +1,45 @@
+import { NextResponse } from 'next/server';
+import { ensureSchema, getSchemaStatus } from '@/lib/migrations';
+import { getVisitorLogStats } from '@/lib/visitor-log';
+import { getUserAgentCacheStats } from '@/lib/client-info';
+import { getUserCacheStats } from '@/lib/database';
+import { getSummaryCacheStats } from '@/lib/planner';
+import { getPasswordHasherStats } from '@/lib/password-hasher';
+import { getLoginLimiterStats } from '@/lib/login-limiter';
+import { getQueryStats } from '@/lib/db';
+import { withMetrics } from '@/lib/metrics';
+
+export const dynamic = 'force-dynamic';
+
+/**
+ * Liveness + schema readiness. 200 when the schema is current, 503 otherwise.
+ * Error details and the process's cache, queue, limiter and query stats are
+ * only included for callers with the admin secret.
+ */
+export const GET = withMetrics('/api/health', async function GET(request: Request) {
+    // Kick off (or retry) the bootstrap; a no-op once it has succeeded
+    await ensureSchema().catch(() => { });
+    const schema = await getSchemaStatus();
+    const ok = schema.ready && schema.version === schema.latest;
+
+    const secret = request.headers.get('x-admin-secret');
+    const isAdmin = !!process.env.ADMIN_SECRET && secret === process.env.ADMIN_SECRET;
+
+    return NextResponse.json(
+        {
+            status: ok ? 'ok' : 'unavailable',
+            uptime: Math.round(process.uptime()),
+            schema: { ...schema, error: isAdmin ? schema.error : schema.error ? 'unavailable' : null },
+            ...(isAdmin && {
+                visitorLog: getVisitorLogStats(),
+                userAgentCache: getUserAgentCacheStats(),
+                userCache: getUserCacheStats(),
+                plannerSummaryCache: getSummaryCacheStats(),
+                passwordHasher: getPasswordHasherStats(),
+                loginLimiter: getLoginLimiterStats(),
+                database: getQueryStats(),
+            }),
+        },
+        { status: ok ? 200 : 503 }
+    );
+});
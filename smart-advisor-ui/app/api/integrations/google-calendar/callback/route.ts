@@ -1,13 +1,16 @@
 import { NextRequest, NextResponse } from "next/server";
 import { getServerSession } from "next-auth";
 import { authOptions } from "@/auth";
-import { saveIntegrationToken, initPlannerTables } from "@/lib/database";
+import { saveIntegrationToken } from "@/lib/database";
+import { ensureSchema } from "@/lib/migrations";
 import { getBaseUrl } from "@/lib/env";
+import { GOOGLE_OAUTH_TOKEN_URL } from "@/lib/google-calendar";
+import { withMetrics, timeSegment } from "@/lib/metrics";
 
 // GET /api/integrations/google-calendar/callback?code=...
 // Google redirects here after the user authorizes
-export async function GET(req: NextRequest) {
-    const session = await getServerSession(authOptions);
+export const GET = withMetrics("/api/integrations/google-calendar/callback", async function GET(req: NextRequest) {
+    const session = await timeSegment("auth", () => getServerSession(authOptions));
     if (!session?.user) {
         return NextResponse.redirect(new URL("/planner?error=unauthorized", req.url));
     }
@@ -21,10 +24,10 @@ export async function GET(req: NextRequest) {
     }
 
     try {
-        await initPlannerTables();
+        await ensureSchema();
 
         // Exchange code for tokens
-        const tokenRes = await fetch("https://oauth2.googleapis.com/token", {
+        const tokenRes = await fetch(GOOGLE_OAUTH_TOKEN_URL, {
             method: "POST",
             headers: { "Content-Type": "application/x-www-form-urlencoded" },
             body: new URLSearchParams({
@@ -55,4 +58,4 @@ export async function GET(req: NextRequest) {
         console.error("Google Calendar callback error:", e);
         return NextResponse.redirect(new URL("/planner?error=google_callback_error", req.url));
     }
-}
+});
@@ -1,8 +1,11 @@
 import { NextRequest, NextResponse } from "next/server";
 import { getServerSession } from "next-auth";
 import { authOptions } from "@/auth";
-import { saveIntegrationToken, initPlannerTables } from "@/lib/database";
+import { saveIntegrationToken } from "@/lib/database";
+import { ensureSchema } from "@/lib/migrations";
 import { getBaseUrl } from "@/lib/env";
+import { NOTION_API_URL } from "@/lib/notion-sync";
+import { withMetrics, timeSegment } from "@/lib/metrics";
 
 function getSemesterLabel(): string {
     const now = new Date();
@@ -31,8 +34,8 @@ function getSemesterLabel(): string {
 }
 
 // GET /api/integrations/notion/callback?code=...
-export async function GET(req: NextRequest) {
-    const session = await getServerSession(authOptions);
+export const GET = withMetrics("/api/integrations/notion/callback", async function GET(req: NextRequest) {
+    const session = await timeSegment("auth", () => getServerSession(authOptions));
     if (!session?.user) {
         return NextResponse.redirect(new URL("/planner?error=unauthorized", req.url));
     }
@@ -46,14 +49,14 @@ export async function GET(req: NextRequest) {
     }
 
     try {
-        await initPlannerTables();
+        await ensureSchema();
 
         // Exchange code for Notion access token
         const basicAuth = Buffer.from(
             `${process.env.NOTION_CLIENT_ID}:${process.env.NOTION_CLIENT_SECRET}`
         ).toString("base64");
 
-        const tokenRes = await fetch("https://api.notion.com/v1/oauth/token", {
+        const tokenRes = await fetch(`${NOTION_API_URL}/v1/oauth/token`, {
             method: "POST",
             headers: {
                 "Content-Type": "application/json",
@@ -79,7 +82,7 @@ export async function GET(req: NextRequest) {
         };
 
         // Find any accessible parent page — the user must share at least one page in the Notion prompt
-        const searchRes = await fetch("https://api.notion.com/v1/search", {
+        const searchRes = await fetch(`${NOTION_API_URL}/v1/search`, {
             method: "POST",
             headers: notionHeaders,
             body: JSON.stringify({ page_size: 50 }),
@@ -119,7 +122,7 @@ export async function GET(req: NextRequest) {
         let studyPlanPageId = workspaceParentId; // fallback
 
         try {
-            const pageRes = await fetch("https://api.notion.com/v1/pages", {
+            const pageRes = await fetch(`${NOTION_API_URL}/v1/pages`, {
                 method: "POST",
                 headers: notionHeaders,
                 body: JSON.stringify({
@@ -156,4 +159,4 @@ export async function GET(req: NextRequest) {
         console.error("Notion callback error:", e);
         return NextResponse.redirect(new URL("/planner?error=notion_callback_error", req.url));
     }
-}
+});
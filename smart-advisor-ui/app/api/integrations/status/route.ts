@@ -2,9 +2,11 @@ import { NextRequest, NextResponse } from "next/server";
 import { getServerSession } from "next-auth";
 import { authOptions } from "@/auth";
 import { getIntegrationToken } from "@/lib/database";
+import { ensureSchema } from "@/lib/migrations";
+import { withMetrics, timeSegment } from "@/lib/metrics";
 
-export async function GET(req: NextRequest) {
-    const session = await getServerSession(authOptions);
+export const GET = withMetrics("/api/integrations/status", async function GET(req: NextRequest) {
+    const session = await timeSegment("auth", () => getServerSession(authOptions));
     if (!session?.user) {
         return NextResponse.json({ notion: false, google_calendar: false }, { status: 401 });
     }
@@ -14,13 +16,19 @@ export async function GET(req: NextRequest) {
         return NextResponse.json({ notion: false, google_calendar: false }, { status: 400 });
     }
 
-    const [notionToken, googleToken] = await Promise.all([
-        getIntegrationToken(studentId, "notion"),
-        getIntegrationToken(studentId, "google_calendar")
-    ]);
+    try {
+        await ensureSchema();
+        const [notionToken, googleToken] = await Promise.all([
+            getIntegrationToken(studentId, "notion"),
+            getIntegrationToken(studentId, "google_calendar")
+        ]);
 
-    return NextResponse.json({
-        notion: !!notionToken,
-        google_calendar: !!googleToken
-    });
-}
+        return NextResponse.json({
+            notion: !!notionToken,
+            google_calendar: !!googleToken
+        });
+    } catch (e) {
+        console.error("Integration status error:", e);
+        return NextResponse.json({ notion: false, google_calendar: false }, { status: 500 });
+    }
+});
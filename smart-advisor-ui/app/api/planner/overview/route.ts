@@ -0,0 +1,39 @@
+import { NextRequest, NextResponse } from "next/server";
+import { getServerSession } from "next-auth";
+import { authOptions } from "@/auth";
+import { etagMatches } from "@/lib/curriculum";
+import { ensureSchema } from "@/lib/migrations";
+import { getPlannerHeads, getPlannerOverview } from "@/lib/planner";
+import { withMetrics, timeSegment } from "@/lib/metrics";
+
+const REV_RE = /^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}$/;
+
+// GET — active semester in full + per-semester summaries (?since=<cursor> for changes only)
+export const GET = withMetrics("/api/planner/overview", async function GET(req: NextRequest) {
+    const session = await timeSegment("auth", () => getServerSession(authOptions));
+    if (!session?.user) return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
+
+    const studentId = (session.user as any).student_id || session.user.name;
+    if (!studentId) return NextResponse.json({ error: "No student ID" }, { status: 400 });
+
+    const since = req.nextUrl.searchParams.get("since");
+    if (since && !REV_RE.test(since)) {
+        return NextResponse.json({ error: "Invalid since cursor" }, { status: 400 });
+    }
+
+    try {
+        await ensureSchema();
+        // Answer a revalidation from the heads alone, before any semester is read
+        const heads = await getPlannerHeads(studentId);
+        const headers = { ETag: heads.etag, "Cache-Control": "private, no-cache" };
+        if (etagMatches(req.headers.get("if-none-match"), heads.etag)) {
+            return new NextResponse(null, { status: 304, headers });
+        }
+
+        const { etag, ...overview } = await getPlannerOverview(studentId, since, heads);
+        return timeSegment("render", () => NextResponse.json(overview, { headers }));
+    } catch (e: any) {
+        console.error("Planner overview error:", e);
+        return NextResponse.json({ error: "Failed to load" }, { status: 500 });
+    }
+});
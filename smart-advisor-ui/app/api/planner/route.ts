@@ -1,45 +1,55 @@
 import { NextRequest, NextResponse } from "next/server";
 import { getServerSession } from "next-auth";
 import { authOptions } from "@/auth";
-import { loadPlanner, savePlanner, deletePlanner, initPlannerTables, loadAllSemesters } from "@/lib/database";
+import { loadPlanner, savePlanner, deletePlanner, loadAllSemesters } from "@/lib/database";
+import { ensureSchema } from "@/lib/migrations";
+import { loadSemester } from "@/lib/planner";
+import { withMetrics, timeSegment } from "@/lib/metrics";
 
-// GET — load planner for current user
-export async function GET(req: NextRequest) {
-    const session = await getServerSession(authOptions);
+// GET — load planner for current user (?semester=<id> for one semester in full)
+export const GET = withMetrics("/api/planner", async function GET(req: NextRequest) {
+    const session = await timeSegment("auth", () => getServerSession(authOptions));
     if (!session?.user) return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
 
     const studentId = (session.user as any).student_id || session.user.name;
     if (!studentId) return NextResponse.json({ error: "No student ID" }, { status: 400 });
 
     try {
-        await initPlannerTables();
+        await ensureSchema();
         const { searchParams } = new URL(req.url);
         const all = searchParams.get("all") === "true";
+        const semesterId = searchParams.get("semester");
+
+        if (semesterId) {
+            const semester = await loadSemester(studentId, semesterId);
+            if (!semester) return NextResponse.json({ error: "Semester not found" }, { status: 404 });
+            return timeSegment("render", () => NextResponse.json(semester));
+        }
 
         if (all) {
             const data = await loadAllSemesters(studentId);
-            return NextResponse.json(data);
+            return timeSegment("render", () => NextResponse.json(data));
         }
 
         const data = await loadPlanner(studentId);
-        return NextResponse.json(data || { id: "default", name: "My Planner", courses: [], studySessions: [] });
+        return timeSegment("render", () => NextResponse.json(data || { id: "default", name: "My Planner", courses: [], studySessions: [] }));
     } catch (e: any) {
         console.error("Planner load error:", e);
         return NextResponse.json({ error: "Failed to load" }, { status: 500 });
     }
-}
+});
 
 // POST — save planner for current user
-export async function POST(req: NextRequest) {
-    const session = await getServerSession(authOptions);
+export const POST = withMetrics("/api/planner", async function POST(req: NextRequest) {
+    const session = await timeSegment("auth", () => getServerSession(authOptions));
     if (!session?.user) return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
 
     const studentId = (session.user as any).student_id || session.user.name;
     if (!studentId) return NextResponse.json({ error: "No student ID" }, { status: 400 });
 
     try {
-        await initPlannerTables();
-        const body = await req.json();
+        await ensureSchema();
+        const body = await timeSegment("parse", () => req.json());
         // Validate structure
         if (!body.id || !body.name || !Array.isArray(body.courses) || (body.studySessions !== undefined && !Array.isArray(body.studySessions))) {
             return NextResponse.json({ error: "Invalid data" }, { status: 400 });
@@ -55,22 +65,22 @@ export async function POST(req: NextRequest) {
         console.error("Planner save error:", e);
         return NextResponse.json({ error: "Failed to save" }, { status: 500 });
     }
-}
+});
 
 // DELETE — reset planner for current user
-export async function DELETE() {
-    const session = await getServerSession(authOptions);
+export const DELETE = withMetrics("/api/planner", async function DELETE() {
+    const session = await timeSegment("auth", () => getServerSession(authOptions));
     if (!session?.user) return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
 
     const studentId = (session.user as any).student_id || session.user.name;
     if (!studentId) return NextResponse.json({ error: "No student ID" }, { status: 400 });
 
     try {
-        await initPlannerTables();
+        await ensureSchema();
         await deletePlanner(studentId);
         return NextResponse.json({ success: true });
     } catch (e: any) {
         console.error("Planner delete error:", e);
         return NextResponse.json({ error: "Failed to delete" }, { status: 500 });
     }
-}
+});
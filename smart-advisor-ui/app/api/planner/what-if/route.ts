@@ -0,0 +1,90 @@
+import { NextRequest, NextResponse } from "next/server";
+import { getServerSession } from "next-auth";
+import { authOptions } from "@/auth";
+import { ensureSchema } from "@/lib/migrations";
+import { loadPlannerCourses } from "@/lib/planner";
+import { solveTargetGPA, resolveTarget, type GradeDistribution, type WhatIfCourse } from "@/lib/gpa-solver";
+import { withMetrics, timeSegment } from "@/lib/metrics";
+
+// A full degree is ~166 CH; this leaves room for retakes without letting one request build huge tables
+const MAX_COURSES = 120;
+const MAX_CREDITS_PER_COURSE = 12;
+
+function parseCourses(raw: unknown[]): WhatIfCourse[] | null {
+    if (raw.length > MAX_COURSES) return null;
+    const courses: WhatIfCourse[] = [];
+    for (const c of raw as any[]) {
+        const credits = Number(c?.credits);
+        if (!Number.isInteger(credits) || credits < 0 || credits > MAX_CREDITS_PER_COURSE) return null;
+        courses.push({
+            id: typeof c.id === "string" ? c.id : undefined,
+            name: typeof c.name === "string" ? c.name : undefined,
+            credits,
+            grade: typeof c.grade === "string" ? c.grade : null,
+        });
+    }
+    return courses;
+}
+
+function parseDistribution(raw: any): GradeDistribution | null {
+    const d = { D: raw?.D ?? 0, M: raw?.M ?? 0, P: raw?.P ?? 0, U: raw?.U ?? 0 };
+    const values = Object.values(d);
+    if (!values.every(v => typeof v === "number" && Number.isFinite(v) && v >= 0)) return null;
+    return values.some(v => v > 0) ? d : null;
+}
+
+// POST { target, courses?, distribution? } — least-effort grades for the ungraded
+// courses that reach `target` (a GPA or a classification such as "VG"), and its odds.
+// Without `courses`, every semester of the signed-in student's planner is used.
+export const POST = withMetrics("/api/planner/what-if", async function POST(req: NextRequest) {
+    let body: any;
+    try {
+        body = await timeSegment("parse", () => req.json());
+    } catch {
+        return NextResponse.json({ error: "Invalid JSON" }, { status: 400 });
+    }
+
+    const target = resolveTarget(body?.target);
+    if (target === null) {
+        return NextResponse.json({ error: "target must be a GPA from 0 to 4 or a classification (EX, VG, Good, SAT)" }, { status: 400 });
+    }
+    if (body.courses !== undefined && !Array.isArray(body.courses)) {
+        return NextResponse.json({ error: "courses must be an array" }, { status: 400 });
+    }
+    let distribution: GradeDistribution | undefined;
+    if (body.distribution !== undefined) {
+        const parsed = parseDistribution(body.distribution);
+        if (!parsed) {
+            return NextResponse.json({ error: "distribution must give non-negative D/M/P/U weights" }, { status: 400 });
+        }
+        distribution = parsed;
+    }
+
+    try {
+        let raw: unknown[] = body.courses;
+        if (!raw) {
+            const session = await timeSegment("auth", () => getServerSession(authOptions));
+            if (!session?.user) return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
+            const studentId = (session.user as any).student_id || session.user.name;
+            await ensureSchema();
+            raw = await loadPlannerCourses(studentId);
+        }
+
+        const courses = parseCourses(raw);
+        if (!courses) {
+            return NextResponse.json(
+                { error: `courses must be at most ${MAX_COURSES} entries with whole credits from 0 to ${MAX_CREDITS_PER_COURSE}` },
+                { status: 400 }
+            );
+        }
+
+        const started = performance.now();
+        const result = solveTargetGPA(courses, target, distribution);
+        const elapsed = performance.now() - started;
+
+        return NextResponse.json(result, { headers: { "Server-Timing": `solver;dur=${elapsed.toFixed(3)}` } });
+    } catch (e) {
+        console.error("What-if solver error:", e);
+        return NextResponse.json({ error: "Failed to solve" }, { status: 500 });
+    }
+});
@@ -1,14 +1,16 @@
 
 import { NextRequest, NextResponse } from 'next/server';
 import { loadMajor } from '@/lib/database';
+import { ensureSchema } from '@/lib/migrations';
 import { getServerSession } from "next-auth/next";
 import { authOptions } from "@/auth";
+import { withMetrics, timeSegment } from '@/lib/metrics';
 
-export async function GET(
+export const GET = withMetrics('/api/profile/[studentId]', async function GET(
     _req: NextRequest,
     { params }: { params: Promise<{ studentId: string }> }
 ) {
-    const session = await getServerSession(authOptions);
+    const session = await timeSegment('auth', () => getServerSession(authOptions));
     const { studentId: targetId } = await params;
 
     if (!targetId) return NextResponse.json({ error: 'Missing ID' }, { status: 400 });
@@ -19,6 +21,12 @@ export async function GET(
         return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
     }
 
-    const major = await loadMajor(targetId);
-    return NextResponse.json({ studentId: targetId, major });
-}
+    try {
+        await ensureSchema();
+        const major = await loadMajor(targetId);
+        return NextResponse.json({ studentId: targetId, major });
+    } catch (e) {
+        console.error("Load profile error:", e);
+        return NextResponse.json({ error: 'Server error' }, { status: 500 });
+    }
+});
@@ -2,14 +2,16 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { saveMajor, logVisitor } from '@/lib/database';
 import { getClientInfo } from '@/lib/client-info';
+import { ensureSchema } from '@/lib/migrations';
 import { getServerSession } from "next-auth/next";
 import { authOptions } from "@/auth";
+import { withMetrics, timeSegment } from '@/lib/metrics';
 
-export async function POST(
+export const POST = withMetrics('/api/profile/[studentId]/save', async function POST(
     request: NextRequest,
     { params }: { params: Promise<{ studentId: string }> }
 ) {
-    const session = await getServerSession(authOptions);
+    const session = await timeSegment('auth', () => getServerSession(authOptions));
     const { studentId: targetId } = await params;
 
     if (!targetId) return NextResponse.json({ error: 'Missing ID' }, { status: 400 });
@@ -21,9 +23,10 @@ export async function POST(
     }
 
     try {
-        const { major } = await request.json() as { major: string };
+        const { major } = await timeSegment('parse', () => request.json()) as { major: string };
         if (!major || !major.trim()) return NextResponse.json({ error: 'Missing major' }, { status: 400 });
 
+        await ensureSchema();
         await saveMajor(targetId, major);
 
         // Silent logging linked to student
@@ -36,4 +39,4 @@ export async function POST(
         console.error("Save profile error:", e);
         return NextResponse.json({ error: 'Server error' }, { status: 500 });
     }
-}
+});
@@ -0,0 +1,112 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { applyProgressDelta, loadProgressState, logVisitor } from '@/lib/database';
+import { ensureSchema } from '@/lib/migrations';
+import { getClientInfo } from '@/lib/client-info';
+import { getMajorGraph, normalizeCode } from '@/lib/curriculum';
+import { validateDelta } from '@/lib/advisor';
+import { updateStudentCredits } from '@/lib/stats';
+import { getServerSession } from "next-auth/next";
+import { authOptions } from "@/auth";
+import { withMetrics, timeSegment } from '@/lib/metrics';
+
+/**
+ * Incremental progress save.
+ *
+ * Body: { major, version, add: ({ code, name } | code)[], remove: code[] }
+ *
+ * `version` is the row version the client last saw (0 = nothing saved yet).
+ * If the row has moved on, nothing is written and a 409 carries the current
+ * state so the client can rebase its pending operations and retry.
+ */
+export const POST = withMetrics('/api/progress/[studentId]/delta', async function POST(
+    request: NextRequest,
+    { params }: { params: Promise<{ studentId: string }> }
+) {
+    const session = await timeSegment('auth', () => getServerSession(authOptions));
+    const { studentId: targetId } = await params;
+
+    if (!targetId || targetId.length < 3) {
+        return NextResponse.json({ error: 'Invalid student ID' }, { status: 400 });
+    }
+
+    const authedSid = (session?.user as any)?.student_id || session?.user?.name;
+
+    if (!session || authedSid !== targetId) {
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    try {
+        await ensureSchema();
+        const body = await timeSegment('parse', () => request.json());
+        const { major, version, add = [], remove = [] } = body as {
+            major: string;
+            version: number;
+            add?: any[];
+            remove?: any[];
+        };
+
+        if (!major || !Number.isInteger(version) || version < 0 || !Array.isArray(add) || !Array.isArray(remove)) {
+            return NextResponse.json({ error: 'Missing fields' }, { status: 400 });
+        }
+
+        const adds = new Map<string, { code: string; name?: string }>();
+        for (const a of add) {
+            const code = typeof a === 'string' ? a : a?.code;
+            if (typeof code !== 'string') continue;
+            const normalized = normalizeCode(code);
+            adds.set(normalized, { code: normalized, name: typeof a?.name === 'string' ? a.name : undefined });
+        }
+        const removes = new Set<string>();
+        for (const r of remove) {
+            if (typeof r === 'string' && !adds.has(normalizeCode(r))) removes.add(normalizeCode(r));
+        }
+
+        const graph = await getMajorGraph(major);
+        if (!graph) {
+            return NextResponse.json({ error: 'Unknown major' }, { status: 400 });
+        }
+
+        const current = await loadProgressState(targetId, major);
+        if (current.version !== version) {
+            return NextResponse.json({ error: 'version_conflict', ...current }, { status: 409 });
+        }
+
+        const previous = new Set<string>();
+        for (const c of current.completed) {
+            const code = typeof c === 'string' ? c : c?.code;
+            if (typeof code === 'string') previous.add(normalizeCode(code));
+        }
+        const next = new Set(previous);
+        for (const code of removes) next.delete(code);
+        for (const code of adds.keys()) next.add(code);
+
+        // Only what the delta touches: the stored row may predate the current
+        // rules, and courses the student didn't touch must not block the save
+        const violations = validateDelta(graph, previous, next, adds.keys(), removes);
+        if (violations.length > 0) {
+            return NextResponse.json(
+                { error: 'prerequisite_not_met', details: violations },
+                { status: 400 }
+            );
+        }
+
+        const newVersion = await applyProgressDelta(targetId, major, version, [...adds.values()], [...removes]);
+        if (newVersion === null) {
+            // Another save landed between the read and the write
+            const latest = await loadProgressState(targetId, major);
+            return NextResponse.json({ error: 'version_conflict', ...latest }, { status: 409 });
+        }
+
+        updateStudentCredits(targetId, major, next, newVersion).catch(e => console.error("Stats update failed", e));
+
+        // Silent logging linked to student
+        const info = await getClientInfo();
+        info.student_id = targetId;
+        logVisitor(info).catch(e => console.error("Logging failed", e));
+
+        return NextResponse.json({ success: true, version: newVersion });
+    } catch (e) {
+        console.error("Delta save error:", e);
+        return NextResponse.json({ error: 'Server error' }, { status: 500 });
+    }
+});
@@ -1,14 +1,16 @@
 
 import { NextRequest, NextResponse } from 'next/server';
-import { loadProgress } from '@/lib/database';
+import { loadProgressState } from '@/lib/database';
+import { ensureSchema } from '@/lib/migrations';
 import { getServerSession } from "next-auth/next";
 import { authOptions } from "@/auth";
+import { withMetrics, timeSegment } from '@/lib/metrics';
 
-export async function GET(
+export const GET = withMetrics('/api/progress/[studentId]', async function GET(
     request: NextRequest,
     { params }: { params: Promise<{ studentId: string }> }
 ) {
-    const session = await getServerSession(authOptions);
+    const session = await timeSegment('auth', () => getServerSession(authOptions));
     const { studentId: targetId } = await params;
     const major = request.nextUrl.searchParams.get('major') ?? 'default';
 
@@ -22,6 +24,7 @@ export async function GET(
         return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
     }
 
-    const completed = await loadProgress(targetId, major);
-    return NextResponse.json({ studentId: targetId, major, completed });
-}
+    await ensureSchema();
+    const { completed, version } = await loadProgressState(targetId, major);
+    return timeSegment('render', () => NextResponse.json({ studentId: targetId, major, completed, version }));
+});
@@ -1,15 +1,20 @@
 
 import { NextRequest, NextResponse } from 'next/server';
 import { saveProgress, logVisitor } from '@/lib/database';
+import { ensureSchema } from '@/lib/migrations';
 import { getClientInfo } from '@/lib/client-info';
+import { getMajorGraph, normalizeCode } from '@/lib/curriculum';
+import { validateCompleted } from '@/lib/advisor';
+import { updateStudentCredits } from '@/lib/stats';
 import { getServerSession } from "next-auth/next";
 import { authOptions } from "@/auth";
+import { withMetrics, timeSegment } from '@/lib/metrics';
 
-export async function POST(
+export const POST = withMetrics('/api/progress/[studentId]/save', async function POST(
     request: NextRequest,
     { params }: { params: Promise<{ studentId: string }> }
 ) {
-    const session = await getServerSession(authOptions);
+    const session = await timeSegment('auth', () => getServerSession(authOptions));
     const { studentId: targetId } = await params;
 
     if (!targetId || targetId.length < 3) {
@@ -23,44 +28,45 @@ export async function POST(
     }
 
     try {
-        const body = await request.json();
+        await ensureSchema();
+        const body = await timeSegment('parse', () => request.json());
         const { major, completed } = body as { major: string; completed: any[] };
 
         if (!major || !Array.isArray(completed)) {
             return NextResponse.json({ error: 'Missing fields' }, { status: 400 });
         }
 
-        // Check prerequisites: each course PREFIXnnn (where nnn > 101) requires PREFIX+(nnn-1)
-        const completedCodes = new Set(
-            completed.map((c: any) => (typeof c === 'string' ? c : c.code))
-        );
-        for (const code of completedCodes) {
-            if (typeof code !== 'string') continue;
-            const match = code.match(/^([A-Za-z]+)(\d+)$/);
-            if (!match) continue;
-            const prefix = match[1];
-            const num = parseInt(match[2], 10);
-            if (num > 101) {
-                const prereqCode = `${prefix}${num - 1}`;
-                if (!completedCodes.has(prereqCode)) {
-                    return NextResponse.json(
-                        { error: 'prerequisite_not_met', details: [{ code, requires: prereqCode }] },
-                        { status: 400 }
-                    );
-                }
-            }
+        const graph = await getMajorGraph(major);
+        if (!graph) {
+            return NextResponse.json({ error: 'Unknown major' }, { status: 400 });
         }
 
-        await saveProgress(targetId, major, completed);
+        // Check the whole set against the major's prerequisite graph
+        const completedCodes = new Set<string>();
+        for (const c of completed) {
+            const code = typeof c === 'string' ? c : c?.code;
+            if (typeof code === 'string') completedCodes.add(normalizeCode(code));
+        }
+        const violations = validateCompleted(graph, completedCodes);
+        if (violations.length > 0) {
+            return NextResponse.json(
+                { error: 'prerequisite_not_met', details: violations },
+                { status: 400 }
+            );
+        }
+
+        const version = await saveProgress(targetId, major, completed);
+
+        updateStudentCredits(targetId, major, completedCodes, version).catch(e => console.error("Stats update failed", e));
 
         // Silent logging linked to student
         const info = await getClientInfo();
         info.student_id = targetId;
         logVisitor(info).catch(e => console.error("Logging failed", e));
 
-        return NextResponse.json({ success: true });
+        return NextResponse.json({ success: true, version });
     } catch (e) {
         console.error("Save error:", e);
         return NextResponse.json({ error: 'Server error' }, { status: 500 });
     }
-}
+});
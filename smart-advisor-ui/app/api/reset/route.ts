@@ -1,10 +1,11 @@
 
 import { NextResponse } from 'next/server';
 import { resetDB } from '@/lib/database';
+import { withMetrics } from '@/lib/metrics';
 
 export const dynamic = 'force-dynamic';
 
-export async function POST(request: Request) {
+export const POST = withMetrics('/api/reset', async function POST(request: Request) {
     const secret = request.headers.get('x-admin-secret');
     if (!process.env.ADMIN_SECRET || secret !== process.env.ADMIN_SECRET) {
         return NextResponse.json({ error: 'Forbidden' }, { status: 403 });
@@ -20,4 +21,4 @@ export async function POST(request: Request) {
         console.error("Reset failed:", e);
         return NextResponse.json({ error: 'Reset failed' }, { status: 500 });
     }
-}
+});
@@ -1,9 +1,10 @@
 import { NextResponse } from 'next/server';
 import { initDB } from '@/lib/database';
+import { withMetrics } from '@/lib/metrics';
 
 export const dynamic = 'force-dynamic';
 
-export async function POST(request: Request) {
+export const POST = withMetrics('/api/setup', async function POST(request: Request) {
     const secret = request.headers.get('x-admin-secret');
     if (!process.env.ADMIN_SECRET || secret !== process.env.ADMIN_SECRET) {
         return NextResponse.json({ error: 'Forbidden' }, { status: 403 });
@@ -16,4 +17,4 @@ export async function POST(request: Request) {
         console.error("Setup failed:", e);
         return NextResponse.json({ error: 'Setup failed' }, { status: 500 });
     }
-}
+});
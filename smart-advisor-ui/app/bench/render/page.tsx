@@ -0,0 +1,8 @@
+import { notFound } from "next/navigation";
+import RenderBench from "@/components/RenderBench";
+
+// Only built into bundles made for benchmarking (see benchmarks/README.md)
+export default function RenderBenchPage() {
+    if (process.env.NEXT_PUBLIC_RENDER_BENCH !== "1") notFound();
+    return <RenderBench />;
+}
@@ -1,5 +1,7 @@
 import HomeClient from "@/components/HomeClient";
+import { getBundleManifest } from "@/lib/curriculum";
 
-export default function Home() {
-  return <HomeClient />;
+export default async function Home() {
+  const bundleVersions = await getBundleManifest();
+  return <HomeClient bundleVersions={bundleVersions} />;
 }
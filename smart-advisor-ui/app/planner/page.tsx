@@ -7,6 +7,7 @@ import { ArrowLeft, Sparkles, Cloud, CloudOff, Loader2 } from "lucide-react";
 import Link from "next/link";
 import PlannerSetup from "../../components/PlannerSetup";
 import PlannerDashboard from "../../components/PlannerDashboard";
+import type { PlannerOverview, PlannerSemester, SemesterSummary } from "@/lib/planner";
 
 // ── Types ────────────────────────────────────────────────────────────────
 
@@ -43,6 +44,52 @@ export interface SemesterData {
 
 const STORAGE_KEY = "htu_semester_planner_v2";
 const LEGACY_KEY = "htu_semester_planner_v1";
+// Last overview per student, so a reload only asks for what changed since
+const OVERVIEW_KEY = "htu_planner_overview_v1";
+
+interface CachedOverview {
+    cursor: string | null;
+    active: PlannerSemester | null;
+    semesters: SemesterSummary[];
+    cumulativeGPA: number;
+}
+
+function readCachedOverview(studentId: string): CachedOverview | null {
+    try {
+        const raw = sessionStorage.getItem(`${OVERVIEW_KEY}:${studentId}`);
+        return raw ? JSON.parse(raw) : null;
+    } catch {
+        return null;
+    }
+}
+
+/** Fetch the overview, sending `since` when we have a usable cached copy, and merge */
+async function fetchOverview(studentId: string): Promise<CachedOverview | null> {
+    const cached = readCachedOverview(studentId);
+    const query = cached?.cursor ? `?since=${encodeURIComponent(cached.cursor)}` : "";
+    const res = await fetch(`/api/planner/overview${query}`);
+    if (!res.ok) return null;
+
+    const overview: Omit<PlannerOverview, "etag"> = await res.json();
+    const byId = new Map((query ? cached!.semesters : []).map(s => [s.id, s]));
+    for (const s of overview.semesters) byId.set(s.id, s);
+
+    const merged: CachedOverview = {
+        cursor: overview.cursor,
+        active: overview.active !== undefined ? overview.active : (cached?.active ?? null),
+        semesters: overview.ids.map(id => byId.get(id)).filter((s): s is SemesterSummary => !!s),
+        cumulativeGPA: overview.cumulativeGPA,
+    };
+    // The cached active semester is only trusted if it is still the active one
+    if (merged.active && merged.active.id !== overview.activeId) {
+        sessionStorage.removeItem(`${OVERVIEW_KEY}:${studentId}`);
+        return query ? fetchOverview(studentId) : merged;
+    }
+    try {
+        sessionStorage.setItem(`${OVERVIEW_KEY}:${studentId}`, JSON.stringify(merged));
+    } catch { }
+    return merged;
+}
 
 function generateId() {
     return Math.random().toString(36).substring(2, 11);
@@ -52,7 +99,8 @@ export default function PlannerPage() {
     const { data: session, status: authStatus } = useSession();
     const isAuthenticated = authStatus === "authenticated";
     const [data, setData] = useState<SemesterData | null>(null);
-    const [allSemesters, setAllSemesters] = useState<SemesterData[]>([]);
+    const [semesterSummaries, setSemesterSummaries] = useState<SemesterSummary[]>([]);
+    const [cumulativeGPA, setCumulativeGPA] = useState(0);
     const [isLoaded, setIsLoaded] = useState(false);
     const [syncStatus, setSyncStatus] = useState<"idle" | "saving" | "saved" | "error">("idle");
     const saveTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
@@ -62,31 +110,22 @@ export default function PlannerPage() {
         if (authStatus === "loading") return;
 
         async function load() {
-            if (isAuthenticated) {
+            const studentId = (session?.user as any)?.student_id || session?.user?.name;
+            if (isAuthenticated && studentId) {
                 try {
-                    const res = await fetch("/api/planner");
-                    if (res.ok) {
-                        const remote = await res.json();
-                        if (remote && remote.courses && Array.isArray(remote.courses)) {
+                    // One request: active semester in full + per-semester GPA summaries
+                    const overview = await fetchOverview(studentId);
+                    if (overview) {
+                        if (overview.active) {
                             setData({
-                                id: remote.id,
-                                name: remote.name,
-                                courses: remote.courses,
-                                studySessions: remote.studySessions || [],
+                                id: overview.active.id,
+                                name: overview.active.name,
+                                courses: overview.active.courses,
+                                studySessions: overview.active.studySessions || [],
                             });
                         }
-                    }
-
-                    // Fetch all history for KPIs
-                    const historyRes = await fetch("/api/planner?all=true");
-                    if (historyRes.ok) {
-                        const history = await historyRes.json();
-                        setAllSemesters(history);
-                        if (!data && history.length > 0) {
-                            // If data wasn't set by solo load, use latest from history
-                            const latest = history[0];
-                            setData(latest);
-                        }
+                        setSemesterSummaries(overview.semesters);
+                        setCumulativeGPA(overview.cumulativeGPA);
                         setIsLoaded(true);
                         setSyncStatus("saved");
                         return;
@@ -242,7 +281,8 @@ export default function PlannerPage() {
                             <PlannerDashboard
                                 courses={data.courses}
                                 studySessions={data.studySessions}
-                                allSemesters={allSemesters}
+                                semesterSummaries={semesterSummaries}
+                                cumulativeGPA={cumulativeGPA}
                                 onUpdateCourses={handleUpdateCourses}
                                 onAddStudySession={handleAddStudySession}
                                 onDeleteStudySession={handleDeleteStudySession}
@@ -2,8 +2,10 @@
 import type { NextAuthOptions } from "next-auth";
 import CredentialsProvider from "next-auth/providers/credentials";
 import GoogleProvider from "next-auth/providers/google";
-import bcrypt from "bcryptjs";
 import { getUserByStudentId, createUser, getUserByEmail, linkAccount, updateUserDetails } from "./lib/database";
+import { hashPassword, verifyPassword } from "./lib/password-hasher";
+import { checkLoginAttempt, recordLoginFailure, recordLoginSuccess } from "./lib/login-limiter";
+import { clientIp } from "./lib/client-info";
 
 export const authOptions: NextAuthOptions = {
     providers: [
@@ -18,7 +20,7 @@ export const authOptions: NextAuthOptions = {
                 password: { label: "Password", type: "password" },
                 is_claiming: { label: "Claiming Account", type: "text" }
             },
-            async authorize(credentials) {
+            async authorize(credentials, req) {
                 console.log("Authorize called with:", { ...credentials, password: "[REDACTED]" });
                 if (!credentials?.student_id || !credentials?.password) {
                     console.log("Missing ID or Password");
@@ -29,6 +31,13 @@ export const authOptions: NextAuthOptions = {
                 const password = credentials.password as string;
                 const isClaiming = credentials.is_claiming === "true";
 
+                const reqHeaders = (req?.headers ?? {}) as Record<string, string | undefined>;
+                const check = checkLoginAttempt(studentId, clientIp(name => reqHeaders[name]));
+                if (!check.allowed) {
+                    // Surfaces as ?error=... on the login page
+                    throw new Error(`${check.reason}, try again in ${check.retryAfter}s`);
+                }
+
                 try {
                     const user = await getUserByStudentId(studentId);
                     console.log("Existing user found:", !!user);
@@ -41,7 +50,7 @@ export const authOptions: NextAuthOptions = {
                         }
 
                         console.log("Creating new user for claim:", studentId);
-                        const passwordHash = await bcrypt.hash(password, 10);
+                        const passwordHash = await hashPassword(password, 10);
                         const finalUser = await createUser({
                             student_id: studentId,
                             password_hash: passwordHash
@@ -53,14 +62,17 @@ export const authOptions: NextAuthOptions = {
 
                     if (!user || !user.password_hash) {
                         console.log("Login failed: User not found or no password hash for ID:", studentId);
+                        recordLoginFailure(studentId);
                         return null;
                     }
 
-                    const isValid = await bcrypt.compare(password, user.password_hash);
+                    const isValid = await verifyPassword(password, user.password_hash);
                     if (!isValid) {
                         console.log("Login failed: Invalid password for student_id:", studentId);
+                        recordLoginFailure(studentId);
                         return null;
                     }
+                    recordLoginSuccess(studentId);
 
                     console.log("Login successful for student_id:", studentId);
                     return { id: user.id.toString(), name: user.student_id, student_id: user.student_id } as any;
@@ -88,13 +100,13 @@ export const authOptions: NextAuthOptions = {
             }
             return true;
         },
+        // student_id lives in the JWT, so resolving a session never queries the database
         async session({ session, token }) {
             if (token.sub && session.user) {
                 (session.user as any).id = token.sub;
                 (session.user as any).provider = (token as any).provider;
-                const dbUser = await getUserByEmail(session.user.email || "") || await getUserByStudentId(session.user.name || "");
-                if (dbUser) {
-                    (session.user as any).student_id = dbUser.student_id;
+                if ((token as any).student_id) {
+                    (session.user as any).student_id = (token as any).student_id;
                 }
             }
             return session;
@@ -106,6 +118,14 @@ export const authOptions: NextAuthOptions = {
             if (account) {
                 (token as any).provider = account.provider;
             }
+            // OAuth users get it from their users row; the lookup goes through the
+            // user cache, and stops once an ID has been linked
+            if (!(token as any).student_id) {
+                const dbUser = (token.email && await getUserByEmail(token.email)) || (token.name && await getUserByStudentId(token.name)) || null;
+                if (dbUser?.student_id) {
+                    (token as any).student_id = dbUser.student_id;
+                }
+            }
             return token;
         }
     },
@@ -0,0 +1,425 @@
+"""Concurrent load / latency benchmark for the Smart Advisor API.
+
+Drives the same scenarios as testsprite_tests/TC001–TC010 (login through
+/api/auth/signin/credentials, progress save/load/delta, planner save/load,
+/api/courses and /api/admin/stats) with many concurrent virtual students,
+then writes per-route p50/p95/p99 latency, throughput and error rates to a
+JSON file that can be diffed between commits.
+
+Usage:
+    # 1. Start a local server pointed at a local Postgres (see benchmarks/README.md)
+    # 2. Run the load
+    python benchmarks/api_load.py --students 50 --duration 60 \
+        --out benchmarks/results/$(git rev-parse --short HEAD).json
+    # 3. Compare two runs (exit code 1 if any route regressed)
+    python benchmarks/api_load.py --compare benchmarks/results/base.json benchmarks/results/head.json
+
+    # Login storm: 40 threads logging in back to back while 10 students run
+    # the normal scenario; compare their p99 with and without the storm
+    python benchmarks/api_load.py --students 10 --login-storm 40 --duration 30
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+ADMIN_SECRET = os.environ.get("ADMIN_SECRET", "ADMIN_SECRET")
+TEST_STUDENT_ID = "S12345"
+TEST_PASSWORD = "secret"
+TIMEOUT = 30
+
+# Real data_science codes whose prerequisites are satisfied by the set itself,
+# so saves pass server-side validation: Fundamentals of Computing → Programming → DSA.
+PROGRESS_MAJOR = "data_science"
+PROGRESS_BASE = [
+    {"code": "40303130", "name": "Fundamentals of Computing"},
+    {"code": "40302111", "name": "Professional Skills"},
+    {"code": "30301111", "name": "Arabic Language & Communication Skills"},
+]
+PROGRESS_TOGGLES = [
+    {"code": "40201100", "name": "Programming"},
+    {"code": "30302129", "name": "Military Science"},
+    {"code": "30303121", "name": "STEM Lab I"},
+]
+
+
+class Recorder:
+    """Thread-safe latency / status collector keyed by route name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def record(self, route, latency_ms, status, ok, segments=None):
+        with self._lock:
+            entry = self.samples.setdefault(route, {"latencies": [], "errors": 0, "status": {}, "segments": {}})
+            entry["latencies"].append(latency_ms)
+            entry["status"][str(status)] = entry["status"].get(str(status), 0) + 1
+            if not ok:
+                entry["errors"] += 1
+            for name, dur in (segments or {}).items():
+                entry["segments"].setdefault(name, []).append(dur)
+
+
+def parse_server_timing(header):
+    """`db;dur=1.2;desc="3 queries", total;dur=4.5` -> {"db": 1.2, "total": 4.5}"""
+    segments = {}
+    for entry in (header or "").split(","):
+        parts = [p.strip() for p in entry.split(";")]
+        for param in parts[1:]:
+            if param.startswith("dur="):
+                try:
+                    segments[parts[0]] = float(param[4:])
+                except ValueError:
+                    pass
+    return segments
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class VirtualStudent:
+    def __init__(self, index, student_id, password, recorder, base_url, admin_secret, admin_every):
+        self.index = index
+        self.student_id = student_id
+        self.password = password
+        self.recorder = recorder
+        self.base_url = base_url
+        self.admin_secret = admin_secret
+        self.admin_every = admin_every
+        self.session = requests.Session()
+        self.iteration = 0
+
+    def call(self, route, method, path, expect=(200,), **kwargs):
+        started = time.perf_counter()
+        status = "exception"
+        ok = False
+        segments = None
+        try:
+            resp = self.session.request(method, f"{self.base_url}{path}", timeout=TIMEOUT, **kwargs)
+            status = resp.status_code
+            ok = status in expect
+            segments = parse_server_timing(resp.headers.get("Server-Timing"))
+            return resp
+        except requests.RequestException:
+            return None
+        finally:
+            self.recorder.record(route, (time.perf_counter() - started) * 1000.0, status, ok, segments)
+
+    def login(self):
+        resp = self.call(
+            "POST /api/auth/signin/credentials", "POST", "/api/auth/signin/credentials",
+            json={"student_id": self.student_id, "password": self.password},
+        )
+        return resp is not None and resp.status_code == 200
+
+    def run_iteration(self):
+        self.iteration += 1
+        sid = self.student_id
+
+        # TC001 — autocomplete list
+        self.call("GET /api/courses", "GET", "/api/courses", expect=(200, 304))
+
+        # TC005 / TC004 — progress save + load
+        completed = PROGRESS_BASE + random.sample(PROGRESS_TOGGLES, random.randint(0, len(PROGRESS_TOGGLES)))
+        self.call(
+            "POST /api/progress/[studentId]/save", "POST", f"/api/progress/{sid}/save",
+            json={"major": PROGRESS_MAJOR, "completed": completed},
+        )
+        loaded = self.call(
+            "GET /api/progress/[studentId]", "GET", f"/api/progress/{sid}",
+            params={"major": PROGRESS_MAJOR},
+        )
+
+        # TC011 — one coalesced checkbox toggle against the version just read
+        if loaded is not None and loaded.status_code == 200:
+            state = loaded.json()
+            have = {c["code"] if isinstance(c, dict) else c for c in state.get("completed", [])}
+            toggle = random.choice(PROGRESS_TOGGLES)
+            op = {"remove": [toggle["code"]]} if toggle["code"] in have else {"add": [toggle]}
+            self.call(
+                "POST /api/progress/[studentId]/delta", "POST", f"/api/progress/{sid}/delta",
+                expect=(200, 409),
+                json={"major": PROGRESS_MAJOR, "version": state.get("version", 0), **op},
+            )
+
+        # TC007 / TC006 — planner save + load (one semester per virtual student)
+        planner = {
+            "id": f"bench-{sid}-{self.index}",
+            "name": "Benchmark Semester",
+            "courses": [
+                {"id": "c1", "name": "Programming", "code": "40201100", "credits": 3,
+                 "hasMidterm": True, "status": "In Progress", "grade": random.choice(["D", "M", "P", None])},
+                {"id": "c2", "name": "Discrete Maths", "code": "40303221", "credits": 3,
+                 "hasMidterm": False, "status": "In Progress", "grade": None},
+            ],
+            "studySessions": [
+                {"id": f"s{self.iteration}", "courseId": "c1", "date": time.strftime("%Y-%m-%d"), "hours": 1.5},
+            ],
+        }
+        self.call("POST /api/planner", "POST", "/api/planner", json=planner)
+        self.call("GET /api/planner", "GET", "/api/planner")
+
+        # TC010 — admin dashboard polling, from a fraction of the virtual students
+        if self.admin_every and self.iteration % self.admin_every == 0:
+            self.call(
+                "GET /api/admin/stats", "GET", "/api/admin/stats",
+                headers={"x-admin-secret": self.admin_secret},
+            )
+
+
+def storm_logins(index, accounts, recorder, base_url, stop):
+    """Log in back to back, as at semester start, until `stop` is set.
+
+    Each storm thread poses as its own client address so the per-IP limit
+    behaves like a crowd of students rather than one abusive host. 429 and
+    503 are expected answers under load (limited / shed), not errors.
+    """
+    headers = {"X-Forwarded-For": f"10.77.{index // 250}.{index % 250 + 1}"}
+    i = index
+    while not stop.is_set():
+        student_id, password = accounts[i % len(accounts)]
+        i += 1
+        started = time.perf_counter()
+        status = "exception"
+        try:
+            resp = requests.post(f"{base_url}/api/auth/signin/credentials", headers=headers, timeout=TIMEOUT,
+                                 json={"student_id": student_id, "password": password})
+            status = resp.status_code
+            if status in (429, 503):
+                time.sleep(min(float(resp.headers.get("Retry-After", 1)), 1.0))
+        except requests.RequestException:
+            pass
+        finally:
+            recorder.record("POST login (storm)", (time.perf_counter() - started) * 1000.0, status,
+                            status in (200, 429, 503))
+
+
+def load_accounts(path, count):
+    if not path:
+        return [(TEST_STUDENT_ID, TEST_PASSWORD)] * count
+    with open(path) as fh:
+        accounts = [tuple(line.strip().split(":", 1)) for line in fh if ":" in line]
+    if not accounts:
+        sys.exit(f"No 'student_id:password' lines found in {path}")
+    return [accounts[i % len(accounts)] for i in range(count)]
+
+
+def seed_accounts(base_url, count, prefix, password):
+    """Claim `count` bench accounts through the NextAuth credentials flow.
+
+    Accounts that already exist are left alone; the claim simply fails and
+    the subsequent login uses the same password.
+    """
+    accounts = []
+    for i in range(count):
+        student_id = f"{prefix}{i:04d}"
+        session = requests.Session()
+        csrf = session.get(f"{base_url}/api/auth/csrf", timeout=TIMEOUT).json()["csrfToken"]
+        session.post(
+            f"{base_url}/api/auth/callback/credentials",
+            data={"csrfToken": csrf, "student_id": student_id, "password": password,
+                  "is_claiming": "true", "json": "true"},
+            timeout=TIMEOUT,
+        )
+        accounts.append((student_id, password))
+    return accounts
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(recorder, elapsed_s):
+    routes = {}
+    total_requests = 0
+    total_errors = 0
+    for route, entry in sorted(recorder.samples.items()):
+        lat = sorted(entry["latencies"])
+        count = len(lat)
+        total_requests += count
+        total_errors += entry["errors"]
+        routes[route] = {
+            "count": count,
+            "errors": entry["errors"],
+            "error_rate": round(entry["errors"] / count, 4) if count else 0.0,
+            "rps": round(count / elapsed_s, 2) if elapsed_s else 0.0,
+            "mean_ms": round(sum(lat) / count, 2) if count else 0.0,
+            "p50_ms": round(percentile(lat, 50), 2),
+            "p95_ms": round(percentile(lat, 95), 2),
+            "p99_ms": round(percentile(lat, 99), 2),
+            "max_ms": round(lat[-1], 2) if lat else 0.0,
+            "status": entry["status"],
+            # Server-side breakdown from the Server-Timing header (mean ms per segment)
+            "server_timing_ms": {
+                name: round(sum(durs) / len(durs), 2) for name, durs in entry.get("segments", {}).items()
+            },
+        }
+    return {
+        "total": {
+            "requests": total_requests,
+            "errors": total_errors,
+            "error_rate": round(total_errors / total_requests, 4) if total_requests else 0.0,
+            "rps": round(total_requests / elapsed_s, 2) if elapsed_s else 0.0,
+        },
+        "routes": routes,
+    }
+
+
+def run(args):
+    base_url = args.base_url.rstrip("/")
+    if args.seed:
+        accounts = seed_accounts(base_url, args.students, args.seed_prefix, args.seed_password)
+    else:
+        accounts = load_accounts(args.accounts, args.students)
+        if not args.accounts and args.students > 1:
+            print(f"warning: all {args.students} virtual students share {TEST_STUDENT_ID}; "
+                  "use --seed or --accounts for realistic row contention", file=sys.stderr)
+
+    recorder = Recorder()
+    stop = threading.Event()
+    students = [
+        VirtualStudent(i, sid, pw, recorder, base_url, args.admin_secret, args.admin_every)
+        for i, (sid, pw) in enumerate(accounts)
+    ]
+
+    def drive(student):
+        # Stagger ramp-up so logins don't all land in the same millisecond.
+        time.sleep(random.uniform(0, args.ramp_up))
+        if not student.login():
+            return
+        while not stop.is_set():
+            student.run_iteration()
+            if args.think_time:
+                time.sleep(random.uniform(0, args.think_time))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.students + args.login_storm) as pool:
+        futures = [pool.submit(drive, s) for s in students]
+        futures += [pool.submit(storm_logins, i, accounts, recorder, base_url, stop) for i in range(args.login_storm)]
+        stop.wait(args.duration)
+        stop.set()
+        for f in futures:
+            f.result()
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "base_url": base_url,
+            "students": args.students,
+            "duration_s": round(elapsed, 2),
+            "think_time_s": args.think_time,
+            "login_storm": args.login_storm,
+        },
+        **summarize(recorder, elapsed),
+    }
+    storm = recorder.samples.get("POST login (storm)")
+    if storm:
+        codes = storm["status"]
+        report["login_storm"] = {
+            "logins_per_s": round(codes.get("200", 0) / elapsed, 2),
+            "limited": codes.get("429", 0),
+            "shed": codes.get("503", 0),
+        }
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+        print(f"wrote {args.out}")
+    print_report(report)
+    return report
+
+
+def print_report(report):
+    print(f"{'route':45} {'count':>7} {'err%':>6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for route, r in report["routes"].items():
+        print(f"{route:45} {r['count']:>7} {r['error_rate'] * 100:>5.1f}% {r['rps']:>8.1f} "
+              f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}")
+        if r.get("server_timing_ms"):
+            print(f"{'':45} server: " + "  ".join(f"{k}={v:.1f}" for k, v in r["server_timing_ms"].items()))
+    t = report["total"]
+    print(f"{'TOTAL':45} {t['requests']:>7} {t['error_rate'] * 100:>5.1f}% {t['rps']:>8.1f}")
+    if "login_storm" in report:
+        s = report["login_storm"]
+        print(f"login storm: {s['logins_per_s']:.1f} logins/s, {s['limited']} rate-limited, {s['shed']} shed (503)")
+
+
+def compare(base_path, head_path, threshold):
+    """Print per-route deltas; returns True if any route regressed past `threshold`."""
+    with open(base_path) as fh:
+        base = json.load(fh)
+    with open(head_path) as fh:
+        head = json.load(fh)
+
+    regressed = False
+    print(f"{'route':45} {'metric':>8} {'base':>9} {'head':>9} {'delta':>8}")
+    for route in sorted(set(base["routes"]) | set(head["routes"])):
+        b = base["routes"].get(route)
+        h = head["routes"].get(route)
+        if not b or not h:
+            print(f"{route:45} {'(only in ' + ('head' if h else 'base') + ')':>8}")
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "error_rate"):
+            before, after = b[metric], h[metric]
+            delta = (after - before) / before if before else (0.0 if after == before else math.inf)
+            flag = ""
+            if metric == "error_rate":
+                if after > before + 0.001:
+                    flag, regressed = " !", True
+            elif delta > threshold:
+                flag, regressed = " !", True
+            print(f"{route:45} {metric:>8} {before:>9.2f} {after:>9.2f} {delta * 100:>7.1f}%{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--admin-secret", default=ADMIN_SECRET)
+    parser.add_argument("--students", type=int, default=20, help="concurrent virtual students")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of sustained load")
+    parser.add_argument("--ramp-up", type=float, default=2.0, help="seconds over which students start")
+    parser.add_argument("--think-time", type=float, default=0.0, help="max random pause between iterations")
+    parser.add_argument("--admin-every", type=int, default=10,
+                        help="poll /api/admin/stats every N iterations per student (0 disables)")
+    parser.add_argument("--accounts", help="file of 'student_id:password' lines")
+    parser.add_argument("--seed", action="store_true", help="claim one bench account per virtual student first")
+    parser.add_argument("--seed-prefix", default="BENCH")
+    parser.add_argument("--seed-password", default="bench-password")
+    parser.add_argument("--login-storm", type=int, default=0, metavar="N",
+                        help="add N threads that do nothing but log in, back to back")
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), help="diff two JSON reports")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative latency regression to flag")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(args.compare[0], args.compare[1], args.threshold) else 0)
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
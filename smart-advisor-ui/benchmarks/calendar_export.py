@@ -0,0 +1,125 @@
+"""Throughput / idempotency benchmark for the Google Calendar exam export.
+
+Runs entirely offline against scripts/gcal-stub.mjs. Each round pushes the
+same semester through POST /api/integrations/google-calendar and reads the
+stub's counters, checking that the calendar ends up with exactly one live
+event per exam:
+
+    1. initial export       every exam is created
+    2. identical re-export  nothing is sent to the calendar
+    3. some dates moved     only those events are updated
+    4. some courses dropped their events are deleted
+
+Usage:
+    node scripts/gcal-stub.mjs &
+    GOOGLE_CALENDAR_API_URL=http://localhost:4020/calendar/v3 \
+    GOOGLE_OAUTH_TOKEN_URL=http://localhost:4020/token npm start
+    python benchmarks/calendar_export.py --courses 12
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+STUB_URL = os.environ.get("GCAL_STUB_URL", "http://localhost:4020")
+TEST_STUDENT_ID = "S12345"
+TEST_PASSWORD = "secret"
+TIMEOUT = 120
+
+
+def make_courses(n, shift_every=0):
+    courses = []
+    for i in range(n):
+        day = 10 + (i % 15)
+        if shift_every and i % shift_every == 0:
+            day += 1
+        courses.append({
+            "id": f"bench{i}",
+            "code": f"BENCH{i:04d}",
+            "name": f"Bench Course {i}",
+            "credits": 3,
+            "midtermDate": f"2026-11-{day:02d}",
+            "finalDate": f"2027-01-{day:02d}",
+        })
+    return courses
+
+
+def stub_stats():
+    return requests.get(f"{STUB_URL}/__stats", timeout=TIMEOUT).json()
+
+
+def export(session, courses):
+    before = stub_stats()
+    started = time.perf_counter()
+    resp = session.post(f"{BASE_URL}/api/integrations/google-calendar", json={"courses": courses}, timeout=TIMEOUT)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    resp.raise_for_status()
+    after = stub_stats()
+    body = resp.json()
+    return {
+        "ms": round(elapsed_ms, 1),
+        "successCount": body["successCount"],
+        "totalCount": body["totalCount"],
+        "created": body.get("created"),
+        "updated": body.get("updated"),
+        "unchanged": body.get("unchanged"),
+        "deleted": body.get("deleted"),
+        "calendarRequests": after["requests"] - before["requests"],
+        "throttled": after["throttled"] - before["throttled"],
+        "peakInFlight": after["peakInFlight"],
+        "liveEvents": after["events"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=12)
+    parser.add_argument("--out", help="write the round results to this JSON file")
+    args = parser.parse_args()
+
+    requests.post(f"{STUB_URL}/__reset", timeout=TIMEOUT).raise_for_status()
+
+    session = requests.Session()
+    resp = session.post(f"{BASE_URL}/api/auth/signin/credentials",
+                        json={"student_id": TEST_STUDENT_ID, "password": TEST_PASSWORD}, timeout=TIMEOUT)
+    resp.raise_for_status()
+    # The stub accepts any code; this stores a fresh token (and clears the event map)
+    session.get(f"{BASE_URL}/api/integrations/google-calendar/callback", params={"code": "bench"},
+                allow_redirects=False, timeout=TIMEOUT)
+
+    n = args.courses
+    rounds = [
+        ("initial", make_courses(n), 2 * n),
+        ("identical", make_courses(n), 2 * n),
+        ("dates moved", make_courses(n, shift_every=3), 2 * n),
+        ("courses dropped", make_courses(n, shift_every=3)[: n // 2], 2 * (n // 2)),
+    ]
+
+    results = {}
+    failed = False
+    for name, courses, expected_live in rounds:
+        r = export(session, courses)
+        results[name] = r
+        ok = r["liveEvents"] == expected_live and r["successCount"] == r["totalCount"]
+        failed |= not ok
+        print(f"{name:16s} {r['ms']:8.1f} ms  calendar requests={r['calendarRequests']:3d}  "
+              f"created={r['created']} updated={r['updated']} unchanged={r['unchanged']} deleted={r['deleted']}  "
+              f"429s={r['throttled']}  live={r['liveEvents']}/{expected_live}  {'ok' if ok else 'MISMATCH'}")
+
+    if results["identical"]["calendarRequests"] != 0:
+        print("identical re-export should not touch the calendar")
+        failed = True
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"courses": n, "rounds": results}, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Throughput benchmark for the cohort analytics job (POST /api/admin/analytics).
+
+Seeds --students synthetic `SYN…` rows into student_progress with psql's COPY
+(each student has completed a random prefix of their major's courses in level
+order, with a few courses skipped), triggers one run through the admin API
+and reports the job's duration and students/sec, then deletes the rows again
+unless --keep is given. Exits non-zero when the run takes longer than
+--budget-s (60 s).
+
+Usage:
+    export POSTGRES_URL=postgres://...   # the database the server uses
+    npm start
+    python benchmarks/cohort_analytics.py --students 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+ADMIN_SECRET = os.environ.get("ADMIN_SECRET", "ADMIN_SECRET")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CURRICULUM = os.path.join(ROOT, "public", "data", "curriculum.json")
+LISTS = ("university_requirements", "college_requirements", "department_requirements",
+         "work_market_requirements", "university_electives", "electives")
+PREFIX = "SYN"
+
+
+def major_courses(raw):
+    out = {}
+    for major, data in raw["majors"].items():
+        courses = []
+        for key in LISTS:
+            entries = data.get(key)
+            if entries is None:
+                entries = raw["shared"].get(key, [])
+            courses.extend(entries or [])
+        seen, codes = set(), []
+        for c in sorted(courses, key=lambda c: c.get("level", 1)):
+            if c["code"] not in seen:
+                seen.add(c["code"])
+                codes.append(c["code"])
+        out[major] = codes
+    return out
+
+
+def psql(url, sql, stdin=None):
+    subprocess.run(["psql", url, "-v", "ON_ERROR_STOP=1", "-q", "-c", sql],
+                   input=stdin, text=True, check=True)
+
+
+def seed(url, courses, students, rng):
+    majors = list(courses)
+    lines = []
+    for n in range(students):
+        major = rng.choice(majors)
+        codes = courses[major]
+        done = [c for c in codes[:rng.randint(0, len(codes))] if rng.random() > 0.1]
+        # COPY text format: only backslash, tab and newline need escaping, none occur in the JSON
+        payload = json.dumps(done)
+        lines.append(f"{PREFIX}{n:07d}\t{major}\t{payload}\t{payload}")
+    psql(url, "COPY student_progress (student_id, major, completed, completed_jsonb) FROM STDIN",
+         "\n".join(lines) + "\n")
+
+
+def cleanup(url):
+    psql(url, f"DELETE FROM student_progress WHERE student_id LIKE '{PREFIX}%'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--database-url", default=os.environ.get("POSTGRES_URL"))
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--budget-s", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="leave the synthetic rows in place")
+    parser.add_argument("--out", help="write the result to this JSON file")
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url or POSTGRES_URL is required to seed rows")
+
+    with open(CURRICULUM) as fh:
+        courses = major_courses(json.load(fh))
+
+    cleanup(args.database_url)
+    started = time.perf_counter()
+    seed(args.database_url, courses, args.students, random.Random(args.seed))
+    print(f"seeded {args.students} students in {time.perf_counter() - started:.1f}s")
+
+    try:
+        started = time.perf_counter()
+        resp = requests.post(f"{args.base_url}/api/admin/analytics", headers={"x-admin-secret": ADMIN_SECRET},
+                             timeout=max(600, args.budget_s * 5))
+        wall = time.perf_counter() - started
+        resp.raise_for_status()
+        run = resp.json()
+        seconds = run["durationMs"] / 1000
+        result = {
+            "students": run["students"],
+            "skipped": run["skipped"],
+            "duration_s": round(seconds, 2),
+            "wall_s": round(wall, 2),
+            "students_per_s": round(run["students"] / seconds) if seconds else None,
+            "budget_s": args.budget_s,
+        }
+        print(json.dumps(result, indent=2))
+
+        resp = requests.get(f"{args.base_url}/api/admin/analytics?limit=3", headers={"x-admin-secret": ADMIN_SECRET},
+                            timeout=30)
+        resp.raise_for_status()
+        for b in resp.json()["bottlenecks"]:
+            print(f"  {b['major']:26} {b['code']:10} score {b['score']:>10.1f}  blocks {b['blockedStudents']} students")
+
+        if args.out:
+            with open(args.out, "w") as fh:
+                json.dump(result, fh, indent=2)
+    finally:
+        if not args.keep:
+            cleanup(args.database_url)
+
+    sys.exit(1 if seconds > args.budget_s else 0)
+
+
+if __name__ == "__main__":
+    main()
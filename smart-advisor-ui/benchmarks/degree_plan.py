@@ -0,0 +1,114 @@
+"""Latency benchmark for the degree-plan scheduler (POST /api/degree-plan).
+
+For every major in public/data/curriculum.json, asks for a plan from a range
+of starting points (nothing done, then every non-elective course of levels
+1, 1-2 and 1-3 completed) and records the scheduler's own compute time from
+the route's `Server-Timing: scheduler;dur=<ms>` header, plus the round trip.
+Exits non-zero if any major's p99 compute time exceeds --budget-ms (5 ms by
+default, the bar for recomputing on every checkbox toggle).
+
+Usage:
+    npm start   # no database needed: `completed` is sent explicitly
+    python benchmarks/degree_plan.py --rounds 50
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CURRICULUM = os.path.join(ROOT, "public", "data", "curriculum.json")
+TIMEOUT = 30
+SHARED_LISTS = ("university_requirements", "college_requirements", "university_electives")
+REQUIRED_LISTS = ("university_requirements", "college_requirements", "department_requirements",
+                  "work_market_requirements")
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def scenarios(raw, major):
+    data = raw["majors"][major]
+    required = []
+    for key in REQUIRED_LISTS:
+        courses = data.get(key)
+        if courses is None and key in SHARED_LISTS:
+            courses = raw["shared"].get(key, [])
+        required.extend(courses or [])
+    yield "none", []
+    for top in (1, 2, 3):
+        yield f"levels<={top}", sorted({c["code"] for c in required if c.get("level", 1) <= top})
+
+
+def server_ms(resp):
+    match = re.search(r"scheduler;dur=([\d.]+)", resp.headers.get("Server-Timing", ""))
+    return float(match.group(1)) if match else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--rounds", type=int, default=30, help="requests per major and starting point")
+    parser.add_argument("--max-credits", type=int, default=18)
+    parser.add_argument("--budget-ms", type=float, default=5.0)
+    parser.add_argument("--out", help="write the per-major results to this JSON file")
+    args = parser.parse_args()
+
+    with open(CURRICULUM) as fh:
+        raw = json.load(fh)
+
+    session = requests.Session()
+    results = {}
+    failed = False
+    print(f"{'major':26} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'http p50':>9}  semesters by start")
+    for major in raw["majors"]:
+        compute, http, plans = [], [], {}
+        for name, completed in scenarios(raw, major):
+            for _ in range(args.rounds):
+                started = time.perf_counter()
+                resp = session.post(f"{args.base_url}/api/degree-plan", timeout=TIMEOUT,
+                                    json={"major": major, "completed": completed, "maxCredits": args.max_credits})
+                http.append((time.perf_counter() - started) * 1000)
+                resp.raise_for_status()
+                ms = server_ms(resp)
+                if ms is not None:
+                    compute.append(ms)
+            body = resp.json()
+            plans[name] = {"semesters": len(body["semesters"]), "lowerBound": body["lowerBound"]}
+
+        compute.sort()
+        http.sort()
+        r = {
+            "p50_ms": round(percentile(compute, 50), 3),
+            "p99_ms": round(percentile(compute, 99), 3),
+            "max_ms": round(compute[-1], 3) if compute else None,
+            "http_p50_ms": round(percentile(http, 50), 2),
+            "plans": plans,
+        }
+        results[major] = r
+        over = not compute or r["p99_ms"] > args.budget_ms
+        failed |= over
+        shape = " ".join(f"{p['semesters']}/{p['lowerBound']}" for p in plans.values())
+        print(f"{major:26} {r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} {r['max_ms'] or 0:>8.3f} {r['http_p50_ms']:>9.2f}  "
+              f"{shape}{'  OVER BUDGET' if over else ''}")
+
+    print("(semesters by start = planned/lower bound for: none, levels<=1, levels<=2, levels<=3)")
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump({"max_credits": args.max_credits, "budget_ms": args.budget_ms, "majors": results}, fh, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
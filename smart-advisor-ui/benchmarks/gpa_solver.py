@@ -0,0 +1,180 @@
+"""Benchmark for the target-GPA what-if solver (POST /api/planner/what-if).
+
+1. Correctness: random small transcripts (up to --naive-max ungraded
+   courses) are solved by the route and by naive enumeration of every
+   D/M/P/U combination here; least effort, reachability and the chance of
+   reaching the target must agree.
+2. Speed: a full 166-CH transcript (54 three-CH and two two-CH courses) with
+   0, 25, 50 and 75% of it graded, against every classification target. The
+   solver's own time comes from the route's `Server-Timing: solver;dur=<ms>`
+   header; the script exits non-zero when its p99 exceeds --budget-ms (10 ms,
+   the bar for re-solving on every edit). Naive enumeration time is measured
+   up to --naive-max courses and extrapolated at 4x per course.
+
+Usage:
+    npm start   # no database needed: `courses` is sent explicitly
+    python benchmarks/gpa_solver.py --rounds 50
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+TIMEOUT = 30
+POINTS = {"D": 4.0, "M": 3.2, "P": 2.4, "U": 0.0}
+STEPS = {"D": 2, "M": 1, "P": 0, "U": 0}
+TARGETS = {"EX": 3.6, "VG": 3.2, "Good": 2.8, "SAT": 2.4}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def server_ms(resp):
+    match = re.search(r"solver;dur=([\d.]+)", resp.headers.get("Server-Timing", ""))
+    return float(match.group(1)) if match else None
+
+
+def gpa(courses):
+    """calculateGPA: credit-weighted, rounded half up to two decimals."""
+    credits = sum(c for c, _ in courses)
+    if credits == 0:
+        return 0.0
+    return math.floor(sum(c * POINTS[g] for c, g in courses) / credits * 100 + 0.5) / 100
+
+
+def naive(graded, remaining, target, dist):
+    """Every D/M/P/U combination of the remaining courses: 4^n evaluations."""
+    best, chance = None, 0.0
+    for combo in itertools.product("DMPU", repeat=len(remaining)):
+        if gpa(graded + list(zip(remaining, combo))) < target - 1e-9:
+            continue
+        chance += math.prod(dist[g] for g in combo)
+        if "U" not in combo:
+            effort = sum(c * STEPS[g] for c, g in zip(remaining, combo))
+            best = effort if best is None else min(best, effort)
+    return best, chance
+
+
+def transcript(rng, graded_count, remaining_credits):
+    courses = [{"credits": rng.choice((1, 2, 3, 3, 3, 4)), "grade": rng.choice("DMPU")}
+               for _ in range(graded_count)]
+    courses += [{"id": f"r{i}", "credits": c} for i, c in enumerate(remaining_credits)]
+    return courses
+
+
+def solve(session, base_url, courses, target):
+    started = time.perf_counter()
+    resp = session.post(f"{base_url}/api/planner/what-if", timeout=TIMEOUT,
+                        json={"target": target, "courses": courses})
+    http_ms = (time.perf_counter() - started) * 1000
+    resp.raise_for_status()
+    return resp, http_ms
+
+
+def check_correctness(session, base_url, rng, cases, naive_max):
+    mismatches = 0
+    for _ in range(cases):
+        n = rng.randint(1, naive_max)
+        courses = transcript(rng, rng.randint(0, 6), [rng.choice((1, 2, 3, 3, 4)) for _ in range(n)])
+        target = round(rng.uniform(0, 4), 2)
+        body = solve(session, base_url, courses, target)[0].json()
+        graded = [(c["credits"], c["grade"]) for c in courses if c.get("grade")]
+        remaining = [c["credits"] for c in courses if not c.get("grade")]
+        effort, chance = naive(graded, remaining, target, body["distribution"])
+        if effort != body["minimumEffort"] or abs(chance - body["probability"]) > 1e-6:
+            mismatches += 1
+            print(f"  mismatch: target {target} courses {courses}: naive {effort}/{chance:.6f}, "
+                  f"solver {body['minimumEffort']}/{body['probability']:.6f}")
+    return mismatches
+
+
+def naive_timing(rng, naive_max):
+    timings = {}
+    for n in range(4, naive_max + 1):
+        remaining = [3] * n
+        started = time.perf_counter()
+        naive([(3, "M")] * 10, remaining, 3.2, {"D": 0.3, "M": 0.3, "P": 0.3, "U": 0.1})
+        timings[n] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--rounds", type=int, default=30, help="requests per scenario and target")
+    parser.add_argument("--cases", type=int, default=100, help="random small transcripts checked against enumeration")
+    parser.add_argument("--naive-max", type=int, default=8, help="most ungraded courses to enumerate naively")
+    parser.add_argument("--budget-ms", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    session = requests.Session()
+
+    print(f"checking {args.cases} transcripts of up to {args.naive_max} ungraded courses against enumeration")
+    mismatches = check_correctness(session, args.base_url, rng, args.cases, args.naive_max)
+    print(f"  {mismatches} mismatches")
+
+    full = [3] * 54 + [2, 2]
+    results = {}
+    print(f"{'graded':>7} {'target':>7} {'p50 ms':>8} {'p99 ms':>8} {'http p50':>9}  effort / chance")
+    for graded_share in (0, 0.25, 0.5, 0.75):
+        cut = round(len(full) * graded_share)
+        courses = [{"credits": c, "grade": rng.choice("DMP")} for c in full[:cut]]
+        courses += [{"id": f"r{i}", "credits": c} for i, c in enumerate(full[cut:])]
+        for name, target in TARGETS.items():
+            compute, http = [], []
+            for _ in range(args.rounds):
+                resp, http_ms = solve(session, args.base_url, courses, target)
+                http.append(http_ms)
+                ms = server_ms(resp)
+                if ms is not None:
+                    compute.append(ms)
+            body = resp.json()
+            compute.sort()
+            http.sort()
+            key = f"{int(graded_share * 100)}%/{name}"
+            results[key] = {
+                "p50_ms": round(percentile(compute, 50), 3),
+                "p99_ms": round(percentile(compute, 99), 3),
+                "http_p50_ms": round(percentile(http, 50), 2),
+                "minimumEffort": body["minimumEffort"],
+                "probability": body["probability"],
+            }
+            r = results[key]
+            print(f"{int(graded_share * 100):>6}% {name:>7} {r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} "
+                  f"{r['http_p50_ms']:>9.2f}  {r['minimumEffort']} / {r['probability']:.4f}")
+
+    timings = naive_timing(rng, args.naive_max)
+    n_max = max(timings)
+    remaining_courses = len(full)
+    extrapolated_s = timings[n_max] / 1000 * 4 ** (remaining_courses - n_max)
+    print("naive enumeration: " + ", ".join(f"{n} courses {ms:.1f} ms" for n, ms in timings.items()))
+    print(f"  extrapolated to {remaining_courses} courses: {extrapolated_s:.3g} s")
+
+    worst = max((r["p99_ms"] for r in results.values()), default=float("inf"))
+    failed = mismatches > 0 or worst > args.budget_ms
+    print(f"solver p99 worst case {worst:.3f} ms (budget {args.budget_ms} ms){'  OVER BUDGET' if worst > args.budget_ms else ''}")
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump({"budget_ms": args.budget_ms, "mismatches": mismatches, "scenarios": results,
+                       "naive_ms": timings, "naive_extrapolated_s": extrapolated_s}, fh, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Render benchmark for TranscriptView and PlannerDashboard (/bench/render).
+
+Loads the render harness in headless Chromium, which mounts both views with a
+synthetic 200-course, 2000-session student, drives a fixed script (20 course
+toggles, 20 keystrokes in a planner row, 10 added study sessions) and records
+React Profiler commit durations per step. Repeats --runs times and reports the
+median of each statistic. Exits non-zero when the p95 commit of an
+interactive step exceeds --budget-ms (16 ms, one frame at 60 Hz).
+
+Usage:
+    NEXT_PUBLIC_RENDER_BENCH=1 npx next build --profile && npm start
+    pip install playwright && playwright install chromium
+    python benchmarks/render.py --runs 5 --out render.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+
+try:
+    from playwright.sync_api import sync_playwright
+except ImportError:
+    sys.exit("playwright is required: pip install playwright && playwright install chromium")
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+INTERACTIVE = ("transcript_toggle", "planner_keystroke", "planner_add_session")
+TIMEOUT_MS = 120_000
+
+
+def run_once(page, url):
+    page.goto(url)
+    page.wait_for_function("window.__renderBench && window.__renderBench.done", timeout=TIMEOUT_MS)
+    bench = page.evaluate("window.__renderBench")
+    if bench.get("error"):
+        raise RuntimeError(bench["error"])
+    return bench["result"]["steps"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=16.0)
+    parser.add_argument("--cpu-throttle", type=float, default=1.0,
+                        help="CDP CPU slowdown factor, e.g. 4 to approximate a mid-range phone")
+    parser.add_argument("--out", help="write the per-step medians to this JSON file")
+    args = parser.parse_args()
+
+    runs = []
+    with sync_playwright() as p:
+        browser = p.chromium.launch()
+        page = browser.new_page(viewport={"width": 1440, "height": 900})
+        if args.cpu_throttle > 1:
+            cdp = page.context.new_cdp_session(page)
+            cdp.send("Emulation.setCPUThrottlingRate", {"rate": args.cpu_throttle})
+        for _ in range(args.runs):
+            runs.append(run_once(page, f"{args.base_url}/bench/render"))
+        browser.close()
+
+    results = {}
+    failed = False
+    print(f"{'step':22} {'commits':>8} {'total ms':>10} {'p95 ms':>8} {'max ms':>8}")
+    for step in runs[0]:
+        r = {key: statistics.median(run[step][key] for run in runs) for key in ("commits", "totalMs", "p95Ms", "maxMs")}
+        results[step] = r
+        over = step in INTERACTIVE and r["p95Ms"] > args.budget_ms
+        failed |= over
+        print(f"{step:22} {r['commits']:>8.0f} {r['totalMs']:>10.2f} {r['p95Ms']:>8.2f} {r['maxMs']:>8.2f}"
+              f"{'  OVER BUDGET' if over else ''}")
+
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump({"runs": args.runs, "cpu_throttle": args.cpu_throttle, "budget_ms": args.budget_ms,
+                       "steps": results}, fh, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,36 @@ import Link from "next/link";
 
 type AppState = "checking" | "login" | "major-select" | "transcript";
 
-export default function HomeClient() {
+interface MajorBundle {
+    major: MajorKey;
+    data: CourseData;
+    rules: any;
+}
+
+// Bundles already fetched this session; switching back to a major is free
+const bundleCache = new Map<string, Promise<MajorBundle>>();
+
+function fetchMajorBundle(key: MajorKey, version: string | undefined): Promise<MajorBundle> {
+    const url = `/api/curriculum/${encodeURIComponent(key)}${version ? `?v=${version}` : ""}`;
+    let pending = bundleCache.get(url);
+    if (!pending) {
+        pending = fetch(url).then(res => {
+            if (!res.ok) throw new Error(`Curriculum fetch failed: ${res.status}`);
+            return res.json();
+        });
+        // Don't keep failures around
+        pending.catch(() => bundleCache.delete(url));
+        bundleCache.set(url, pending);
+    }
+    return pending;
+}
+
+interface HomeClientProps {
+    /** Major key → content hash of its curriculum bundle */
+    bundleVersions: Record<string, string>;
+}
+
+export default function HomeClient({ bundleVersions }: HomeClientProps) {
     const { data: session, status } = useSession();
     const [appState, setAppState] = useState<AppState>("checking");
     const [studentId, setStudentId] = useState<string | null>(null);
@@ -89,44 +118,14 @@ export default function HomeClient() {
     };
 
 
-    /** Fetch + merge shared + major-specific data from curriculum.json + rules */
+    /** Fetch the major's bundle (course data already merged with `shared`, plus rules) */
     async function loadCourses(key: MajorKey) {
         setLoading(true);
         try {
-            const rulesPath = "/data/curriculum_rules.json";
-            const curriculumPath = "/data/curriculum.json";
-
-            console.log(`[Advisor] Fetching rules: ${rulesPath}`);
-            console.log(`[Advisor] Fetching curriculum: ${curriculumPath}`);
-
-            const [rulesRes, curriculumRes] = await Promise.all([
-                fetch(rulesPath),
-                fetch(curriculumPath),
-            ]);
-
-            if (!rulesRes.ok) throw new Error(`Rules fetch failed: ${rulesRes.status}`);
-            if (!curriculumRes.ok) throw new Error(`Curriculum fetch failed: ${curriculumRes.status}`);
-
-            const [rulesJson, curriculum] = await Promise.all([
-                rulesRes.json(),
-                curriculumRes.json(),
-            ]);
-
-            setRules(rulesJson);
-
-            const shared = curriculum.shared;
-            const majorData = curriculum.majors[key];
-
-            if (!majorData) throw new Error(`Major data not found for ${key}`);
-
-            setCourseData({
-                university_requirements: majorData.university_requirements ?? shared.university_requirements ?? [],
-                college_requirements: majorData.college_requirements ?? shared.college_requirements ?? [],
-                university_electives: majorData.university_electives ?? shared.university_electives ?? [],
-                department_requirements: majorData.department_requirements ?? [],
-                electives: majorData.electives ?? [],
-                work_market_requirements: majorData.work_market_requirements ?? [],
-            });
+            console.log(`[Advisor] Fetching curriculum bundle: ${key}`);
+            const bundle = await fetchMajorBundle(key, bundleVersions[key]);
+            setRules(bundle.rules);
+            setCourseData(bundle.data);
         } catch (e) {
             console.error("[Advisor] Data Load Error:", e);
             // Alert or show error UI? For now just log.
@@ -1,6 +1,6 @@
 "use client";
 
-import { useState, useMemo, useEffect, useRef, useCallback } from "react";
+import { useState, useMemo, useEffect, useRef, useCallback, memo } from "react";
 import { motion, AnimatePresence } from "framer-motion";
 import {
     BookOpen, Clock, Trophy, Plus,
@@ -8,12 +8,15 @@ import {
     AlertTriangle, Lightbulb, Info,
     BarChart3, Calendar, Settings, ExternalLink, Loader2, Globe, Sparkles
 } from "lucide-react";
-import { PlannerCourse, StudySession, SemesterData } from "@/app/planner/page";
+import { PlannerCourse, StudySession } from "@/app/planner/page";
+import type { PlannerSemester, SemesterSummary } from "@/lib/planner";
 import {
     calculateGPA, getClassification, GRADE_MAP,
     SCORED_GRADES, generateInsights, type Insight, type HTUGrade
 } from "@/lib/grading";
 import WeeklySummary from "./WeeklySummary";
+import { useVirtualList } from "@/lib/useVirtualList";
+import { StudyIndex } from "@/lib/study-index";
 
 // ── Color mapping (Tailwind needs static class strings) ─────────────────
 
@@ -27,19 +30,25 @@ const COLORS: Record<string, { bg: string; border: string; text: string }> = {
 };
 const gc = (key: string) => COLORS[key] || COLORS.gray;
 
+// Fixed row heights, so long tables and logs can be windowed
+const COURSE_ROW_HEIGHT = 77;
+const SESSION_ROW_HEIGHT = 60;
+
 // ── Props ───────────────────────────────────────────────────────────────
 
 interface PlannerDashboardProps {
     courses: PlannerCourse[];
     studySessions: StudySession[];
-    allSemesters?: SemesterData[];
+    /** Per-semester GPA summaries, computed server-side */
+    semesterSummaries?: SemesterSummary[];
+    cumulativeGPA?: number;
     onUpdateCourses: (courses: PlannerCourse[]) => void;
     onAddStudySession: (session: StudySession) => void;
     onDeleteStudySession: (id: string) => void;
 }
 
 export default function PlannerDashboard({
-    courses, studySessions, allSemesters = [], onUpdateCourses, onAddStudySession, onDeleteStudySession
+    courses, studySessions, semesterSummaries = [], cumulativeGPA = 0, onUpdateCourses, onAddStudySession, onDeleteStudySession
 }: PlannerDashboardProps) {
 
     // ── Onboarding state ───────────────────────────────────────────────
@@ -75,45 +84,81 @@ export default function PlannerDashboard({
     );
 
     const classification = useMemo(() => getClassification(semesterGPA), [semesterGPA]);
-    const totalCredits = courses.reduce((s, c) => s + c.credits, 0);
-    const atRiskCount = courses.filter(c => c.grade === "U" || c.grade === "WF" || c.status === "At Risk").length;
+    const { totalCredits, atRiskCount } = useMemo(() => {
+        let totalCredits = 0, atRiskCount = 0;
+        for (const c of courses) {
+            totalCredits += c.credits;
+            if (c.grade === "U" || c.grade === "WF" || c.status === "At Risk") atRiskCount++;
+        }
+        return { totalCredits, atRiskCount };
+    }, [courses]);
+
+    // Sessions bucketed by week with running per-course totals; extended in
+    // place when a session is appended, so the KPIs below don't rescan the log
+    const studyIndexRef = useRef<StudyIndex | null>(null);
+    const studyIndex = useMemo(
+        () => (studyIndexRef.current = StudyIndex.update(studyIndexRef.current, studySessions)),
+        [studySessions]
+    );
+    const indexedCount = studyIndex.size;
 
-    const insights = useMemo(() => generateInsights(courses, studySessions), [courses, studySessions]);
+    const insights = useMemo(
+        () => generateInsights(courses, studyIndex),
+        [courses, studyIndex, indexedCount]
+    );
 
-    const weekAgo = new Date(Date.now() - 7 * 86400000);
-    const weeklyHours = studySessions
-        .filter(s => new Date(s.date) >= weekAgo)
-        .reduce((s, sess) => s + sess.hours, 0);
+    const courseById = useMemo(() => new Map(courses.map(c => [c.id, c])), [courses]);
 
-    const courseHours = useMemo(() => {
-        const map: Record<string, number> = {};
-        studySessions.forEach(s => { map[s.courseId] = (map[s.courseId] || 0) + s.hours; });
-        return map;
-    }, [studySessions]);
+    const weeklyHours = useMemo(
+        () => studyIndex.hoursBetween(Date.now() - 7 * 86400000),
+        [studyIndex, indexedCount]
+    );
 
     // ── Historical KPIs ────────────────────────────────────────────────
     const historicalStats = useMemo(() => {
-        if (!allSemesters || allSemesters.length === 0) return null;
-
-        const semesterGrades = allSemesters.map(sem => {
-            const graded = sem.courses.filter(c => c.grade && SCORED_GRADES.includes(c.grade as HTUGrade));
-            const gpa = calculateGPA(graded.map(c => ({ credits: c.credits, grade: c.grade! })));
-            return {
-                name: sem.name || "Unknown Semester",
-                gpa,
-                courseCount: sem.courses.length,
-                indicator: gpa >= 2.8 ? "Good" : gpa >= 2.4 ? "Average" : gpa > 0 ? "At Risk" : "N/A"
-            };
-        });
-
-        const totalGraded = allSemesters.flatMap(s => s.courses.filter(c => c.grade && SCORED_GRADES.includes(c.grade as HTUGrade)));
-        const cumulativeGPA = calculateGPA(totalGraded.map(c => ({ credits: c.credits, grade: c.grade! })));
+        if (semesterSummaries.length === 0) return null;
+
+        const semesterGrades = semesterSummaries.map(sem => ({
+            id: sem.id,
+            rev: sem.rev,
+            name: sem.name || "Unknown Semester",
+            gpa: sem.gpa,
+            courseCount: sem.courseCount,
+            indicator: sem.gpa >= 2.8 ? "Good" : sem.gpa >= 2.4 ? "Average" : sem.gpa > 0 ? "At Risk" : "N/A"
+        }));
 
         return { semesterGrades, cumulativeGPA };
-    }, [allSemesters]);
+    }, [semesterSummaries, cumulativeGPA]);
+
+    // A past semester's courses are only fetched when its card is opened,
+    // and kept until its rev changes
+    const [openSemesterId, setOpenSemesterId] = useState<string | null>(null);
+    const [semesterDetails, setSemesterDetails] = useState<Record<string, PlannerSemester | "loading" | "error">>({});
+    const openSemester = historicalStats?.semesterGrades.find(s => s.id === openSemesterId) ?? null;
+    const openDetail = openSemester ? semesterDetails[openSemester.id] : undefined;
+
+    const semesterDetailsRef = useRef(semesterDetails);
+    useEffect(() => { semesterDetailsRef.current = semesterDetails; });
+
+    const toggleSemester = useCallback((id: string, rev: string) => {
+        setOpenSemesterId(prev => (prev === id ? null : id));
+        const cached = semesterDetailsRef.current[id];
+        if (cached === "loading" || (typeof cached === "object" && cached.rev === rev)) return;
+        setSemesterDetails(d => ({ ...d, [id]: "loading" }));
+        fetch(`/api/planner?semester=${encodeURIComponent(id)}`)
+            .then(res => (res.ok ? res.json() : Promise.reject(new Error(`Semester load failed: ${res.status}`))))
+            .then((semester: PlannerSemester) => setSemesterDetails(d => ({ ...d, [id]: semester })))
+            .catch(() => setSemesterDetails(d => ({ ...d, [id]: "error" })));
+    }, []);
 
     // ── Handlers ────────────────────────────────────────────────────────
-    const updateGrade = (id: string, grade: string) => {
+    // Read the latest props through a ref so the handlers keep their identity
+    // and an edit re-renders only the row it touched
+    const latestRef = useRef({ courses, onUpdateCourses });
+    useEffect(() => { latestRef.current = { courses, onUpdateCourses }; });
+
+    const updateGrade = useCallback((id: string, grade: string) => {
+        const { courses, onUpdateCourses } = latestRef.current;
         onUpdateCourses(courses.map(c => {
             if (c.id !== id) return c;
             const newGrade = grade || null;
@@ -123,18 +168,20 @@ export default function PlannerDashboard({
             else if (!newGrade) status = "In Progress";
             return { ...c, grade: newGrade, status };
         }));
-    };
+    }, []);
 
-    const updateField = (id: string, field: keyof PlannerCourse, value: any) => {
+    const updateField = useCallback((id: string, field: keyof PlannerCourse, value: any) => {
+        const { courses, onUpdateCourses } = latestRef.current;
         onUpdateCourses(courses.map(c => c.id === id ? { ...c, [field]: value } : c));
-    };
+    }, []);
 
-    const toggleStatus = (id: string) => {
+    const toggleStatus = useCallback((id: string) => {
         const order: Record<string, PlannerCourse["status"]> = {
             "In Progress": "Completed", "Completed": "At Risk", "At Risk": "In Progress"
         };
+        const { courses, onUpdateCourses } = latestRef.current;
         onUpdateCourses(courses.map(c => c.id === id ? { ...c, status: order[c.status] } : c));
-    };
+    }, []);
 
     const addSession = () => {
         const hrs = parseFloat(logHours);
@@ -150,9 +197,17 @@ export default function PlannerDashboard({
         setLogNotes("");
     };
 
-    const recentSessions = [...studySessions]
-        .sort((a, b) => new Date(b.date).getTime() - new Date(a.date).getTime())
-        .slice(0, 10);
+    // Whole log, newest first; the list below is windowed
+    const recentSessions = useMemo(
+        () => studySessions
+            .map((s, i) => ({ s, t: studyIndex.times[i] }))
+            .sort((a, b) => b.t - a.t)
+            .map(e => e.s),
+        [studySessions, studyIndex]
+    );
+
+    const courseRows = useVirtualList<HTMLTableSectionElement>(courses.length, COURSE_ROW_HEIGHT);
+    const sessionRows = useVirtualList<HTMLDivElement>(recentSessions.length, SESSION_ROW_HEIGHT, { scroller: "self", threshold: 30 });
 
     // ── Insight helpers ─────────────────────────────────────────────────
     const insightIcon = (type: Insight["type"]) => {
@@ -254,105 +309,19 @@ export default function PlannerDashboard({
                                 <Th className="w-32 pr-8 text-right">Status</Th>
                             </tr>
                         </thead>
-                        <tbody className="divide-y divide-white/[0.03]">
-                            {courses.map(course => {
-                                const gradeInfo = course.grade ? GRADE_MAP[course.grade] : null;
-                                const gColor = gradeInfo ? gc(gradeInfo.colorKey) : null;
-                                return (
-                                    <tr key={course.id} className="group hover:bg-white/[0.02] transition-colors">
-                                        {/* Name */}
-                                        <td className="py-5 px-8">
-                                            <div className="flex flex-col gap-0.5">
-                                                <div className="flex items-center gap-3">
-                                                    <div className={`w-2 h-2 rounded-full ${gColor ? gColor.bg : "bg-violet-500/40"} shadow-[0_0_10px_rgba(139,92,246,0.2)]`} />
-                                                    <span className="text-sm font-bold text-white tracking-tight">{course.name}</span>
-                                                </div>
-                                                <span className="text-[10px] font-bold text-white/20 ml-5 uppercase tracking-widest">{course.id}</span>
-                                            </div>
-                                        </td>
-                                        {/* Credits */}
-                                        <td className="py-5 px-4 text-center">
-                                            <span className="text-xs font-black text-white/40">{course.credits}</span>
-                                        </td>
-                                        {/* Grade */}
-                                        <td className="py-5 px-4">
-                                            <select
-                                                value={course.grade || ""}
-                                                onChange={e => updateGrade(course.id, e.target.value)}
-                                                className="bg-white/5 border border-white/5 group-hover:border-white/10 rounded-xl px-3 py-2 text-xs font-bold text-white outline-none focus:ring-2 focus:ring-violet-500/20 transition-all w-full cursor-pointer appearance-none text-center"
-                                                style={{ colorScheme: "dark" }}
-                                            >
-                                                <option value="" className="bg-[#0a0a0a]">N/A</option>
-                                                <option value="D" className="bg-[#0a0a0a]">Distinction (D)</option>
-                                                <option value="M" className="bg-[#0a0a0a]">Merit (M)</option>
-                                                <option value="P" className="bg-[#0a0a0a]">Pass (P)</option>
-                                                <option value="U" className="bg-[#0a0a0a]">Unclassified (U)</option>
-                                            </select>
-                                        </td>
-                                        {/* Midterm Date */}
-                                        <td className="py-5 px-4">
-                                            <input
-                                                type="date"
-                                                value={course.midtermDate || ""}
-                                                onChange={e => updateField(course.id, "midtermDate", e.target.value || undefined)}
-                                                className="bg-white/5 border border-white/5 group-hover:border-white/10 rounded-xl px-3 py-2 text-[11px] font-bold text-white/60 outline-none focus:ring-2 focus:ring-violet-500/20 transition-all w-full text-center"
-                                                style={{ colorScheme: "dark" }}
-                                            />
-                                        </td>
-                                        {/* Final Date */}
-                                        <td className="py-5 px-4">
-                                            <input
-                                                type="date"
-                                                value={course.finalDate || ""}
-                                                onChange={e => updateField(course.id, "finalDate", e.target.value || undefined)}
-                                                className="bg-white/5 border border-white/5 group-hover:border-white/10 rounded-xl px-3 py-2 text-[11px] font-bold text-white/60 outline-none focus:ring-2 focus:ring-violet-500/20 transition-all w-full text-center"
-                                                style={{ colorScheme: "dark" }}
-                                            />
-                                        </td>
-                                        {/* Instructor */}
-                                        <td className="py-5 px-4">
-                                            <input
-                                                type="text"
-                                                placeholder="Dr. Name"
-                                                value={course.professor || ""}
-                                                onChange={e => updateField(course.id, "professor", e.target.value)}
-                                                className="bg-white/5 border border-white/5 group-hover:border-white/10 rounded-xl px-3 py-2 text-[10px] font-bold text-white/60 placeholder:text-white/10 outline-none focus:ring-2 focus:ring-violet-500/20 transition-all w-full text-center"
-                                            />
-                                        </td>
-                                        {/* Location */}
-                                        <td className="py-5 px-4">
-                                            <input
-                                                type="text"
-                                                placeholder="Room/Lab"
-                                                value={course.location || ""}
-                                                onChange={e => updateField(course.id, "location", e.target.value)}
-                                                className="bg-white/5 border border-white/5 group-hover:border-white/10 rounded-xl px-3 py-2 text-[10px] font-bold text-white/60 placeholder:text-white/10 outline-none focus:ring-2 focus:ring-violet-500/20 transition-all w-full text-center"
-                                            />
-                                        </td>
-                                        {/* Study Hours */}
-                                        <td className="py-5 px-4 text-center">
-                                            <div className="flex flex-col items-center">
-                                                <span className="text-xs font-black text-white">{(courseHours[course.id] || 0).toFixed(1)}</span>
-                                                <span className="text-[9px] font-bold text-white/20 uppercase tracking-tighter">Hours</span>
-                                            </div>
-                                        </td>
-                                        {/* Status */}
-                                        <td className="py-5 px-8 text-right">
-                                            <button
-                                                onClick={() => toggleStatus(course.id)}
-                                                className={`px-3 py-1.5 rounded-xl text-[10px] font-black uppercase tracking-widest border transition-all ${course.status === "Completed"
-                                                    ? "bg-emerald-500/10 border-emerald-500/20 text-emerald-400"
-                                                    : course.status === "At Risk"
-                                                        ? "bg-red-500/10 border-red-500/20 text-red-400"
-                                                        : "bg-blue-500/10 border-blue-500/20 text-blue-400"
-                                                    } hover:scale-105 active:scale-95`}
-                                            >
-                                                {course.status}
-                                            </button>
-                                        </td>
-                                    </tr>
-                                );
-                            })}
+                        <tbody ref={courseRows.ref} className="divide-y divide-white/[0.03]">
+                            {courseRows.padTop > 0 && <tr aria-hidden style={{ height: courseRows.padTop }} />}
+                            {courses.slice(courseRows.start, courseRows.end).map(course => (
+                                <CourseRow
+                                    key={course.id}
+                                    course={course}
+                                    studyHours={studyIndex.hoursFor(course.id)}
+                                    onGrade={updateGrade}
+                                    onField={updateField}
+                                    onToggleStatus={toggleStatus}
+                                />
+                            ))}
+                            {courseRows.padBottom > 0 && <tr aria-hidden style={{ height: courseRows.padBottom }} />}
                         </tbody>
                     </table>
                 </div>
@@ -365,8 +334,14 @@ export default function PlannerDashboard({
                         <Trophy className="w-3.5 h-3.5" /> Academic Performance Track
                     </h3>
                     <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-4">
-                        {historicalStats.semesterGrades.map((sem, idx) => (
-                            <div key={idx} className="glass-card-premium p-5 rounded-3xl border border-white/5 relative overflow-hidden group">
+                        {historicalStats.semesterGrades.map(sem => (
+                            <button
+                                key={sem.id}
+                                type="button"
+                                onClick={() => toggleSemester(sem.id, sem.rev)}
+                                aria-expanded={openSemesterId === sem.id}
+                                className={`glass-card-premium p-5 rounded-3xl border text-left relative overflow-hidden group ${openSemesterId === sem.id ? "border-violet-500/30" : "border-white/5"}`}
+                            >
                                 <div className="absolute top-0 right-0 p-4 opacity-5 group-hover:opacity-10 transition-opacity">
                                     <GraduationCap className="w-12 h-12 text-white" />
                                 </div>
@@ -394,9 +369,36 @@ export default function PlannerDashboard({
                                         {sem.courseCount} Courses Completed
                                     </p>
                                 </div>
-                            </div>
+                            </button>
                         ))}
                     </div>
+                    {openSemester && (
+                        <div className="glass-card-premium p-5 rounded-3xl border border-white/5">
+                            <p className="text-[10px] font-bold text-white/30 uppercase tracking-widest mb-3">{openSemester.name}</p>
+                            {openDetail === "loading" || openDetail === undefined ? (
+                                <Loader2 className="w-4 h-4 animate-spin text-white/30" />
+                            ) : openDetail === "error" ? (
+                                <p className="text-xs text-red-400">Couldn&apos;t load this semester.</p>
+                            ) : openDetail.courses.length === 0 ? (
+                                <p className="text-xs text-white/30">No courses recorded.</p>
+                            ) : (
+                                <ul className="divide-y divide-white/5">
+                                    {openDetail.courses.map((c: PlannerCourse) => (
+                                        <li key={c.id} className="flex items-center justify-between py-2 text-sm">
+                                            <span className="text-white/80">
+                                                {c.name}
+                                                {c.code && <span className="ml-2 text-[10px] text-white/30">{c.code}</span>}
+                                            </span>
+                                            <span className="flex items-center gap-3 text-xs text-white/40">
+                                                <span>{c.credits} CH</span>
+                                                <span className="font-bold text-white/70">{c.grade || "—"}</span>
+                                            </span>
+                                        </li>
+                                    ))}
+                                </ul>
+                            )}
+                        </div>
+                    )}
                 </section>
             )}
 
@@ -451,28 +453,32 @@ export default function PlannerDashboard({
                             </button>
                         </div>
 
-                        {/* Recent sessions */}
+                        {/* Sessions, newest first */}
                         {recentSessions.length > 0 ? (
-                            <div className="space-y-2 max-h-64 overflow-y-auto">
-                                {recentSessions.map(s => {
-                                    const course = courses.find(c => c.id === s.courseId);
+                            <div ref={sessionRows.ref} className="max-h-64 overflow-y-auto">
+                                <div style={{ height: sessionRows.padTop }} />
+                                {recentSessions.slice(sessionRows.start, sessionRows.end).map(s => {
+                                    const course = courseById.get(s.courseId);
                                     return (
-                                        <div key={s.id} className="flex items-center justify-between py-2 px-3 rounded-xl bg-white/[0.02] border border-white/5 group">
-                                            <div className="flex flex-col">
-                                                <span className="text-xs font-medium">{course?.name || "Unknown"}</span>
-                                                <span className="text-[10px] text-white/30">
-                                                    {s.date} &middot; {s.hours}h{s.notes ? ` · ${s.notes}` : ""}
-                                                </span>
+                                        <div key={s.id} style={{ height: SESSION_ROW_HEIGHT }} className="pb-2">
+                                            <div className="h-full flex items-center justify-between py-2 px-3 rounded-xl bg-white/[0.02] border border-white/5 group">
+                                                <div className="flex flex-col min-w-0">
+                                                    <span className="text-xs font-medium truncate">{course?.name || "Unknown"}</span>
+                                                    <span className="text-[10px] text-white/30 truncate">
+                                                        {s.date} &middot; {s.hours}h{s.notes ? ` · ${s.notes}` : ""}
+                                                    </span>
+                                                </div>
+                                                <button
+                                                    onClick={() => onDeleteStudySession(s.id)}
+                                                    className="opacity-0 group-hover:opacity-100 text-white/20 hover:text-red-400 transition-all p-1"
+                                                >
+                                                    <Trash2 className="w-3.5 h-3.5" />
+                                                </button>
                                             </div>
-                                            <button
-                                                onClick={() => onDeleteStudySession(s.id)}
-                                                className="opacity-0 group-hover:opacity-100 text-white/20 hover:text-red-400 transition-all p-1"
-                                            >
-                                                <Trash2 className="w-3.5 h-3.5" />
-                                            </button>
                                         </div>
                                     );
                                 })}
+                                <div style={{ height: sessionRows.padBottom }} />
                             </div>
                         ) : (
                             <p className="text-xs text-white/20 text-center py-4">No study sessions yet. Log your first one above.</p>
@@ -505,7 +511,7 @@ export default function PlannerDashboard({
             </div>
 
             {/* ════ This Week Summary ════ */}
-            <WeeklySummary courses={courses} studySessions={studySessions} />
+            <WeeklySummary courses={courses} studyIndex={studyIndex} />
 
             {/* ════ Integrations ════ */}
             <IntegrationPanel courses={courses} />
@@ -553,6 +559,112 @@ function StatCard({ icon, bg, border, value, label }: {
     );
 }
 
+/** One course in the semester table; memoized so typing in one row leaves the others alone */
+const CourseRow = memo(function CourseRow({ course, studyHours, onGrade, onField, onToggleStatus }: {
+    course: PlannerCourse;
+    studyHours: number;
+    onGrade: (id: string, grade: string) => void;
+    onField: (id: string, field: keyof PlannerCourse, value: any) => void;
+    onToggleStatus: (id: string) => void;
+}) {
+    const gradeInfo = course.grade ? GRADE_MAP[course.grade] : null;
+    const gColor = gradeInfo ? gc(gradeInfo.colorKey) : null;
+    return (
+        <tr className="group hover:bg-white/[0.02] transition-colors" style={{ height: COURSE_ROW_HEIGHT }}>
+            {/* Name */}
+            <td className="py-5 px-8">
+                <div className="flex flex-col gap-0.5">
+                    <div className="flex items-center gap-3">
+                        <div className={`w-2 h-2 rounded-full ${gColor ? gColor.bg : "bg-violet-500/40"} shadow-[0_0_10px_rgba(139,92,246,0.2)]`} />
+                        <span className="text-sm font-bold text-white tracking-tight">{course.name}</span>
+                    </div>
+                    <span className="text-[10px] font-bold text-white/20 ml-5 uppercase tracking-widest">{course.id}</span>
+                </div>
+            </td>
+            {/* Credits */}
+            <td className="py-5 px-4 text-center">
+                <span className="text-xs font-black text-white/40">{course.credits}</span>
+            </td>
+            {/* Grade */}
+            <td className="py-5 px-4">
+                <select
+                    value={course.grade || ""}
+                    onChange={e => onGrade(course.id, e.target.value)}
+                    className="bg-white/5 border border-white/5 group-hover:border-white/10 rounded-xl px-3 py-2 text-xs font-bold text-white outline-none focus:ring-2 focus:ring-violet-500/20 transition-all w-full cursor-pointer appearance-none text-center"
+                    style={{ colorScheme: "dark" }}
+                >
+                    <option value="" className="bg-[#0a0a0a]">N/A</option>
+                    <option value="D" className="bg-[#0a0a0a]">Distinction (D)</option>
+                    <option value="M" className="bg-[#0a0a0a]">Merit (M)</option>
+                    <option value="P" className="bg-[#0a0a0a]">Pass (P)</option>
+                    <option value="U" className="bg-[#0a0a0a]">Unclassified (U)</option>
+                </select>
+            </td>
+            {/* Midterm Date */}
+            <td className="py-5 px-4">
+                <input
+                    type="date"
+                    value={course.midtermDate || ""}
+                    onChange={e => onField(course.id, "midtermDate", e.target.value || undefined)}
+                    className="bg-white/5 border border-white/5 group-hover:border-white/10 rounded-xl px-3 py-2 text-[11px] font-bold text-white/60 outline-none focus:ring-2 focus:ring-violet-500/20 transition-all w-full text-center"
+                    style={{ colorScheme: "dark" }}
+                />
+            </td>
+            {/* Final Date */}
+            <td className="py-5 px-4">
+                <input
+                    type="date"
+                    value={course.finalDate || ""}
+                    onChange={e => onField(course.id, "finalDate", e.target.value || undefined)}
+                    className="bg-white/5 border border-white/5 group-hover:border-white/10 rounded-xl px-3 py-2 text-[11px] font-bold text-white/60 outline-none focus:ring-2 focus:ring-violet-500/20 transition-all w-full text-center"
+                    style={{ colorScheme: "dark" }}
+                />
+            </td>
+            {/* Instructor */}
+            <td className="py-5 px-4">
+                <input
+                    type="text"
+                    placeholder="Dr. Name"
+                    value={course.professor || ""}
+                    onChange={e => onField(course.id, "professor", e.target.value)}
+                    className="bg-white/5 border border-white/5 group-hover:border-white/10 rounded-xl px-3 py-2 text-[10px] font-bold text-white/60 placeholder:text-white/10 outline-none focus:ring-2 focus:ring-violet-500/20 transition-all w-full text-center"
+                />
+            </td>
+            {/* Location */}
+            <td className="py-5 px-4">
+                <input
+                    type="text"
+                    placeholder="Room/Lab"
+                    value={course.location || ""}
+                    onChange={e => onField(course.id, "location", e.target.value)}
+                    className="bg-white/5 border border-white/5 group-hover:border-white/10 rounded-xl px-3 py-2 text-[10px] font-bold text-white/60 placeholder:text-white/10 outline-none focus:ring-2 focus:ring-violet-500/20 transition-all w-full text-center"
+                />
+            </td>
+            {/* Study Hours */}
+            <td className="py-5 px-4 text-center">
+                <div className="flex flex-col items-center">
+                    <span className="text-xs font-black text-white">{studyHours.toFixed(1)}</span>
+                    <span className="text-[9px] font-bold text-white/20 uppercase tracking-tighter">Hours</span>
+                </div>
+            </td>
+            {/* Status */}
+            <td className="py-5 px-8 text-right">
+                <button
+                    onClick={() => onToggleStatus(course.id)}
+                    className={`px-3 py-1.5 rounded-xl text-[10px] font-black uppercase tracking-widest border transition-all ${course.status === "Completed"
+                        ? "bg-emerald-500/10 border-emerald-500/20 text-emerald-400"
+                        : course.status === "At Risk"
+                            ? "bg-red-500/10 border-red-500/20 text-red-400"
+                            : "bg-blue-500/10 border-blue-500/20 text-blue-400"
+                        } hover:scale-105 active:scale-95`}
+                >
+                    {course.status}
+                </button>
+            </td>
+        </tr>
+    );
+});
+
 function Th({ children, className = "" }: { children: React.ReactNode; className?: string }) {
     return (
         <th className={`py-3 px-4 text-[10px] uppercase tracking-widest font-bold text-white/30 ${className}`}>
@@ -0,0 +1,223 @@
+"use client";
+
+import { Profiler, useEffect, useRef, useState, type ProfilerOnRenderCallback } from "react";
+import { Course, CourseData } from "@/types";
+import { PlannerCourse, StudySession } from "@/app/planner/page";
+import TranscriptView from "./TranscriptView";
+import PlannerDashboard from "./PlannerDashboard";
+
+/**
+ * Render benchmark for the two heaviest client views (see
+ * benchmarks/render.py). Mounts TranscriptView and PlannerDashboard with a
+ * synthetic 200-course, 2000-session student, drives a fixed script of
+ * interactions and records React Profiler commit times per step. Results land
+ * in `window.__renderBench` and the #render-bench-result element.
+ *
+ * Network calls the views make for saving progress are answered locally so
+ * only rendering is measured.
+ */
+
+const COURSES = 200;
+const SESSIONS = 2000;
+const TOGGLES = 20;
+const KEYSTROKES = 20;
+const ADDED_SESSIONS = 10;
+
+interface StepResult { commits: number; totalMs: number; maxMs: number; p95Ms: number }
+export interface RenderBenchResult {
+    courses: number;
+    sessions: number;
+    steps: Record<string, StepResult>;
+}
+
+declare global {
+    interface Window { __renderBench?: { done: boolean; result?: RenderBenchResult; error?: string } }
+}
+
+// ── Synthetic student ───────────────────────────────────────────────────
+
+function syntheticCourseData(): CourseData {
+    const code = (i: number) => String(90000000 + i);
+    const courses: Course[] = [];
+    for (let i = 0; i < COURSES; i++) {
+        const level = (Math.floor(i / (COURSES / 5)) + 1) as Course["level"];
+        // Each course past the first year needs one or two from the year before; every 25th needs a CH total
+        let prereq: string | undefined;
+        if (i % 25 === 24) prereq = `>= ${level * 30} CH`;
+        else if (level > 1) prereq = i % 3 === 0 ? `${code(i - 40)} & ${code(i - 41)}` : code(i - 40);
+        courses.push({ code: code(i), name: `Synthetic Course ${i + 1}`, ch: 3, framework: "HTU", level, prereq });
+    }
+    return {
+        university_requirements: courses.slice(0, 10),
+        university_electives: courses.slice(10, 16),
+        college_requirements: courses.slice(16, 40),
+        department_requirements: courses.slice(40, 180),
+        electives: courses.slice(180),
+        work_market_requirements: [],
+    };
+}
+
+function syntheticPlanner(): { courses: PlannerCourse[]; sessions: StudySession[] } {
+    const courses: PlannerCourse[] = Array.from({ length: COURSES }, (_, i) => ({
+        id: `c${i}`,
+        name: `Synthetic Course ${i + 1}`,
+        credits: 3,
+        hasMidterm: true,
+        status: "In Progress",
+        grade: i % 4 === 0 ? "M" : null,
+    }));
+    const day = 86400000;
+    const now = Date.now();
+    const sessions: StudySession[] = Array.from({ length: SESSIONS }, (_, i) => ({
+        id: `s${i}`,
+        courseId: `c${(i * 7) % COURSES}`,
+        date: new Date(now - (i % 365) * day).toISOString().split("T")[0],
+        hours: 0.5 + (i % 6) * 0.5,
+    }));
+    return { courses, sessions };
+}
+
+// ── Harness ─────────────────────────────────────────────────────────────
+
+const nextFrame = () => new Promise<void>(resolve => requestAnimationFrame(() => setTimeout(resolve, 0)));
+
+/** Set a controlled input's value the way React's onChange expects */
+function typeInto(input: HTMLInputElement, value: string) {
+    const setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, "value")!.set!;
+    setter.call(input, value);
+    input.dispatchEvent(new Event("input", { bubbles: true }));
+}
+
+function summarize(durations: number[]): StepResult {
+    const sorted = [...durations].sort((a, b) => a - b);
+    const round = (n: number) => Math.round(n * 100) / 100;
+    return {
+        commits: sorted.length,
+        totalMs: round(sorted.reduce((s, d) => s + d, 0)),
+        maxMs: round(sorted[sorted.length - 1] ?? 0),
+        p95Ms: round(sorted[Math.max(0, Math.ceil(sorted.length * 0.95) - 1)] ?? 0),
+    };
+}
+
+export default function RenderBench() {
+    const [rules, setRules] = useState<any>(null);
+    const [courseData] = useState(syntheticCourseData);
+    const [planner, setPlanner] = useState<{ courses: PlannerCourse[]; sessions: StudySession[] } | null>(null);
+    const [result, setResult] = useState<RenderBenchResult | null>(null);
+    const rootRef = useRef<HTMLDivElement>(null);
+    const stepRef = useRef<number[] | null>(null);
+
+    const onRender: ProfilerOnRenderCallback = (_id, _phase, actualDuration) => {
+        stepRef.current?.push(actualDuration);
+    };
+
+    useEffect(() => {
+        window.__renderBench = { done: false };
+        localStorage.setItem("htuai_planner_onboarding", "true");
+
+        const realFetch = window.fetch;
+        window.fetch = (input, init) => {
+            const url = typeof input === "string" ? input : input instanceof URL ? input.href : input.url;
+            if (url.includes("/api/progress/")) {
+                const body = url.includes("/delta") || url.includes("/save") ? { version: 1 } : { completed: [], version: 0 };
+                return Promise.resolve(new Response(JSON.stringify(body), { headers: { "Content-Type": "application/json" } }));
+            }
+            return realFetch(input, init);
+        };
+
+        fetch("/data/curriculum_rules.json").then(r => r.json())
+            .then(r => {
+                // TranscriptView mounts with the rules, so its mount is the first step
+                stepRef.current = [];
+                setRules(r);
+            })
+            .catch(e => { window.__renderBench = { done: true, error: String(e) }; });
+        return () => { window.fetch = realFetch; };
+    }, []);
+
+    useEffect(() => {
+        if (!rules) return;
+        let cancelled = false;
+
+        const measure = async (name: string, steps: Record<string, StepResult>, run: () => Promise<void>) => {
+            stepRef.current = [];
+            await run();
+            await nextFrame();
+            steps[name] = summarize(stepRef.current ?? []);
+            stepRef.current = null;
+        };
+
+        (async () => {
+            const steps: Record<string, StepResult> = {};
+            const root = rootRef.current!;
+
+            await nextFrame();
+            steps.transcript_mount = summarize(stepRef.current ?? []);
+            stepRef.current = null;
+
+            // Toggle first-year cards one at a time
+            const cards = [...root.querySelectorAll("h3")]
+                .filter(h => h.textContent?.startsWith("Synthetic Course"))
+                .map(h => h.parentElement as HTMLElement);
+            await measure("transcript_toggle", steps, async () => {
+                for (const card of cards.slice(0, TOGGLES)) {
+                    card.click();
+                    await nextFrame();
+                }
+            });
+
+            // PlannerDashboard
+            await measure("planner_mount", steps, async () => {
+                setPlanner(syntheticPlanner());
+                await nextFrame();
+            });
+            const input = root.querySelector<HTMLInputElement>('input[placeholder="Dr. Name"]')!;
+            await measure("planner_keystroke", steps, async () => {
+                for (let i = 1; i <= KEYSTROKES; i++) {
+                    typeInto(input, "Dr. Synthetic".padEnd(i, "x").slice(0, i));
+                    await nextFrame();
+                }
+            });
+            await measure("planner_add_session", steps, async () => {
+                for (let i = 0; i < ADDED_SESSIONS; i++) {
+                    setPlanner(p => p && {
+                        ...p,
+                        sessions: [...p.sessions, { id: `new${i}`, courseId: "c0", date: new Date().toISOString().split("T")[0], hours: 1 }],
+                    });
+                    await nextFrame();
+                }
+            });
+
+            if (cancelled) return;
+            const res: RenderBenchResult = { courses: COURSES, sessions: SESSIONS, steps };
+            setResult(res);
+            window.__renderBench = { done: true, result: res };
+        })().catch(e => { window.__renderBench = { done: true, error: String(e) }; });
+
+        return () => { cancelled = true; };
+    }, [rules]);
+
+    return (
+        <div ref={rootRef} className="min-h-screen bg-black text-white">
+            <pre id="render-bench-result" className="p-6 text-xs text-white/60">
+                {result ? JSON.stringify(result, null, 2) : "running…"}
+            </pre>
+            {rules && (
+                <Profiler id="transcript" onRender={onRender}>
+                    <TranscriptView data={courseData} studentId="BENCH" majorKey="electrical_engineering" rules={rules} />
+                </Profiler>
+            )}
+            {planner && (
+                <Profiler id="planner" onRender={onRender}>
+                    <PlannerDashboard
+                        courses={planner.courses}
+                        studySessions={planner.sessions}
+                        onUpdateCourses={courses => setPlanner(p => p && { ...p, courses })}
+                        onAddStudySession={s => setPlanner(p => p && { ...p, sessions: [...p.sessions, s] })}
+                        onDeleteStudySession={id => setPlanner(p => p && { ...p, sessions: p.sessions.filter(s => s.id !== id) })}
+                    />
+                </Profiler>
+            )}
+        </div>
+    );
+}
@@ -3,6 +3,8 @@
 import { useMemo } from "react";
 import { motion } from "framer-motion";
 import { Course, CourseData } from "@/types";
+import type { MajorGraph } from "@/lib/advisor";
+import { planDegree } from "@/lib/scheduler";
 import {
     GraduationCap, Target, BookOpen, TrendingUp,
     Zap, Award, Star, Crown, Trophy, Rocket, Lock,
@@ -20,6 +22,7 @@ interface StudentDashboardProps {
     data: CourseData;
     allCourses: Course[];
     rules: any;
+    majorGraph: MajorGraph;
 }
 
 /* ═══════════════════════════════════════════════════════════════════
@@ -138,6 +141,7 @@ export default function StudentDashboard({
     data,
     allCourses,
     rules,
+    majorGraph,
 }: StudentDashboardProps) {
     const completedCount = completedCourses.size;
     const progress = Math.min(completedCredits / totalCredits, 1);
@@ -159,25 +163,25 @@ export default function StudentDashboard({
     }, [progressPct]);
 
     // ── Graduation estimate ──────────────────────────────────────────
+    // Prerequisite-aware semester plan at a regular 18 CH load; cheap enough
+    // to recompute on every toggle (see lib/scheduler.ts)
+    const degreePlan = useMemo(
+        () => planDegree(majorGraph, completedCourses),
+        [majorGraph, completedCourses]
+    );
+
     const graduationEstimate = useMemo(() => {
         if (completedCredits >= totalCredits) return "Graduated! 🎉";
         if (completedCredits === 0) return "Start your journey!";
 
-        const remaining = totalCredits - completedCredits;
-
-        // HTU runs 2 main semesters/year, ~18 CH each = ~36 CH/year
-        // Students typically take 15-18 CH per regular semester
-        const CH_PER_SEMESTER = 17; // realistic average
-        const semestersLeft = Math.ceil(remaining / CH_PER_SEMESTER);
-
-        // Estimate which academic year they'll graduate in
-        // 1 semester = 1 sem left, 2 semesters = 1 year left, etc.
+        // HTU runs 2 main semesters/year
+        const semestersLeft = Math.max(degreePlan.semesters.length, 1);
         const yearsLeft = Math.ceil(semestersLeft / 2);
 
         if (semestersLeft <= 1) return "This semester! 🔥";
         if (semestersLeft === 2) return "~1 year left";
         return `~${yearsLeft} years (${semestersLeft} semesters)`;
-    }, [completedCredits, totalCredits]);
+    }, [completedCredits, totalCredits, degreePlan]);
 
     // ── Category CH breakdown for "What's Next" ──────────────────────
     const categories = useMemo(() => {
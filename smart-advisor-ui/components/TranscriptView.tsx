@@ -1,13 +1,32 @@
 "use client";
 
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useMemo, useRef } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { Course, CourseData } from '@/types';
 import CourseCard from './ui/CourseCard';
-import { checkPrerequisites } from '@/lib/advisor';
+import { PrereqTracker } from '@/lib/prerequisites';
+import { buildMajorGraph, computeCompletedCredits, validateDelta, type PrereqViolation } from '@/lib/advisor';
 import { CheckCircle2, Trophy, RotateCcw, Loader2, GraduationCap, BookOpen, Sparkles, Target, Star, Info } from 'lucide-react';
 import StudentDashboard from './StudentDashboard';
 
+// Rapid toggles within this window are sent as one delta
+const SAVE_DEBOUNCE_MS = 400;
+
+// Category-specific styling
+const CATEGORY_STYLE: Record<string, { icon: React.ReactNode; color: string }> = {
+    "University Requirements": { icon: <GraduationCap className="w-4 h-4" />, color: "#a78bfa" },
+    "University Elective": { icon: <Sparkles className="w-4 h-4" />, color: "#34d399" },
+    "College Requirements": { icon: <BookOpen className="w-4 h-4" />, color: "#60a5fa" },
+    "Department Requirements": { icon: <Target className="w-4 h-4" />, color: "#f59e0b" },
+    "Department Elective": { icon: <Star className="w-4 h-4" />, color: "#f472b6" },
+};
+
+function countIn(completed: Set<string>, codes: Set<string>): number {
+    let n = 0;
+    for (const code of completed) if (codes.has(code)) n++;
+    return n;
+}
+
 interface TranscriptViewProps {
     data: CourseData;
     studentId: string;   // university ID → database key
@@ -19,116 +38,272 @@ export default function TranscriptView({ data, studentId, majorKey, rules }: Tra
     const [completedCourses, setCompletedCourses] = useState<Set<string>>(new Set());
     const [viewMode, setViewMode] = useState<"level" | "category">("level");
     const [saveStatus, setSaveStatus] = useState<"saved" | "saving" | null>(null);
+    // Prerequisite conflicts the server reported for the last rejected delta
+    const [saveConflicts, setSaveConflicts] = useState<PrereqViolation[] | null>(null);
 
-    const allCourses = [
+    const allCourses = useMemo(() => [
         ...data.university_requirements,
         ...data.college_requirements,
         ...(data.university_electives ?? []),
         ...data.department_requirements,
         ...data.electives,
         ...(data.work_market_requirements ?? [])
-    ];
+    ], [data]);
+
+    // Same compiled prerequisite graph the save route validates against
+    const majorGraph = useMemo(() => buildMajorGraph(data, rules, majorKey), [data, rules, majorKey]);
 
-    // Build code → name lookup
-    const courseNameMap = Object.fromEntries(allCourses.map((c) => [c.code, c.name]));
+    // Code → name, for saved entries and prerequisite chips
+    const courseNameMap = useMemo(
+        () => Object.fromEntries(allCourses.map((c) => [c.code, c.name])),
+        [allCourses]
+    );
+
+    // ── Incremental saves ───────────────────────────────────────────────────
+    // Toggles queue add/remove ops that are flushed as one delta. The server
+    // applies a delta only if our version is still current; on a 409 we rebase
+    // the unacknowledged ops onto the server's state and send them again.
+    const completedRef = useRef(completedCourses);
+    const versionRef = useRef(0);
+    const pendingRef = useRef(new Map<string, string | null>());   // code → name to add, null to remove
+    const inFlightRef = useRef<Promise<number | null> | null>(null);   // resolves to the version the server reported
+    const timerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+    const epochRef = useRef(0);   // bumped on reload/reset so stale responses are ignored
+
+    const commitCompleted = (next: Set<string>) => {
+        completedRef.current = next;
+        setCompletedCourses(next);
+    };
+
+    // Ticked courses that unticking `code` would break, transitively. Only
+    // courses it currently unlocks count, so a legacy row's existing gaps
+    // don't pull in courses the student never touched.
+    const dependentsOf = useCallback((set: Set<string>, code: string): PrereqViolation[] => {
+        const next = new Set(set);
+        next.delete(code);
+        const removed = [code];
+        const broken: PrereqViolation[] = [];
+        for (let v = validateDelta(majorGraph, set, next, [], removed); v.length > 0; v = validateDelta(majorGraph, set, next, [], removed)) {
+            for (const violation of v) {
+                next.delete(violation.code);
+                removed.push(violation.code);
+                broken.push(violation);
+            }
+        }
+        return broken;
+    }, [majorGraph]);
 
     // Load progress from SERVER on mount or when student/major changes
-    useEffect(() => {
-        if (!studentId || !majorKey) return;
+    const loadFromServer = useCallback(() => {
+        const epoch = ++epochRef.current;
+        pendingRef.current = new Map();
         fetch(`/api/progress/${encodeURIComponent(studentId)}?major=${majorKey}`)
             .then(r => r.json())
-            .then(({ completed }: { completed: (string | { code: string })[] }) => {
+            .then(({ completed, version }: { completed: (string | { code: string })[]; version?: number }) => {
+                if (epoch !== epochRef.current) return;
                 // Handle both legacy string[] and new {code, name}[] formats
                 const codes = completed.map(c => (typeof c === 'string' ? c : c.code));
-                setCompletedCourses(new Set(codes));
+                versionRef.current = version ?? 0;
+                commitCompleted(new Set(codes));
             })
-            .catch(() => setCompletedCourses(new Set()));
+            .catch(() => commitCompleted(new Set()));
     }, [studentId, majorKey]);
 
-    const toggleCourse = useCallback((code: string) => {
-        setCompletedCourses(prev => {
-            const newSet = new Set(prev);
-            if (newSet.has(code)) newSet.delete(code);
-            else newSet.add(code);
-
-            // Save to server immediately
-            setSaveStatus("saving");
-
-            // Map codes to objects { code, name }
-            const completedObjects = [...newSet].map(c => ({
-                code: c,
-                name: courseNameMap[c] || "Unknown Course"
-            }));
+    useEffect(() => {
+        if (!studentId || !majorKey) return;
+        loadFromServer();
+    }, [studentId, majorKey, loadFromServer]);
+
+    const flushPending = useCallback(function flush() {
+        timerRef.current = null;
+        if (inFlightRef.current || pendingRef.current.size === 0) return;
+
+        const sending = pendingRef.current;
+        pendingRef.current = new Map();
+        const epoch = epochRef.current;
+        let reported: number | null = null;
+
+        const add: { code: string; name: string }[] = [];
+        const remove: string[] = [];
+        for (const [code, name] of sending) {
+            if (name === null) remove.push(code);
+            else add.push({ code, name });
+        }
 
-            fetch(`/api/progress/${encodeURIComponent(studentId)}/save`, {
+        const request = fetch(`/api/progress/${encodeURIComponent(studentId)}/delta`, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ major: majorKey, version: versionRef.current, add, remove }),
+        })
+            .then(async res => {
+                const body = await res.json().catch(() => ({}));
+                if ((res.ok || res.status === 409) && typeof body.version === "number") reported = body.version;
+                if (epoch !== epochRef.current) return;
+
+                if (res.ok) {
+                    setSaveConflicts(null);
+                    versionRef.current = body.version;
+                    if (pendingRef.current.size === 0) {
+                        setSaveStatus("saved");
+                        setTimeout(() => setSaveStatus(null), 1500);
+                    }
+                    return;
+                }
+                if (res.status === 409) {
+                    // Someone else saved first: replay everything not yet acknowledged on top of theirs
+                    const ops = new Map([...sending, ...pendingRef.current]);
+                    const next = new Set<string>(
+                        (body.completed as (string | { code: string })[]).map(c => (typeof c === 'string' ? c : c.code))
+                    );
+                    for (const [code, name] of ops) {
+                        if (name === null) next.delete(code);
+                        else next.add(code);
+                    }
+                    versionRef.current = body.version;
+                    pendingRef.current = ops;
+                    commitCompleted(next);
+                    return;
+                }
+                if (res.status === 400 && body.error === "prerequisite_not_met") setSaveConflicts(body.details ?? []);
+                throw new Error(`Save failed: ${res.status}`);
+            })
+            .catch(() => {
+                if (epoch !== epochRef.current) return;
+                // Rejected or failed: fall back to whatever the server has
+                setSaveStatus(null);
+                loadFromServer();
+            })
+            .finally(() => {
+                inFlightRef.current = null;
+                if (pendingRef.current.size > 0 && !timerRef.current) {
+                    timerRef.current = setTimeout(flush, 0);
+                }
+            });
+        inFlightRef.current = request.then(() => reported);
+    }, [studentId, majorKey, loadFromServer]);
+
+    // Send anything still queued when leaving this student/major. With a
+    // delta still in flight, wait for it and build on the version it returns;
+    // the reload for the next student/major would otherwise hide that version.
+    useEffect(() => {
+        return () => {
+            if (timerRef.current) clearTimeout(timerRef.current);
+            timerRef.current = null;
+            const ops = pendingRef.current;
+            if (ops.size === 0) return;
+            pendingRef.current = new Map();
+            const send = (version: number) => fetch(`/api/progress/${encodeURIComponent(studentId)}/delta`, {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ major: majorKey, completed: completedObjects }),
-            })
-                .then(() => { setSaveStatus("saved"); setTimeout(() => setSaveStatus(null), 1500); })
-                .catch(() => setSaveStatus(null));
+                keepalive: true,
+                body: JSON.stringify({
+                    major: majorKey,
+                    version,
+                    add: [...ops].filter(([, name]) => name !== null).map(([code, name]) => ({ code, name })),
+                    remove: [...ops].filter(([, name]) => name === null).map(([code]) => code),
+                }),
+            }).catch(() => { });
+            const version = versionRef.current;
+            const inFlight = inFlightRef.current;
+            if (inFlight) inFlight.then(reported => send(reported ?? version));
+            else send(version);
+        };
+    }, [studentId, majorKey]);
 
-            return newSet;
-        });
-    }, [studentId, majorKey, courseNameMap]);
+    const toggleCourse = useCallback((code: string) => {
+        const next = new Set(completedRef.current);
+        const ops = pendingRef.current;
+        if (next.has(code)) {
+            // Unticking a prerequisite would leave what it unlocked invalid:
+            // untick those too, but only once the student agrees
+            const dependents = dependentsOf(next, code);
+            if (dependents.length > 0 && !confirm(
+                `Unticking ${courseNameMap[code] || code} also unticks the courses that need it:\n\n` +
+                dependents.map(d => `• ${d.name} (${d.code})`).join("\n") +
+                "\n\nContinue?"
+            )) return;
+            for (const c of [code, ...dependents.map(d => d.code)]) {
+                next.delete(c);
+                ops.set(c, null);
+            }
+        } else {
+            next.add(code);
+            ops.set(code, courseNameMap[code] || "Unknown Course");
+        }
+        setSaveConflicts(null);
+        commitCompleted(next);
+
+        setSaveStatus("saving");
+        if (timerRef.current) clearTimeout(timerRef.current);
+        timerRef.current = setTimeout(flushPending, SAVE_DEBOUNCE_MS);
+    }, [courseNameMap, dependentsOf, flushPending]);
 
     const resetProgress = () => {
-        setCompletedCourses(new Set());
+        const epoch = ++epochRef.current;
+        if (timerRef.current) clearTimeout(timerRef.current);
+        timerRef.current = null;
+        pendingRef.current = new Map();
+        setSaveConflicts(null);
+        commitCompleted(new Set());
         fetch(`/api/progress/${encodeURIComponent(studentId)}/save`, {
             method: "POST",
             headers: { "Content-Type": "application/json" },
             body: JSON.stringify({ major: majorKey, completed: [] }),
-        });
+        })
+            .then(r => r.json())
+            .then(({ version }) => { if (epoch === epochRef.current) versionRef.current = version; })
+            .catch(() => { });
     };
 
-    // Build code → name lookup for prerequisite resolution
-    const courseMap = Object.fromEntries(allCourses.map((c) => [c.code, c.name]));
-    // Set of all codes in the curriculum — prereqs outside this are auto-satisfied
-    const allCourseCodes = new Set(allCourses.map(c => c.code));
-
     // Determine rule set from majorKey
-    const ruleSet = Object.values(rules.degree_types).find((rs: any) =>
-        rs.major_keys.includes(majorKey)
-    ) as any || rules.degree_types.computing_bsc;
+    const ruleSet = majorGraph.ruleSet;
 
     const totalCredits = ruleSet.total_credits;
     const MAX_DEPT_ELECTIVES = ruleSet.max_dept_electives;
     const MAX_UNI_ELECTIVES = ruleSet.max_uni_electives;
-    const TOTAL_CAP = totalCredits;
+
+    // Code sets per requirement list, rebuilt only when the curriculum changes
+    const codeSets = useMemo(() => {
+        const codes = (list: Course[] | undefined) => new Set((list ?? []).map(c => c.code));
+        return {
+            uniReq: codes(data.university_requirements),
+            uniElective: codes(data.university_electives),
+            deptElective: codes(data.electives),
+        };
+    }, [data]);
+    const uniElectiveCodes = codeSets.uniElective;
+    const deptElectiveCodes = codeSets.deptElective;
 
     // ── University Electives: 3 slots × 1 CH = 3 CH max ─────────────────────
-    const uniElectiveCodes = new Set((data.university_electives ?? []).map((c: Course) => c.code));
     // UE slots (UE-I, UE-II, UE-III) are always tickable — there are exactly 3, each 1 CH
-    const tickedUniElecCount = [...completedCourses].filter(c => uniElectiveCodes.has(c)).length;
+    const tickedUniElecCount = useMemo(() => countIn(completedCourses, uniElectiveCodes), [completedCourses, uniElectiveCodes]);
 
     // ── Department Electives: 3 slots × 3 CH = 9 CH max ─────────────────────
-    const deptElectiveCodes = new Set(data.electives.map((c: Course) => c.code));
-    const tickedDeptElecCount = [...completedCourses].filter(c => deptElectiveCodes.has(c)).length;
+    const tickedDeptElecCount = useMemo(() => countIn(completedCourses, deptElectiveCodes), [completedCourses, deptElectiveCodes]);
     const deptElecCapReached = tickedDeptElecCount >= MAX_DEPT_ELECTIVES;
 
-    // ── Completed credits — respect elective caps so total never exceeds 135 ──
-    const completedCredits = (() => {
-        let total = 0;
-        let uniElecCounted = 0;
-        let deptElecCounted = 0;
-        for (const course of allCourses) {
-            if (!completedCourses.has(course.code)) continue;
-            if (uniElectiveCodes.has(course.code)) {
-                if (uniElecCounted < MAX_UNI_ELECTIVES) { total += course.ch; uniElecCounted++; }
-            } else if (deptElectiveCodes.has(course.code)) {
-                if (deptElecCounted < MAX_DEPT_ELECTIVES) { total += course.ch; deptElecCounted++; }
-            } else {
-                total += course.ch;
-            }
-        }
-        return Math.min(total, TOTAL_CAP);
-    })();
+    // ── Completed credits — respect elective caps so total never exceeds the degree ──
+    const completedCredits = useMemo(
+        () => computeCompletedCredits(data, completedCourses, ruleSet),
+        [data, completedCourses, ruleSet]
+    );
 
     const progress = Math.min(completedCredits / totalCredits, 1);
 
+    // Prereq rules are parsed once per curriculum; each toggle only re-evaluates
+    // the courses that depend on what changed (or on the CH total).
+    const prereqTracker = useMemo(
+        () => new PrereqTracker(majorGraph.compiled),
+        [majorGraph]
+    );
+    const prereqLocks = useMemo(
+        () => prereqTracker.update(completedCourses, completedCredits),
+        [prereqTracker, completedCourses, completedCredits]
+    );
+
 
     // Grouping Logic
-    const getGroups = () => {
+    const groups = useMemo((): Record<string, Course[]> => {
         if (viewMode === 'category') {
             return {
                 "University Requirements": data.university_requirements,
@@ -149,11 +324,7 @@ export default function TranscriptView({ data, studentId, majorKey, rules }: Tra
                 "Fifth Year (Level 5)": allCourses.filter(c => (c.level || 5) >= 5),
             };
         }
-    };
-
-    const groups = getGroups();
-
-
+    }, [viewMode, data, allCourses]);
 
     return (
         <div className="w-full max-w-7xl mx-auto px-6 pt-10 pb-24 space-y-12">
@@ -202,6 +373,14 @@ export default function TranscriptView({ data, studentId, majorKey, rules }: Tra
                             </AnimatePresence>
                         </div>
 
+                        {saveConflicts && (
+                            <p className="text-xs font-bold text-red-400/80 max-w-sm">
+                                Not saved: {saveConflicts.length > 0
+                                    ? saveConflicts.map(c => `${c.name} needs ${c.missing.length > 0 ? c.missing.join(", ") : c.reason || `${c.requiredCH} CH`}`).join("; ")
+                                    : "prerequisites not met"}
+                            </p>
+                        )}
+
                         <div className="h-4 w-px bg-white/10" />
 
                         <button
@@ -272,6 +451,7 @@ export default function TranscriptView({ data, studentId, majorKey, rules }: Tra
                 data={data}
                 allCourses={allCourses}
                 rules={rules}
+                majorGraph={majorGraph}
             />
 
             {/* View-mode toggle and Section Header */}
@@ -306,15 +486,7 @@ export default function TranscriptView({ data, studentId, majorKey, rules }: Tra
             {/* Course Grid */}
             <div className="space-y-12">
                 {Object.entries(groups).map(([title, courses]) => {
-                    // Category-specific styling
-                    const catStyle: Record<string, { icon: React.ReactNode; color: string }> = {
-                        "University Requirements": { icon: <GraduationCap className="w-4 h-4" />, color: "#a78bfa" },
-                        "University Elective": { icon: <Sparkles className="w-4 h-4" />, color: "#34d399" },
-                        "College Requirements": { icon: <BookOpen className="w-4 h-4" />, color: "#60a5fa" },
-                        "Department Requirements": { icon: <Target className="w-4 h-4" />, color: "#f59e0b" },
-                        "Department Elective": { icon: <Star className="w-4 h-4" />, color: "#f472b6" },
-                    };
-                    const style = catStyle[title];
+                    const style = CATEGORY_STYLE[title];
 
                     return courses.length > 0 && <section key={title}>
                         <div className="flex items-center gap-3 mb-6">
@@ -369,11 +541,10 @@ export default function TranscriptView({ data, studentId, majorKey, rules }: Tra
                                     capMax = MAX_DEPT_ELECTIVES;
                                 }
 
-                                const { isLocked: prereqLocked, missing, lockReason: prereqReason } = checkPrerequisites(course, completedCourses, completedCredits, allCourseCodes, rules.logic_rules.prerequisites);
+                                const { isLocked: prereqLocked, missing, lockReason: prereqReason } = prereqLocks[prereqTracker.compiled.indexOf.get(course.code)!];
 
                                 // Hard-lock everything EXCEPT University Requirements & Electives (which get a soft-lock warning)
-                                const uniReqCodes = new Set(data.university_requirements.map(r => r.code));
-                                const isUniversitySubject = uniReqCodes.has(course.code) || uniElectiveCodes.has(course.code);
+                                const isUniversitySubject = codeSets.uniReq.has(course.code) || uniElectiveCodes.has(course.code);
 
                                 const isLocked = isElectiveLocked || (!isUniversitySubject && prereqLocked);
                                 const hasPrereqWarning = isUniversitySubject && prereqLocked;
@@ -390,9 +561,9 @@ export default function TranscriptView({ data, studentId, majorKey, rules }: Tra
                                         hasPrereqWarning={hasPrereqWarning}
                                         lockReason={lockReason}
                                         missingPrereqs={missing}
-                                        courseMap={courseMap}
+                                        courseMap={courseNameMap}
                                         completedCredits={completedCredits}
-                                        onToggle={() => toggleCourse(course.code)}
+                                        onToggle={toggleCourse}
                                     />
                                 );
                             })}
@@ -2,47 +2,39 @@
 
 import { useMemo } from "react";
 import { Calendar, TrendingUp, TrendingDown, Clock, BookOpen, AlertTriangle } from "lucide-react";
-import { PlannerCourse, StudySession } from "@/app/planner/page";
+import { PlannerCourse } from "@/app/planner/page";
+import type { StudyIndex } from "@/lib/study-index";
 
 interface WeeklySummaryProps {
     courses: PlannerCourse[];
-    studySessions: StudySession[];
+    /** Owned by PlannerDashboard; grows in place as sessions are added */
+    studyIndex: StudyIndex;
 }
 
-export default function WeeklySummary({ courses, studySessions }: WeeklySummaryProps) {
+export default function WeeklySummary({ courses, studyIndex }: WeeklySummaryProps) {
     const now = new Date();
-    const weekStart = new Date(now);
-    weekStart.setDate(now.getDate() - now.getDay()); // Sunday
-    weekStart.setHours(0, 0, 0, 0);
+    const weekStartDate = new Date(now);
+    weekStartDate.setDate(now.getDate() - now.getDay()); // Sunday
+    weekStartDate.setHours(0, 0, 0, 0);
+    const weekStart = weekStartDate.getTime();
+    const prevWeekStart = weekStartDate.setDate(weekStartDate.getDate() - 7);
+    const indexedCount = studyIndex.size;
 
-    const prevWeekStart = new Date(weekStart);
-    prevWeekStart.setDate(prevWeekStart.getDate() - 7);
+    const { thisWeekHours, prevWeekHours, thisWeekByCourse } = useMemo(() => ({
+        thisWeekHours: studyIndex.hoursBetween(weekStart),
+        prevWeekHours: studyIndex.hoursBetween(prevWeekStart, weekStart),
+        thisWeekByCourse: studyIndex.hoursByCourseBetween(weekStart),
+    }), [studyIndex, indexedCount, weekStart, prevWeekStart]);
 
-    const thisWeekSessions = useMemo(
-        () => studySessions.filter(s => new Date(s.date) >= weekStart),
-        [studySessions, weekStart]
-    );
-    const prevWeekSessions = useMemo(
-        () => studySessions.filter(s => {
-            const d = new Date(s.date);
-            return d >= prevWeekStart && d < weekStart;
-        }),
-        [studySessions, prevWeekStart, weekStart]
-    );
-
-    const thisWeekHours = thisWeekSessions.reduce((s, sess) => s + sess.hours, 0);
-    const prevWeekHours = prevWeekSessions.reduce((s, sess) => s + sess.hours, 0);
     const hoursDelta = thisWeekHours - prevWeekHours;
     const trending = hoursDelta >= 0;
 
     // Per-course breakdown this week
-    const courseBreakdown = useMemo(() => {
-        const map: Record<string, number> = {};
-        thisWeekSessions.forEach(s => { map[s.courseId] = (map[s.courseId] || 0) + s.hours; });
-        return courses
-            .map(c => ({ name: c.name, hours: map[c.id] || 0, id: c.id }))
-            .sort((a, b) => b.hours - a.hours);
-    }, [thisWeekSessions, courses]);
+    const courseBreakdown = useMemo(() => (
+        courses
+            .map(c => ({ name: c.name, hours: thisWeekByCourse.get(c.id) || 0, id: c.id }))
+            .sort((a, b) => b.hours - a.hours)
+    ), [thisWeekByCourse, courses]);
 
     const maxHours = Math.max(...courseBreakdown.map(c => c.hours), 1);
 
@@ -1,5 +1,6 @@
 "use client";
 
+import { memo } from "react";
 import { motion } from "framer-motion";
 import { CheckCircle, Circle, Lock, AlertCircle } from "lucide-react";
 import { Course } from "../../types";
@@ -13,7 +14,7 @@ interface CourseCardProps {
     missingPrereqs?: string[];
     courseMap?: Record<string, string>;
     completedCredits?: number;
-    onToggle: () => void;
+    onToggle: (code: string) => void;
 }
 
 function parsePrereqCodes(prereq: string): string[] {
@@ -37,7 +38,7 @@ function extractRequiredCH(prereq: string): number | null {
     return m ? parseInt(m[1], 10) : null;
 }
 
-export default function CourseCard({
+function CourseCard({
     course,
     isCompleted,
     isLocked,
@@ -53,7 +54,7 @@ export default function CourseCard({
     const hasCHRule = requiredCH !== null;
     const hasOtherText = !!course.prereq && prereqCodes.length === 0 && !hasCHRule;
 
-    const handleClick = () => { if (!isLocked) onToggle(); };
+    const handleClick = () => { if (!isLocked) onToggle(course.code); };
 
     const accent = fw[course.framework] ?? { badge: "text-white/40 border-white/10 bg-white/3", dot: "bg-white/40" };
 
@@ -63,6 +64,7 @@ export default function CourseCard({
             whileTap={isLocked ? {} : { scale: 0.985 }}
             className={`
                 relative p-4 rounded-2xl border transition-all duration-200 select-none overflow-hidden
+                [content-visibility:auto] [contain-intrinsic-size:auto_180px]
                 ${isLocked ? "cursor-not-allowed" : "cursor-pointer"}
                 ${isCompleted
                     ? "border-emerald-500/20 bg-emerald-500/5"
@@ -184,3 +186,19 @@ export default function CourseCard({
         </motion.div>
     );
 }
+
+/**
+ * A toggle re-renders only the cards whose state changed. The running CH
+ * total changes on most toggles, but only cards with a CH rule display it.
+ */
+export default memo(CourseCard, (prev, next) =>
+    prev.course === next.course &&
+    prev.isCompleted === next.isCompleted &&
+    prev.isLocked === next.isLocked &&
+    prev.hasPrereqWarning === next.hasPrereqWarning &&
+    prev.lockReason === next.lockReason &&
+    prev.missingPrereqs === next.missingPrereqs &&
+    prev.courseMap === next.courseMap &&
+    prev.onToggle === next.onToggle &&
+    (prev.completedCredits === next.completedCredits || !next.course.prereq || extractRequiredCH(next.course.prereq) === null)
+);
@@ -0,0 +1,23 @@
+/**
+ * Runs once when a server instance starts. Migrating here means the first
+ * request doesn't pay for it; routes still await the same memoized promise.
+ * The curriculum bundles are compressed here for the same reason.
+ */
+export async function register() {
+    if (process.env.NEXT_RUNTIME !== 'nodejs') return;
+
+    const { warmCurriculumBundles } = await import('@/lib/curriculum');
+    await warmCurriculumBundles()
+        .catch(e => console.error("Curriculum bundle warm-up failed:", e));
+
+    if (!process.env.POSTGRES_URL) return;
+
+    const { ensureSchema } = await import('@/lib/migrations');
+    const { startRetentionJob } = await import('@/lib/visitor-log');
+    const { startAnalyticsJob } = await import('@/lib/analytics');
+    // Not gated on the bootstrap below: every job run awaits ensureSchema
+    startRetentionJob();
+    startAnalyticsJob();
+    await ensureSchema()
+        .catch(e => console.error("Schema bootstrap failed, will retry on first request:", e));
+}
@@ -1,13 +1,16 @@
-import { Course } from '@/types';
+import { Course, CourseData } from '@/types';
+import {
+    compilePrereq, compilePrerequisites, explain, isSatisfied, missingCodes, toBitmap, topologicalOrder, unmetCredits,
+    CompiledPrereqs, DEFAULT_PREREQ_RULES, PrereqNode, PrereqResult, PrereqRules,
+} from './prerequisites';
 
-interface PrereqResult {
-    isLocked: boolean;
-    missing: string[];
-    lockReason?: string;
-}
+// Compiled rules, keyed by the logic rules, then the curriculum code set, then the prereq text
+const ruleCache = new WeakMap<PrereqRules, WeakMap<Set<string>, Map<string, PrereqNode | null>>>();
 
 /**
  * Check prerequisites for a course.
+ * For whole-curriculum checks prefer `compilePrerequisites` + `PrereqTracker`
+ * from ./prerequisites, which avoid re-evaluating unaffected courses.
  * @param course            The course to check
  * @param completedCourses  Set of course codes the student has ticked
  * @param completedCredits  Total CH completed (for hour-based rules)
@@ -18,94 +21,211 @@ export function checkPrerequisites(
     completedCourses: Set<string>,
     completedCredits: number = 0,
     allCourseCodes: Set<string> = new Set(),
-    logicRules?: any
+    logicRules?: PrereqRules
 ): PrereqResult {
-    const rules = logicRules || {
-        code_regex: "\\b\\d{6,10}\\b",
-        separators: { and: ["AND", "&"], or: ["OR"] }
-    };
+    const rules = logicRules || DEFAULT_PREREQ_RULES;
 
-    const extract = (s: string) => extractCode(s, rules);
-    if (!course.prereq || course.prereq.trim() === '') {
-        return { isLocked: false, missing: [] };
+    let byCodes = ruleCache.get(rules);
+    if (!byCodes) {
+        byCodes = new WeakMap();
+        ruleCache.set(rules, byCodes);
+    }
+    let compiled = byCodes.get(allCourseCodes);
+    if (!compiled) {
+        compiled = new Map();
+        byCodes.set(allCourseCodes, compiled);
     }
 
-    const prereqStr = course.prereq.toUpperCase().trim();
-
-    // ── Department Approval ──────────────────────────────────────────────────
-    if (prereqStr.includes('APPROVAL')) {
-        return { isLocked: true, missing: [], lockReason: 'Requires Department Approval' };
+    const key = course.prereq ?? '';
+    let rule = compiled.get(key);
+    if (rule === undefined) {
+        const known = (code: string) => (allCourseCodes.size === 0 || allCourseCodes.has(code) ? 0 : -1);
+        rule = compilePrereq(course.prereq, rules, known);
+        compiled.set(key, rule);
     }
 
-    // ── Credit-hour rules: ">= 85", "90 CH", or "100 hrs completed" ──────────
-    // We only treat it as an hour rule if it has a comparison operator OR a units suffix (CH, HRS, etc.)
-    const hoursMatch = prereqStr.match(/(?:>=\s*)(\d+)|(\d+)\s*(?:HRS|HOURS?|CH|CREDITS?)/);
-    if (hoursMatch) {
-        // hoursMatch[1] is for >= rule, hoursMatch[2] is for suffix rule
-        const required = parseInt(hoursMatch[1] || hoursMatch[2], 10);
-        if (completedCredits < required) {
-            return {
-                isLocked: true,
-                missing: [],
-                lockReason: `Requires ${required} CH completed (you have ${completedCredits} CH)`,
-            };
+    return explain(rule, n => completedCourses.has(n.code), completedCredits);
+}
+
+// ─── Degree rules shared by the transcript UI and the save route ──────────
+
+export interface DegreeRuleSet {
+    total_credits: number;
+    max_dept_electives: number;
+    max_uni_electives: number;
+    level_count: number;
+    major_keys: string[];
+}
+
+/** Every course of a major, in curriculum order */
+export function flattenCourseData(data: CourseData): Course[] {
+    return [
+        ...data.university_requirements,
+        ...data.college_requirements,
+        ...(data.university_electives ?? []),
+        ...data.department_requirements,
+        ...data.electives,
+        ...(data.work_market_requirements ?? []),
+    ];
+}
+
+/** The `degree_types` entry from curriculum_rules.json that covers `majorKey` */
+export function getRuleSet(rules: any, majorKey: string): DegreeRuleSet {
+    return (Object.values(rules.degree_types) as DegreeRuleSet[]).find(rs =>
+        rs.major_keys.includes(majorKey)
+    ) || rules.degree_types.computing_bsc;
+}
+
+/** Completed CH, respecting elective caps so the total never exceeds the degree */
+export function computeCompletedCredits(data: CourseData, completed: Set<string>, ruleSet: DegreeRuleSet): number {
+    const uniElectiveCodes = new Set((data.university_electives ?? []).map(c => c.code));
+    const deptElectiveCodes = new Set(data.electives.map(c => c.code));
+    const allCourses = flattenCourseData(data);
+
+    let total = 0;
+    let uniElecCounted = 0;
+    let deptElecCounted = 0;
+    for (const course of allCourses) {
+        if (!completed.has(course.code)) continue;
+        if (uniElectiveCodes.has(course.code)) {
+            if (uniElecCounted < ruleSet.max_uni_electives) { total += course.ch; uniElecCounted++; }
+        } else if (deptElectiveCodes.has(course.code)) {
+            if (deptElecCounted < ruleSet.max_dept_electives) { total += course.ch; deptElecCounted++; }
+        } else {
+            total += course.ch;
         }
     }
+    return Math.min(total, ruleSet.total_credits);
+}
+
+export interface MajorGraph {
+    data: CourseData;
+    ruleSet: DegreeRuleSet;
+    compiled: CompiledPrereqs;
+    /** Bitmap index → course */
+    courses: Course[];
+    /** Bitmap indices, prerequisites before the courses that need them */
+    order: number[];
+    /** 1 = university requirement/elective: unmet prereqs only warn, never block */
+    softLocked: Uint8Array;
+}
 
-    // ── Course-code prerequisites ────────────────────────────────────────────
-    // Strip only valid credit hour rules (requiring >= or units) to leave only course codes.
-    const codeOnlyStr = prereqStr.replace(/(?:>=\s*\d+)|(?:\d+\s*(?:HRS|HOURS?|CH|CREDITS?))|(?:\d+\s*INCLUDING[^)]*)/gi, '').trim();
+/** Compile a major's prerequisite DAG. Build once per curriculum load and reuse. */
+export function buildMajorGraph(data: CourseData, rules: any, majorKey: string): MajorGraph {
+    const ruleSet = getRuleSet(rules, majorKey);
+    const allCourses = flattenCourseData(data);
+    const compiled = compilePrerequisites(allCourses, rules.logic_rules?.prerequisites);
 
-    // If nothing left after stripping the hours part, we're done
-    const codeRegex = new RegExp(rules.code_regex);
-    const hasCodePrereqs = codeRegex.test(codeOnlyStr);
-    if (!hasCodePrereqs) {
-        return { isLocked: false, missing: [] };
+    const courses = new Array<Course>(compiled.codes.length);
+    for (const c of allCourses) {
+        const i = compiled.indexOf.get(c.code)!;
+        if (!courses[i]) courses[i] = c;
     }
 
-    let missing: string[] = [];
-
-    if (codeOnlyStr.includes(' OR ')) {
-        const orRegex = new RegExp(`\\s*(?:${rules.separators.or.join('|')})\\s*`, 'i');
-        const options = codeOnlyStr.split(orRegex).map(s => s.trim());
-        const codes = options
-            .map(extract)
-            .filter((c): c is string => c !== null)
-            .filter(c => allCourseCodes.size === 0 || allCourseCodes.has(c));
-
-        if (codes.length === 0) return { isLocked: false, missing: [] };
-
-        const hasOne = codes.some(code => completedCourses.has(code));
-        if (!hasOne) missing = codes;
-    } else {
-        const andRegex = new RegExp(`\\s*(?:${rules.separators.and.join('|')})\\s*`, 'i');
-        const parts = codeOnlyStr.split(andRegex);
-        const codes = parts
-            .map(s => s.trim())
-            .map(extract)
-            .filter((c): c is string => c !== null)
-            .filter(c => allCourseCodes.size === 0 || allCourseCodes.has(c));
-
-        for (const code of codes) {
-            if (!completedCourses.has(code)) missing.push(code);
-        }
+    const softLocked = new Uint8Array(compiled.codes.length);
+    for (const c of [...data.university_requirements, ...(data.university_electives ?? [])]) {
+        softLocked[compiled.indexOf.get(c.code)!] = 1;
     }
 
-    return { isLocked: missing.length > 0, missing };
+    return { data, ruleSet, compiled, courses, order: topologicalOrder(compiled), softLocked };
 }
 
-function extractCode(str: string, rules: any): string | null {
-    const regexStr = rules.code_regex;
-    const match = str.match(new RegExp(regexStr));
-    if (match) {
-        let code = match[0];
-        const { leading_zeros_if_length, target_length } = rules.stripping || {};
+export interface PrereqViolation {
+    code: string;
+    name: string;
+    /** Prerequisite codes not in the submitted set */
+    missing: string[];
+    requiredCH?: number;
+    completedCH?: number;
+    deficitCH?: number;
+    reason?: string;
+}
 
-        if (leading_zeros_if_length && code.length === leading_zeros_if_length && code.startsWith('00')) {
-            const stripped = code.substring(2);
-            return stripped;
-        }
-        return code;
+/**
+ * Check a whole completed set against the major's DAG in one topological pass
+ * and return every violation. Codes outside the curriculum are ignored, and
+ * university requirements/electives are exempt, matching the transcript UI.
+ */
+export function validateCompleted(graph: MajorGraph, completed: Iterable<string>): PrereqViolation[] {
+    const completedSet = completed instanceof Set ? completed as Set<string> : new Set(completed);
+    const bitmap = toBitmap(graph.compiled, completedSet);
+    const credits = computeCompletedCredits(graph.data, completedSet, graph.ruleSet);
+    const has = (n: { index: number }) => n.index >= 0 && bitmap[n.index] === 1;
+
+    const violations: PrereqViolation[] = [];
+    for (const i of graph.order) {
+        const rule = graph.compiled.rules[i];
+        if (!rule || bitmap[i] !== 1 || graph.softLocked[i] === 1) continue;
+        if (isSatisfied(rule, bitmap, credits)) continue;
+        violations.push(violationFor(graph, i, rule, has, credits));
+    }
+    return violations;
+}
+
+function violationFor(
+    graph: MajorGraph, i: number, rule: PrereqNode, has: (n: { index: number }) => boolean, credits: number
+): PrereqViolation {
+    const course = graph.courses[i];
+    const violation: PrereqViolation = {
+        code: course.code,
+        name: course.name,
+        missing: missingCodes(rule, has, credits),
+    };
+    const requiredCH = unmetCredits(rule, credits);
+    if (requiredCH !== null) {
+        violation.requiredCH = requiredCH;
+        violation.completedCH = credits;
+        violation.deficitCH = requiredCH - credits;
+    }
+    if (rule.kind === 'approval') violation.reason = 'Requires Department Approval';
+    return violation;
+}
+
+/**
+ * Check only what a change from `previous` to `next` affects: every added
+ * course, the dependents of every removed one (from the reverse-dependency
+ * index), and credit-gated courses when the CH total dropped. A dependent is
+ * only reported if it passed before the change, so rows saved under older
+ * rules (prerequisites unticked without cascading, comma lists that used to
+ * mean "any of") keep courses the student never touched.
+ */
+export function validateDelta(
+    graph: MajorGraph,
+    previous: Set<string>,
+    next: Set<string>,
+    added: Iterable<string>,
+    removed: Iterable<string>
+): PrereqViolation[] {
+    const { compiled } = graph;
+    const before = toBitmap(compiled, previous);
+    const after = toBitmap(compiled, next);
+    const creditsBefore = computeCompletedCredits(graph.data, previous, graph.ruleSet);
+    const creditsAfter = computeCompletedCredits(graph.data, next, graph.ruleSet);
+    const has = (n: { index: number }) => n.index >= 0 && after[n.index] === 1;
+
+    const checked = new Set<number>();
+    const violations: PrereqViolation[] = [];
+    const check = (i: number, onlyIfNewlyBroken: boolean) => {
+        if (checked.has(i)) return;
+        checked.add(i);
+        const rule = compiled.rules[i];
+        if (!rule || after[i] !== 1 || graph.softLocked[i] === 1) return;
+        if (isSatisfied(rule, after, creditsAfter)) return;
+        if (onlyIfNewlyBroken && (before[i] !== 1 || !isSatisfied(rule, before, creditsBefore))) return;
+        violations.push(violationFor(graph, i, rule, has, creditsAfter));
+    };
+
+    for (const code of added) {
+        const i = compiled.indexOf.get(code);
+        if (i !== undefined) check(i, false);
+    }
+    for (const code of removed) {
+        const i = compiled.indexOf.get(code);
+        if (i === undefined) continue;
+        for (const d of compiled.dependents[i]) check(d, true);
+    }
+    if (creditsAfter < creditsBefore) {
+        for (const i of compiled.creditGated) check(i, true);
     }
-    return null;
+    return violations;
 }
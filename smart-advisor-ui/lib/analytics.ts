@@ -0,0 +1,393 @@
+import { connect, sql, transaction } from './db';
+import { parseJson } from './database';
+import { getCurriculum, getMajorGraph, normalizeCode } from './curriculum';
+import { computeCompletedCredits, MajorGraph } from './advisor';
+import { isSatisfied, PrereqNode, toBitmap } from './prerequisites';
+import { ensureSchema } from './migrations';
+
+/**
+ * Cohort-wide analytics over student_progress.
+ *
+ * The job streams every progress row through a server-side cursor, FETCH_SIZE
+ * rows at a time, inside one read-only REPEATABLE READ transaction (a
+ * consistent snapshot). Memory stays constant: each major keeps a few typed
+ * arrays indexed like its compiled prerequisite graph, plus a count per
+ * credit-hour value. Per student and course it records:
+ *
+ *   completed         course is done
+ *   unlocked          not done, and every prerequisite is met (can take it now)
+ *   blocked_students  not done, and holding back at least one locked course
+ *   blocked_courses   locked (student, course) pairs listing it as missing
+ *   bottleneck_score  the same pairs, each weighted by how much of the degree
+ *                     sits behind the locked course and split between all of
+ *                     its missing prerequisites
+ *
+ * Results replace analytics_course / analytics_major / analytics_major_histogram
+ * in one transaction; /api/admin/analytics and the admin dashboard read them.
+ * A Postgres advisory lock lets only one instance run the job at a time;
+ * the others skip their run instead of scanning the same rows again.
+ */
+
+const FETCH_SIZE = Number(process.env.ANALYTICS_FETCH_SIZE) || 2000;
+const HISTOGRAM_BUCKETS = 10;
+const RUN_INTERVAL_MS = Number(process.env.ANALYTICS_INTERVAL_MS) || 24 * 60 * 60 * 1000;
+// Arbitrary app-wide key for pg_try_advisory_lock (migrations.ts uses 727_001)
+const ANALYTICS_LOCK_KEY = 727_002;
+
+interface MajorAccumulator {
+    graph: MajorGraph;
+    /** Courses that (transitively) require course i, +1 for i itself */
+    weight: Float64Array;
+    bitmap: Uint8Array;
+    completed: Uint32Array;
+    unlocked: Uint32Array;
+    blockedStudents: Uint32Array;
+    blockedCourses: Uint32Array;
+    score: Float64Array;
+    /** Student stamp per course, so blockedStudents counts each student once */
+    seen: Uint32Array;
+    /** Students per completed CH value */
+    creditCounts: Uint32Array;
+    students: number;
+    complete: number;
+}
+
+const reachCache = new WeakMap<MajorGraph, Float64Array>();
+
+/** 1 + number of courses that transitively depend on each course */
+function degreeWeight(graph: MajorGraph): Float64Array {
+    let weight = reachCache.get(graph);
+    if (weight) return weight;
+    const n = graph.compiled.codes.length;
+    weight = new Float64Array(n);
+    const mark = new Uint32Array(n);
+    for (let i = 0; i < n; i++) {
+        let count = 0;
+        const stack = [...graph.compiled.dependents[i]];
+        while (stack.length > 0) {
+            const d = stack.pop()!;
+            if (mark[d] === i + 1) continue;
+            mark[d] = i + 1;
+            count++;
+            stack.push(...graph.compiled.dependents[d]);
+        }
+        weight[i] = 1 + count;
+    }
+    reachCache.set(graph, weight);
+    return weight;
+}
+
+function accumulatorFor(graph: MajorGraph): MajorAccumulator {
+    const n = graph.compiled.codes.length;
+    return {
+        graph,
+        weight: degreeWeight(graph),
+        bitmap: new Uint8Array(n),
+        completed: new Uint32Array(n),
+        unlocked: new Uint32Array(n),
+        blockedStudents: new Uint32Array(n),
+        blockedCourses: new Uint32Array(n),
+        score: new Float64Array(n),
+        seen: new Uint32Array(n),
+        creditCounts: new Uint32Array(graph.ruleSet.total_credits + 1),
+        students: 0,
+        complete: 0,
+    };
+}
+
+/** Unmet course prerequisites of a rule, written into `out` (deduplicated by the caller) */
+function collectUnmet(node: PrereqNode, bitmap: Uint8Array, credits: number, out: number[]) {
+    if (isSatisfied(node, bitmap, credits)) return;
+    if (node.kind === 'course') {
+        if (node.index >= 0) out.push(node.index);
+    } else if (node.kind === 'all' || node.kind === 'any') {
+        for (const child of node.children) collectUnmet(child, bitmap, credits, out);
+    }
+}
+
+const unmet: number[] = [];
+
+function addStudent(acc: MajorAccumulator, codes: Set<string>, stamp: number) {
+    const { graph, bitmap } = acc;
+    const { compiled } = graph;
+    toBitmap(compiled, codes, bitmap);
+    const credits = computeCompletedCredits(graph.data, codes, graph.ruleSet);
+
+    acc.students++;
+    acc.creditCounts[credits]++;
+    if (credits >= graph.ruleSet.total_credits) acc.complete++;
+
+    for (let i = 0; i < bitmap.length; i++) {
+        if (bitmap[i] === 1) {
+            acc.completed[i]++;
+            continue;
+        }
+        const rule = compiled.rules[i];
+        // University requirements only warn about prerequisites (see advisor.ts)
+        if (!rule || graph.softLocked[i] === 1 || isSatisfied(rule, bitmap, credits)) {
+            acc.unlocked[i]++;
+            continue;
+        }
+
+        unmet.length = 0;
+        collectUnmet(rule, bitmap, credits, unmet);
+        if (unmet.length === 0) continue; // held back by CH or approval only
+        const share = acc.weight[i] / unmet.length;
+        for (const m of unmet) {
+            acc.blockedCourses[m]++;
+            acc.score[m] += share;
+            if (acc.seen[m] !== stamp) {
+                acc.seen[m] = stamp;
+                acc.blockedStudents[m]++;
+            }
+        }
+    }
+}
+
+export interface AnalyticsRunResult {
+    runId: number;
+    students: number;
+    skipped: number;
+    durationMs: number;
+}
+
+let running: Promise<AnalyticsRunResult | null> | null = null;
+
+/**
+ * Run the job, or join the run already in progress in this process.
+ * Resolves to null when another instance holds the job's lock.
+ */
+export function runCohortAnalytics(): Promise<AnalyticsRunResult | null> {
+    if (!running) running = runLocked().finally(() => { running = null; });
+    return running;
+}
+
+export function isAnalyticsRunning(): boolean {
+    return running !== null;
+}
+
+async function runLocked(): Promise<AnalyticsRunResult | null> {
+    const client = await connect();
+    try {
+        // Session-level lock, so it must be taken and released on this client
+        const { rows: [lock] } = await client.sql`SELECT pg_try_advisory_lock(${ANALYTICS_LOCK_KEY}) AS acquired`;
+        if (!lock.acquired) return null;
+        try {
+            return await run();
+        } finally {
+            await client.sql`SELECT pg_advisory_unlock(${ANALYTICS_LOCK_KEY})`;
+        }
+    } finally {
+        client.release();
+    }
+}
+
+async function run(): Promise<AnalyticsRunResult> {
+    const started = performance.now();
+    const { rows: [runRow] } = await sql`INSERT INTO analytics_runs DEFAULT VALUES RETURNING id`;
+    const runId = Number(runRow.id);
+
+    try {
+        const curriculum = await getCurriculum();
+        const accumulators = new Map<string, MajorAccumulator>();
+        for (const major in curriculum.majors) {
+            accumulators.set(major, accumulatorFor((await getMajorGraph(major))!));
+        }
+
+        let students = 0;
+        let skipped = 0;
+        await transaction('analytics_scan', async (tx) => {
+            await tx.sql`SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY`;
+            await tx.sql`
+                DECLARE progress_cursor NO SCROLL CURSOR FOR
+                SELECT major, COALESCE(completed_jsonb, try_jsonb(completed, '[]')) AS completed
+                FROM student_progress
+            `;
+            const codes = new Set<string>();
+            for (; ;) {
+                // FETCH takes no bind parameters, so the count is part of the statement text
+                const { rows } = await tx.client.query(`FETCH FORWARD ${FETCH_SIZE} FROM progress_cursor`);
+                for (const row of rows) {
+                    const acc = accumulators.get(row.major);
+                    if (!acc) { skipped++; continue; }
+                    codes.clear();
+                    for (const entry of parseJson<any[]>(row.completed, [])) {
+                        const code = typeof entry === 'string' ? entry : entry?.code;
+                        if (typeof code === 'string') codes.add(normalizeCode(code));
+                    }
+                    addStudent(acc, codes, ++students);
+                }
+                if (rows.length < FETCH_SIZE) break;
+            }
+            await tx.sql`CLOSE progress_cursor`;
+        });
+
+        await writeResults(accumulators);
+        const durationMs = Math.round(performance.now() - started);
+        await sql`
+            UPDATE analytics_runs SET status = 'done', finished_at = NOW(), students = ${students}, duration_ms = ${durationMs}
+            WHERE id = ${runId}
+        `;
+        return { runId, students, skipped, durationMs };
+    } catch (e) {
+        await sql`
+            UPDATE analytics_runs SET status = 'failed', finished_at = NOW(), error = ${e instanceof Error ? e.message : String(e)}
+            WHERE id = ${runId}
+        `.catch(() => { });
+        throw e;
+    }
+}
+
+async function writeResults(accumulators: Map<string, MajorAccumulator>) {
+    const course = { major: [] as string[], code: [] as string[], name: [] as string[], completed: [] as number[], unlocked: [] as number[], blockedStudents: [] as number[], blockedCourses: [] as number[], score: [] as number[] };
+    const major = { major: [] as string[], students: [] as number[], avg: [] as number[], median: [] as number[], complete: [] as number[] };
+    const hist = { major: [] as string[], bucket: [] as number[], min: [] as number[], max: [] as number[], students: [] as number[] };
+
+    for (const [key, acc] of accumulators) {
+        const { graph } = acc;
+        for (let i = 0; i < graph.courses.length; i++) {
+            course.major.push(key);
+            course.code.push(graph.courses[i].code);
+            course.name.push(graph.courses[i].name);
+            course.completed.push(acc.completed[i]);
+            course.unlocked.push(acc.unlocked[i]);
+            course.blockedStudents.push(acc.blockedStudents[i]);
+            course.blockedCourses.push(acc.blockedCourses[i]);
+            course.score.push(Math.round(acc.score[i] * 100) / 100);
+        }
+
+        // Mean, median and decile histogram from the per-CH counts
+        const total = graph.ruleSet.total_credits;
+        const counts = acc.creditCounts;
+        const buckets = new Array<number>(HISTOGRAM_BUCKETS).fill(0);
+        let sum = 0;
+        let median = 0;
+        let seen = 0;
+        for (let ch = 0; ch < counts.length; ch++) {
+            if (counts[ch] === 0) continue;
+            sum += ch * counts[ch];
+            if (seen < acc.students / 2 && seen + counts[ch] >= acc.students / 2) median = ch;
+            seen += counts[ch];
+            buckets[Math.min(HISTOGRAM_BUCKETS - 1, Math.floor((ch / total) * HISTOGRAM_BUCKETS))] += counts[ch];
+        }
+        major.major.push(key);
+        major.students.push(acc.students);
+        major.avg.push(acc.students ? Math.round((sum / acc.students) * 10) / 10 : 0);
+        major.median.push(median);
+        major.complete.push(acc.complete);
+        for (let b = 0; b < HISTOGRAM_BUCKETS; b++) {
+            hist.major.push(key);
+            hist.bucket.push(b);
+            hist.min.push(Math.ceil((b * total) / HISTOGRAM_BUCKETS));
+            hist.max.push(b === HISTOGRAM_BUCKETS - 1 ? total : Math.ceil(((b + 1) * total) / HISTOGRAM_BUCKETS) - 1);
+            hist.students.push(buckets[b]);
+        }
+    }
+
+    await transaction('analytics_write', async (tx) => {
+        await tx.sql`DELETE FROM analytics_course`;
+        await tx.sql`
+            INSERT INTO analytics_course (major, course_code, name, completed, unlocked, blocked_students, blocked_courses, bottleneck_score)
+            SELECT * FROM UNNEST(
+                ${course.major}::text[], ${course.code}::text[], ${course.name}::text[], ${course.completed}::int[],
+                ${course.unlocked}::int[], ${course.blockedStudents}::int[], ${course.blockedCourses}::int[], ${course.score}::float8[]
+            )
+            ON CONFLICT (major, course_code) DO NOTHING
+        `;
+        await tx.sql`DELETE FROM analytics_major`;
+        await tx.sql`
+            INSERT INTO analytics_major (major, students, avg_credit_hours, median_credit_hours, complete)
+            SELECT * FROM UNNEST(${major.major}::text[], ${major.students}::int[], ${major.avg}::float8[], ${major.median}::int[], ${major.complete}::int[])
+        `;
+        await tx.sql`DELETE FROM analytics_major_histogram`;
+        await tx.sql`
+            INSERT INTO analytics_major_histogram (major, bucket, min_ch, max_ch, students)
+            SELECT * FROM UNNEST(${hist.major}::text[], ${hist.bucket}::int[], ${hist.min}::int[], ${hist.max}::int[], ${hist.students}::int[])
+        `;
+    });
+}
+
+// ─── Reading ────────────────────────────────────────────────────────────────
+
+export interface CohortAnalytics {
+    lastRun: { id: number; startedAt: string; finishedAt: string | null; status: string; students: number; durationMs: number | null } | null;
+    running: boolean;
+    bottlenecks: { major: string; code: string; name: string; completed: number; unlocked: number; blockedStudents: number; blockedCourses: number; score: number }[];
+    majors: { major: string; students: number; avgCreditHours: number; medianCreditHours: number; complete: number; histogram: { minCH: number; maxCH: number; students: number }[] }[];
+}
+
+/** The latest job output: top `limit` bottlenecks per major (or for one major) and every histogram */
+export async function getCohortAnalytics(limit = 10, majorFilter: string | null = null): Promise<CohortAnalytics> {
+    const [runs, courses, majors, histogram] = await Promise.all([
+        sql`
+            SELECT id, started_at, finished_at, status, students, duration_ms FROM analytics_runs
+            WHERE status <> 'running'
+            ORDER BY id DESC LIMIT 1
+        `,
+        sql`
+            SELECT * FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY major ORDER BY bottleneck_score DESC, course_code) AS rank
+                FROM analytics_course
+                WHERE bottleneck_score > 0 AND (${majorFilter}::text IS NULL OR major = ${majorFilter})
+            ) AS ranked
+            WHERE rank <= ${limit}
+            ORDER BY major, rank
+        `,
+        sql`SELECT * FROM analytics_major ORDER BY major`,
+        sql`SELECT * FROM analytics_major_histogram ORDER BY major, bucket`,
+    ]);
+
+    const run = runs.rows[0];
+    return {
+        lastRun: run ? {
+            id: Number(run.id),
+            startedAt: new Date(run.started_at).toISOString(),
+            finishedAt: run.finished_at ? new Date(run.finished_at).toISOString() : null,
+            status: run.status,
+            students: Number(run.students),
+            durationMs: run.duration_ms === null ? null : Number(run.duration_ms),
+        } : null,
+        running: isAnalyticsRunning(),
+        bottlenecks: courses.rows.map(r => ({
+            major: r.major,
+            code: r.course_code,
+            name: r.name,
+            completed: Number(r.completed),
+            unlocked: Number(r.unlocked),
+            blockedStudents: Number(r.blocked_students),
+            blockedCourses: Number(r.blocked_courses),
+            score: Number(r.bottleneck_score),
+        })),
+        majors: majors.rows
+            .filter(r => !majorFilter || r.major === majorFilter)
+            .map(r => ({
+                major: r.major,
+                students: Number(r.students),
+                avgCreditHours: Number(r.avg_credit_hours),
+                medianCreditHours: Number(r.median_credit_hours),
+                complete: Number(r.complete),
+                histogram: histogram.rows
+                    .filter(h => h.major === r.major)
+                    .map(h => ({ minCH: Number(h.min_ch), maxCH: Number(h.max_ch), students: Number(h.students) })),
+            })),
+    };
+}
+
+// ─── Schedule ───────────────────────────────────────────────────────────────
+
+let timer: ReturnType<typeof setInterval> | null = null;
+
+/** Run every RUN_INTERVAL_MS (called from instrumentation.ts); the first run is one interval after start */
+export function startAnalyticsJob(): void {
+    if (timer) return;
+    timer = setInterval(() => {
+        // Waits for the schema in case the instance booted without a database
+        ensureSchema()
+            .then(() => runCohortAnalytics())
+            .then(r => console.log(r
+                ? `Cohort analytics: ${r.students} students in ${r.durationMs}ms`
+                : 'Cohort analytics: skipped, another instance is running it'))
+            .catch(e => console.error("Cohort analytics failed:", e));
+    }, RUN_INTERVAL_MS);
+    timer.unref?.();
+}
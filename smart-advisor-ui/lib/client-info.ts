@@ -1,23 +1,62 @@
 import { headers } from 'next/headers';
 import { UAParser } from 'ua-parser-js';
-import { VisitorLog } from './database';
-
-export async function getClientInfo(): Promise<VisitorLog> {
-    const headersList = await headers();
-    const ip = headersList.get('x-forwarded-for')?.split(',')[0].trim() || 'unknown';
-    const userAgent = headersList.get('user-agent') || '';
-
-    // Parse User Agent
-    const parser = new UAParser(userAgent);
-    const result = parser.getResult();
-
-    return {
-        ip_address: ip,
-        user_agent: userAgent,
-        device_vendor: result.device.vendor,
-        device_model: result.device.model,
-        os_name: result.os.name,
-        os_version: result.os.version,
-        browser_name: result.browser.name
-    };
+import type { VisitorLog } from './database';
+import { LRUCache } from './lru-cache';
+import { timeSegment } from './metrics';
+
+type ParsedAgent = Pick<VisitorLog, 'device_vendor' | 'device_model' | 'os_name' | 'os_version' | 'browser_name'>;
+
+// A few hundred distinct UA strings cover nearly all traffic
+const uaCache = new LRUCache<string, ParsedAgent>(1000);
+
+export function parseUserAgent(userAgent: string): ParsedAgent {
+    return uaCache.getOrSet(userAgent, () => {
+        const result = new UAParser(userAgent).getResult();
+        return {
+            device_vendor: result.device.vendor,
+            device_model: result.device.model,
+            os_name: result.os.name,
+            os_version: result.os.version,
+            browser_name: result.browser.name,
+        };
+    });
+}
+
+export function getUserAgentCacheStats() {
+    return { size: uaCache.size, hits: uaCache.hits, misses: uaCache.misses };
+}
+
+/**
+ * Number of reverse proxies in front of the app that append to
+ * X-Forwarded-For (1 on Vercel, which also overwrites what the client sent).
+ */
+const TRUSTED_PROXY_HOPS = Math.max(1, Number(process.env.TRUSTED_PROXY_HOPS) || 1);
+
+/**
+ * The client address as seen by the outermost trusted proxy.
+ *
+ * The leftmost X-Forwarded-For entries are whatever the client sent, so they
+ * can't key a rate limit; the entry TRUSTED_PROXY_HOPS from the right was
+ * appended by our own proxy. Assumes the app is only reachable through those
+ * proxies; X-Real-IP is used when no X-Forwarded-For is present.
+ */
+export function clientIp(header: (name: string) => string | null | undefined): string {
+    const hops = header('x-forwarded-for')?.split(',').map(h => h.trim()).filter(Boolean);
+    if (hops?.length) return hops[Math.max(0, hops.length - TRUSTED_PROXY_HOPS)];
+    return header('x-real-ip')?.trim() || 'unknown';
+}
+
+/** Counted in the request's `parse` Server-Timing segment */
+export function getClientInfo(): Promise<VisitorLog> {
+    return timeSegment('parse', async () => {
+        const headersList = await headers();
+        const ip = clientIp(name => headersList.get(name));
+        const userAgent = headersList.get('user-agent') || '';
+
+        return {
+            ip_address: ip,
+            user_agent: userAgent,
+            ...parseUserAgent(userAgent),
+        };
+    });
 }
@@ -0,0 +1,250 @@
+import path from 'path';
+import fs from 'fs/promises';
+import { createHash } from 'crypto';
+import { brotliCompressSync, gzipSync, constants as zlib } from 'zlib';
+import { Course, CourseData } from '@/types';
+import { buildMajorGraph, flattenCourseData, MajorGraph } from './advisor';
+
+export { flattenCourseData };
+
+/**
+ * Process-wide compiled view of public/data/curriculum.json and
+ * curriculum_rules.json.
+ *
+ * The files are read and indexed once; later calls are a memory lookup. Their
+ * mtimes are re-checked at most once per STAT_INTERVAL_MS so edits are
+ * picked up without a restart.
+ */
+
+const CURRICULUM_FILE = path.join(process.cwd(), 'public', 'data', 'curriculum.json');
+const RULES_FILE = path.join(process.cwd(), 'public', 'data', 'curriculum_rules.json');
+const STAT_INTERVAL_MS = 1000;
+
+export interface CourseEntry {
+    code: string;
+    name: string;
+    ch: number;
+    level?: number;
+}
+
+export interface AutocompleteCourse {
+    name: string;
+    code: string;
+    ch: number;
+}
+
+export interface CurriculumIndex {
+    mtimeMs: number;
+    rulesMtimeMs: number;
+    /** The parsed file, as-is */
+    raw: any;
+    /** Parsed curriculum_rules.json */
+    rules: any;
+    /** Normalized code → course, deduplicated across shared data and all majors */
+    courses: Map<string, CourseEntry>;
+    /** Major key → requirement lists, merged with `shared` the way the client does */
+    majors: Record<string, CourseData>;
+    /** Major key → every course of that major, flattened */
+    majorCourses: Record<string, Course[]>;
+    /** All courses sorted by name then code, for autocomplete */
+    autocomplete: AutocompleteCourse[];
+    /** `autocomplete` serialized once, plus its strong ETag */
+    autocompleteBody: string;
+    autocompleteEtag: string;
+    /** Major key → compiled prerequisite DAG, built on first use */
+    graphs: Map<string, MajorGraph>;
+    /** Major key → client bundle (merged data + rules), compressed on first use */
+    bundles: Record<string, MajorBundle>;
+}
+
+/**
+ * Everything the transcript page needs for one major, serialized once.
+ * `hash` is a content hash of `body`, so a URL carrying it can be cached
+ * forever; the compressed variants are produced on first request.
+ */
+export interface MajorBundle {
+    major: string;
+    hash: string;
+    body: Buffer;
+    gzip?: Buffer;
+    br?: Buffer;
+}
+
+/** HTU codes sometimes carry a `00` prefix on the 10-digit form; strip it. */
+export function normalizeCode(code: string): string {
+    const trimmed = code.trim();
+    if (trimmed.length === 10 && trimmed.startsWith('00')) return trimmed.substring(2);
+    return trimmed;
+}
+
+export function mergeMajorData(raw: any, majorKey: string): CourseData | null {
+    const shared = raw.shared ?? {};
+    const majorData = raw.majors?.[majorKey];
+    if (!majorData) return null;
+
+    return {
+        university_requirements: majorData.university_requirements ?? shared.university_requirements ?? [],
+        college_requirements: majorData.college_requirements ?? shared.college_requirements ?? [],
+        university_electives: majorData.university_electives ?? shared.university_electives ?? [],
+        department_requirements: majorData.department_requirements ?? [],
+        electives: majorData.electives ?? [],
+        work_market_requirements: majorData.work_market_requirements ?? [],
+    };
+}
+
+export function etagFor(body: string | Buffer): string {
+    return `"${createHash('sha1').update(body).digest('hex').slice(0, 27)}"`;
+}
+
+/** True when an If-None-Match header value matches `etag` */
+export function etagMatches(ifNoneMatch: string | null, etag: string): boolean {
+    if (!ifNoneMatch) return false;
+    if (ifNoneMatch.trim() === '*') return true;
+    return ifNoneMatch.split(',').some(tag => tag.trim().replace(/^W\//, '') === etag);
+}
+
+function buildIndex(raw: any, rules: any, mtimeMs: number, rulesMtimeMs: number): CurriculumIndex {
+    const courses = new Map<string, CourseEntry>();
+
+    const processList = (list: any[] | undefined) => {
+        if (!list) return;
+        for (const c of list) {
+            if (!c?.code || !c?.name) continue;
+            const code = normalizeCode(c.code);
+            const existing = courses.get(code);
+            if (!existing || c.name.length > existing.name.length) {
+                courses.set(code, { code, name: c.name.trim(), ch: c.ch ?? 3, level: c.level });
+            }
+        }
+    };
+
+    processList(raw.shared?.university_requirements);
+    processList(raw.shared?.college_requirements);
+    processList(raw.shared?.university_electives);
+
+    const majors: Record<string, CourseData> = {};
+    const majorCourses: Record<string, Course[]> = {};
+    for (const majorKey in raw.majors ?? {}) {
+        const majorData = raw.majors[majorKey];
+        processList(majorData.university_requirements);
+        processList(majorData.college_requirements);
+        processList(majorData.university_electives);
+        processList(majorData.department_requirements);
+        processList(majorData.electives);
+        processList(majorData.work_market_requirements);
+
+        const merged = mergeMajorData(raw, majorKey)!;
+        majors[majorKey] = merged;
+        majorCourses[majorKey] = flattenCourseData(merged);
+    }
+
+    const autocomplete = Array.from(courses.values())
+        .map(({ name, code, ch }) => ({ name, code, ch }))
+        .sort((a, b) => {
+            if (a.name < b.name) return -1;
+            if (a.name > b.name) return 1;
+            if (a.code < b.code) return -1;
+            if (a.code > b.code) return 1;
+            return 0;
+        });
+
+    const autocompleteBody = JSON.stringify(autocomplete);
+
+    const bundles: Record<string, MajorBundle> = {};
+    for (const majorKey in majors) {
+        const body = Buffer.from(JSON.stringify({ major: majorKey, data: majors[majorKey], rules }));
+        bundles[majorKey] = {
+            major: majorKey,
+            hash: createHash('sha256').update(body).digest('hex').slice(0, 16),
+            body,
+        };
+    }
+
+    return {
+        mtimeMs,
+        rulesMtimeMs,
+        raw,
+        rules,
+        courses,
+        majors,
+        majorCourses,
+        autocomplete,
+        autocompleteBody,
+        autocompleteEtag: etagFor(autocompleteBody),
+        graphs: new Map(),
+        bundles,
+    };
+}
+
+let current: CurriculumIndex | null = null;
+let loading: Promise<CurriculumIndex> | null = null;
+let lastStatAt = 0;
+
+async function load(): Promise<CurriculumIndex> {
+    const [stat, rulesStat] = await Promise.all([fs.stat(CURRICULUM_FILE), fs.stat(RULES_FILE)]);
+    lastStatAt = Date.now();
+    if (current && current.mtimeMs === stat.mtimeMs && current.rulesMtimeMs === rulesStat.mtimeMs) return current;
+
+    const [raw, rules] = await Promise.all([
+        fs.readFile(CURRICULUM_FILE, 'utf8').then(JSON.parse),
+        fs.readFile(RULES_FILE, 'utf8').then(JSON.parse),
+    ]);
+    current = buildIndex(raw, rules, stat.mtimeMs, rulesStat.mtimeMs);
+    return current;
+}
+
+/** Get the shared curriculum index, (re)building it if the file changed. */
+export async function getCurriculum(): Promise<CurriculumIndex> {
+    if (current && Date.now() - lastStatAt < STAT_INTERVAL_MS) return current;
+    if (!loading) {
+        loading = load().finally(() => { loading = null; });
+    }
+    return loading;
+}
+
+/** The compiled prerequisite DAG for a major, or null if the major is unknown. */
+export async function getMajorGraph(majorKey: string): Promise<MajorGraph | null> {
+    const curriculum = await getCurriculum();
+    const data = curriculum.majors[majorKey];
+    if (!data) return null;
+
+    let graph = curriculum.graphs.get(majorKey);
+    if (!graph) {
+        graph = buildMajorGraph(data, curriculum.rules, majorKey);
+        curriculum.graphs.set(majorKey, graph);
+    }
+    return graph;
+}
+
+/** Major key → bundle hash, for building `/api/curriculum/<major>?v=<hash>` URLs */
+export async function getBundleManifest(): Promise<Record<string, string>> {
+    const { bundles } = await getCurriculum();
+    const manifest: Record<string, string> = {};
+    for (const key in bundles) manifest[key] = bundles[key].hash;
+    return manifest;
+}
+
+function compressBundle(bundle: MajorBundle): Required<MajorBundle> {
+    bundle.gzip ??= gzipSync(bundle.body, { level: 9 });
+    bundle.br ??= brotliCompressSync(bundle.body, {
+        params: {
+            [zlib.BROTLI_PARAM_MODE]: zlib.BROTLI_MODE_TEXT,
+            [zlib.BROTLI_PARAM_QUALITY]: zlib.BROTLI_MAX_QUALITY,
+            [zlib.BROTLI_PARAM_SIZE_HINT]: bundle.body.length,
+        },
+    });
+    return bundle as Required<MajorBundle>;
+}
+
+/** The client bundle for a major with its compressed variants, or null if the major is unknown. */
+export async function getMajorBundle(majorKey: string): Promise<Required<MajorBundle> | null> {
+    const { bundles } = await getCurriculum();
+    const bundle = Object.hasOwn(bundles, majorKey) ? bundles[majorKey] : undefined;
+    return bundle ? compressBundle(bundle) : null;
+}
+
+/** Compress every bundle up front so no request pays for max-quality brotli */
+export async function warmCurriculumBundles(): Promise<void> {
+    const { bundles } = await getCurriculum();
+    for (const key in bundles) compressBundle(bundles[key]);
+}
@@ -1,19 +1,11 @@
-import path from 'path';
-import fs from 'fs/promises';
 import { CourseData, Course } from '@/types';
+import { getCurriculum } from './curriculum';
 
 export async function getCourseData(majorKey: string = 'data_science'): Promise<CourseData> {
-    const dataDir = path.join(process.cwd(), 'public/data');
-    const filePath = path.join(dataDir, 'curriculum.json');
-
     try {
-        const fileContents = await fs.readFile(filePath, 'utf8');
-        const jsonData = JSON.parse(fileContents);
-
-        // Structure is { majors: { [key]: { ... } }, shared: { ... } }
-        const majorData = jsonData.majors[majorKey] || jsonData.majors['data_science'];
-
-        return majorData as CourseData;
+        // Merged with `shared` the same way HomeClient does it
+        const curriculum = await getCurriculum();
+        return curriculum.majors[majorKey] || curriculum.majors['data_science'];
     } catch (error) {
         console.error("Error loading course data:", error);
         return {
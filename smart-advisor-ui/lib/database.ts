@@ -1,14 +1,17 @@
-import { sql } from '@vercel/postgres';
+import { sql, prepared, batch } from './db';
+import { migrate, SCHEMA_TABLES } from './migrations';
+import { invalidateStats } from './stats';
+import { enqueueVisit } from './visitor-log';
+import { LRUCache } from './lru-cache';
 
 /**
  * Drop all tables and recreate them. (Nuclear Reset)
  */
 export async function resetDB() {
-    await sql`DROP TABLE IF EXISTS accounts CASCADE;`;
-    await sql`DROP TABLE IF EXISTS users CASCADE;`;
-    await sql`DROP TABLE IF EXISTS visitor_logs CASCADE;`;
-    await sql`DROP TABLE IF EXISTS student_profile CASCADE;`;
-    await sql`DROP TABLE IF EXISTS student_progress CASCADE;`;
+    // Table names are constants from lib/migrations.ts, never user input
+    await batch('reset_db', [`DROP TABLE IF EXISTS ${SCHEMA_TABLES.join(', ')} CASCADE`]);
+    clearUserCache();
+    invalidateStats();
     await initDB();
 }
 
@@ -27,139 +30,274 @@ export interface VisitorLog {
 }
 
 /**
- * Initialize the database tables if they don't exist.
- * Note: In production, it's better to run migration scripts, but this works for simple apps.
+ * Bring the database schema up to date. See lib/migrations.ts.
  */
 export async function initDB() {
-    await sql`
-        CREATE TABLE IF NOT EXISTS student_progress (
-            student_id  TEXT    NOT NULL,
-            major       TEXT    NOT NULL,
-            completed   TEXT    NOT NULL DEFAULT '[]',
-            updated_at  BIGINT  NOT NULL DEFAULT (EXTRACT(EPOCH FROM NOW())::bigint),
-            PRIMARY KEY (student_id, major)
-        );
-    `;
-    await sql`
-        CREATE INDEX IF NOT EXISTS idx_student_id ON student_progress (student_id);
-    `;
-    await sql`
-        CREATE TABLE IF NOT EXISTS student_profile (
-            student_id  TEXT    PRIMARY KEY,
-            major       TEXT    NOT NULL,
-            updated_at  BIGINT  NOT NULL DEFAULT (EXTRACT(EPOCH FROM NOW())::bigint)
-        );
-    `;
-    await sql`
-        CREATE TABLE IF NOT EXISTS visitor_logs (
-            id SERIAL PRIMARY KEY,
-            student_id TEXT,
-            ip_address TEXT,
-            user_agent TEXT,
-            device_vendor TEXT,
-            device_model TEXT,
-            os_name TEXT,
-            os_version TEXT,
-            browser_name TEXT,
-            visited_at TIMESTAMP DEFAULT NOW()
-        );
-    `;
-
-    // New authentication tables
-    await sql`
-        CREATE TABLE IF NOT EXISTS users (
-            id SERIAL PRIMARY KEY,
-            student_id TEXT UNIQUE,
-            email TEXT UNIQUE,
-            password_hash TEXT,
-            name TEXT,
-            image TEXT,
-            created_at TIMESTAMP DEFAULT (NOW())
-        );
-    `;
-
-    await sql`
-        CREATE TABLE IF NOT EXISTS accounts (
-            id SERIAL PRIMARY KEY,
-            user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
-            provider TEXT NOT NULL,
-            provider_account_id TEXT NOT NULL,
-            UNIQUE(provider, provider_account_id)
-        );
-    `;
+    await migrate();
+}
 
-    // Add student_id column if it doesn't exist (migrations are better, but this handles simple schema evolution)
+/** JSONB comes back parsed; tolerate rows/drivers that still hand us a string */
+export function parseJson<T>(value: unknown, fallback: T): T {
+    if (value === null || value === undefined) return fallback;
+    if (typeof value !== 'string') return value as T;
     try {
-        await sql`ALTER TABLE visitor_logs ADD COLUMN IF NOT EXISTS student_id TEXT;`;
-    } catch (e) {
-        console.log("Column check passed or failed safely", e);
+        return JSON.parse(value) as T;
+    } catch {
+        return fallback;
     }
 }
 
 
-/** Log visitor information */
+/**
+ * Log visitor information. Rows are buffered and written in batches off the
+ * request path (see lib/visitor-log.ts), so this never waits on the database.
+ */
 export async function logVisitor(data: VisitorLog): Promise<void> {
-    try {
-        await sql`
-            INSERT INTO visitor_logs (
-                student_id, ip_address, user_agent, device_vendor, device_model, os_name, os_version, browser_name
-            ) VALUES (
-                ${data.student_id || null}, ${data.ip_address}, ${data.user_agent}, ${data.device_vendor || null}, ${data.device_model || null}, 
-                ${data.os_name || null}, ${data.os_version || null}, ${data.browser_name || null}
-            )
-        `;
-    } catch (e) {
-        console.error("Failed to log visitor:", e);
-    }
+    enqueueVisit(data);
 }
 
-/** Get recent visitor logs */
-export async function getVisitorLogs(limit = 100): Promise<(VisitorLog & { id: number; visited_at: Date })[]> {
+export interface VisitorLogQuery {
+    limit?: number;
+    /** Opaque cursor from a previous page's `nextCursor` */
+    cursor?: string | null;
+    studentId?: string | null;
+    /** Inclusive YYYY-MM-DD bounds on visited_at */
+    from?: string | null;
+    to?: string | null;
+}
+
+export interface VisitorLogPage {
+    logs: (VisitorLog & { id: number; visited_at: Date })[];
+    nextCursor: string | null;
+}
+
+// Cursor = last row's (visited_at, id); the timestamp is kept as Postgres text
+// so it round-trips to the microsecond regardless of the Node timezone.
+function encodeLogCursor(visitedAt: string, id: number): string {
+    return Buffer.from(`${visitedAt}|${id}`).toString('base64url');
+}
+
+function decodeLogCursor(cursor: string): { visitedAt: string; id: number } | null {
+    const [visitedAt, id] = Buffer.from(cursor, 'base64url').toString().split('|');
+    if (!visitedAt || !/^\d+$/.test(id ?? '') || isNaN(Date.parse(visitedAt))) return null;
+    return { visitedAt, id: Number(id) };
+}
+
+/**
+ * Visitor logs, newest first, one page at a time. Keyset pagination on
+ * (visited_at, id) uses idx_visitor_logs_visited / _student_visited, so any
+ * page costs the same however large the table is.
+ */
+export async function getVisitorLogs(query: VisitorLogQuery = {}): Promise<VisitorLogPage> {
+    const limit = Math.min(Math.max(query.limit ?? 100, 1), 500);
+    const after = query.cursor ? decodeLogCursor(query.cursor) : null;
     try {
+        // Unset filters are passed as NULL; each query is planned with its
+        // actual parameters, so the NULL branches fold away.
         const { rows } = await sql`
-            SELECT * FROM visitor_logs 
-            ORDER BY visited_at DESC 
-            LIMIT ${limit}
+            SELECT *, to_char(visited_at, 'YYYY-MM-DD"T"HH24:MI:SS.US') AS cursor_ts
+            FROM visitor_logs
+            WHERE visited_at IS NOT NULL
+              AND (${query.studentId ?? null}::text IS NULL OR student_id = ${query.studentId ?? null})
+              AND (${query.from ?? null}::date IS NULL OR visited_at >= ${query.from ?? null}::date)
+              AND (${query.to ?? null}::date IS NULL OR visited_at < ${query.to ?? null}::date + 1)
+              AND (${after?.visitedAt ?? null}::timestamp IS NULL
+                   OR (visited_at, id) < (${after?.visitedAt ?? null}::timestamp, ${after?.id ?? 0}))
+            ORDER BY visited_at DESC, id DESC
+            LIMIT ${limit + 1}
         `;
-        return rows as (VisitorLog & { id: number; visited_at: Date })[];
+        const page = rows.slice(0, limit);
+        const last = page[page.length - 1];
+        return {
+            logs: page.map(({ cursor_ts, ...log }) => log) as VisitorLogPage['logs'],
+            nextCursor: rows.length > limit ? encodeLogCursor(last.cursor_ts, last.id) : null,
+        };
     } catch (e) {
         console.error("Failed to fetch logs:", e);
-        return [];
+        return { logs: [], nextCursor: null };
     }
 }
 
-/** Load a student's completed courses for a specific major */
-export async function loadProgress(studentId: string, major: string): Promise<string[]> {
+/** A completed entry: legacy rows hold bare codes, newer ones `{ code, name }` */
+export type CompletedEntry = string | { code: string; name?: string };
+
+export interface ProgressState {
+    completed: CompletedEntry[];
+    /** Bumped on every write; 0 = nothing saved yet */
+    version: number;
+}
+
+// ── Hot reads, as prepared statements ──────────────────────────────
+
+const selectProgress = prepared('load_progress', `
+    SELECT COALESCE(completed_jsonb, try_jsonb(completed, '[]')) AS completed, version
+    FROM student_progress
+    WHERE student_id = $1 AND major = $2
+`);
+
+const selectMajor = prepared('load_major', `
+    SELECT major FROM student_profile WHERE student_id = $1
+`);
+
+const selectLatestSemester = prepared('load_planner', `
+    SELECT
+        id,
+        name,
+        COALESCE(courses_jsonb, try_jsonb(courses, '[]')) AS courses,
+        COALESCE(study_sessions_jsonb, try_jsonb(study_sessions, '[]')) AS study_sessions
+    FROM planner_semesters
+    WHERE student_id = $1
+    ORDER BY updated_at DESC LIMIT 1
+`);
+
+/** Load a student's completed courses for a specific major, with the row version */
+export async function loadProgressState(studentId: string, major: string): Promise<ProgressState> {
     try {
-        const { rows } = await sql`
-            SELECT completed FROM student_progress 
-            WHERE student_id = ${studentId} AND major = ${major}
-        `;
-        if (rows.length === 0) return [];
-        return JSON.parse(rows[0].completed) as string[];
+        const { rows } = await selectProgress(studentId, major);
+        if (rows.length === 0) return { completed: [], version: 0 };
+        return { completed: parseJson(rows[0].completed, []), version: Number(rows[0].version) };
     } catch (e) {
         console.error("DB Load Error:", e);
         // Fallback or init table if missing
-        return [];
+        return { completed: [], version: 0 };
     }
 }
 
-/** Save a student's completed courses for a specific major */
-export async function saveProgress(studentId: string, major: string, completed: string[]): Promise<void> {
+/** Load a student's completed courses for a specific major */
+export async function loadProgress(studentId: string, major: string): Promise<CompletedEntry[]> {
+    return (await loadProgressState(studentId, major)).completed;
+}
+
+/**
+ * Save a student's completed courses for a specific major. Returns the new version.
+ * The TEXT column is still written for the previous release; reads use JSONB.
+ */
+export async function saveProgress(studentId: string, major: string, completed: CompletedEntry[]): Promise<number> {
     const json = JSON.stringify(completed);
-    await sql`
-        INSERT INTO student_progress (student_id, major, completed, updated_at)
-        VALUES (${studentId}, ${major}, ${json}, (EXTRACT(EPOCH FROM NOW())::bigint))
-        ON CONFLICT (student_id, major) DO UPDATE SET
-            completed   = EXCLUDED.completed,
-            updated_at  = EXCLUDED.updated_at
+    const { rows } = await sql`
+        WITH up AS (
+            INSERT INTO student_progress (student_id, major, completed, completed_jsonb, updated_at, version)
+            VALUES (${studentId}, ${major}, ${json}, ${json}::jsonb, (EXTRACT(EPOCH FROM NOW())::bigint), 1)
+            ON CONFLICT (student_id, major) DO UPDATE SET
+                completed       = EXCLUDED.completed,
+                completed_jsonb = EXCLUDED.completed_jsonb,
+                updated_at      = EXCLUDED.updated_at,
+                version         = student_progress.version + 1
+            RETURNING version
+        ), entries AS (
+            SELECT completed_code(e) AS code, MAX(e ->> 'name') AS name
+            FROM jsonb_array_elements(${json}::jsonb) AS e
+            WHERE completed_code(e) IS NOT NULL
+            GROUP BY 1
+        ), del AS (
+            DELETE FROM student_completed_course
+            WHERE student_id = ${studentId} AND major = ${major}
+              AND course_code NOT IN (SELECT code FROM entries)
+            RETURNING course_code
+        ), ins AS (
+            INSERT INTO student_completed_course (student_id, major, course_code, name)
+            SELECT ${studentId}, ${major}, code, name FROM entries
+            ON CONFLICT (student_id, major, course_code) DO UPDATE SET name = EXCLUDED.name
+            RETURNING course_code, name, (xmax = 0) AS inserted
+        ), counts AS (
+            -- +1 for newly completed courses, -1 for dropped ones
+            INSERT INTO stats_course_completion (course_code, name, students)
+            SELECT course_code, MAX(name), SUM(delta) FROM (
+                SELECT course_code, name, 1 AS delta FROM ins WHERE inserted
+                UNION ALL
+                SELECT course_code, NULL, -1 FROM del
+            ) AS changes
+            GROUP BY course_code
+            ON CONFLICT (course_code) DO UPDATE SET
+                students = stats_course_completion.students + EXCLUDED.students,
+                name     = COALESCE(stats_course_completion.name, EXCLUDED.name)
+        )
+        SELECT version FROM up
+    `;
+    return Number(rows[0].version);
+}
+
+/**
+ * Apply add/remove operations to a student's progress in one statement,
+ * only if the row is still at `expectedVersion`. Entries are matched by code
+ * so legacy string entries are removed too; re-adding a code replaces it.
+ * Returns the new version, or null when the row has moved on (conflict).
+ */
+export async function applyProgressDelta(
+    studentId: string,
+    major: string,
+    expectedVersion: number,
+    add: { code: string; name?: string }[],
+    remove: string[]
+): Promise<number | null> {
+    if (expectedVersion === 0) {
+        // First write for this major: make sure there is a row to CAS against
+        await sql`
+            INSERT INTO student_progress (student_id, major, completed, completed_jsonb, updated_at, version)
+            VALUES (${studentId}, ${major}, '[]', '[]'::jsonb, (EXTRACT(EPOCH FROM NOW())::bigint), 0)
+            ON CONFLICT (student_id, major) DO NOTHING
+        `;
+    }
+
+    const addJson = JSON.stringify(add);
+    const removeJson = JSON.stringify(remove);
+    const dropJson = JSON.stringify([...remove, ...add.map(a => a.code)]);
+    // If another save commits first, the version re-check in `up` fails and
+    // nothing (including the course rows) is written.
+    const { rows } = await sql`
+        WITH next AS (
+            SELECT (
+                SELECT COALESCE(jsonb_agg(e), '[]'::jsonb)
+                FROM jsonb_array_elements(COALESCE(sp.completed_jsonb, try_jsonb(sp.completed, '[]'))) AS e
+                WHERE completed_code(e) IS NULL
+                   OR completed_code(e) NOT IN (SELECT jsonb_array_elements_text(${dropJson}::jsonb))
+            ) || ${addJson}::jsonb AS doc
+            FROM student_progress sp
+            WHERE sp.student_id = ${studentId} AND sp.major = ${major} AND sp.version = ${expectedVersion}
+        ), up AS (
+            UPDATE student_progress SET
+                completed_jsonb = next.doc,
+                completed       = next.doc::text,
+                updated_at      = (EXTRACT(EPOCH FROM NOW())::bigint),
+                version         = version + 1
+            FROM next
+            WHERE student_id = ${studentId} AND major = ${major} AND version = ${expectedVersion}
+            RETURNING version
+        ), del AS (
+            DELETE FROM student_completed_course
+            WHERE student_id = ${studentId} AND major = ${major}
+              AND course_code IN (SELECT jsonb_array_elements_text(${removeJson}::jsonb))
+              AND EXISTS (SELECT 1 FROM up)
+            RETURNING course_code
+        ), ins AS (
+            INSERT INTO student_completed_course (student_id, major, course_code, name)
+            SELECT ${studentId}, ${major}, completed_code(e), e ->> 'name'
+            FROM jsonb_array_elements(${addJson}::jsonb) AS e
+            WHERE completed_code(e) IS NOT NULL AND EXISTS (SELECT 1 FROM up)
+            ON CONFLICT (student_id, major, course_code) DO UPDATE SET name = EXCLUDED.name
+            RETURNING course_code, name, (xmax = 0) AS inserted
+        ), counts AS (
+            -- +1 for newly completed courses, -1 for dropped ones
+            INSERT INTO stats_course_completion (course_code, name, students)
+            SELECT course_code, MAX(name), SUM(delta) FROM (
+                SELECT course_code, name, 1 AS delta FROM ins WHERE inserted
+                UNION ALL
+                SELECT course_code, NULL, -1 FROM del
+            ) AS changes
+            GROUP BY course_code
+            ON CONFLICT (course_code) DO UPDATE SET
+                students = stats_course_completion.students + EXCLUDED.students,
+                name     = COALESCE(stats_course_completion.name, EXCLUDED.name)
+        )
+        SELECT version FROM up
     `;
+    return rows.length > 0 ? Number(rows[0].version) : null;
 }
 
 /** Get a summary of all students */
 export async function getAllStudents(): Promise<{ student_id: string; major: string; count: number }[]> {
     const { rows } = await sql`
-        SELECT student_id, major, json_array_length(completed::json) as count
+        SELECT student_id, major, jsonb_array_length(COALESCE(completed_jsonb, try_jsonb(completed, '[]'))) as count
         FROM student_progress
         ORDER BY updated_at DESC
     `;
@@ -169,9 +307,7 @@ export async function getAllStudents(): Promise<{ student_id: string; major: str
 /** Load the major a student previously chose (null = first-time user) */
 export async function loadMajor(studentId: string): Promise<string | null> {
     try {
-        const { rows } = await sql`
-            SELECT major FROM student_profile WHERE student_id = ${studentId}
-        `;
+        const { rows } = await selectMajor(studentId);
         return rows[0]?.major ?? null;
     } catch {
         return null;
@@ -200,19 +336,71 @@ export interface DBUser {
     image: string | null;
 }
 
+// ── User cache ──────────────────────────────────────────────────────────
+// Rows by id, plus email / student_id → id indexes. A hit through an index is
+// checked against the row, so an index entry left behind by a change can't
+// return the wrong user. Writes below update the cache; the TTL bounds how
+// stale another server instance's copy can get.
+
+const USER_CACHE_TTL_MS = Number(process.env.USER_CACHE_TTL_MS) || 60_000;
+const usersById = new LRUCache<number, DBUser>(5000, USER_CACHE_TTL_MS);
+const userIdIndex = new LRUCache<string, number | null>(10_000, USER_CACHE_TTL_MS);
+
+export function getUserCacheStats() {
+    const hits = usersById.hits + userIdIndex.hits;
+    const misses = usersById.misses + userIdIndex.misses;
+    return { size: usersById.size, hits, misses, hitRate: hits + misses > 0 ? hits / (hits + misses) : 0 };
+}
+
+function cacheUser(user: DBUser): DBUser {
+    usersById.set(user.id, user);
+    if (user.email) userIdIndex.set(`email:${user.email}`, user.id);
+    if (user.student_id) userIdIndex.set(`sid:${user.student_id}`, user.id);
+    return user;
+}
+
+export function clearUserCache() {
+    usersById.clear();
+    userIdIndex.clear();
+}
+
+async function cachedUserBy(
+    key: string,
+    matches: (user: DBUser) => boolean,
+    load: () => Promise<DBUser | null>
+): Promise<DBUser | null> {
+    const id = userIdIndex.get(key);
+    if (id === null) return null;
+    if (id !== undefined) {
+        const user = usersById.get(id);
+        if (user && matches(user)) return user;
+    }
+    const user = await load();
+    if (user) return cacheUser(user);
+    // Remember misses too; createUser overwrites the entry
+    userIdIndex.set(key, null);
+    return null;
+}
+
 export async function getUserById(id: number): Promise<DBUser | null> {
+    const cached = usersById.get(id);
+    if (cached) return cached;
     const { rows } = await sql`SELECT * FROM users WHERE id = ${id}`;
-    return (rows[0] as DBUser) || null;
+    return rows[0] ? cacheUser(rows[0] as DBUser) : null;
 }
 
 export async function getUserByStudentId(studentId: string): Promise<DBUser | null> {
-    const { rows } = await sql`SELECT * FROM users WHERE student_id = ${studentId}`;
-    return (rows[0] as DBUser) || null;
+    return cachedUserBy(`sid:${studentId}`, u => u.student_id === studentId, async () => {
+        const { rows } = await sql`SELECT * FROM users WHERE student_id = ${studentId}`;
+        return (rows[0] as DBUser) || null;
+    });
 }
 
 export async function getUserByEmail(email: string): Promise<DBUser | null> {
-    const { rows } = await sql`SELECT * FROM users WHERE email = ${email}`;
-    return (rows[0] as DBUser) || null;
+    return cachedUserBy(`email:${email}`, u => u.email === email, async () => {
+        const { rows } = await sql`SELECT * FROM users WHERE email = ${email}`;
+        return (rows[0] as DBUser) || null;
+    });
 }
 
 export async function createUser(data: Partial<DBUser>): Promise<DBUser> {
@@ -252,7 +440,7 @@ export async function createUser(data: Partial<DBUser>): Promise<DBUser> {
 
         const { rows } = await query;
         console.log("DB: User created/updated successfully with ID:", rows[0].id);
-        return rows[0] as DBUser;
+        return cacheUser(rows[0] as DBUser);
     } catch (error) {
         console.error("DB Error in createUser:", error);
         throw error;
@@ -268,7 +456,8 @@ export async function linkAccount(userId: number, provider: string, providerAcco
 }
 
 export async function updateUserDetails(id: number, data: Partial<DBUser>) {
-    await sql`
+    usersById.delete(id);
+    const { rows } = await sql`
         UPDATE users 
         SET 
             student_id = COALESCE(${data.student_id}, student_id),
@@ -276,54 +465,22 @@ export async function updateUserDetails(id: number, data: Partial<DBUser>) {
             name = COALESCE(${data.name}, name),
             image = COALESCE(${data.image}, image)
         WHERE id = ${id}
+        RETURNING *
     `;
+    if (rows[0]) cacheUser(rows[0] as DBUser);
 }
 
 // ─── Planner Persistence ──────────────────────────────────────────────────
 
-export async function initPlannerTables() {
-    await sql`
-        CREATE TABLE IF NOT EXISTS planner_semesters (
-            id TEXT PRIMARY KEY,
-            student_id TEXT NOT NULL,
-            name TEXT NOT NULL DEFAULT 'Spring 2026',
-            courses TEXT NOT NULL DEFAULT '[]',
-            study_sessions TEXT NOT NULL DEFAULT '[]',
-            created_at TIMESTAMP DEFAULT NOW(),
-            updated_at TIMESTAMP DEFAULT NOW()
-        );
-    `;
-    await sql`
-        CREATE INDEX IF NOT EXISTS idx_planner_student ON planner_semesters (student_id);
-    `;
-    await sql`
-        CREATE TABLE IF NOT EXISTS integration_tokens (
-            id SERIAL PRIMARY KEY,
-            student_id TEXT NOT NULL,
-            provider TEXT NOT NULL,
-            access_token TEXT NOT NULL,
-            refresh_token TEXT,
-            expires_at BIGINT,
-            metadata TEXT DEFAULT '{}',
-            updated_at TIMESTAMP DEFAULT NOW(),
-            UNIQUE(student_id, provider)
-        );
-    `;
-}
-
 export async function loadPlanner(studentId: string) {
     try {
-        const { rows } = await sql`
-            SELECT * FROM planner_semesters
-            WHERE student_id = ${studentId}
-            ORDER BY updated_at DESC LIMIT 1
-        `;
+        const { rows } = await selectLatestSemester(studentId);
         if (rows.length === 0) return null;
         return {
             id: rows[0].id,
             name: rows[0].name,
-            courses: JSON.parse(rows[0].courses),
-            studySessions: JSON.parse(rows[0].study_sessions),
+            courses: parseJson(rows[0].courses, []),
+            studySessions: parseJson(rows[0].study_sessions, []),
         };
     } catch {
         return null;
@@ -337,11 +494,18 @@ export async function savePlanner(
     const coursesJson = JSON.stringify(data.courses);
     const sessionsJson = JSON.stringify(data.studySessions);
     await sql`
-        INSERT INTO planner_semesters (id, student_id, name, courses, study_sessions, updated_at)
-        VALUES (${data.id}, ${studentId}, ${data.name || 'Spring 2026'}, ${coursesJson}, ${sessionsJson}, NOW())
+        INSERT INTO planner_semesters (
+            id, student_id, name, courses, study_sessions, courses_jsonb, study_sessions_jsonb, updated_at
+        )
+        VALUES (
+            ${data.id}, ${studentId}, ${data.name || 'Spring 2026'}, ${coursesJson}, ${sessionsJson},
+            ${coursesJson}::jsonb, ${sessionsJson}::jsonb, NOW()
+        )
         ON CONFLICT (id) DO UPDATE SET
             courses = EXCLUDED.courses,
             study_sessions = EXCLUDED.study_sessions,
+            courses_jsonb = EXCLUDED.courses_jsonb,
+            study_sessions_jsonb = EXCLUDED.study_sessions_jsonb,
             name = EXCLUDED.name,
             updated_at = NOW()
     `;
@@ -359,31 +523,49 @@ export async function saveIntegrationToken(
     expiresAt?: number,
     metadata?: Record<string, any>
 ) {
+    const metadataJson = JSON.stringify(metadata || {});
     await sql`
-        INSERT INTO integration_tokens (student_id, provider, access_token, refresh_token, expires_at, metadata, updated_at)
-        VALUES (${studentId}, ${provider}, ${accessToken}, ${refreshToken || null}, ${expiresAt || null}, ${JSON.stringify(metadata || {})}, NOW())
+        INSERT INTO integration_tokens (student_id, provider, access_token, refresh_token, expires_at, metadata, metadata_jsonb, updated_at)
+        VALUES (${studentId}, ${provider}, ${accessToken}, ${refreshToken || null}, ${expiresAt || null}, ${metadataJson}, ${metadataJson}::jsonb, NOW())
         ON CONFLICT (student_id, provider) DO UPDATE SET
             access_token = EXCLUDED.access_token,
             refresh_token = COALESCE(EXCLUDED.refresh_token, integration_tokens.refresh_token),
             expires_at = EXCLUDED.expires_at,
             metadata = EXCLUDED.metadata,
+            metadata_jsonb = EXCLUDED.metadata_jsonb,
             updated_at = NOW()
     `;
 }
 
 export async function getIntegrationToken(studentId: string, provider: string) {
     const { rows } = await sql`
-        SELECT * FROM integration_tokens WHERE student_id = ${studentId} AND provider = ${provider}
+        SELECT
+            access_token,
+            refresh_token,
+            expires_at,
+            COALESCE(metadata_jsonb, try_jsonb(metadata, '{}')) AS metadata
+        FROM integration_tokens WHERE student_id = ${studentId} AND provider = ${provider}
     `;
     if (rows.length === 0) return null;
     return {
         accessToken: rows[0].access_token,
         refreshToken: rows[0].refresh_token,
         expiresAt: rows[0].expires_at ? Number(rows[0].expires_at) : null,
-        metadata: JSON.parse(rows[0].metadata || '{}'),
+        metadata: parseJson<Record<string, any>>(rows[0].metadata, {}),
     };
 }
 
+/** Shallow-merge `patch` into a token's metadata without touching the token itself */
+export async function updateIntegrationMetadata(studentId: string, provider: string, patch: Record<string, any>) {
+    await sql`
+        UPDATE integration_tokens SET
+            metadata_jsonb = COALESCE(metadata_jsonb, try_jsonb(metadata, '{}')) || ${JSON.stringify(patch)}::jsonb,
+            metadata = (COALESCE(metadata_jsonb, try_jsonb(metadata, '{}')) || ${JSON.stringify(patch)}::jsonb)::text,
+            updated_at = NOW()
+        WHERE student_id = ${studentId} AND provider = ${provider}
+    `;
+}
+
 export async function deleteIntegrationToken(studentId: string, provider: string) {
     await sql`DELETE FROM integration_tokens WHERE student_id = ${studentId} AND provider = ${provider}`;
 }
@@ -391,15 +573,21 @@ export async function deleteIntegrationToken(studentId: string, provider: string
 export async function loadAllSemesters(studentId: string) {
     try {
         const { rows } = await sql`
-            SELECT * FROM planner_semesters
+            SELECT
+                id,
+                name,
+                COALESCE(courses_jsonb, try_jsonb(courses, '[]')) AS courses,
+                COALESCE(study_sessions_jsonb, try_jsonb(study_sessions, '[]')) AS study_sessions,
+                updated_at
+            FROM planner_semesters
             WHERE student_id = ${studentId}
             ORDER BY updated_at DESC
         `;
         return rows.map(r => ({
             id: r.id,
             name: r.name,
-            courses: JSON.parse(r.courses),
-            studySessions: JSON.parse(r.study_sessions),
+            courses: parseJson(r.courses, []),
+            studySessions: parseJson(r.study_sessions, []),
             updatedAt: r.updated_at
         }));
     } catch {
@@ -0,0 +1,169 @@
+import './local-postgres';
+import { createPool, type VercelPool, type VercelPoolClient, type QueryResult, type QueryResultRow } from '@vercel/postgres';
+import { queryStats, recordQuery } from './metrics';
+
+/**
+ * Data-access layer shared by lib/database.ts, lib/stats.ts, lib/planner.ts,
+ * lib/visitor-log.ts and lib/migrations.ts.
+ *
+ *   - one connection pool per process, sized by POSTGRES_POOL_MAX (default 10);
+ *     works against a plain local Postgres through POSTGRES_WS_PROXY
+ *   - `sql`           drop-in for the @vercel/postgres tag, timed
+ *   - `prepared`      a named statement, parsed once per pooled connection
+ *   - `transaction`   BEGIN/COMMIT on one client, ROLLBACK on throw
+ *   - `parallel`      independent queries, each on its own pooled connection
+ *   - `batch`         parameterless statements sent as one multi-statement
+ *                     round trip
+ *
+ * Every query is recorded once, through lib/metrics.ts, under a label (the
+ * statement name, or the verb and table of an ad-hoc query): into a
+ * per-label histogram and the request's `db` Server-Timing segment.
+ * getQueryStats() reads counts, errors and latency per label back from those
+ * histograms for /api/health (admin callers only).
+ */
+
+const POOL_MAX = Number(process.env.POSTGRES_POOL_MAX) || 10;
+const IDLE_TIMEOUT_MS = Number(process.env.POSTGRES_IDLE_TIMEOUT_MS) || 30_000;
+const CONNECT_TIMEOUT_MS = Number(process.env.POSTGRES_CONNECT_TIMEOUT_MS) || 10_000;
+
+let pool: VercelPool | null = null;
+
+/** Created on first use, so importing this module never needs POSTGRES_URL */
+export function getPool(): VercelPool {
+    if (!pool) {
+        pool = createPool({
+            connectionString: process.env.POSTGRES_URL,
+            max: POOL_MAX,
+            idleTimeoutMillis: IDLE_TIMEOUT_MS,
+            connectionTimeoutMillis: CONNECT_TIMEOUT_MS,
+        });
+        pool.on('error', e => console.error("Postgres pool error:", e));
+    }
+    return pool;
+}
+
+/** A dedicated client; the caller must release() it */
+export function connect(): Promise<VercelPoolClient> {
+    return getPool().connect();
+}
+
+// ── Timing ──────────────────────────────────────────────────────────
+
+async function timed<T>(label: string, run: () => Promise<T>): Promise<T> {
+    const started = performance.now();
+    let failed = false;
+    try {
+        return await run();
+    } catch (e) {
+        failed = true;
+        throw e;
+    } finally {
+        recordQuery(label, performance.now() - started, failed);
+    }
+}
+
+/** Pool usage, and per-label query stats from lib/metrics.ts' query histograms */
+export function getQueryStats() {
+    return {
+        pool: pool
+            ? { max: POOL_MAX, total: pool.totalCount, idle: pool.idleCount, waiting: pool.waitingCount }
+            : { max: POOL_MAX, total: 0, idle: 0, waiting: 0 },
+        queries: queryStats(),
+    };
+}
+
+export { resetQueryStats } from './metrics';
+
+/** "SELECT student_progress", "INSERT users", "WITH student_progress" … */
+function labelFor(text: string): string {
+    const verb = text.trimStart().split(/\s/, 1)[0].toUpperCase();
+    const table = text.match(/\b(?:FROM|INTO|UPDATE|TABLE(?: IF (?:NOT )?EXISTS)?)\s+([a-z_][a-z0-9_]*)/i)?.[1];
+    return table ? `${verb} ${table}` : verb;
+}
+
+// ── Queries ─────────────────────────────────────────────────────────
+
+type Primitive = string | number | boolean | null | undefined | Date | unknown[];
+
+interface Queryable {
+    query<R extends QueryResultRow>(config: { text: string; values?: unknown[]; name?: string }): Promise<QueryResult<R>>;
+}
+
+function toQuery(strings: TemplateStringsArray, values: Primitive[]): { text: string; values: Primitive[] } {
+    let text = strings[0];
+    for (let i = 1; i < strings.length; i++) text += `$${i}${strings[i]}`;
+    return { text, values };
+}
+
+function tag(target: () => Queryable) {
+    return <R extends QueryResultRow = any>(strings: TemplateStringsArray, ...values: Primitive[]): Promise<QueryResult<R>> => {
+        const query = toQuery(strings, values);
+        return timed(labelFor(query.text), () => target().query<R>(query));
+    };
+}
+
+/** Same call shape as the @vercel/postgres `sql` tag; values are always bound parameters */
+export const sql = tag(getPool);
+
+export interface Statement<R extends QueryResultRow> {
+    (...values: Primitive[]): Promise<QueryResult<R>>;
+    readonly name: string;
+}
+
+/**
+ * A named prepared statement. Postgres parses and plans it once per pooled
+ * connection; later executions only send the name and the parameters.
+ */
+export function prepared<R extends QueryResultRow = any>(name: string, text: string): Statement<R> {
+    const run = (...values: Primitive[]) => timed(name, () => getPool().query<R>({ name, text, values }));
+    return Object.defineProperty(run, 'name', { value: name }) as Statement<R>;
+}
+
+export interface Transaction {
+    sql: ReturnType<typeof tag>;
+    client: VercelPoolClient;
+}
+
+/** Run `fn` inside BEGIN/COMMIT on one client; any throw rolls back */
+export async function transaction<T>(label: string, fn: (tx: Transaction) => Promise<T>): Promise<T> {
+    const client = await connect();
+    try {
+        return await timed(`tx ${label}`, async () => {
+            await client.query('BEGIN');
+            try {
+                const result = await fn({ sql: tag(() => client), client });
+                await client.query('COMMIT');
+                return result;
+            } catch (e) {
+                await client.query('ROLLBACK').catch(() => { });
+                throw e;
+            }
+        });
+    } finally {
+        client.release();
+    }
+}
+
+/**
+ * Start independent queries together. Each takes its own pooled connection,
+ * so this is bounded by POSTGRES_POOL_MAX rather than fired serially.
+ */
+export function parallel<T extends readonly unknown[]>(queries: { readonly [K in keyof T]: () => Promise<T[K]> }): Promise<T> {
+    return Promise.all(queries.map(q => q())) as Promise<any>;
+}
+
+/**
+ * Send parameterless statements as one simple-protocol round trip on one
+ * connection. Postgres runs them in an implicit transaction; results come
+ * back in order.
+ */
+export async function batch(label: string, statements: string[]): Promise<QueryResult<any>[]> {
+    const client = await connect();
+    try {
+        const result = await timed(`batch ${label}`, () => client.query(statements.join(';\n')));
+        // A single statement yields one result rather than an array
+        return Array.isArray(result) ? result : [result];
+    } finally {
+        client.release();
+    }
+}
@@ -0,0 +1,213 @@
+import { createHash } from 'crypto';
+import { LRUCache } from './lru-cache';
+import { fetchWithRetry, mapWithConcurrency, RateLimiter } from './rate-limited-fetch';
+
+/**
+ * Planner exam dates → Google Calendar events.
+ *
+ * Each (course, exam type) gets a deterministic event id derived from the
+ * student and course key, and { eventId, hash, course } is kept in the
+ * token's integration metadata. A re-export leaves unchanged events alone,
+ * updates changed ones and deletes events whose date was cleared or whose
+ * course was removed. Because the ids are deterministic, an insert that hits an
+ * existing event (409) turns into an update, so a lost metadata map still
+ * can't produce duplicates.
+ *
+ * Requests run on a small worker pool behind a per-token limiter with
+ * retry/backoff. GOOGLE_CALENDAR_API_URL / GOOGLE_OAUTH_TOKEN_URL point at
+ * another server (e.g. scripts/gcal-stub.mjs) for offline testing.
+ */
+
+export const GOOGLE_CALENDAR_API_URL = (process.env.GOOGLE_CALENDAR_API_URL || 'https://www.googleapis.com/calendar/v3').replace(/\/$/, '');
+export const GOOGLE_OAUTH_TOKEN_URL = process.env.GOOGLE_OAUTH_TOKEN_URL || 'https://oauth2.googleapis.com/token';
+const REQUESTS_PER_SECOND = Number(process.env.GOOGLE_CALENDAR_RATE_LIMIT) || 10;
+const CONCURRENCY = 4;
+const TIME_ZONE = 'Asia/Amman';
+
+const EXAMS = [["midtermDate", "Midterm"], ["finalDate", "Final"]] as const;
+
+export interface ExamEvent {
+    eventId: string;
+    hash: string;
+    /** Course name, so a later delete reports it like an upsert does */
+    course?: string;
+}
+
+export interface CalendarExportResult {
+    course: string;
+    type: string;
+    success: boolean;
+    action?: 'created' | 'updated' | 'unchanged' | 'deleted';
+    error?: string;
+}
+
+export interface CalendarExport {
+    results: CalendarExportResult[];
+    /** Merge into the token metadata */
+    metadata: { examEvents: Record<string, ExamEvent> };
+}
+
+const limiters = new LRUCache<string, RateLimiter>(1000);
+
+/** Google event ids use base32hex (0-9a-v); hex digits are a subset */
+function eventIdFor(studentId: string, key: string): string {
+    return `htu${createHash('sha1').update(`${studentId}|${key}`).digest('hex')}`;
+}
+
+const EXAM_DURATION_MS = 2 * 3600_000;
+
+/**
+ * Wall-clock end of an exam starting at `date`. A naive local time (what the
+ * planner's date inputs produce) stays naive, so Google reads both ends in
+ * TIME_ZONE; doing the sum in UTC keeps the server's own zone out of it.
+ */
+function examEnd(date: string): string {
+    const naive = date.match(/^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2})(:\d{2})?$/);
+    if (!naive) return new Date(new Date(date).getTime() + EXAM_DURATION_MS).toISOString();
+    const end = new Date(Date.parse(`${naive[1]}${naive[2] ?? ':00'}Z`) + EXAM_DURATION_MS);
+    return end.toISOString().slice(0, 19);
+}
+
+/** All-day events end on the following day (exclusive); timed ones last two hours */
+function eventTimes(date: string) {
+    if (date.includes('T')) {
+        return { start: { dateTime: date, timeZone: TIME_ZONE }, end: { dateTime: examEnd(date), timeZone: TIME_ZONE } };
+    }
+    const next = new Date(`${date}T00:00:00Z`);
+    next.setUTCDate(next.getUTCDate() + 1);
+    return { start: { date, timeZone: TIME_ZONE }, end: { date: next.toISOString().slice(0, 10), timeZone: TIME_ZONE } };
+}
+
+interface PlannedEvent {
+    key: string;
+    course: string;
+    type: string;
+    body: Record<string, any>;
+    hash: string;
+}
+
+function plannedEvents(courses: any[]): PlannedEvent[] {
+    const events: PlannedEvent[] = [];
+    const seen = new Set<string>();
+    for (const course of courses) {
+        for (const [field, type] of EXAMS) {
+            const date = course[field];
+            if (!date) continue;
+            const key = `${course.code || course.id || course.name}:${type}`;
+            if (seen.has(key)) continue;
+            seen.add(key);
+
+            const body = {
+                summary: `${course.name} — ${type}`,
+                description: `${type} exam for ${course.name} (${course.credits} CH)`,
+                ...eventTimes(date),
+                reminders: {
+                    useDefault: false,
+                    overrides: [
+                        { method: "popup", minutes: 1440 }, // 1 day before
+                        { method: "popup", minutes: 60 },   // 1 hour before
+                    ]
+                }
+            };
+            events.push({
+                key,
+                course: course.name,
+                type,
+                body,
+                hash: createHash('sha1').update(JSON.stringify(body)).digest('hex').slice(0, 16),
+            });
+        }
+    }
+    return events;
+}
+
+export async function exportExamsToCalendar(
+    studentId: string,
+    accessToken: string,
+    metadata: Record<string, any>,
+    courses: any[]
+): Promise<CalendarExport> {
+    const limiter = limiters.getOrSet(accessToken, () => new RateLimiter(REQUESTS_PER_SECOND));
+    const eventsUrl = `${GOOGLE_CALENDAR_API_URL}/calendars/primary/events`;
+    const request = async (method: string, url: string, body?: unknown) => {
+        const res = await fetchWithRetry(url, {
+            method,
+            headers: { Authorization: `Bearer ${accessToken}`, "Content-Type": "application/json" },
+            body: body === undefined ? undefined : JSON.stringify(body),
+        }, { limiter });
+        return { ok: res.ok, status: res.status, text: res.ok ? '' : await res.text() };
+    };
+
+    const known: Record<string, ExamEvent> = metadata.examEvents || {};
+    const next: Record<string, ExamEvent> = {};
+    const planned = plannedEvents(courses);
+    const keep = new Set(planned.map(e => e.key));
+    const removed = Object.keys(known).filter(key => !keep.has(key));
+
+    const upsert = async (event: PlannedEvent): Promise<CalendarExportResult> => {
+        const existing = known[event.key];
+        const base = { course: event.course, type: event.type };
+        if (existing?.hash === event.hash) {
+            next[event.key] = { ...existing, course: event.course };
+            return { ...base, success: true, action: 'unchanged' };
+        }
+
+        const eventId = existing?.eventId ?? eventIdFor(studentId, event.key);
+        // `status` brings back an event the user deleted (Google keeps it as cancelled)
+        const body = { ...event.body, status: 'confirmed' };
+        let res = existing ? await request('PUT', `${eventsUrl}/${eventId}`, body) : await request('POST', eventsUrl, { ...body, id: eventId });
+        let action: CalendarExportResult['action'] = existing ? 'updated' : 'created';
+
+        if (!existing && res.status === 409) {
+            res = await request('PUT', `${eventsUrl}/${eventId}`, body);
+            action = 'updated';
+        } else if (existing && (res.status === 404 || res.status === 410)) {
+            res = await request('POST', eventsUrl, { ...body, id: eventId });
+            action = 'created';
+        }
+
+        if (!res.ok) {
+            if (existing) next[event.key] = existing;
+            return { ...base, success: false, error: res.text };
+        }
+        next[event.key] = { eventId, hash: event.hash, course: event.course };
+        return { ...base, success: true, action };
+    };
+
+    // Entries written before `course` was stored fall back to the course key
+    const removedResult = (key: string) => ({
+        course: known[key].course ?? key.slice(0, key.lastIndexOf(':')),
+        type: key.slice(key.lastIndexOf(':') + 1),
+    });
+
+    const remove = async (key: string): Promise<CalendarExportResult> => {
+        const base = removedResult(key);
+        const res = await request('DELETE', `${eventsUrl}/${known[key].eventId}`);
+        if (!res.ok && res.status !== 404 && res.status !== 410) {
+            // Keep it so the next export tries again
+            next[key] = known[key];
+            return { ...base, success: false, error: res.text };
+        }
+        return { ...base, success: true, action: 'deleted' };
+    };
+
+    const settled = await mapWithConcurrency<PlannedEvent | string, CalendarExportResult>(
+        [...planned, ...removed],
+        CONCURRENCY,
+        item => typeof item === 'string' ? remove(item) : upsert(item)
+    );
+
+    const results = settled.map((r, i) => {
+        if (r.status === 'fulfilled') return r.value;
+        const item = i < planned.length ? planned[i] : null;
+        const key = item ? item.key : removed[i - planned.length];
+        if (known[key]) next[key] = known[key];
+        return {
+            ...(item ? { course: item.course, type: item.type } : removedResult(key)),
+            success: false,
+            error: r.reason instanceof Error ? r.reason.message : String(r.reason),
+        };
+    });
+
+    return { results, metadata: { examEvents: next } };
+}
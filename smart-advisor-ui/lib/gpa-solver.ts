@@ -0,0 +1,323 @@
+import {
+    calculateGPA, CUMULATIVE_CLASSIFICATIONS, GRADE_MAP, HTUGrade, SCORED_GRADES,
+} from './grading';
+
+/**
+ * Target-GPA "what-if" solver: given every graded and ungraded course across
+ * all semesters and a target cumulative GPA, find the least-effort grades for
+ * the ungraded courses that reach it, and how likely the target is.
+ *
+ * Every scored grade is a multiple of 0.8 points (D 5, M 4, P 3, U 0 units),
+ * so a transcript's quality points are an integer number of units and the
+ * target, under calculateGPA's rounding, is an integer number of units too.
+ *
+ *   - Effort is counted in credit-hour steps above Pass (M = 1, D = 2 per CH).
+ *     Courses with the same credit hours are interchangeable, so a DP over
+ *     credit-hour groups × extra units finds the least effort that reaches
+ *     the target, then two tie-breaks of it: `spread` (fewest Distinction
+ *     credits) and `focused` (fewest courses above Pass).
+ *   - The chance of reaching the target assumes each remaining course's grade
+ *     is drawn independently from `distribution` (by default the student's
+ *     credit-weighted history plus a light prior); a DP over courses × units
+ *     gives the whole outcome distribution, hence also the GPA band.
+ *
+ * Both DPs are O(courses × credit hours), so a full 166-CH transcript solves
+ * in well under a millisecond where enumerating the 4^n D/M/P/U combinations
+ * would not finish (benchmarks/gpa_solver.py).
+ */
+
+export interface WhatIfCourse {
+    id?: string;
+    name?: string;
+    /** Whole credit hours */
+    credits: number;
+    /** D/M/P/U counts as graded; empty is still to be taken; TC/X/WF are left out */
+    grade?: string | null;
+}
+
+export type GradeDistribution = Record<'D' | 'M' | 'P' | 'U', number>;
+type PassingGrade = 'D' | 'M' | 'P';
+
+export interface WhatIfAssignment {
+    strategy: 'spread' | 'focused';
+    gpa: number;
+    distinctions: number;
+    merits: number;
+    grades: { id?: string; name?: string; credits: number; grade: PassingGrade }[];
+}
+
+export interface ClassificationOutlook {
+    short: string;
+    label: string;
+    min: number;
+    reachable: boolean;
+    minimumEffort: number | null;
+    probability: number;
+}
+
+export interface WhatIfResult {
+    target: number;
+    currentGPA: number;
+    gradedCredits: number;
+    remainingCredits: number;
+    /** Some assignment of passing grades reaches the target */
+    reachable: boolean;
+    /** CH-steps above Pass of the cheapest such assignment; null when unreachable */
+    minimumEffort: number | null;
+    assignments: WhatIfAssignment[];
+    /** Chance of ending at or above the target under `distribution` */
+    probability: number;
+    /** 10th / 50th / 90th percentile of the final GPA under `distribution` */
+    band: { low: number; median: number; high: number };
+    distribution: GradeDistribution;
+    classifications: ClassificationOutlook[];
+}
+
+/** Points per unit; every entry of SCORED_GRADES is a multiple of it */
+const POINT_UNIT = 0.8;
+const UNITS = Object.fromEntries(
+    SCORED_GRADES.map(g => [g, Math.round(GRADE_MAP[g].points / POINT_UNIT)])
+) as Record<'D' | 'M' | 'P' | 'U', number>;
+const PASS = UNITS.P;
+const MAX_STEPS = UNITS.D - UNITS.P;
+
+/** Pseudo-credits added to the history: one course each of D, M and P, a third of one U */
+const PRIOR_CREDITS: GradeDistribution = { D: 3, M: 3, P: 3, U: 1 };
+
+/** Fewest units over `credits` CH whose GPA, rounded like calculateGPA, is at least `target` */
+function requiredUnits(target: number, credits: number): number {
+    // round(units·80 / CH) ≥ T  ⇔  160·units ≥ (2T − 1)·CH
+    const t = Math.round(target * 100);
+    return Math.max(0, Math.ceil(((2 * t - 1) * credits) / 160));
+}
+
+function unitsToGPA(units: number, credits: number): number {
+    return credits === 0 ? 0 : Math.round((units * 100 * POINT_UNIT) / credits) / 100;
+}
+
+export function historyDistribution(graded: { credits: number; grade: string }[]): GradeDistribution {
+    const weights = { ...PRIOR_CREDITS };
+    for (const c of graded) weights[c.grade as keyof GradeDistribution] += c.credits;
+    return normalizeDistribution(weights);
+}
+
+export function normalizeDistribution(d: GradeDistribution): GradeDistribution {
+    const total = d.D + d.M + d.P + d.U;
+    return { D: d.D / total, M: d.M / total, P: d.P / total, U: d.U / total };
+}
+
+// ── Least effort ────────────────────────────────────────────────────────
+
+interface CreditGroup {
+    credits: number;
+    /** Indices into the remaining courses */
+    courses: number[];
+}
+
+type Strategy = WhatIfAssignment['strategy'];
+
+/**
+ * For `k` extra units of `credits` each over `n` same-CH courses, the
+ * (distinctions, merits) split each strategy prefers.
+ */
+function split(strategy: Strategy, k: number, n: number): [number, number] {
+    const d = strategy === 'spread' ? Math.max(0, k - n) : Math.floor(k / 2);
+    return [d, k - 2 * d];
+}
+
+function splitCost(strategy: Strategy, credits: number, d: number, m: number): number {
+    return strategy === 'spread' ? credits * d : d + m;
+}
+
+/**
+ * best[g][e]: least tie-break cost for groups g.. to add exactly e extra
+ * CH-steps (Infinity when impossible). Row G is the empty suffix.
+ */
+function effortTable(groups: CreditGroup[], maxExtra: number, strategy: Strategy): Float64Array[] {
+    const best: Float64Array[] = new Array(groups.length + 1);
+    best[groups.length] = new Float64Array(maxExtra + 1).fill(Infinity);
+    best[groups.length][0] = 0;
+    for (let g = groups.length - 1; g >= 0; g--) {
+        const { credits, courses } = groups[g];
+        const n = courses.length;
+        const next = best[g + 1];
+        const row = new Float64Array(maxExtra + 1).fill(Infinity);
+        for (let k = 0; k <= MAX_STEPS * n; k++) {
+            const step = k * credits;
+            const [d, m] = split(strategy, k, n);
+            const cost = splitCost(strategy, credits, d, m);
+            for (let e = step; e <= maxExtra; e++) {
+                const c = next[e - step] + cost;
+                if (c < row[e]) row[e] = c;
+            }
+        }
+        best[g] = row;
+    }
+    return best;
+}
+
+/** Smallest reachable extra at or above `need`, or -1 */
+function leastExtra(reach: Float64Array, need: number): number {
+    for (let e = Math.max(0, need); e < reach.length; e++) if (reach[e] !== Infinity) return e;
+    return -1;
+}
+
+function assign(
+    groups: CreditGroup[], best: Float64Array[], extra: number, strategy: Strategy, remaining: WhatIfCourse[]
+): { grades: PassingGrade[]; distinctions: number; merits: number } {
+    const grades: PassingGrade[] = new Array(remaining.length).fill('P');
+    let distinctions = 0, merits = 0;
+    let e = extra;
+    for (let g = 0; g < groups.length; g++) {
+        const { credits, courses } = groups[g];
+        const n = courses.length;
+        for (let k = 0; k <= MAX_STEPS * n; k++) {
+            const step = k * credits;
+            if (step > e) break;
+            const [d, m] = split(strategy, k, n);
+            if (best[g + 1][e - step] + splitCost(strategy, credits, d, m) === best[g][e]) {
+                // Same-CH courses are interchangeable: the first d get D, the next m get M
+                for (let i = 0; i < d; i++) grades[courses[i]] = 'D';
+                for (let i = d; i < d + m; i++) grades[courses[i]] = 'M';
+                distinctions += d;
+                merits += m;
+                e -= step;
+                break;
+            }
+        }
+    }
+    return { grades, distinctions, merits };
+}
+
+// ── Outcome distribution ────────────────────────────────────────────────
+
+/** dist[u]: probability the remaining courses earn exactly u units */
+function outcomeDistribution(remaining: WhatIfCourse[], p: GradeDistribution): Float64Array {
+    const maxUnits = remaining.reduce((s, c) => s + c.credits, 0) * UNITS.D;
+    let dist = new Float64Array(maxUnits + 1);
+    let next = new Float64Array(maxUnits + 1);
+    dist[0] = 1;
+    let top = 0;
+    const outcomes = SCORED_GRADES.map(g => [UNITS[g as keyof GradeDistribution], p[g as keyof GradeDistribution]] as const)
+        .filter(([, prob]) => prob > 0);
+    for (const c of remaining) {
+        next.fill(0, 0, top + c.credits * UNITS.D + 1);
+        for (let u = 0; u <= top; u++) {
+            const q = dist[u];
+            if (q === 0) continue;
+            for (const [units, prob] of outcomes) next[u + units * c.credits] += q * prob;
+        }
+        top += c.credits * UNITS.D;
+        [dist, next] = [next, dist];
+    }
+    return dist;
+}
+
+function tailProbability(dist: Float64Array, from: number): number {
+    let p = 0;
+    for (let u = Math.max(0, from); u < dist.length; u++) p += dist[u];
+    // Summing a few hundred floats leaves noise in the last digits
+    return Math.min(1, Math.round(p * 1e6) / 1e6);
+}
+
+function quantile(dist: Float64Array, q: number): number {
+    let cdf = 0;
+    for (let u = 0; u < dist.length; u++) {
+        cdf += dist[u];
+        if (cdf >= q - 1e-12) return u;
+    }
+    return dist.length - 1;
+}
+
+// ── Solver ──────────────────────────────────────────────────────────────
+
+export function solveTargetGPA(
+    courses: WhatIfCourse[], target: number, distribution?: GradeDistribution
+): WhatIfResult {
+    const graded: { credits: number; grade: HTUGrade }[] = [];
+    const remaining: WhatIfCourse[] = [];
+    for (const c of courses) {
+        if (!c.grade) remaining.push(c);
+        else if (SCORED_GRADES.includes(c.grade as HTUGrade)) graded.push({ credits: c.credits, grade: c.grade as HTUGrade });
+    }
+
+    const gradedCredits = graded.reduce((s, c) => s + c.credits, 0);
+    const gradedUnits = graded.reduce((s, c) => s + c.credits * UNITS[c.grade as keyof GradeDistribution], 0);
+    const remainingCredits = remaining.reduce((s, c) => s + c.credits, 0);
+    const totalCredits = gradedCredits + remainingCredits;
+    const p = distribution ? normalizeDistribution(distribution) : historyDistribution(graded);
+
+    // Extra CH-steps above an all-Pass finish needed for a target
+    const needExtra = (t: number) => requiredUnits(t, totalCredits) - gradedUnits - PASS * remainingCredits;
+
+    const byCredits = new Map<number, number[]>();
+    remaining.forEach((c, i) => {
+        const list = byCredits.get(c.credits);
+        if (list) list.push(i);
+        else byCredits.set(c.credits, [i]);
+    });
+    const groups = [...byCredits].map(([credits, idx]) => ({ credits, courses: idx }));
+    const maxExtra = MAX_STEPS * remainingCredits;
+    const tables = {
+        spread: effortTable(groups, maxExtra, 'spread'),
+        focused: effortTable(groups, maxExtra, 'focused'),
+    };
+    // Both tables are finite at exactly the same extras
+    const reach = tables.spread[0];
+
+    const dist = outcomeDistribution(remaining, p);
+    const passUnits = gradedUnits + PASS * remainingCredits;
+    const chance = (t: number) => tailProbability(dist, requiredUnits(t, totalCredits) - gradedUnits);
+
+    const extra = leastExtra(reach, needExtra(target));
+    const assignments: WhatIfAssignment[] = [];
+    if (extra >= 0) {
+        for (const strategy of ['spread', 'focused'] as const) {
+            const { grades, distinctions, merits } = assign(groups, tables[strategy], extra, strategy, remaining);
+            if (assignments.some(a => a.grades.every((g, i) => g.grade === grades[i]))) continue;
+            assignments.push({
+                strategy,
+                gpa: unitsToGPA(passUnits + extra, totalCredits),
+                distinctions,
+                merits,
+                grades: remaining.map((c, i) => ({ id: c.id, name: c.name, credits: c.credits, grade: grades[i] })),
+            });
+        }
+    }
+
+    return {
+        target,
+        currentGPA: calculateGPA(graded),
+        gradedCredits,
+        remainingCredits,
+        reachable: extra >= 0,
+        minimumEffort: extra >= 0 ? extra : null,
+        assignments,
+        probability: chance(target),
+        band: {
+            low: unitsToGPA(gradedUnits + quantile(dist, 0.1), totalCredits),
+            median: unitsToGPA(gradedUnits + quantile(dist, 0.5), totalCredits),
+            high: unitsToGPA(gradedUnits + quantile(dist, 0.9), totalCredits),
+        },
+        distribution: p,
+        classifications: CUMULATIVE_CLASSIFICATIONS.map(c => {
+            const e = leastExtra(reach, needExtra(c.min));
+            return {
+                short: c.short,
+                label: c.label,
+                min: c.min,
+                reachable: e >= 0,
+                minimumEffort: e >= 0 ? e : null,
+                probability: chance(c.min),
+            };
+        }),
+    };
+}
+
+/** A classification's short name ("VG") or a number, as a target GPA */
+export function resolveTarget(target: unknown): number | null {
+    if (typeof target === 'number') return Number.isFinite(target) && target >= 0 && target <= 4 ? target : null;
+    if (typeof target !== 'string') return null;
+    const cls = CUMULATIVE_CLASSIFICATIONS.find(c => c.short.toLowerCase() === target.toLowerCase());
+    return cls ? cls.min : null;
+}
@@ -1,5 +1,7 @@
 // HTU Al Hussein Technical University — Grading System
 
+import { StudyIndex, type IndexedSession } from "./study-index";
+
 export type HTUGrade = "D" | "M" | "P" | "U" | "WF" | "TC" | "X";
 
 export interface GradeInfo {
@@ -64,9 +66,10 @@ export function generateInsights(
         grade?: string | null; hasMidterm: boolean;
         midtermDate?: string; finalDate?: string; status: string;
     }[],
-    studySessions: { courseId: string; date: string; hours: number }[]
+    studySessions: StudyIndex | IndexedSession[]
 ): Insight[] {
     const insights: Insight[] = [];
+    const sessions = studySessions instanceof StudyIndex ? studySessions : StudyIndex.from(studySessions);
     const now = new Date();
 
     // 1. At-risk courses
@@ -105,12 +108,9 @@ export function generateInsights(
     });
 
     // 4. No study logged this week
-    const weekAgo = new Date(now.getTime() - 7 * 86400000);
+    const weekAgo = now.getTime() - 7 * 86400000;
     courses.filter(c => c.status !== "Completed").forEach(c => {
-        const recent = studySessions.filter(
-            s => s.courseId === c.id && new Date(s.date) >= weekAgo
-        );
-        if (recent.length === 0) {
+        if (sessions.lastStudied(c.id) < weekAgo) {
             insights.push({
                 type: "tip",
                 title: `No study for ${c.name}`,
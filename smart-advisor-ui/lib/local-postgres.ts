@@ -0,0 +1,17 @@
+import { neonConfig } from '@neondatabase/serverless';
+
+/**
+ * Point @vercel/postgres at a plain local Postgres (benchmarks, offline dev).
+ *
+ * The Neon driver speaks WebSockets, so a local server needs the Neon wsproxy
+ * in front of it. Set POSTGRES_WS_PROXY to the proxy's host:port, e.g.
+ * `localhost:5433`; when unset this module does nothing.
+ */
+const wsProxy = process.env.POSTGRES_WS_PROXY;
+
+if (wsProxy) {
+    neonConfig.wsProxy = () => `${wsProxy}/v1`;
+    neonConfig.useSecureWebSocket = false;
+    neonConfig.pipelineTLS = false;
+    neonConfig.pipelineConnect = false;
+}
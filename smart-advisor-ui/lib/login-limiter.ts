@@ -0,0 +1,73 @@
+import { LRUCache } from './lru-cache';
+
+/**
+ * Login attempt limits, kept in process memory.
+ *
+ *   - per student ID: MAX_FAILURES wrong passwords per FAILURE_WINDOW_MS,
+ *     cleared by a successful login
+ *   - per client IP:  IP_LIMIT attempts (right or wrong) per minute; generous,
+ *     since a whole campus can sit behind one NAT address. The IP comes from
+ *     clientIp() (lib/client-info.ts): the X-Forwarded-For hop appended by our
+ *     own proxy, never the client-supplied leftmost entry. This assumes the
+ *     app is only reachable through TRUSTED_PROXY_HOPS proxies.
+ *
+ * Both are checked before any bcrypt work is queued, so a flood of guesses
+ * costs a map lookup rather than a hash.
+ */
+
+const MAX_FAILURES = Number(process.env.LOGIN_MAX_FAILURES) || 10;
+const FAILURE_WINDOW_MS = 15 * 60_000;
+const IP_LIMIT = Number(process.env.LOGIN_IP_LIMIT) || 120;
+const IP_WINDOW_MS = 60_000;
+
+interface Window {
+    count: number;
+    resetAt: number;
+}
+
+const failuresByStudent = new LRUCache<string, Window>(50_000, FAILURE_WINDOW_MS);
+const attemptsByIp = new LRUCache<string, Window>(10_000, IP_WINDOW_MS);
+
+let blocked = 0;
+
+function bump(cache: LRUCache<string, Window>, key: string, windowMs: number): Window {
+    const now = Date.now();
+    let entry = cache.get(key);
+    if (!entry || entry.resetAt <= now) {
+        entry = { count: 0, resetAt: now + windowMs };
+        cache.set(key, entry);
+    }
+    entry.count++;
+    return entry;
+}
+
+const secondsUntil = (at: number) => Math.max(1, Math.ceil((at - Date.now()) / 1000));
+
+export type LoginCheck = { allowed: true } | { allowed: false; retryAfter: number; reason: string };
+
+/** Count an attempt against the IP and report whether it may go ahead */
+export function checkLoginAttempt(studentId: string, ip: string): LoginCheck {
+    const failures = failuresByStudent.get(studentId);
+    if (failures && failures.count >= MAX_FAILURES && failures.resetAt > Date.now()) {
+        blocked++;
+        return { allowed: false, retryAfter: secondsUntil(failures.resetAt), reason: 'Too many failed attempts for this ID' };
+    }
+    const byIp = bump(attemptsByIp, ip, IP_WINDOW_MS);
+    if (byIp.count > IP_LIMIT) {
+        blocked++;
+        return { allowed: false, retryAfter: secondsUntil(byIp.resetAt), reason: 'Too many login attempts' };
+    }
+    return { allowed: true };
+}
+
+export function recordLoginFailure(studentId: string): void {
+    bump(failuresByStudent, studentId, FAILURE_WINDOW_MS);
+}
+
+export function recordLoginSuccess(studentId: string): void {
+    failuresByStudent.delete(studentId);
+}
+
+export function getLoginLimiterStats() {
+    return { trackedIds: failuresByStudent.size, trackedIps: attemptsByIp.size, blocked, maxFailures: MAX_FAILURES, ipLimit: IP_LIMIT };
+}
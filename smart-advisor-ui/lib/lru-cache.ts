@@ -0,0 +1,59 @@
+/**
+ * Small in-process LRU cache on top of Map's insertion order.
+ * Entries can optionally expire after `ttlMs`.
+ */
+export class LRUCache<K, V> {
+    private map = new Map<K, { value: V; expiresAt: number }>();
+    hits = 0;
+    misses = 0;
+
+    constructor(private maxSize: number, private ttlMs = Infinity) { }
+
+    get size(): number {
+        return this.map.size;
+    }
+
+    get(key: K): V | undefined {
+        const entry = this.map.get(key);
+        if (!entry) {
+            this.misses++;
+            return undefined;
+        }
+        if (entry.expiresAt <= Date.now()) {
+            this.map.delete(key);
+            this.misses++;
+            return undefined;
+        }
+        // Move to the most-recently-used end
+        this.map.delete(key);
+        this.map.set(key, entry);
+        this.hits++;
+        return entry.value;
+    }
+
+    set(key: K, value: V): void {
+        this.map.delete(key);
+        this.map.set(key, { value, expiresAt: Date.now() + this.ttlMs });
+        if (this.map.size > this.maxSize) {
+            // Oldest entry is first in iteration order
+            this.map.delete(this.map.keys().next().value as K);
+        }
+    }
+
+    delete(key: K): boolean {
+        return this.map.delete(key);
+    }
+
+    clear(): void {
+        this.map.clear();
+    }
+
+    /** Return the cached value or compute, store and return it */
+    getOrSet(key: K, compute: () => V): V {
+        const cached = this.get(key);
+        if (cached !== undefined) return cached;
+        const value = compute();
+        this.set(key, value);
+        return value;
+    }
+}
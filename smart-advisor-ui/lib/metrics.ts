@@ -0,0 +1,249 @@
+import { AsyncLocalStorage } from 'node:async_hooks';
+
+/**
+ * Request timing for the API routes.
+ *
+ *   - `withMetrics(route, handler)` wraps a route handler: the response gets a
+ *     `Server-Timing` header (one entry per segment, plus `total`), and the
+ *     request's latency lands in a histogram per route, method and status
+ *   - `timeSegment(name, fn)` attributes part of a request to a segment
+ *     (`auth`, `parse`, `render` …); lib/db.ts reports every query as `db`
+ *     and into a histogram per query label
+ *   - `renderPrometheus()` serializes every histogram in the Prometheus text
+ *     format for /api/admin/metrics
+ *
+ * METRICS_ENABLED=0 turns the request timing off: `withMetrics` returns the
+ * handler itself and `timeSegment` returns after one boolean check. The query
+ * histograms stay on, since `queryStats()` (lib/db.ts' getQueryStats, shown
+ * by /api/health) reads them.
+ */
+
+export const METRICS_ENABLED = process.env.METRICS_ENABLED !== '0';
+
+// ── Histograms ──────────────────────────────────────────────────────
+
+/** Upper bounds in seconds, as exported; compared in ms */
+const BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+const BUCKETS_MS = BUCKETS.map(b => b * 1000);
+
+class Histogram {
+    /** Per-bucket (not cumulative) counts; the last slot is +Inf */
+    readonly counts = new Float64Array(BUCKETS.length + 1);
+    sum = 0;
+    count = 0;
+    maxMs = 0;
+    /** Observations of calls that threw */
+    errors = 0;
+
+    observe(ms: number, failed = false) {
+        let i = 0;
+        while (i < BUCKETS_MS.length && ms > BUCKETS_MS[i]) i++;
+        this.counts[i]++;
+        this.sum += ms / 1000;
+        this.count++;
+        if (ms > this.maxMs) this.maxMs = ms;
+        if (failed) this.errors++;
+    }
+
+    /** The `q` quantile in ms, interpolated within its bucket like histogram_quantile() */
+    quantile(q: number): number {
+        const rank = q * this.count;
+        let cumulative = 0;
+        for (let i = 0; i < this.counts.length; i++) {
+            const n = this.counts[i];
+            if (n > 0 && cumulative + n >= rank) {
+                const lower = i === 0 ? 0 : BUCKETS_MS[i - 1];
+                const upper = i < BUCKETS_MS.length ? BUCKETS_MS[i] : this.maxMs;
+                return Math.min(this.maxMs, lower + (upper - lower) * ((rank - cumulative) / n));
+            }
+            cumulative += n;
+        }
+        return this.maxMs;
+    }
+}
+
+interface Family {
+    help: string;
+    labelNames: string[];
+    series: Map<string, { labels: string[]; histogram: Histogram }>;
+}
+
+const families = new Map<string, Family>();
+
+function family(name: string, help: string, labelNames: string[]): Family {
+    let f = families.get(name);
+    if (!f) {
+        f = { help, labelNames, series: new Map() };
+        families.set(name, f);
+    }
+    return f;
+}
+
+const routeLatency = family('http_request_duration_seconds', 'API route latency, by route, method and status.', ['route', 'method', 'status']);
+const segmentLatency = family('http_request_segment_seconds', 'Time spent per Server-Timing segment, by route.', ['route', 'segment']);
+const queryLatency = family('db_query_duration_seconds', 'Database query latency, by statement label.', ['query']);
+
+function observe(f: Family, labels: string[], ms: number, failed = false) {
+    const key = labels.join('\u0000');
+    let s = f.series.get(key);
+    if (!s) {
+        s = { labels, histogram: new Histogram() };
+        f.series.set(key, s);
+    }
+    s.histogram.observe(ms, failed);
+}
+
+// ── Request context ─────────────────────────────────────────────────
+
+interface RequestTiming {
+    /** Segment name → accumulated ms, in first-seen order */
+    segments: Map<string, number>;
+    queries: number;
+}
+
+const requestTiming = new AsyncLocalStorage<RequestTiming>();
+
+function addSegment(timing: RequestTiming, name: string, ms: number) {
+    timing.segments.set(name, (timing.segments.get(name) ?? 0) + ms);
+}
+
+/** Time `fn` as part of the current request's `name` segment */
+export async function timeSegment<T>(name: string, fn: () => T | Promise<T>): Promise<T> {
+    const timing = METRICS_ENABLED ? requestTiming.getStore() : undefined;
+    if (!timing) return fn();
+    const started = performance.now();
+    try {
+        return await fn();
+    } finally {
+        addSegment(timing, name, performance.now() - started);
+    }
+}
+
+/**
+ * Called by lib/db.ts for every query. Concurrent queries each add their own
+ * duration, so `db` can exceed the request's wall time.
+ */
+export function recordQuery(label: string, ms: number, failed = false) {
+    observe(queryLatency, [label], ms, failed);
+    if (!METRICS_ENABLED) return;
+    const timing = requestTiming.getStore();
+    if (timing) {
+        addSegment(timing, 'db', ms);
+        timing.queries++;
+    }
+}
+
+function serverTiming(timing: RequestTiming, totalMs: number): string {
+    const entries: string[] = [];
+    for (const [name, ms] of timing.segments) {
+        entries.push(name === 'db'
+            ? `db;dur=${ms.toFixed(3)};desc="${timing.queries} queries"`
+            : `${name};dur=${ms.toFixed(3)}`);
+    }
+    entries.push(`total;dur=${totalMs.toFixed(3)}`);
+    return entries.join(', ');
+}
+
+type Handler<A extends unknown[]> = (...args: A) => Response | Promise<Response>;
+
+/** Instrument a route handler; `route` is its path pattern, e.g. "/api/progress/[studentId]" */
+export function withMetrics<A extends unknown[]>(route: string, handler: Handler<A>): Handler<A> {
+    if (!METRICS_ENABLED) return handler;
+
+    return async (...args: A) => {
+        // Next passes the request first even to handlers declared without parameters
+        const method = args[0] instanceof Request ? args[0].method : 'GET';
+        const timing: RequestTiming = { segments: new Map(), queries: 0 };
+        const started = performance.now();
+        let status = 500;
+        try {
+            const response = await requestTiming.run(timing, () => handler(...args));
+            status = response.status;
+            try {
+                response.headers.append('Server-Timing', serverTiming(timing, performance.now() - started));
+            } catch {
+                // Immutable headers (e.g. a proxied fetch response): histograms only
+            }
+            return response;
+        } finally {
+            observe(routeLatency, [route, method, String(status)], performance.now() - started);
+            for (const [name, ms] of timing.segments) observe(segmentLatency, [route, name], ms);
+        }
+    };
+}
+
+// ── Exposition ──────────────────────────────────────────────────────
+
+const escapeLabel = (v: string) => v.replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+
+function labelSet(names: string[], values: string[], extra?: string): string {
+    const pairs = names.map((n, i) => `${n}="${escapeLabel(values[i])}"`);
+    if (extra) pairs.push(extra);
+    return `{${pairs.join(',')}}`;
+}
+
+/** A gauge family in the text format, for values owned elsewhere (pool sizes …) */
+export function gauge(name: string, help: string, values: [Record<string, string>, number][]): string {
+    const lines = [`# HELP ${name} ${help}`, `# TYPE ${name} gauge`];
+    for (const [labels, value] of values) {
+        const names = Object.keys(labels);
+        lines.push(`${name}${names.length ? labelSet(names, names.map(n => labels[n])) : ''} ${value}`);
+    }
+    return lines.join('\n') + '\n';
+}
+
+export function renderPrometheus(): string {
+    const lines: string[] = [];
+    for (const [name, f] of families) {
+        lines.push(`# HELP ${name} ${f.help}`, `# TYPE ${name} histogram`);
+        for (const { labels, histogram } of f.series.values()) {
+            let cumulative = 0;
+            for (let i = 0; i < BUCKETS.length; i++) {
+                cumulative += histogram.counts[i];
+                lines.push(`${name}_bucket${labelSet(f.labelNames, labels, `le="${BUCKETS[i]}"`)} ${cumulative}`);
+            }
+            lines.push(`${name}_bucket${labelSet(f.labelNames, labels, 'le="+Inf"')} ${histogram.count}`);
+            lines.push(`${name}_sum${labelSet(f.labelNames, labels)} ${histogram.sum}`);
+            lines.push(`${name}_count${labelSet(f.labelNames, labels)} ${histogram.count}`);
+        }
+    }
+    return lines.join('\n') + '\n';
+}
+
+export function resetMetrics() {
+    for (const f of families.values()) f.series.clear();
+}
+
+// ── Query stats ─────────────────────────────────────────────────────
+
+export interface QueryStats {
+    count: number;
+    errors: number;
+    meanMs: number;
+    p50Ms: number;
+    p95Ms: number;
+    maxMs: number;
+}
+
+const round = (ms: number) => Math.round(ms * 100) / 100;
+
+/** Per query label, most total time first; percentiles are estimated from the histogram buckets */
+export function queryStats(): Record<string, QueryStats> {
+    const stats: Record<string, QueryStats> = {};
+    const series = [...queryLatency.series.values()].sort((a, b) => b.histogram.sum - a.histogram.sum);
+    for (const { labels: [label], histogram: h } of series) {
+        stats[label] = {
+            count: h.count,
+            errors: h.errors,
+            meanMs: round((h.sum * 1000) / h.count),
+            p50Ms: round(h.quantile(0.5)),
+            p95Ms: round(h.quantile(0.95)),
+            maxMs: round(h.maxMs),
+        };
+    }
+    return stats;
+}
+
+export function resetQueryStats() {
+    queryLatency.series.clear();
+}
@@ -0,0 +1,612 @@
+import type { VercelPoolClient } from '@vercel/postgres';
+import { connect } from './db';
+import { rebuildStats } from './stats';
+
+/**
+ * Versioned schema migrations.
+ *
+ * Each migration runs once, in order, and is recorded in `schema_migrations`.
+ * A Postgres advisory lock keeps concurrent instances from racing each other.
+ * Migrations must be safe to re-run (IF NOT EXISTS etc.) because a failed
+ * run is retried from the start of the migration that failed.
+ *
+ * Data backfills run in small batches, each its own statement, so they never
+ * hold row locks on a whole table while the app keeps serving requests.
+ */
+
+export interface Migration {
+    version: number;
+    name: string;
+    up: (client: VercelPoolClient) => Promise<void>;
+    /** Tables this migration creates; resetDB drops them */
+    tables?: string[];
+    /** Recompute the stats rollups once all pending migrations have run */
+    rebuildsStats?: boolean;
+}
+
+// Arbitrary app-wide key for pg_advisory_lock
+const MIGRATION_LOCK_KEY = 727_001;
+const BACKFILL_BATCH_SIZE = 500;
+
+/**
+ * CREATE INDEX CONCURRENTLY that can be retried. A concurrent build that
+ * fails leaves an INVALID index behind, which IF NOT EXISTS would skip on
+ * every later run, so that one is dropped and rebuilt. `name` and `definition`
+ * are literals from this file, never user input.
+ */
+async function createIndexConcurrently(client: VercelPoolClient, name: string, definition: string): Promise<void> {
+    const { rows } = await client.sql`
+        SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(${name})
+    `;
+    if (rows.length > 0 && !rows[0].indisvalid) {
+        await client.query(`DROP INDEX CONCURRENTLY IF EXISTS ${name}`);
+    }
+    await client.query(`CREATE INDEX CONCURRENTLY IF NOT EXISTS ${name} ON ${definition}`);
+}
+
+/** Run `step` until it reports it touched no rows */
+async function inBatches(step: () => Promise<number>): Promise<number> {
+    let total = 0;
+    for (let n = await step(); n > 0; n = await step()) total += n;
+    return total;
+}
+
+export const MIGRATIONS: Migration[] = [
+    {
+        version: 1,
+        name: 'baseline',
+        tables: ['student_progress', 'student_profile', 'visitor_logs', 'users', 'accounts', 'planner_semesters', 'integration_tokens'],
+        up: async (client) => {
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS student_progress (
+                    student_id  TEXT    NOT NULL,
+                    major       TEXT    NOT NULL,
+                    completed   TEXT    NOT NULL DEFAULT '[]',
+                    updated_at  BIGINT  NOT NULL DEFAULT (EXTRACT(EPOCH FROM NOW())::bigint),
+                    PRIMARY KEY (student_id, major)
+                );
+            `;
+            await client.sql`CREATE INDEX IF NOT EXISTS idx_student_id ON student_progress (student_id);`;
+            await client.sql`ALTER TABLE student_progress ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0;`;
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS student_profile (
+                    student_id  TEXT    PRIMARY KEY,
+                    major       TEXT    NOT NULL,
+                    updated_at  BIGINT  NOT NULL DEFAULT (EXTRACT(EPOCH FROM NOW())::bigint)
+                );
+            `;
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS visitor_logs (
+                    id SERIAL PRIMARY KEY,
+                    student_id TEXT,
+                    ip_address TEXT,
+                    user_agent TEXT,
+                    device_vendor TEXT,
+                    device_model TEXT,
+                    os_name TEXT,
+                    os_version TEXT,
+                    browser_name TEXT,
+                    visited_at TIMESTAMP DEFAULT NOW()
+                );
+            `;
+            await client.sql`ALTER TABLE visitor_logs ADD COLUMN IF NOT EXISTS student_id TEXT;`;
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS users (
+                    id SERIAL PRIMARY KEY,
+                    student_id TEXT UNIQUE,
+                    email TEXT UNIQUE,
+                    password_hash TEXT,
+                    name TEXT,
+                    image TEXT,
+                    created_at TIMESTAMP DEFAULT (NOW())
+                );
+            `;
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS accounts (
+                    id SERIAL PRIMARY KEY,
+                    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+                    provider TEXT NOT NULL,
+                    provider_account_id TEXT NOT NULL,
+                    UNIQUE(provider, provider_account_id)
+                );
+            `;
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS planner_semesters (
+                    id TEXT PRIMARY KEY,
+                    student_id TEXT NOT NULL,
+                    name TEXT NOT NULL DEFAULT 'Spring 2026',
+                    courses TEXT NOT NULL DEFAULT '[]',
+                    study_sessions TEXT NOT NULL DEFAULT '[]',
+                    created_at TIMESTAMP DEFAULT NOW(),
+                    updated_at TIMESTAMP DEFAULT NOW()
+                );
+            `;
+            await client.sql`CREATE INDEX IF NOT EXISTS idx_planner_student ON planner_semesters (student_id);`;
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS integration_tokens (
+                    id SERIAL PRIMARY KEY,
+                    student_id TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    access_token TEXT NOT NULL,
+                    refresh_token TEXT,
+                    expires_at BIGINT,
+                    metadata TEXT DEFAULT '{}',
+                    updated_at TIMESTAMP DEFAULT NOW(),
+                    UNIQUE(student_id, provider)
+                );
+            `;
+        },
+    },
+    {
+        // JSONB twins of the JSON-in-TEXT columns. Adding a nullable column is
+        // metadata-only; the copy happens in batches. The TEXT columns are still
+        // written so the previous release keeps working during a rollout, and
+        // migration 8 keeps the twins in step with its TEXT-only writes.
+        version: 2,
+        name: 'jsonb_columns',
+        up: async (client) => {
+            await client.sql`
+                CREATE OR REPLACE FUNCTION try_jsonb(value TEXT, fallback JSONB) RETURNS JSONB AS $$
+                BEGIN
+                    RETURN COALESCE(value::jsonb, fallback);
+                EXCEPTION WHEN others THEN
+                    RETURN fallback;
+                END;
+                $$ LANGUAGE plpgsql IMMUTABLE;
+            `;
+            await client.sql`ALTER TABLE student_progress ADD COLUMN IF NOT EXISTS completed_jsonb JSONB;`;
+            await client.sql`ALTER TABLE planner_semesters ADD COLUMN IF NOT EXISTS courses_jsonb JSONB;`;
+            await client.sql`ALTER TABLE planner_semesters ADD COLUMN IF NOT EXISTS study_sessions_jsonb JSONB;`;
+            await client.sql`ALTER TABLE integration_tokens ADD COLUMN IF NOT EXISTS metadata_jsonb JSONB;`;
+
+            await inBatches(async () => (await client.sql`
+                UPDATE student_progress SET completed_jsonb = try_jsonb(completed, '[]')
+                WHERE ctid IN (
+                    SELECT ctid FROM student_progress WHERE completed_jsonb IS NULL LIMIT ${BACKFILL_BATCH_SIZE}
+                )
+            `).rowCount ?? 0);
+            await inBatches(async () => (await client.sql`
+                UPDATE planner_semesters SET
+                    courses_jsonb        = try_jsonb(courses, '[]'),
+                    study_sessions_jsonb = try_jsonb(study_sessions, '[]')
+                WHERE ctid IN (
+                    SELECT ctid FROM planner_semesters WHERE courses_jsonb IS NULL LIMIT ${BACKFILL_BATCH_SIZE}
+                )
+            `).rowCount ?? 0);
+            await inBatches(async () => (await client.sql`
+                UPDATE integration_tokens SET metadata_jsonb = try_jsonb(metadata, '{}')
+                WHERE ctid IN (
+                    SELECT ctid FROM integration_tokens WHERE metadata_jsonb IS NULL LIMIT ${BACKFILL_BATCH_SIZE}
+                )
+            `).rowCount ?? 0);
+        },
+    },
+    {
+        // One row per completed course so aggregates run in SQL
+        version: 3,
+        name: 'student_completed_course',
+        tables: ['student_completed_course'],
+        up: async (client) => {
+            // Entry → normalized course code (legacy bare strings or { code, name })
+            await client.sql`
+                CREATE OR REPLACE FUNCTION completed_code(entry JSONB) RETURNS TEXT AS $$
+                    SELECT CASE
+                        WHEN length(c) = 10 AND left(c, 2) = '00' THEN substr(c, 3)
+                        ELSE c
+                    END
+                    FROM (SELECT btrim(CASE jsonb_typeof(entry)
+                        WHEN 'string' THEN entry #>> '{}'
+                        WHEN 'object' THEN entry ->> 'code'
+                    END) AS c) AS s
+                $$ LANGUAGE sql IMMUTABLE;
+            `;
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS student_completed_course (
+                    student_id   TEXT NOT NULL,
+                    major        TEXT NOT NULL,
+                    course_code  TEXT NOT NULL,
+                    name         TEXT,
+                    PRIMARY KEY (student_id, major, course_code)
+                );
+            `;
+
+            // Keyset walk over student_progress so each batch is an index range scan
+            let after: [string, string] = ['', ''];
+            for (; ;) {
+                const { rows } = await client.sql`
+                    WITH batch AS (
+                        SELECT student_id, major, completed_jsonb FROM student_progress
+                        WHERE (student_id, major) > (${after[0]}, ${after[1]})
+                        ORDER BY student_id, major
+                        LIMIT ${BACKFILL_BATCH_SIZE}
+                    ), ins AS (
+                        INSERT INTO student_completed_course (student_id, major, course_code, name)
+                        SELECT b.student_id, b.major, completed_code(e), MAX(e ->> 'name')
+                        FROM batch b, jsonb_array_elements(
+                            CASE jsonb_typeof(b.completed_jsonb) WHEN 'array' THEN b.completed_jsonb ELSE '[]'::jsonb END
+                        ) AS e
+                        WHERE completed_code(e) IS NOT NULL
+                        GROUP BY b.student_id, b.major, completed_code(e)
+                        ON CONFLICT DO NOTHING
+                    )
+                    SELECT student_id, major FROM batch
+                    ORDER BY student_id DESC, major DESC
+                    LIMIT 1
+                `;
+                if (rows.length === 0) break;
+                after = [rows[0].student_id, rows[0].major];
+            }
+        },
+    },
+    {
+        // CONCURRENTLY so live writes aren't blocked; can't run in a transaction
+        version: 4,
+        name: 'jsonb_and_course_indexes',
+        up: async (client) => {
+            await createIndexConcurrently(client, 'idx_progress_completed_gin',
+                'student_progress USING GIN (completed_jsonb jsonb_path_ops)');
+            await createIndexConcurrently(client, 'idx_completed_course_code',
+                'student_completed_course (course_code)');
+            await createIndexConcurrently(client, 'idx_planner_student_updated',
+                'planner_semesters (student_id, updated_at DESC)');
+        },
+    },
+    {
+        // Rollups behind /api/admin/stats; see lib/stats.ts
+        version: 5,
+        name: 'stats_rollups',
+        tables: ['stats_daily_traffic', 'stats_heatmap', 'stats_device', 'stats_course_completion', 'stats_student_credits'],
+        up: async (client) => {
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS stats_daily_traffic (
+                    day     DATE    PRIMARY KEY,
+                    visits  BIGINT  NOT NULL DEFAULT 0
+                );
+            `;
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS stats_heatmap (
+                    dow     SMALLINT NOT NULL,
+                    hour    SMALLINT NOT NULL,
+                    visits  BIGINT   NOT NULL DEFAULT 0,
+                    PRIMARY KEY (dow, hour)
+                );
+            `;
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS stats_device (
+                    os       TEXT   NOT NULL,
+                    browser  TEXT   NOT NULL,
+                    visits   BIGINT NOT NULL DEFAULT 0,
+                    PRIMARY KEY (os, browser)
+                );
+            `;
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS stats_course_completion (
+                    course_code  TEXT   PRIMARY KEY,
+                    name         TEXT,
+                    students     BIGINT NOT NULL DEFAULT 0
+                );
+            `;
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS stats_student_credits (
+                    student_id    TEXT    NOT NULL,
+                    major         TEXT    NOT NULL,
+                    course_count  INTEGER NOT NULL DEFAULT 0,
+                    credit_hours  INTEGER NOT NULL DEFAULT 0,
+                    -- student_progress.version this row reflects; older updates are ignored
+                    progress_version  INTEGER NOT NULL DEFAULT 0,
+                    updated_at    BIGINT  NOT NULL DEFAULT (EXTRACT(EPOCH FROM NOW())::bigint),
+                    PRIMARY KEY (student_id, major)
+                );
+            `;
+            await client.sql`CREATE INDEX IF NOT EXISTS idx_student_credits_updated ON stats_student_credits (updated_at DESC);`;
+        },
+        rebuildsStats: true,
+    },
+    {
+        // Raw visits older than the retention window are folded into
+        // visitor_logs_daily by pruneVisitorLogs (lib/visitor-log.ts)
+        version: 6,
+        name: 'visitor_logs_retention',
+        tables: ['visitor_logs_daily'],
+        up: async (client) => {
+            await createIndexConcurrently(client, 'idx_visitor_logs_visited',
+                'visitor_logs (visited_at DESC, id DESC)');
+            await createIndexConcurrently(client, 'idx_visitor_logs_student_visited',
+                'visitor_logs (student_id, visited_at DESC, id DESC)');
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS visitor_logs_daily (
+                    day      DATE     NOT NULL,
+                    hour     SMALLINT NOT NULL,
+                    os       TEXT     NOT NULL,
+                    browser  TEXT     NOT NULL,
+                    visits   BIGINT   NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, hour, os, browser)
+                );
+            `;
+        },
+        rebuildsStats: true,
+    },
+    {
+        // Written wholesale by the cohort analytics job (lib/analytics.ts)
+        version: 7,
+        name: 'cohort_analytics',
+        tables: ['analytics_runs', 'analytics_course', 'analytics_major', 'analytics_major_histogram'],
+        up: async (client) => {
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS analytics_runs (
+                    id           SERIAL PRIMARY KEY,
+                    started_at   TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    finished_at  TIMESTAMPTZ,
+                    status       TEXT    NOT NULL DEFAULT 'running',
+                    students     INTEGER NOT NULL DEFAULT 0,
+                    duration_ms  INTEGER,
+                    error        TEXT
+                );
+            `;
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS analytics_course (
+                    major             TEXT    NOT NULL,
+                    course_code       TEXT    NOT NULL,
+                    name              TEXT,
+                    completed         INTEGER NOT NULL DEFAULT 0,
+                    unlocked          INTEGER NOT NULL DEFAULT 0,
+                    blocked_students  INTEGER NOT NULL DEFAULT 0,
+                    blocked_courses   INTEGER NOT NULL DEFAULT 0,
+                    bottleneck_score  DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    PRIMARY KEY (major, course_code)
+                );
+            `;
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS analytics_major (
+                    major                TEXT    PRIMARY KEY,
+                    students             INTEGER NOT NULL DEFAULT 0,
+                    avg_credit_hours     DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    median_credit_hours  INTEGER NOT NULL DEFAULT 0,
+                    complete             INTEGER NOT NULL DEFAULT 0
+                );
+            `;
+            await client.sql`
+                CREATE TABLE IF NOT EXISTS analytics_major_histogram (
+                    major     TEXT     NOT NULL,
+                    bucket    SMALLINT NOT NULL,
+                    min_ch    INTEGER  NOT NULL,
+                    max_ch    INTEGER  NOT NULL,
+                    students  INTEGER  NOT NULL DEFAULT 0,
+                    PRIMARY KEY (major, bucket)
+                );
+            `;
+        },
+    },
+    {
+        // The previous release writes only the TEXT columns. Reads prefer the
+        // JSONB twins, so without this its saves during a rollout would be
+        // hidden behind the backfilled copy. A write that changes the TEXT
+        // column but leaves the twin untouched re-derives the twin; this
+        // release sets both, which skips the re-parse.
+        version: 8,
+        name: 'jsonb_sync_triggers',
+        up: async (client) => {
+            await client.sql`
+                CREATE OR REPLACE FUNCTION sync_student_progress_jsonb() RETURNS TRIGGER AS $$
+                BEGIN
+                    IF TG_OP = 'INSERT' THEN
+                        IF NEW.completed_jsonb IS NULL THEN
+                            NEW.completed_jsonb := try_jsonb(NEW.completed, '[]');
+                        END IF;
+                    ELSIF NEW.completed IS DISTINCT FROM OLD.completed
+                        AND NEW.completed_jsonb IS NOT DISTINCT FROM OLD.completed_jsonb THEN
+                        NEW.completed_jsonb := try_jsonb(NEW.completed, '[]');
+                    END IF;
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql;
+            `;
+            await client.sql`
+                CREATE OR REPLACE FUNCTION sync_planner_semesters_jsonb() RETURNS TRIGGER AS $$
+                BEGIN
+                    IF TG_OP = 'INSERT' THEN
+                        IF NEW.courses_jsonb IS NULL THEN
+                            NEW.courses_jsonb := try_jsonb(NEW.courses, '[]');
+                        END IF;
+                        IF NEW.study_sessions_jsonb IS NULL THEN
+                            NEW.study_sessions_jsonb := try_jsonb(NEW.study_sessions, '[]');
+                        END IF;
+                    ELSE
+                        IF NEW.courses IS DISTINCT FROM OLD.courses
+                            AND NEW.courses_jsonb IS NOT DISTINCT FROM OLD.courses_jsonb THEN
+                            NEW.courses_jsonb := try_jsonb(NEW.courses, '[]');
+                        END IF;
+                        IF NEW.study_sessions IS DISTINCT FROM OLD.study_sessions
+                            AND NEW.study_sessions_jsonb IS NOT DISTINCT FROM OLD.study_sessions_jsonb THEN
+                            NEW.study_sessions_jsonb := try_jsonb(NEW.study_sessions, '[]');
+                        END IF;
+                    END IF;
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql;
+            `;
+            await client.sql`
+                CREATE OR REPLACE FUNCTION sync_integration_tokens_jsonb() RETURNS TRIGGER AS $$
+                BEGIN
+                    IF TG_OP = 'INSERT' THEN
+                        IF NEW.metadata_jsonb IS NULL THEN
+                            NEW.metadata_jsonb := try_jsonb(NEW.metadata, '{}');
+                        END IF;
+                    ELSIF NEW.metadata IS DISTINCT FROM OLD.metadata
+                        AND NEW.metadata_jsonb IS NOT DISTINCT FROM OLD.metadata_jsonb THEN
+                        NEW.metadata_jsonb := try_jsonb(NEW.metadata, '{}');
+                    END IF;
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql;
+            `;
+            await client.sql`DROP TRIGGER IF EXISTS trg_student_progress_jsonb ON student_progress;`;
+            await client.sql`
+                CREATE TRIGGER trg_student_progress_jsonb BEFORE INSERT OR UPDATE ON student_progress
+                FOR EACH ROW EXECUTE FUNCTION sync_student_progress_jsonb();
+            `;
+            await client.sql`DROP TRIGGER IF EXISTS trg_planner_semesters_jsonb ON planner_semesters;`;
+            await client.sql`
+                CREATE TRIGGER trg_planner_semesters_jsonb BEFORE INSERT OR UPDATE ON planner_semesters
+                FOR EACH ROW EXECUTE FUNCTION sync_planner_semesters_jsonb();
+            `;
+            await client.sql`DROP TRIGGER IF EXISTS trg_integration_tokens_jsonb ON integration_tokens;`;
+            await client.sql`
+                CREATE TRIGGER trg_integration_tokens_jsonb BEFORE INSERT OR UPDATE ON integration_tokens
+                FOR EACH ROW EXECUTE FUNCTION sync_integration_tokens_jsonb();
+            `;
+
+            // Catch up on TEXT-only writes made between the backfill and now.
+            // This release always writes both, so where they differ the TEXT
+            // column is the newer one.
+            await inBatches(async () => (await client.sql`
+                UPDATE student_progress SET completed_jsonb = try_jsonb(completed, '[]')
+                WHERE ctid IN (
+                    SELECT ctid FROM student_progress
+                    WHERE completed_jsonb IS DISTINCT FROM try_jsonb(completed, '[]')
+                    LIMIT ${BACKFILL_BATCH_SIZE}
+                )
+            `).rowCount ?? 0);
+            await inBatches(async () => (await client.sql`
+                UPDATE planner_semesters SET
+                    courses_jsonb        = try_jsonb(courses, '[]'),
+                    study_sessions_jsonb = try_jsonb(study_sessions, '[]')
+                WHERE ctid IN (
+                    SELECT ctid FROM planner_semesters
+                    WHERE courses_jsonb IS DISTINCT FROM try_jsonb(courses, '[]')
+                       OR study_sessions_jsonb IS DISTINCT FROM try_jsonb(study_sessions, '[]')
+                    LIMIT ${BACKFILL_BATCH_SIZE}
+                )
+            `).rowCount ?? 0);
+            await inBatches(async () => (await client.sql`
+                UPDATE integration_tokens SET metadata_jsonb = try_jsonb(metadata, '{}')
+                WHERE ctid IN (
+                    SELECT ctid FROM integration_tokens
+                    WHERE metadata_jsonb IS DISTINCT FROM try_jsonb(metadata, '{}')
+                    LIMIT ${BACKFILL_BATCH_SIZE}
+                )
+            `).rowCount ?? 0);
+        },
+    },
+];
+
+export const LATEST_SCHEMA_VERSION = MIGRATIONS[MIGRATIONS.length - 1].version;
+
+/** Every table the migrations manage, schema_migrations included */
+export const SCHEMA_TABLES: readonly string[] = [
+    ...MIGRATIONS.flatMap(m => m.tables ?? []),
+    'schema_migrations',
+];
+
+async function appliedVersion(client: VercelPoolClient): Promise<number> {
+    const { rows } = await client.sql`SELECT COALESCE(MAX(version), 0) AS version FROM schema_migrations`;
+    return Number(rows[0].version);
+}
+
+/**
+ * Bring the schema up to LATEST_SCHEMA_VERSION. Returns the versions applied
+ * by this call (empty when already current).
+ */
+export async function migrate(): Promise<number[]> {
+    const client = await connect();
+    try {
+        await client.sql`
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version     INTEGER PRIMARY KEY,
+                name        TEXT NOT NULL,
+                applied_at  TIMESTAMP DEFAULT NOW()
+            );
+        `;
+        if (await appliedVersion(client) >= LATEST_SCHEMA_VERSION) return [];
+
+        // Session-level lock, so it must be taken and released on this client
+        await client.sql`SELECT pg_advisory_lock(${MIGRATION_LOCK_KEY})`;
+        try {
+            const current = await appliedVersion(client);
+            const applied: number[] = [];
+            let rebuild = false;
+            for (const migration of MIGRATIONS) {
+                if (migration.version <= current) continue;
+                const started = Date.now();
+                await migration.up(client);
+                await client.sql`
+                    INSERT INTO schema_migrations (version, name) VALUES (${migration.version}, ${migration.name})
+                    ON CONFLICT (version) DO NOTHING
+                `;
+                console.log(`Migration ${migration.version} (${migration.name}) applied in ${Date.now() - started}ms`);
+                applied.push(migration.version);
+                rebuild ||= !!migration.rebuildsStats;
+            }
+            // Runs against the final schema, so it can use every table above
+            if (rebuild) await rebuildStats();
+            return applied;
+        } finally {
+            await client.sql`SELECT pg_advisory_unlock(${MIGRATION_LOCK_KEY})`;
+        }
+    } finally {
+        client.release();
+    }
+}
+
+// ─── Readiness ──────────────────────────────────────────────────────────────
+
+let ready: Promise<void> | null = null;
+let readyAt: Date | null = null;
+let lastError: string | null = null;
+
+/**
+ * Migrate once per process. After the first success this is an already
+ * resolved promise, so request handlers can await it without any DDL or
+ * round trip. A failure is not cached; the next call tries again.
+ */
+export function ensureSchema(): Promise<void> {
+    if (!ready) {
+        ready = migrate().then(
+            () => {
+                readyAt = new Date();
+                lastError = null;
+            },
+            (e) => {
+                ready = null;
+                lastError = e instanceof Error ? e.message : String(e);
+                throw e;
+            }
+        );
+    }
+    return ready;
+}
+
+export interface SchemaStatus {
+    /** ensureSchema has completed in this process */
+    ready: boolean;
+    readyAt: string | null;
+    /** Highest version recorded in schema_migrations (null = unreachable) */
+    version: number | null;
+    latest: number;
+    pending: string[];
+    error: string | null;
+}
+
+export async function getSchemaStatus(): Promise<SchemaStatus> {
+    let version: number | null = null;
+    let error = lastError;
+    try {
+        const client = await connect();
+        try {
+            version = await appliedVersion(client);
+        } finally {
+            client.release();
+        }
+    } catch (e) {
+        error = e instanceof Error ? e.message : String(e);
+    }
+
+    return {
+        ready: readyAt !== null,
+        readyAt: readyAt?.toISOString() ?? null,
+        version,
+        latest: LATEST_SCHEMA_VERSION,
+        pending: MIGRATIONS.filter(m => version === null || m.version > version).map(m => `${m.version}_${m.name}`),
+        error,
+    };
+}
@@ -0,0 +1,287 @@
+import { createHash } from 'crypto';
+import { LRUCache } from './lru-cache';
+import { fetchWithRetry, mapWithConcurrency, RateLimiter } from './rate-limited-fetch';
+
+/**
+ * Planner → Notion course database sync.
+ *
+ * Each semester gets its own database. Its id and a course key → { pageId,
+ * hash } map are kept per semester in the token's integration metadata, so a
+ * re-sync of that semester reuses the same database and only PATCHes rows
+ * whose properties changed; courses dropped from the semester are archived.
+ * Requests go through a per-token limiter (Notion allows ~3 req/s per
+ * integration) with a small worker pool. Reads and updates are retried on
+ * 429/409/5xx; creates only on 429, since a create that failed with a 5xx may
+ * still have gone through.
+ *
+ * NOTION_API_URL points the client at another server (e.g.
+ * scripts/notion-stub.mjs) for offline testing.
+ */
+
+export const NOTION_API_URL = (process.env.NOTION_API_URL || 'https://api.notion.com').replace(/\/$/, '');
+const NOTION_VERSION = '2022-06-28';
+const REQUESTS_PER_SECOND = Number(process.env.NOTION_RATE_LIMIT) || 3;
+const CONCURRENCY = 3;
+
+export interface NotionCoursePage {
+    pageId: string;
+    hash: string;
+}
+
+export interface NotionSemesterState {
+    databaseId: string;
+    coursePages: Record<string, NotionCoursePage>;
+}
+
+/** Sync state stored in integration_tokens.metadata, next to the workspace info */
+export interface NotionSyncMetadata {
+    parentPageId?: string | null;
+    /** Keyed by semester name */
+    semesters?: Record<string, NotionSemesterState>;
+}
+
+export interface NotionSyncResult {
+    databaseId: string | null;
+    totalCount: number;
+    successCount: number;
+    created: number;
+    updated: number;
+    unchanged: number;
+    archived: number;
+    failed: number;
+    warning?: string;
+    /** Merge into the token metadata */
+    metadata: NotionSyncMetadata;
+}
+
+export class NotionSyncError extends Error {
+    constructor(message: string, readonly status = 400) {
+        super(message);
+    }
+}
+
+// Notion rate-limits per integration token; share one limiter per token
+const limiters = new LRUCache<string, RateLimiter>(1000);
+
+export interface NotionClient {
+    request(method: string, path: string, body?: unknown): Promise<{ ok: boolean; status: number; data: any }>;
+}
+
+export function notionClient(accessToken: string): NotionClient {
+    const limiter = limiters.getOrSet(accessToken, () => new RateLimiter(REQUESTS_PER_SECOND));
+    return {
+        async request(method, path, body) {
+            const res = await fetchWithRetry(`${NOTION_API_URL}${path}`, {
+                method,
+                headers: {
+                    Authorization: `Bearer ${accessToken}`,
+                    'Notion-Version': NOTION_VERSION,
+                    'Content-Type': 'application/json',
+                },
+                body: body === undefined ? undefined : JSON.stringify(body),
+            }, { limiter, retryOn: [409], idempotent: !isCreate(method, path) });
+            const data = await res.json().catch(() => null);
+            return { ok: res.ok, status: res.status, data };
+        },
+    };
+}
+
+/** POST /v1/pages and /v1/databases make a new object on every call */
+function isCreate(method: string, path: string): boolean {
+    return method === 'POST' && (path === '/v1/pages' || path === '/v1/databases');
+}
+
+/** A page the integration can write under: prefer a workspace-level one */
+export async function findParentPage(client: NotionClient): Promise<string | null> {
+    const { ok, data } = await client.request('POST', '/v1/search', { page_size: 20 });
+    if (!ok) return null;
+    const pages = data?.results?.filter((r: any) => r.object === 'page') || [];
+    const workspacePage = pages.find((p: any) => p.parent?.type === 'workspace');
+    return workspacePage?.id || pages[0]?.id || null;
+}
+
+const DATABASE_PROPERTIES = {
+    "Course": { title: {} },
+    "Code": { rich_text: {} },
+    "Credits": { number: {} },
+    "Grade": { select: { options: [
+        { name: "D", color: "green" },
+        { name: "M", color: "blue" },
+        { name: "P", color: "yellow" },
+        { name: "U", color: "red" },
+        { name: "—", color: "gray" },
+    ]}},
+    "Status": { select: { options: [
+        { name: "Completed", color: "green" },
+        { name: "In Progress", color: "blue" },
+        { name: "Planned", color: "gray" },
+    ]}},
+    "Midterm Date": { date: {} },
+    "Final Date": { date: {} },
+};
+
+function courseProperties(course: any) {
+    const grade = course.grade || "—";
+    const status = grade !== "—" ? "Completed" : "In Progress";
+
+    // Dates are always sent so clearing one in the planner clears it in Notion
+    return {
+        "Course": { title: [{ text: { content: course.name || "Unknown" } }] },
+        "Code": { rich_text: [{ text: { content: course.code || course.id || "" } }] },
+        "Credits": { number: course.credits || 0 },
+        "Grade": { select: { name: grade } },
+        "Status": { select: { name: status } },
+        "Midterm Date": { date: course.midtermDate ? { start: course.midtermDate } : null },
+        "Final Date": { date: course.finalDate ? { start: course.finalDate } : null },
+    };
+}
+
+interface Row {
+    key: string;
+    properties: ReturnType<typeof courseProperties>;
+    hash: string;
+}
+
+function toRows(courses: any[]): Row[] {
+    const seen = new Map<string, number>();
+    return courses.map(course => {
+        const base = String(course.code || course.id || course.name || 'course');
+        const n = seen.get(base) ?? 0;
+        seen.set(base, n + 1);
+        const properties = courseProperties(course);
+        return {
+            key: n === 0 ? base : `${base}#${n}`,
+            properties,
+            hash: createHash('sha1').update(JSON.stringify(properties)).digest('hex').slice(0, 16),
+        };
+    });
+}
+
+/**
+ * Whether the stored database is still there. Only a 404 or an archived
+ * database counts as gone; any other failure (429/5xx still failing after
+ * retries, an auth error) aborts the sync with the stored metadata intact,
+ * since creating a new database then would duplicate the student's courses.
+ */
+async function databaseExists(client: NotionClient, databaseId: string): Promise<boolean> {
+    const { ok, status, data } = await client.request('GET', `/v1/databases/${databaseId}`);
+    if (status === 404) return false;
+    if (!ok) {
+        console.error("Notion database lookup failed:", status, data);
+        throw new NotionSyncError(
+            status === 401 || status === 403
+                ? "Notion denied access to the course database. Reconnect Notion and try again."
+                : "Notion is not responding right now. Try syncing again in a few minutes.",
+            status === 401 || status === 403 ? 401 : 503
+        );
+    }
+    return !data?.archived;
+}
+
+export async function syncCoursesToNotion(
+    accessToken: string,
+    metadata: Record<string, any>,
+    { courses, semesterName, createNewPage }: { courses: any[]; semesterName?: string; createNewPage?: boolean }
+): Promise<NotionSyncResult> {
+    const client = notionClient(accessToken);
+
+    let parentPageId: string | null = metadata.parentPageId || await findParentPage(client);
+    if (!parentPageId) {
+        throw new NotionSyncError("No accessible Notion page found. Reconnect Notion and make sure to select pages to share when prompted.");
+    }
+
+    const semester = semesterName || metadata.semester || "Courses";
+    const semesters: Record<string, NotionSemesterState> = { ...(metadata.semesters || {}) };
+    let databaseId: string | null = semesters[semester]?.databaseId || null;
+    let pages: Record<string, NotionCoursePage> = { ...(semesters[semester]?.coursePages || {}) };
+
+    // A fresh Study Plan page gets its own database
+    if (createNewPage) {
+        const page = await client.request('POST', '/v1/pages', {
+            parent: { page_id: parentPageId },
+            properties: { title: { title: [{ text: { content: `📚 Study Plan ${semester}` } }] } },
+        }).catch(() => null);
+        if (page?.ok) parentPageId = page.data.id;
+        databaseId = null;
+    }
+
+    if (databaseId && !(await databaseExists(client, databaseId))) databaseId = null;
+
+    const base = { totalCount: courses.length, successCount: 0, created: 0, updated: 0, unchanged: 0, archived: 0, failed: 0 };
+
+    if (!databaseId) {
+        pages = {};
+        const db = await client.request('POST', '/v1/databases', {
+            parent: { page_id: parentPageId },
+            title: [{ text: { content: semester } }],
+            properties: DATABASE_PROPERTIES,
+        });
+        if (!db.ok) {
+            console.error("Notion DB creation failed:", db.status, db.data);
+            return { ...base, databaseId: null, warning: "Database creation failed", metadata: { parentPageId } };
+        }
+        databaseId = db.data.id as string;
+    }
+
+    const rows = toRows(courses);
+    const keep = new Set(rows.map(r => r.key));
+    const stale = Object.keys(pages).filter(key => !keep.has(key));
+    const nextPages: Record<string, NotionCoursePage> = {};
+    const counts = { ...base };
+
+    const createRow = async (row: Row) => {
+        const res = await client.request('POST', '/v1/pages', {
+            parent: { database_id: databaseId },
+            properties: row.properties,
+        });
+        if (!res.ok) throw new Error(`create ${row.key}: ${res.status}`);
+        nextPages[row.key] = { pageId: res.data.id, hash: row.hash };
+        counts.created++;
+    };
+
+    const rowResults = await mapWithConcurrency(rows, CONCURRENCY, async row => {
+        const existing = pages[row.key];
+        if (!existing) return createRow(row);
+        if (existing.hash === row.hash) {
+            nextPages[row.key] = existing;
+            counts.unchanged++;
+            return;
+        }
+        const res = await client.request('PATCH', `/v1/pages/${existing.pageId}`, { properties: row.properties });
+        // Deleted by hand in Notion: recreate it
+        if (res.status === 404) return createRow(row);
+        if (!res.ok) {
+            // Keep the old hash so the next sync retries the update
+            nextPages[row.key] = existing;
+            throw new Error(`update ${row.key}: ${res.status}`);
+        }
+        nextPages[row.key] = { pageId: existing.pageId, hash: row.hash };
+        counts.updated++;
+    });
+
+    const staleResults = await mapWithConcurrency(stale, CONCURRENCY, async key => {
+        const res = await client.request('PATCH', `/v1/pages/${pages[key].pageId}`, { archived: true });
+        if (!res.ok && res.status !== 404) throw new Error(`archive ${key}: ${res.status}`);
+        counts.archived++;
+    });
+
+    for (const r of rowResults) {
+        if (r.status === 'rejected') {
+            counts.failed++;
+            console.error("Notion row sync failed:", r.reason);
+        }
+    }
+    // Keep the mapping for rows we couldn't archive so the next sync retries them
+    staleResults.forEach((r, i) => {
+        if (r.status === 'rejected') nextPages[stale[i]] = pages[stale[i]];
+    });
+
+    semesters[semester] = { databaseId, coursePages: nextPages };
+
+    return {
+        ...counts,
+        successCount: counts.created + counts.updated + counts.unchanged,
+        databaseId,
+        metadata: { parentPageId, semesters },
+    };
+}
@@ -0,0 +1,167 @@
+import os from 'os';
+import { Worker } from 'worker_threads';
+import bcrypt from 'bcryptjs';
+
+/**
+ * bcrypt on a worker_threads pool.
+ *
+ * bcryptjs is pure JS: a cost-10 hash or compare holds the event loop for
+ * tens of milliseconds, which during a login burst stalls every other
+ * request in the process. Here each call is handed to one of a few workers.
+ * Waiting jobs are capped at MAX_QUEUE; beyond that callers get
+ * PasswordHasherBusyError right away (the login routes turn it into a 503)
+ * instead of piling up behind the pool.
+ *
+ * If workers can't be started the calls fall back to bcryptjs' async API on
+ * the main thread.
+ */
+
+const POOL_SIZE = Number(process.env.PASSWORD_WORKERS)
+    || Math.max(1, Math.min(4, (os.availableParallelism?.() ?? os.cpus().length) - 1));
+const MAX_QUEUE = Number(process.env.PASSWORD_QUEUE_LIMIT) || 64;
+
+// Evaluated as CommonJS inside the worker; resolves bcryptjs from node_modules
+// at runtime, so the bundler never has to know about a separate worker file.
+const WORKER_SOURCE = `
+const { parentPort } = require('worker_threads');
+const bcrypt = require('bcryptjs');
+parentPort.on('message', ({ id, op, password, hash, rounds }) => {
+    try {
+        const result = op === 'hash' ? bcrypt.hashSync(password, rounds) : bcrypt.compareSync(password, hash);
+        parentPort.postMessage({ id, result });
+    } catch (e) {
+        parentPort.postMessage({ id, error: String(e && e.message || e) });
+    }
+});
+`;
+
+export class PasswordHasherBusyError extends Error {
+    constructor() {
+        super('Too many logins in progress, try again shortly');
+    }
+}
+
+type Job =
+    | { op: 'hash'; password: string; rounds: number }
+    | { op: 'compare'; password: string; hash: string };
+
+interface Pending {
+    id: number;
+    job: Job;
+    resolve: (value: any) => void;
+    reject: (e: Error) => void;
+}
+
+interface PoolWorker {
+    worker: Worker;
+    current: Pending | null;
+    completed: number;
+}
+
+const workers: PoolWorker[] = [];
+const queue: Pending[] = [];
+let nextId = 0;
+let workersUnavailable = false;
+
+const counters = { hashed: 0, compared: 0, rejected: 0, workerErrors: 0, maxQueued: 0 };
+
+export function getPasswordHasherStats() {
+    return {
+        ...counters,
+        poolSize: workersUnavailable ? 0 : POOL_SIZE,
+        busy: workers.filter(w => w.current).length,
+        queued: queue.length,
+        maxQueue: MAX_QUEUE,
+    };
+}
+
+function spawn(): PoolWorker | null {
+    let worker: Worker;
+    try {
+        worker = new Worker(WORKER_SOURCE, { eval: true });
+    } catch (e) {
+        console.error("Password worker could not start, hashing on the main thread:", e);
+        workersUnavailable = true;
+        return null;
+    }
+    worker.unref();
+
+    const entry: PoolWorker = { worker, current: null, completed: 0 };
+    worker.on('message', ({ id, result, error }) => {
+        const job = entry.current;
+        entry.current = null;
+        entry.completed++;
+        if (job && job.id === id) {
+            if (error) job.reject(new Error(error));
+            else job.resolve(result);
+        }
+        dispatch();
+    });
+    worker.on('error', e => {
+        counters.workerErrors++;
+        workers.splice(workers.indexOf(entry), 1);
+        const job = entry.current;
+        entry.current = null;
+        if (entry.completed === 0) {
+            // Died before finishing anything (e.g. bcryptjs not resolvable from
+            // the worker): stop spawning and hash on the main thread instead
+            console.error("Password worker could not start, hashing on the main thread:", e);
+            workersUnavailable = true;
+            if (job) runInline(job);
+        } else {
+            console.error("Password worker failed:", e);
+            job?.reject(e instanceof Error ? e : new Error(String(e)));
+        }
+        dispatch();
+    });
+    workers.push(entry);
+    return entry;
+}
+
+function dispatch() {
+    while (queue.length > 0) {
+        let idle = workers.find(w => !w.current);
+        if (!idle && workers.length < POOL_SIZE) idle = spawn() ?? undefined;
+        if (!idle) {
+            if (workersUnavailable && workers.length === 0) {
+                // No pool at all: drain on the main thread
+                for (const p of queue.splice(0)) runInline(p);
+            }
+            return;
+        }
+        const next = queue.shift()!;
+        idle.current = next;
+        idle.worker.postMessage({ id: next.id, ...next.job });
+    }
+}
+
+function runInline({ job, resolve, reject }: Pending) {
+    const result = job.op === 'hash' ? bcrypt.hash(job.password, job.rounds) : bcrypt.compare(job.password, job.hash);
+    result.then(resolve, reject);
+}
+
+function submit<T>(job: Job): Promise<T> {
+    if (queue.length >= MAX_QUEUE) {
+        counters.rejected++;
+        return Promise.reject(new PasswordHasherBusyError());
+    }
+    return new Promise<T>((resolve, reject) => {
+        const pending = { id: nextId++, job, resolve, reject };
+        if (workersUnavailable) return runInline(pending);
+        queue.push(pending);
+        counters.maxQueued = Math.max(counters.maxQueued, queue.length);
+        dispatch();
+    });
+}
+
+export async function hashPassword(password: string, rounds = 10): Promise<string> {
+    const hash = await submit<string>({ op: 'hash', password, rounds });
+    counters.hashed++;
+    return hash;
+}
+
+export async function verifyPassword(password: string, hash: string): Promise<boolean> {
+    const ok = await submit<boolean>({ op: 'compare', password, hash });
+    counters.compared++;
+    return ok;
+}
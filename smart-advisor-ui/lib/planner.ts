@@ -0,0 +1,200 @@
+import { sql } from './db';
+import { createHash } from 'crypto';
+import { parseJson } from './database';
+import { calculateGPA, gradeToPoints, HTUGrade, SCORED_GRADES } from './grading';
+import { LRUCache } from './lru-cache';
+
+/**
+ * Planner page data in one request: the active (most recently updated)
+ * semester in full plus a compact summary of every semester.
+ *
+ * Summaries are computed with calculateGPA and cached per semester, keyed on
+ * its updated_at, so only semesters that changed since the last load have
+ * their courses read and graded again. Every semester carries a `rev` (its
+ * updated_at at microsecond precision); passing the newest one back as
+ * `since` returns only what changed after it.
+ */
+
+export interface SemesterSummary {
+    id: string;
+    name: string;
+    rev: string;
+    gpa: number;
+    /** Credit hours of every course in the semester */
+    creditHours: number;
+    courseCount: number;
+    /** Graded credit hours and quality points, for combining into a cumulative GPA */
+    gradedCredits: number;
+    qualityPoints: number;
+}
+
+export interface PlannerSemester {
+    id: string;
+    name: string;
+    rev: string;
+    courses: any[];
+    studySessions: any[];
+}
+
+export interface PlannerOverview {
+    /** Newest first; ids only, so the client can drop deleted semesters */
+    ids: string[];
+    activeId: string | null;
+    /** Left out when `since` was given and the active semester hasn't changed */
+    active?: PlannerSemester | null;
+    /** Every semester, or with `since` only the ones that changed */
+    semesters: SemesterSummary[];
+    cumulativeGPA: number;
+    /** Newest rev; send back as `since` */
+    cursor: string | null;
+    etag: string;
+}
+
+// Summaries are a few hundred bytes; this covers every active student
+const summaryCache = new LRUCache<string, SemesterSummary>(10_000);
+
+export function getSummaryCacheStats() {
+    return { size: summaryCache.size, hits: summaryCache.hits, misses: summaryCache.misses };
+}
+
+export function summarizeSemester(id: string, name: string, rev: string, courses: any[]): SemesterSummary {
+    const graded = courses
+        .filter(c => c?.grade && SCORED_GRADES.includes(c.grade as HTUGrade))
+        .map(c => ({ credits: Number(c.credits) || 0, grade: c.grade as string }));
+    const gradedCredits = graded.reduce((s, c) => s + c.credits, 0);
+    return {
+        id,
+        name: name || 'Unknown Semester',
+        rev,
+        gpa: calculateGPA(graded),
+        creditHours: courses.reduce((s, c) => s + (Number(c?.credits) || 0), 0),
+        courseCount: courses.length,
+        gradedCredits,
+        qualityPoints: graded.reduce((s, c) => s + c.credits * gradeToPoints(c.grade), 0),
+    };
+}
+
+/** Same rounding as calculateGPA, over the union of all semesters */
+function cumulativeGPA(summaries: SemesterSummary[]): number {
+    const credits = summaries.reduce((s, x) => s + x.gradedCredits, 0);
+    if (credits === 0) return 0;
+    const points = summaries.reduce((s, x) => s + x.qualityPoints, 0);
+    return Math.round((points / credits) * 100) / 100;
+}
+
+export interface PlannerHeads {
+    /** id, name and rev of every semester, newest first */
+    heads: { id: string; name: string; rev: string }[];
+    etag: string;
+}
+
+/**
+ * The cheap first half of an overview: enough to answer If-None-Match
+ * without reading any semester's courses.
+ */
+export async function getPlannerHeads(studentId: string): Promise<PlannerHeads> {
+    // Walks idx_planner_student_updated; no JSON is read here
+    const { rows } = await sql`
+        SELECT id, name, to_char(updated_at, 'YYYY-MM-DD"T"HH24:MI:SS.US') AS rev
+        FROM planner_semesters
+        WHERE student_id = ${studentId}
+        ORDER BY updated_at DESC, id
+    `;
+    const heads = rows.map(r => ({ id: r.id as string, name: r.name as string, rev: r.rev as string }));
+    const etag = `"${createHash('sha1').update(heads.map(h => `${h.id}@${h.rev}`).join(',')).digest('hex').slice(0, 27)}"`;
+    return { heads, etag };
+}
+
+export async function getPlannerOverview(
+    studentId: string,
+    since?: string | null,
+    planner?: PlannerHeads
+): Promise<PlannerOverview> {
+    const { heads, etag } = planner ?? await getPlannerHeads(studentId);
+    const ids = heads.map(h => h.id);
+    const activeId = ids[0] ?? null;
+
+    const summaries = new Map<string, SemesterSummary>();
+    const stale: string[] = [];
+    for (const h of heads) {
+        const cached = summaryCache.get(h.id);
+        if (cached?.rev === h.rev) summaries.set(h.id, cached);
+        else stale.push(h.id);
+    }
+
+    const includeActive = !since || (!!activeId && heads[0].rev > since);
+    const toRead = new Set(stale);
+    if (includeActive && activeId) toRead.add(activeId);
+
+    let active: PlannerSemester | null = null;
+    if (toRead.size > 0) {
+        const { rows } = await sql`
+            SELECT
+                id,
+                name,
+                to_char(updated_at, 'YYYY-MM-DD"T"HH24:MI:SS.US') AS rev,
+                COALESCE(courses_jsonb, try_jsonb(courses, '[]')) AS courses,
+                CASE WHEN id = ${activeId}
+                    THEN COALESCE(study_sessions_jsonb, try_jsonb(study_sessions, '[]'))
+                END AS study_sessions
+            FROM planner_semesters
+            WHERE student_id = ${studentId} AND id = ANY(${Array.from(toRead)}::text[])
+        `;
+        for (const r of rows) {
+            const courses = parseJson<any[]>(r.courses, []);
+            const summary = summarizeSemester(r.id, r.name, r.rev, courses);
+            summaries.set(r.id, summary);
+            summaryCache.set(r.id, summary);
+            if (r.id === activeId) {
+                active = { id: r.id, name: r.name, rev: r.rev, courses, studySessions: parseJson(r.study_sessions, []) };
+            }
+        }
+    }
+
+    // A semester deleted between the two queries is left out
+    const ordered = ids.map(id => summaries.get(id)).filter((s): s is SemesterSummary => !!s);
+
+    const overview: PlannerOverview = {
+        ids,
+        activeId,
+        semesters: since ? ordered.filter(s => s.rev > since) : ordered,
+        cumulativeGPA: cumulativeGPA(ordered),
+        cursor: heads.reduce<string | null>((max, h) => (!max || h.rev > max ? h.rev : max), null),
+        etag,
+    };
+    if (includeActive) overview.active = active;
+    return overview;
+}
+
+/** One semester in full, for loading history on demand */
+export async function loadSemester(studentId: string, semesterId: string): Promise<PlannerSemester | null> {
+    const { rows } = await sql`
+        SELECT
+            id,
+            name,
+            to_char(updated_at, 'YYYY-MM-DD"T"HH24:MI:SS.US') AS rev,
+            COALESCE(courses_jsonb, try_jsonb(courses, '[]')) AS courses,
+            COALESCE(study_sessions_jsonb, try_jsonb(study_sessions, '[]')) AS study_sessions
+        FROM planner_semesters
+        WHERE student_id = ${studentId} AND id = ${semesterId}
+    `;
+    if (rows.length === 0) return null;
+    return {
+        id: rows[0].id,
+        name: rows[0].name,
+        rev: rows[0].rev,
+        courses: parseJson(rows[0].courses, []),
+        studySessions: parseJson(rows[0].study_sessions, []),
+    };
+}
+
+/** Every course of every semester, for the what-if solver */
+export async function loadPlannerCourses(studentId: string): Promise<any[]> {
+    const { rows } = await sql`
+        SELECT COALESCE(courses_jsonb, try_jsonb(courses, '[]')) AS courses
+        FROM planner_semesters
+        WHERE student_id = ${studentId}
+        ORDER BY updated_at, id
+    `;
+    return rows.flatMap(r => parseJson<any[]>(r.courses, []));
+}
@@ -0,0 +1,379 @@
+import { Course } from '@/types';
+
+/**
+ * Prerequisite rule engine.
+ *
+ * Each course's free-text `prereq` is parsed ONCE per curriculum load into a
+ * small AST, using the `logic_rules.prerequisites` config from
+ * curriculum_rules.json. Evaluating the AST against a completed-course bitmap
+ * allocates nothing, and a reverse-dependency index tells callers which
+ * courses need re-evaluating after a single toggle.
+ */
+
+export interface PrereqRules {
+    code_regex: string;
+    separators: { and: string[]; or: string[] };
+    stripping?: { leading_zeros_if_length?: number; target_length?: number };
+    auto_satisfy_external?: boolean;
+}
+
+export const DEFAULT_PREREQ_RULES: PrereqRules = {
+    code_regex: "\\b\\d{6,10}\\b",
+    separators: { and: ["AND", "&"], or: ["OR"] },
+    auto_satisfy_external: true,
+};
+
+export interface CourseNode { kind: 'course'; code: string; index: number }
+
+export type PrereqNode =
+    | { kind: 'all'; children: PrereqNode[] }
+    | { kind: 'any'; children: PrereqNode[] }
+    | CourseNode
+    | { kind: 'credits'; min: number }
+    | { kind: 'approval' };
+
+export interface PrereqResult {
+    isLocked: boolean;
+    missing: string[];
+    lockReason?: string;
+}
+
+const UNLOCKED: PrereqResult = Object.freeze({ isLocked: false, missing: [] }) as PrereqResult;
+
+// ">= 85", "90 CH", "100 hrs completed", "90 credit hours completed"
+const HOURS_RE = /(?:>=\s*)(\d+)|(\d+)\s*(?:HRS|HOURS?|CH|CREDITS?)/;
+const HOURS_STRIP_RE = /(?:>=\s*\d+)|(?:\d+\s*(?:HRS|HOURS?|CH|CREDITS?))|(?:\d+\s*INCLUDING[^)]*)/gi;
+
+function escapeRegex(s: string): string {
+    return s.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+}
+
+/** Per-rules-object compiled regexes, so they're built once and not per token */
+interface RuleMatchers {
+    code: RegExp;
+    and: RegExp;
+    or: RegExp;
+    stripLength?: number;
+}
+
+const matcherCache = new WeakMap<PrereqRules, RuleMatchers>();
+
+function matchersFor(rules: PrereqRules): RuleMatchers {
+    let m = matcherCache.get(rules);
+    if (!m) {
+        const sep = (words: string[]) =>
+            new RegExp(`\\s*(?:${words.map(w => /^\w+$/.test(w) ? `\\b${w}\\b` : escapeRegex(w)).join('|')})\\s*`, 'i');
+        m = {
+            code: new RegExp(rules.code_regex, 'g'),
+            and: sep(rules.separators.and),
+            or: sep(rules.separators.or),
+            stripLength: rules.stripping?.leading_zeros_if_length,
+        };
+        matcherCache.set(rules, m);
+    }
+    return m;
+}
+
+function stripCode(code: string, m: RuleMatchers): string {
+    if (m.stripLength && code.length === m.stripLength && code.startsWith('00')) return code.substring(2);
+    return code;
+}
+
+/**
+ * Parse one prereq string into an AST (null = no prerequisites).
+ * @param lookup  Maps a course code to its bitmap index, or -1 if the code is
+ *                outside the curriculum. External codes are dropped when the
+ *                rules auto-satisfy them, otherwise they can never be met.
+ */
+export function compilePrereq(
+    prereq: string | undefined,
+    rules: PrereqRules = DEFAULT_PREREQ_RULES,
+    lookup: (code: string) => number = () => -1
+): PrereqNode | null {
+    if (!prereq || prereq.trim() === '') return null;
+
+    const text = prereq.toUpperCase().trim();
+    if (text.includes('APPROVAL')) return { kind: 'approval' };
+
+    const m = matchersFor(rules);
+    const autoSatisfy = rules.auto_satisfy_external !== false;
+    const parts: PrereqNode[] = [];
+
+    const hours = text.match(HOURS_RE);
+    if (hours) parts.push({ kind: 'credits', min: parseInt(hours[1] || hours[2], 10) });
+
+    const codeOnly = text.replace(HOURS_STRIP_RE, '').trim();
+
+    // OR binds loosest; within an option every code listed is required
+    const options: PrereqNode[] = [];
+    for (const option of codeOnly.split(m.or)) {
+        const required: PrereqNode[] = [];
+        for (const term of option.split(m.and)) {
+            for (const match of term.matchAll(m.code)) {
+                const code = stripCode(match[0], m);
+                const index = lookup(code);
+                if (index < 0 && autoSatisfy) continue;
+                required.push({ kind: 'course', code, index });
+            }
+        }
+        if (required.length > 0) options.push(required.length === 1 ? required[0] : { kind: 'all', children: required });
+    }
+
+    if (options.length === 1) parts.push(options[0]);
+    else if (options.length > 1) parts.push({ kind: 'any', children: options });
+
+    if (parts.length === 0) return null;
+    return parts.length === 1 ? parts[0] : { kind: 'all', children: parts };
+}
+
+/** Allocation-free check of a rule against a completed bitmap. */
+export function isSatisfied(node: PrereqNode, completed: Uint8Array, credits: number): boolean {
+    switch (node.kind) {
+        case 'course':
+            return node.index >= 0 && completed[node.index] === 1;
+        case 'credits':
+            return credits >= node.min;
+        case 'approval':
+            return false;
+        case 'all':
+            for (let i = 0; i < node.children.length; i++) {
+                if (!isSatisfied(node.children[i], completed, credits)) return false;
+            }
+            return true;
+        case 'any':
+            for (let i = 0; i < node.children.length; i++) {
+                if (isSatisfied(node.children[i], completed, credits)) return true;
+            }
+            return false;
+    }
+}
+
+function satisfiedBy(node: PrereqNode, has: (n: CourseNode) => boolean, credits: number): boolean {
+    switch (node.kind) {
+        case 'course': return has(node);
+        case 'credits': return credits >= node.min;
+        case 'approval': return false;
+        case 'all': return node.children.every(c => satisfiedBy(c, has, credits));
+        case 'any': return node.children.some(c => satisfiedBy(c, has, credits));
+    }
+}
+
+function collectMissing(node: PrereqNode, has: (n: CourseNode) => boolean, credits: number, out: string[]) {
+    if (satisfiedBy(node, has, credits)) return;
+    if (node.kind === 'course') out.push(node.code);
+    else if (node.kind === 'all' || node.kind === 'any') {
+        for (const child of node.children) collectMissing(child, has, credits, out);
+    }
+}
+
+/** The first credit-hour threshold in `node` that `credits` doesn't reach, or null */
+export function unmetCredits(node: PrereqNode, credits: number): number | null {
+    if (node.kind === 'credits') return credits < node.min ? node.min : null;
+    if (node.kind === 'all' || node.kind === 'any') {
+        for (const child of node.children) {
+            const min = unmetCredits(child, credits);
+            if (min !== null) return min;
+        }
+    }
+    return null;
+}
+
+/** Codes that would still have to be completed for `node` to pass */
+export function missingCodes(node: PrereqNode, has: (n: CourseNode) => boolean, credits: number): string[] {
+    const out: string[] = [];
+    collectMissing(node, has, credits, out);
+    return out;
+}
+
+/** Build the user-facing lock result. Only allocates when the rule is unmet. */
+export function explain(
+    node: PrereqNode | null,
+    has: (n: CourseNode) => boolean,
+    credits: number
+): PrereqResult {
+    if (!node || satisfiedBy(node, has, credits)) return UNLOCKED;
+
+    if (node.kind === 'approval') {
+        return { isLocked: true, missing: [], lockReason: 'Requires Department Approval' };
+    }
+    const requiredCH = unmetCredits(node, credits);
+    if (requiredCH !== null) {
+        return {
+            isLocked: true,
+            missing: [],
+            lockReason: `Requires ${requiredCH} CH completed (you have ${credits} CH)`,
+        };
+    }
+
+    return { isLocked: true, missing: missingCodes(node, has, credits) };
+}
+
+// ─── Whole-curriculum compilation ───────────────────────────────────────────
+
+export interface CompiledPrereqs {
+    /** Bitmap index → course code (unique codes, in curriculum order) */
+    codes: string[];
+    indexOf: Map<string, number>;
+    /** Bitmap index → compiled rule (null = no prerequisites) */
+    rules: (PrereqNode | null)[];
+    /** Bitmap index → indices of courses whose rule mentions it */
+    dependents: number[][];
+    /** Indices of courses with a credit-hour threshold somewhere in their rule */
+    creditGated: number[];
+}
+
+function collectCourseRefs(node: PrereqNode, out: Set<number>) {
+    if (node.kind === 'course') { if (node.index >= 0) out.add(node.index); }
+    else if (node.kind === 'all' || node.kind === 'any') {
+        for (const child of node.children) collectCourseRefs(child, out);
+    }
+}
+
+function hasCredits(node: PrereqNode): boolean {
+    if (node.kind === 'credits') return true;
+    if (node.kind === 'all' || node.kind === 'any') return node.children.some(hasCredits);
+    return false;
+}
+
+export function compilePrerequisites(courses: Course[], rules: PrereqRules = DEFAULT_PREREQ_RULES): CompiledPrereqs {
+    const codes: string[] = [];
+    const indexOf = new Map<string, number>();
+    const sources: (string | undefined)[] = [];
+
+    for (const course of courses) {
+        if (indexOf.has(course.code)) continue;
+        indexOf.set(course.code, codes.length);
+        codes.push(course.code);
+        sources.push(course.prereq);
+    }
+
+    const lookup = (code: string) => indexOf.get(code) ?? -1;
+    const compiledRules = sources.map(src => compilePrereq(src, rules, lookup));
+    const dependents: number[][] = codes.map(() => []);
+    const creditGated: number[] = [];
+
+    compiledRules.forEach((rule, i) => {
+        if (!rule) return;
+        const refs = new Set<number>();
+        collectCourseRefs(rule, refs);
+        for (const ref of refs) dependents[ref].push(i);
+        if (hasCredits(rule)) creditGated.push(i);
+    });
+
+    return { codes, indexOf, rules: compiledRules, dependents, creditGated };
+}
+
+/** Fill a bitmap (reused if given) from a set of completed codes. */
+export function toBitmap(compiled: CompiledPrereqs, completed: Iterable<string>, into?: Uint8Array): Uint8Array {
+    const bitmap = into && into.length === compiled.codes.length ? into : new Uint8Array(compiled.codes.length);
+    bitmap.fill(0);
+    for (const code of completed) {
+        const i = compiled.indexOf.get(code);
+        if (i !== undefined) bitmap[i] = 1;
+    }
+    return bitmap;
+}
+
+function lockFor(compiled: CompiledPrereqs, i: number, bitmap: Uint8Array, credits: number): PrereqResult {
+    const rule = compiled.rules[i];
+    if (!rule || isSatisfied(rule, bitmap, credits)) return UNLOCKED;
+    return explain(rule, n => n.index >= 0 && bitmap[n.index] === 1, credits);
+}
+
+/** Lock state of every course, indexed like `compiled.codes`. */
+export function evaluateAll(compiled: CompiledPrereqs, bitmap: Uint8Array, credits: number): PrereqResult[] {
+    const out = new Array<PrereqResult>(compiled.codes.length);
+    for (let i = 0; i < out.length; i++) out[i] = lockFor(compiled, i, bitmap, credits);
+    return out;
+}
+
+/**
+ * Recompute only the courses a change can affect: dependents of each toggled
+ * code, plus credit-gated courses when the completed CH total moved.
+ * Returns `previous` untouched when nothing changed.
+ */
+export function updateLocks(
+    compiled: CompiledPrereqs,
+    previous: PrereqResult[],
+    bitmap: Uint8Array,
+    credits: number,
+    toggled: Iterable<string>,
+    creditsChanged: boolean
+): PrereqResult[] {
+    let next: PrereqResult[] | null = null;
+    const recompute = (i: number) => {
+        const result = lockFor(compiled, i, bitmap, credits);
+        if (result === previous[i]) return;
+        if (!next) next = previous.slice();
+        next[i] = result;
+    };
+
+    for (const code of toggled) {
+        const i = compiled.indexOf.get(code);
+        if (i === undefined) continue;
+        for (const dep of compiled.dependents[i]) recompute(dep);
+    }
+    if (creditsChanged) {
+        for (const i of compiled.creditGated) recompute(i);
+    }
+    return next ?? previous;
+}
+
+/**
+ * Keeps a bitmap and lock array in step with a changing completed set,
+ * re-evaluating only what each change can affect.
+ */
+export class PrereqTracker {
+    private bitmap: Uint8Array;
+    private completed: Set<string> = new Set();
+    private credits = -1;
+    private locks: PrereqResult[] | null = null;
+
+    constructor(readonly compiled: CompiledPrereqs) {
+        this.bitmap = new Uint8Array(compiled.codes.length);
+    }
+
+    update(completed: Set<string>, credits: number): PrereqResult[] {
+        if (!this.locks) {
+            toBitmap(this.compiled, completed, this.bitmap);
+            this.locks = evaluateAll(this.compiled, this.bitmap, credits);
+        } else {
+            const toggled: string[] = [];
+            for (const code of completed) if (!this.completed.has(code)) toggled.push(code);
+            for (const code of this.completed) if (!completed.has(code)) toggled.push(code);
+            for (const code of toggled) {
+                const i = this.compiled.indexOf.get(code);
+                if (i !== undefined) this.bitmap[i] = completed.has(code) ? 1 : 0;
+            }
+            this.locks = updateLocks(this.compiled, this.locks, this.bitmap, credits, toggled, credits !== this.credits);
+        }
+        this.completed = completed;
+        this.credits = credits;
+        return this.locks;
+    }
+}
+
+/**
+ * Kahn's algorithm over the prereq → dependent edges. Courses caught in a
+ * cycle (bad data) are appended at the end in curriculum order.
+ */
+export function topologicalOrder(compiled: CompiledPrereqs): number[] {
+    const n = compiled.codes.length;
+    const indegree = new Uint16Array(n);
+    for (const deps of compiled.dependents) {
+        for (const d of deps) indegree[d]++;
+    }
+
+    const order: number[] = [];
+    for (let i = 0; i < n; i++) if (indegree[i] === 0) order.push(i);
+    for (let head = 0; head < order.length; head++) {
+        for (const d of compiled.dependents[order[head]]) {
+            if (--indegree[d] === 0) order.push(d);
+        }
+    }
+
+    if (order.length < n) {
+        for (let i = 0; i < n; i++) if (indegree[i] > 0) order.push(i);
+    }
+    return order;
+}
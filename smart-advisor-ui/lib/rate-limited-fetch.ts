@@ -0,0 +1,142 @@
+/**
+ * Helpers for talking to third-party APIs (Notion, Google Calendar) that
+ * enforce request-rate limits: a request-spacing limiter, fetch with
+ * retry/backoff on 429 and 5xx, a bounded-concurrency map, and a per-key
+ * lock so one student's syncs don't overlap.
+ */
+
+/** Spaces request starts at least `1000 / ratePerSecond` ms apart */
+export class RateLimiter {
+    private nextAt = 0;
+    private readonly intervalMs: number;
+
+    constructor(ratePerSecond: number) {
+        this.intervalMs = 1000 / ratePerSecond;
+    }
+
+    /** Resolves when the caller may start its request */
+    async acquire(): Promise<void> {
+        const now = Date.now();
+        const at = Math.max(now, this.nextAt);
+        this.nextAt = at + this.intervalMs;
+        if (at > now) await sleep(at - now);
+    }
+
+    /** Push every caller back, e.g. after the server answered 429 with Retry-After */
+    pause(ms: number): void {
+        this.nextAt = Math.max(this.nextAt, Date.now() + ms);
+    }
+}
+
+export interface RetryOptions {
+    limiter?: RateLimiter;
+    /** Retries after the first attempt */
+    retries?: number;
+    baseDelayMs?: number;
+    maxDelayMs?: number;
+    /** Statuses worth retrying besides 429 and 5xx */
+    retryOn?: number[];
+    /**
+     * false for requests that create something (e.g. POST a new page): only
+     * 429 is retried, since after a 5xx or a dropped connection the server
+     * may already have acted on the request and a retry would duplicate it
+     */
+    idempotent?: boolean;
+}
+
+export function sleep(ms: number): Promise<void> {
+    return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+/** Retry-After in ms (delta-seconds or HTTP date), or null */
+function retryAfterMs(res: Response): number | null {
+    const header = res.headers.get('retry-after');
+    if (!header) return null;
+    const seconds = Number(header);
+    if (!isNaN(seconds)) return seconds * 1000;
+    const date = Date.parse(header);
+    return isNaN(date) ? null : Math.max(date - Date.now(), 0);
+}
+
+/**
+ * fetch() that waits its turn on `limiter` and retries 429, 5xx and network
+ * errors (only 429 when `idempotent` is false) with exponential backoff and
+ * full jitter, honouring Retry-After.
+ * The last response (or error) is returned (or thrown) when retries run out.
+ */
+export async function fetchWithRetry(url: string, init: RequestInit, options: RetryOptions = {}): Promise<Response> {
+    const { limiter, retries = 4, baseDelayMs = 500, maxDelayMs = 8000, retryOn = [], idempotent = true } = options;
+
+    for (let attempt = 0; ; attempt++) {
+        await limiter?.acquire();
+        const backoff = Math.random() * Math.min(maxDelayMs, baseDelayMs * 2 ** attempt);
+
+        let res: Response;
+        try {
+            res = await fetch(url, init);
+        } catch (e) {
+            if (!idempotent || attempt >= retries) throw e;
+            await sleep(backoff);
+            continue;
+        }
+
+        const retryable = res.status === 429
+            || (idempotent && (res.status >= 500 || retryOn.includes(res.status)));
+        if (!retryable || attempt >= retries) return res;
+
+        const wait = retryAfterMs(res) ?? backoff;
+        // Drain the body so the connection can be reused
+        await res.arrayBuffer().catch(() => { });
+        if (res.status === 429 && limiter) {
+            // Hold back every request sharing the limiter; the next acquire() waits it out
+            limiter.pause(wait);
+        } else {
+            await sleep(wait);
+        }
+    }
+}
+
+/**
+ * Like Promise.allSettled(items.map(worker)) but with at most `concurrency`
+ * workers in flight. Results keep the input order.
+ */
+export async function mapWithConcurrency<T, R>(
+    items: readonly T[],
+    concurrency: number,
+    worker: (item: T, index: number) => Promise<R>
+): Promise<PromiseSettledResult<R>[]> {
+    const results: PromiseSettledResult<R>[] = new Array(items.length);
+    let next = 0;
+
+    const run = async () => {
+        while (next < items.length) {
+            const i = next++;
+            try {
+                results[i] = { status: 'fulfilled', value: await worker(items[i], i) };
+            } catch (reason) {
+                results[i] = { status: 'rejected', reason };
+            }
+        }
+    };
+
+    await Promise.all(Array.from({ length: Math.min(concurrency, items.length) }, run));
+    return results;
+}
+
+const locks = new Map<string, Promise<unknown>>();
+
+/**
+ * Run `fn` after any other `fn` holding the same key has finished, e.g. one
+ * integration sync per student so two clicks can't both create the same
+ * remote objects. Load and save the sync state inside `fn`.
+ */
+export async function withKeyLock<T>(key: string, fn: () => Promise<T>): Promise<T> {
+    const previous = locks.get(key) ?? Promise.resolve();
+    const current = previous.catch(() => { }).then(fn);
+    locks.set(key, current);
+    try {
+        return await current;
+    } finally {
+        if (locks.get(key) === current) locks.delete(key);
+    }
+}
@@ -0,0 +1,391 @@
+import { computeCompletedCredits, MajorGraph } from './advisor';
+import { PrereqNode, toBitmap } from './prerequisites';
+
+/**
+ * Degree-plan scheduler: lays the courses a student still needs into
+ * semesters under a per-semester credit-hour cap.
+ *
+ * 1. Requirements: every mandatory course not yet completed, plus enough of
+ *    the cheapest reachable electives to fill the `degree_types` caps, plus
+ *    any prerequisite those pull in (for an OR rule, the cheapest option).
+ * 2. Critical path: each course's earliest possible semester (prerequisite
+ *    depth and credit-hour gates) and tail (longest chain of courses that
+ *    hard-depend on it). Their sum, and remaining CH / cap, bound the plan
+ *    from below.
+ * 3. Layering: semester by semester, take the ready courses with the longest
+ *    tail first until the cap is reached. The degree's `level_count` splits
+ *    its credit hours into years of standing; a course is held back until the
+ *    student is at most one level below it, unless nothing else is ready.
+ *    Course levels above `level_count` are read as the final level.
+ *
+ * List scheduling isn't guaranteed optimal, so the plan reports `lowerBound`;
+ * when `semesters.length === lowerBound` the plan is provably the shortest.
+ * The per-major preparation is cached on the graph, so a plan for the largest
+ * major takes well under a millisecond and can be recomputed on every toggle.
+ */
+
+export const DEFAULT_MAX_CREDITS = 18;
+export const MIN_MAX_CREDITS = 3;
+export const MAX_MAX_CREDITS = 30;
+// Stops a pathological cap/curriculum combination from looping forever
+const MAX_SEMESTERS = 40;
+
+const MANDATORY = 0;
+const UNI_ELECTIVE = 1;
+const DEPT_ELECTIVE = 2;
+
+export interface PlannedCourse {
+    code: string;
+    name: string;
+    ch: number;
+    level: number;
+}
+
+export interface PlannedSemester {
+    /** 1-based, counting from the next semester */
+    index: number;
+    /** Student's level (year of standing) when the semester starts, 1..levelCount */
+    level: number;
+    credits: number;
+    courses: PlannedCourse[];
+}
+
+export interface DegreePlan {
+    maxCredits: number;
+    totalCredits: number;
+    /** `level_count` of the degree */
+    levelCount: number;
+    completedCredits: number;
+    plannedCredits: number;
+    semesters: PlannedSemester[];
+    /** No plan can be shorter than this */
+    lowerBound: number;
+    /** Longest chain of prerequisites left, first course first */
+    criticalPath: string[];
+    /** Electives picked to fill the caps */
+    electives: string[];
+    /** Scheduled on the assumption that department approval is granted */
+    needsApproval: string[];
+    /** Required but blocked by a prerequisite outside the curriculum */
+    unschedulable: { code: string; name: string; reason: string }[];
+    /** CH still missing after every planned course (catalog totals short of the degree) */
+    shortfallCredits: number;
+}
+
+interface PreparedGraph {
+    kind: Uint8Array;
+    ch: Uint8Array;
+    /** Course level, clamped to 1..levelCount */
+    level: Uint8Array;
+    levelCount: number;
+    /** Course refs required through AND only: these order every plan */
+    hardDependents: number[][];
+    /** The rule can be met at all (no required course outside the curriculum) */
+    reachable: Uint8Array;
+}
+
+const prepared = new WeakMap<MajorGraph, PreparedGraph>();
+
+function collectHardRefs(node: PrereqNode, out: Set<number>) {
+    if (node.kind === 'course') { if (node.index >= 0) out.add(node.index); }
+    else if (node.kind === 'all') for (const child of node.children) collectHardRefs(child, out);
+}
+
+function canBeMet(node: PrereqNode): boolean {
+    switch (node.kind) {
+        case 'course': return node.index >= 0;
+        case 'credits':
+        case 'approval': return true;
+        case 'all': return node.children.every(canBeMet);
+        case 'any': return node.children.some(canBeMet);
+    }
+}
+
+function hasApproval(node: PrereqNode): boolean {
+    if (node.kind === 'approval') return true;
+    if (node.kind === 'all' || node.kind === 'any') return node.children.some(hasApproval);
+    return false;
+}
+
+function prepare(graph: MajorGraph): PreparedGraph {
+    let p = prepared.get(graph);
+    if (p) return p;
+
+    const { compiled, courses, data } = graph;
+    const n = compiled.codes.length;
+    const kind = new Uint8Array(n);
+    for (const c of data.university_electives ?? []) kind[compiled.indexOf.get(c.code)!] = UNI_ELECTIVE;
+    for (const c of data.electives) kind[compiled.indexOf.get(c.code)!] = DEPT_ELECTIVE;
+    // A code listed as both required and elective is required
+    for (const c of [
+        ...data.university_requirements, ...data.college_requirements,
+        ...data.department_requirements, ...(data.work_market_requirements ?? []),
+    ]) kind[compiled.indexOf.get(c.code)!] = MANDATORY;
+
+    const ch = new Uint8Array(n);
+    const level = new Uint8Array(n);
+    const levelCount = Math.max(1, graph.ruleSet.level_count || 1);
+    const reachable = new Uint8Array(n);
+    const hardDependents: number[][] = courses.map(() => []);
+    for (let i = 0; i < n; i++) {
+        ch[i] = courses[i].ch ?? 3;
+        level[i] = Math.min(Math.max(courses[i].level ?? 1, 1), levelCount);
+        const rule = compiled.rules[i];
+        reachable[i] = !rule || graph.softLocked[i] === 1 || canBeMet(rule) ? 1 : 0;
+        if (rule && graph.softLocked[i] !== 1) {
+            const refs = new Set<number>();
+            collectHardRefs(rule, refs);
+            for (const ref of refs) hardDependents[ref].push(i);
+        }
+    }
+
+    p = { kind, ch, level, levelCount, hardDependents, reachable };
+    prepared.set(graph, p);
+    return p;
+}
+
+/** Ready to take, given `done` courses and `credits` CH. Approval is assumed granted. */
+function ready(node: PrereqNode, done: Uint8Array, credits: number): boolean {
+    switch (node.kind) {
+        case 'course': return node.index >= 0 && done[node.index] === 1;
+        case 'credits': return credits >= node.min;
+        case 'approval': return true;
+        case 'all':
+            for (const child of node.children) if (!ready(child, done, credits)) return false;
+            return true;
+        case 'any':
+            for (const child of node.children) if (ready(child, done, credits)) return true;
+            return false;
+    }
+}
+
+/** Courses still to add for `node` to pass (rough: ignores transitive prerequisites) */
+function unmetCount(node: PrereqNode, have: Uint8Array): number {
+    switch (node.kind) {
+        case 'course': return node.index >= 0 && have[node.index] === 1 ? 0 : 1;
+        case 'credits':
+        case 'approval': return 0;
+        case 'all': {
+            let sum = 0;
+            for (const child of node.children) sum += unmetCount(child, have);
+            return sum;
+        }
+        case 'any': {
+            let best = Infinity;
+            for (const child of node.children) if (canBeMet(child)) best = Math.min(best, unmetCount(child, have));
+            return best;
+        }
+    }
+}
+
+/** Mark the courses `node` still needs, choosing the cheapest option of each OR */
+function requirePrereqs(node: PrereqNode, have: Uint8Array, needed: Uint8Array, queue: number[]) {
+    switch (node.kind) {
+        case 'course':
+            if (node.index >= 0 && have[node.index] === 0) {
+                have[node.index] = 1;
+                needed[node.index] = 1;
+                queue.push(node.index);
+            }
+            return;
+        case 'all':
+            for (const child of node.children) requirePrereqs(child, have, needed, queue);
+            return;
+        case 'any': {
+            let best: PrereqNode | null = null;
+            let bestCost = Infinity;
+            for (const child of node.children) {
+                if (!canBeMet(child)) continue;
+                const cost = unmetCount(child, have);
+                if (cost < bestCost) { best = child; bestCost = cost; }
+            }
+            if (best && bestCost > 0) requirePrereqs(best, have, needed, queue);
+            return;
+        }
+    }
+}
+
+/** Earliest semester (1-based) in which `node` can be satisfied */
+function earliestFor(node: PrereqNode, earliest: Int16Array, needed: Uint8Array, credits: number, maxCredits: number): number {
+    switch (node.kind) {
+        case 'course':
+            return node.index >= 0 && needed[node.index] === 1 ? earliest[node.index] + 1 : 1;
+        case 'credits':
+            return node.min <= credits ? 1 : 1 + Math.ceil((node.min - credits) / maxCredits);
+        case 'approval':
+            return 1;
+        case 'all': {
+            let e = 1;
+            for (const child of node.children) e = Math.max(e, earliestFor(child, earliest, needed, credits, maxCredits));
+            return e;
+        }
+        case 'any': {
+            let e = Infinity;
+            for (const child of node.children) {
+                if (canBeMet(child)) e = Math.min(e, earliestFor(child, earliest, needed, credits, maxCredits));
+            }
+            return e === Infinity ? 1 : e;
+        }
+    }
+}
+
+/** Year of standing reached with `credits` CH: total CH split evenly over the levels */
+function standing(credits: number, totalCredits: number, levelCount: number): number {
+    if (totalCredits <= 0) return levelCount;
+    return Math.min(levelCount, 1 + Math.floor((credits * levelCount) / totalCredits));
+}
+
+export function planDegree(graph: MajorGraph, completed: Iterable<string>, maxCredits = DEFAULT_MAX_CREDITS): DegreePlan {
+    const p = prepare(graph);
+    const { compiled, courses, ruleSet } = graph;
+    const n = compiled.codes.length;
+
+    const completedSet = completed instanceof Set ? completed as Set<string> : new Set(completed);
+    const done = toBitmap(compiled, completedSet);
+    const completedCredits = computeCompletedCredits(graph.data, completedSet, ruleSet);
+
+    // ── 1. What is still required ────────────────────────────────────
+    const needed = new Uint8Array(n);
+    const have = done.slice();
+    const unschedulable: DegreePlan['unschedulable'] = [];
+    const doneElectives = [0, 0, 0];
+    for (let i = 0; i < n; i++) {
+        if (done[i] === 1) doneElectives[p.kind[i]]++;
+        else if (p.kind[i] === MANDATORY) {
+            if (p.reachable[i]) { needed[i] = 1; have[i] = 1; }
+            else unschedulable.push({ code: courses[i].code, name: courses[i].name, reason: 'Prerequisite is not offered in this curriculum' });
+        }
+    }
+
+    const electives: string[] = [];
+    const slots = [0, ruleSet.max_uni_electives - doneElectives[UNI_ELECTIVE], ruleSet.max_dept_electives - doneElectives[DEPT_ELECTIVE]];
+    for (const k of [UNI_ELECTIVE, DEPT_ELECTIVE]) {
+        if (slots[k] <= 0) continue;
+        const candidates: number[] = [];
+        for (let i = 0; i < n; i++) if (p.kind[i] === k && done[i] === 0 && p.reachable[i]) candidates.push(i);
+        const cost = (i: number) => (compiled.rules[i] && !graph.softLocked[i] ? unmetCount(compiled.rules[i]!, have) : 0);
+        candidates.sort((a, b) => cost(a) - cost(b) || p.level[a] - p.level[b] || a - b);
+        for (const i of candidates.slice(0, slots[k])) {
+            needed[i] = 1;
+            have[i] = 1;
+            electives.push(courses[i].code);
+        }
+    }
+
+    const queue: number[] = [];
+    for (let i = 0; i < n; i++) if (needed[i]) queue.push(i);
+    while (queue.length > 0) {
+        const i = queue.pop()!;
+        const rule = compiled.rules[i];
+        if (rule && graph.softLocked[i] !== 1) requirePrereqs(rule, have, needed, queue);
+    }
+
+    // ── 2. Critical path ─────────────────────────────────────────────
+    const earliest = new Int16Array(n);
+    const tail = new Int16Array(n);
+    let remainingCH = 0;
+    for (const i of graph.order) {
+        if (!needed[i]) continue;
+        remainingCH += p.ch[i];
+        const rule = compiled.rules[i];
+        earliest[i] = rule && graph.softLocked[i] !== 1 ? earliestFor(rule, earliest, needed, completedCredits, maxCredits) : 1;
+    }
+    for (let k = graph.order.length - 1; k >= 0; k--) {
+        const i = graph.order[k];
+        if (!needed[i]) continue;
+        let longest = 0;
+        for (const d of p.hardDependents[i]) if (needed[d]) longest = Math.max(longest, tail[d]);
+        tail[i] = longest + 1;
+    }
+
+    let lowerBound = remainingCH > 0 ? Math.ceil(remainingCH / maxCredits) : 0;
+    let head = -1;
+    for (let i = 0; i < n; i++) {
+        if (!needed[i]) continue;
+        lowerBound = Math.max(lowerBound, earliest[i] + tail[i] - 1);
+        if (head < 0 || tail[i] > tail[head]) head = i;
+    }
+    const criticalPath: string[] = [];
+    for (let i = head; i >= 0;) {
+        criticalPath.push(courses[i].code);
+        const next: number = p.hardDependents[i].find(d => needed[d] && tail[d] === tail[i] - 1) ?? -1;
+        i = next;
+    }
+
+    // ── 3. Layering ──────────────────────────────────────────────────
+    const pending: number[] = [];
+    for (let i = 0; i < n; i++) if (needed[i]) pending.push(i);
+    // Longest tail first, then courses that unblock more, then lower level
+    pending.sort((a, b) =>
+        tail[b] - tail[a] ||
+        p.hardDependents[b].length - p.hardDependents[a].length ||
+        p.level[a] - p.level[b] ||
+        a - b
+    );
+
+    const semesters: PlannedSemester[] = [];
+    const taken = done.slice();
+    let credits = completedCredits;
+    let plannedCredits = 0;
+    let left = pending.length;
+    const scheduled = new Uint8Array(n);
+    while (left > 0 && semesters.length < MAX_SEMESTERS) {
+        const level = standing(credits, ruleSet.total_credits, p.levelCount);
+        const picked: number[] = [];
+        let load = 0;
+        const fill = (maxLevel: number) => {
+            for (const i of pending) {
+                if (scheduled[i] || p.level[i] > maxLevel) continue;
+                if (load + p.ch[i] > maxCredits && picked.length > 0) continue;
+                const rule = compiled.rules[i];
+                if (rule && graph.softLocked[i] !== 1 && !ready(rule, taken, credits)) continue;
+                picked.push(i);
+                scheduled[i] = 1;
+                load += p.ch[i];
+                if (load >= maxCredits) break;
+            }
+        };
+        fill(level + 1);
+        // Only higher-level courses are ready: don't stall on standing alone
+        if (picked.length === 0) fill(p.levelCount);
+        if (picked.length === 0) break;
+
+        for (const i of picked) taken[i] = 1;
+        left -= picked.length;
+        credits = Math.min(ruleSet.total_credits, credits + load);
+        plannedCredits += load;
+        semesters.push({
+            index: semesters.length + 1,
+            level,
+            credits: load,
+            courses: picked
+                .sort((a, b) => p.level[a] - p.level[b] || a - b)
+                .map(i => ({ code: courses[i].code, name: courses[i].name, ch: p.ch[i], level: p.level[i] })),
+        });
+    }
+
+    for (const i of pending) {
+        if (!scheduled[i]) unschedulable.push({ code: courses[i].code, name: courses[i].name, reason: 'Prerequisites can never be met' });
+    }
+
+    const needsApproval: string[] = [];
+    for (const i of pending) {
+        const rule = compiled.rules[i];
+        if (scheduled[i] && rule && graph.softLocked[i] !== 1 && hasApproval(rule)) needsApproval.push(courses[i].code);
+    }
+
+    return {
+        maxCredits,
+        totalCredits: ruleSet.total_credits,
+        levelCount: p.levelCount,
+        completedCredits,
+        plannedCredits,
+        semesters,
+        lowerBound,
+        criticalPath,
+        electives,
+        needsApproval,
+        unschedulable,
+        shortfallCredits: Math.max(0, ruleSet.total_credits - completedCredits - plannedCredits),
+    };
+}
@@ -0,0 +1,369 @@
+import { sql, transaction, parallel, batch } from './db';
+import { getCurriculum } from './curriculum';
+
+/**
+ * Admin dashboard statistics, served from rollup tables.
+ *
+ * Visits update stats_daily_traffic / stats_heatmap / stats_device in the
+ * same statement that writes them (lib/visitor-log.ts). Progress saves
+ * adjust stats_course_completion in their own statement and then call
+ * updateStudentCredits. The dashboard therefore reads a handful of small
+ * tables instead of scanning visitor_logs and every transcript.
+ *
+ * Per-major counts, progress buckets and sums are aggregated in Postgres
+ * (at most majors × 4 rows come back) and only the STUDENT_LIST_LIMIT most
+ * recently active students are listed, so the payload and the work done here
+ * don't grow with the number of students.
+ *
+ * rebuildStats() recomputes everything from the raw tables, for the initial
+ * backfill and to repair drift (e.g. after rows are deleted by hand).
+ */
+
+const STATS_TTL_MS = 15_000;
+const TOTAL_CREDITS = 135;
+const STUDENT_LIST_LIMIT = 200;
+const PROGRESS_BUCKETS = ['0-25%', '26-50%', '51-75%', '76-100%'] as const;
+// Credit hours assumed for codes missing from the catalog
+const FALLBACK_CH = 3;
+
+export interface StudentCredits {
+    student_id: string;
+    major: string;
+    count: number;
+    ch: number;
+}
+
+export interface MajorStats {
+    count: number;
+    avgCourses: number;
+    avgCH: number;
+    avgProgress: number;
+    maxCH: number;
+    minCH: number;
+    /** Students per PROGRESS_BUCKETS entry */
+    progressBuckets: [number, number, number, number];
+}
+
+export interface AdminStats {
+    totalStudents: number;
+    visitorCount: number;
+    totalVisitors: number;
+    totalCompletedCourses: number;
+    avgCoursesCompleted: number;
+    avgCreditHours: number;
+    thisWeekVisits: number;
+    lastWeekVisits: number;
+    majorDistribution: Record<string, number>;
+    majorCounts: Record<string, number>;
+    progressDistribution: Record<string, number>;
+    majorStats: Record<string, MajorStats>;
+    topCourses: { code: string; name: string; count: number; ch: number }[];
+    trafficTrends: { date: string; count: number }[];
+    trafficByDay: { date: string; count: number }[];
+    deviceBreakdown: { os: string; browser: string; count: number }[];
+    recentActivity: { type: string; student_id: string; detail: string; time: string }[];
+    heatmap: { day: number; hour: number; count: number }[];
+    /** The STUDENT_LIST_LIMIT most recently updated students; totalStudents counts all */
+    studentData: StudentCredits[];
+    students: StudentCredits[];
+}
+
+/** Course count and catalog credit hours for a set of normalized codes */
+export async function creditHoursFor(codes: Iterable<string>): Promise<{ count: number; ch: number }> {
+    const { courses } = await getCurriculum();
+    let count = 0;
+    let ch = 0;
+    for (const code of codes) {
+        count++;
+        ch += courses.get(code)?.ch ?? FALLBACK_CH;
+    }
+    return { count, ch };
+}
+
+/** Refresh one student's row after a progress save that produced `version` */
+export async function updateStudentCredits(
+    studentId: string,
+    major: string,
+    codes: Iterable<string>,
+    version: number
+): Promise<void> {
+    const { count, ch } = await creditHoursFor(codes);
+    await sql`
+        INSERT INTO stats_student_credits (student_id, major, course_count, credit_hours, progress_version, updated_at)
+        VALUES (${studentId}, ${major}, ${count}, ${ch}, ${version}, (EXTRACT(EPOCH FROM NOW())::bigint))
+        ON CONFLICT (student_id, major) DO UPDATE SET
+            course_count     = EXCLUDED.course_count,
+            credit_hours     = EXCLUDED.credit_hours,
+            progress_version = EXCLUDED.progress_version,
+            updated_at       = EXCLUDED.updated_at
+        WHERE stats_student_credits.progress_version < EXCLUDED.progress_version
+    `;
+}
+
+/** Recompute every rollup from the raw tables in one transaction */
+export async function rebuildStats(): Promise<void> {
+    const { courses } = await getCurriculum();
+    const chByCode: Record<string, number> = {};
+    for (const [code, course] of courses) chByCode[code] = course.ch;
+
+    await transaction('rebuild_stats', async (tx) => {
+        // Visit rollups = raw rows still in visitor_logs + days already folded
+        // into visitor_logs_daily by the retention job
+        await tx.sql`DELETE FROM stats_daily_traffic`;
+        await tx.sql`
+            INSERT INTO stats_daily_traffic (day, visits)
+            SELECT day, SUM(visits) FROM (
+                SELECT visited_at::date AS day, COUNT(*) AS visits FROM visitor_logs
+                WHERE visited_at IS NOT NULL
+                GROUP BY 1
+                UNION ALL
+                SELECT day, visits FROM visitor_logs_daily
+            ) AS v
+            GROUP BY day
+        `;
+
+        await tx.sql`DELETE FROM stats_heatmap`;
+        await tx.sql`
+            INSERT INTO stats_heatmap (dow, hour, visits)
+            SELECT dow, hour, SUM(visits) FROM (
+                SELECT EXTRACT(DOW FROM visited_at)::int AS dow, EXTRACT(HOUR FROM visited_at)::int AS hour, COUNT(*) AS visits
+                FROM visitor_logs
+                WHERE visited_at IS NOT NULL
+                GROUP BY 1, 2
+                UNION ALL
+                SELECT EXTRACT(DOW FROM day)::int, hour, visits FROM visitor_logs_daily
+            ) AS v
+            GROUP BY dow, hour
+        `;
+
+        await tx.sql`DELETE FROM stats_device`;
+        await tx.sql`
+            INSERT INTO stats_device (os, browser, visits)
+            SELECT os, browser, SUM(visits) FROM (
+                SELECT COALESCE(os_name, 'Unknown') AS os, COALESCE(browser_name, 'Unknown') AS browser, COUNT(*) AS visits
+                FROM visitor_logs
+                GROUP BY 1, 2
+                UNION ALL
+                SELECT os, browser, visits FROM visitor_logs_daily
+            ) AS v
+            GROUP BY os, browser
+        `;
+
+        await tx.sql`DELETE FROM stats_course_completion`;
+        await tx.sql`
+            INSERT INTO stats_course_completion (course_code, name, students)
+            SELECT course_code, MAX(name), COUNT(*) FROM student_completed_course
+            GROUP BY course_code
+        `;
+
+        await tx.sql`DELETE FROM stats_student_credits`;
+        await tx.sql`
+            INSERT INTO stats_student_credits (student_id, major, course_count, credit_hours, progress_version, updated_at)
+            SELECT
+                sp.student_id,
+                sp.major,
+                COUNT(scc.course_code),
+                COALESCE(SUM(CASE WHEN scc.course_code IS NULL THEN 0 ELSE COALESCE(ch.hours::int, ${FALLBACK_CH}) END), 0),
+                sp.version,
+                sp.updated_at
+            FROM student_progress sp
+            LEFT JOIN student_completed_course scc
+                ON scc.student_id = sp.student_id AND scc.major = sp.major
+            LEFT JOIN jsonb_each_text(${JSON.stringify(chByCode)}::jsonb) AS ch(code, hours)
+                ON ch.code = scc.course_code
+            GROUP BY sp.student_id, sp.major, sp.version, sp.updated_at
+        `;
+    });
+    invalidateStats();
+}
+
+async function computeStats(): Promise<AdminStats> {
+    // Every dashboard query is parameterless, so they travel as one batch:
+    // one connection and one round trip instead of seven
+    const [{ courses: courseMap }, results] = await parallel([
+        () => getCurriculum(),
+        () => batch('admin_stats', [
+            `
+                SELECT student_id, major, course_count, credit_hours
+                FROM stats_student_credits
+                ORDER BY updated_at DESC
+                LIMIT ${STUDENT_LIST_LIMIT}
+            `,
+            `
+                SELECT
+                    COALESCE(NULLIF(major, ''), 'Unknown') AS major,
+                    CASE
+                        WHEN credit_hours * 100 <= ${25 * TOTAL_CREDITS} THEN 0
+                        WHEN credit_hours * 100 <= ${50 * TOTAL_CREDITS} THEN 1
+                        WHEN credit_hours * 100 <= ${75 * TOTAL_CREDITS} THEN 2
+                        ELSE 3
+                    END AS bucket,
+                    COUNT(*) AS students,
+                    SUM(course_count) AS courses,
+                    SUM(credit_hours) AS credit_hours,
+                    MIN(credit_hours) AS min_ch,
+                    MAX(credit_hours) AS max_ch
+                FROM stats_student_credits
+                GROUP BY 1, 2
+            `,
+            `
+                SELECT course_code, name, students FROM stats_course_completion
+                WHERE students > 0
+                ORDER BY students DESC
+            `,
+            `
+                SELECT to_char(day, 'YYYY-MM-DD') AS day, visits FROM stats_daily_traffic
+                WHERE day >= (NOW() - INTERVAL '30 days')::date
+                ORDER BY day ASC
+            `,
+            `SELECT os, browser, visits FROM stats_device ORDER BY visits DESC`,
+            `SELECT dow, hour, visits FROM stats_heatmap ORDER BY dow, hour`,
+            `
+                SELECT
+                    COALESCE(SUM(visits), 0) AS total,
+                    COALESCE(SUM(visits) FILTER (WHERE day >= DATE_TRUNC('week', NOW())::date), 0) AS this_week,
+                    COALESCE(SUM(visits) FILTER (
+                        WHERE day >= (DATE_TRUNC('week', NOW()) - INTERVAL '7 days')::date
+                          AND day < DATE_TRUNC('week', NOW())::date
+                    ), 0) AS last_week
+                FROM stats_daily_traffic
+            `,
+            `
+                SELECT student_id, os_name, browser_name, device_model, visited_at
+                FROM visitor_logs
+                ORDER BY visited_at DESC
+                LIMIT 50
+            `,
+        ]),
+    ] as const);
+    const [students, majorRows, courseRows, trafficRows, deviceRows, heatmapRows, totals, visitRows] = results;
+
+    // ── Students, majors, progress ──────────────────────────────────
+    const studentRealCH: StudentCredits[] = students.rows.map(r => ({
+        student_id: r.student_id,
+        major: r.major,
+        count: Number(r.course_count),
+        ch: Number(r.credit_hours),
+    }));
+
+    const majorCounts: Record<string, number> = {};
+    const progressDistribution: Record<string, number> = Object.fromEntries(PROGRESS_BUCKETS.map(b => [b, 0]));
+    const majorTotals: Record<string, { courses: number; ch: number; min: number; max: number; buckets: [number, number, number, number] }> = {};
+    let totalStudents = 0;
+    let totalCompletedCourses = 0;
+    let totalRealCreditHours = 0;
+    for (const r of majorRows.rows) {
+        const major = r.major as string;
+        const n = Number(r.students);
+        const bucket = Number(r.bucket);
+        majorCounts[major] = (majorCounts[major] || 0) + n;
+        progressDistribution[PROGRESS_BUCKETS[bucket]] += n;
+        totalStudents += n;
+        totalCompletedCourses += Number(r.courses);
+        totalRealCreditHours += Number(r.credit_hours);
+
+        const t = majorTotals[major] ??= { courses: 0, ch: 0, min: Infinity, max: -Infinity, buckets: [0, 0, 0, 0] };
+        t.courses += Number(r.courses);
+        t.ch += Number(r.credit_hours);
+        t.min = Math.min(t.min, Number(r.min_ch));
+        t.max = Math.max(t.max, Number(r.max_ch));
+        t.buckets[bucket] += n;
+    }
+
+    const majorStats: Record<string, MajorStats> = {};
+    for (const [major, t] of Object.entries(majorTotals)) {
+        const count = majorCounts[major];
+        majorStats[major] = {
+            count,
+            avgCourses: Math.round(t.courses / count),
+            avgCH: Math.round(t.ch / count),
+            avgProgress: Math.min(Math.round((t.ch / count / TOTAL_CREDITS) * 100), 100),
+            maxCH: t.max,
+            minCH: t.min,
+            progressBuckets: t.buckets,
+        };
+    }
+
+    // ── Courses ─────────────────────────────────────────────────────
+    const topCourses = courseRows.rows.map(r => {
+        const catalogEntry = courseMap.get(r.course_code);
+        return {
+            code: r.course_code as string,
+            name: r.name || catalogEntry?.name || r.course_code,
+            count: Number(r.students),
+            ch: catalogEntry?.ch ?? FALLBACK_CH,
+        };
+    });
+
+    // ── Traffic ─────────────────────────────────────────────────────
+    const trafficByDay = trafficRows.rows.map(r => ({
+        date: String(r.day),
+        count: Number(r.visits),
+    }));
+    const deviceBreakdown = deviceRows.rows.map(r => ({
+        os: String(r.os),
+        browser: String(r.browser),
+        count: Number(r.visits),
+    }));
+    const heatmap = heatmapRows.rows.map(r => ({
+        day: Number(r.dow),
+        hour: Number(r.hour),
+        count: Number(r.visits),
+    }));
+    const totalVisitors = Number(totals.rows[0]?.total ?? 0);
+
+    const recentActivity = visitRows.rows.map(r => {
+        const device = r.device_model || r.os_name || 'Unknown device';
+        const browser = r.browser_name || '';
+        return {
+            type: 'visit',
+            student_id: r.student_id || 'Anonymous',
+            detail: `Visited from ${device}${browser ? ` (${browser})` : ''}`,
+            time: String(r.visited_at),
+        };
+    });
+
+    return {
+        totalStudents,
+        visitorCount: totalVisitors,
+        totalVisitors,
+        totalCompletedCourses,
+        avgCoursesCompleted: totalStudents > 0 ? Math.round(totalCompletedCourses / totalStudents) : 0,
+        avgCreditHours: totalStudents > 0 ? Math.round(totalRealCreditHours / totalStudents) : 0,
+        thisWeekVisits: Number(totals.rows[0]?.this_week ?? 0),
+        lastWeekVisits: Number(totals.rows[0]?.last_week ?? 0),
+        majorDistribution: majorCounts,
+        majorCounts,
+        progressDistribution,
+        majorStats,
+        topCourses,
+        trafficTrends: trafficByDay,
+        trafficByDay,
+        deviceBreakdown,
+        recentActivity,
+        heatmap,
+        studentData: studentRealCH,
+        students: studentRealCH,
+    };
+}
+
+let cached: { at: number; value: AdminStats } | null = null;
+let computing: Promise<AdminStats> | null = null;
+
+/** Dashboard stats, at most STATS_TTL_MS old. Concurrent misses share one computation. */
+export async function getAdminStats(): Promise<AdminStats> {
+    if (cached && Date.now() - cached.at < STATS_TTL_MS) return cached.value;
+    if (!computing) {
+        computing = computeStats()
+            .then(value => {
+                cached = { at: Date.now(), value };
+                return value;
+            })
+            .finally(() => { computing = null; });
+    }
+    return computing;
+}
+
+export function invalidateStats() {
+    cached = null;
+}
@@ -0,0 +1,162 @@
+/**
+ * Study-session index for the planner's insights, weekly summary and KPIs.
+ *
+ * Sessions are bucketed by ISO week (Monday 00:00 UTC) with the week's total
+ * and per-course hours kept alongside, each session's date is parsed once,
+ * and per-course totals and last-studied times are kept running. A range
+ * query sums whole weeks from their totals and only looks at individual
+ * sessions in the two edge weeks, so "this week" or "the last 7 days" costs
+ * the same for a student with a month of history as for one with four years.
+ *
+ * `StudyIndex.update(previous, sessions)` extends the previous index in place
+ * when `sessions` is the previous array with sessions appended (how the
+ * planner adds one) and rebuilds it otherwise (deletes, a new semester).
+ * `size` changes on every update, so memoized consumers can depend on it.
+ */
+
+export interface IndexedSession {
+    courseId: string;
+    date: string;
+    hours: number;
+}
+
+interface WeekBucket {
+    hours: number;
+    byCourse: Map<string, number>;
+    entries: { time: number; courseId: string; hours: number }[];
+}
+
+const DAY = 86400000;
+const WEEK = 7 * DAY;
+
+/** Epoch ms of the Monday 00:00 UTC starting the ISO week containing `time` */
+export function isoWeekStart(time: number): number {
+    const day = Math.floor(time / DAY);
+    // 1970-01-01 was a Thursday, three days after a Monday
+    return (day - (((day + 3) % 7) + 7) % 7) * DAY;
+}
+
+function addTo(map: Map<string, number>, key: string, hours: number) {
+    map.set(key, (map.get(key) ?? 0) + hours);
+}
+
+export class StudyIndex {
+    /** Epoch ms per session, parallel to the indexed array (NaN for bad dates) */
+    readonly times: number[] = [];
+    private readonly weeks = new Map<number, WeekBucket>();
+    private readonly courseTotals = new Map<string, number>();
+    private readonly lastStudiedAt = new Map<string, number>();
+    private source: readonly IndexedSession[] = [];
+    private minWeek = Infinity;
+    private maxWeek = -Infinity;
+
+    /** Index for `sessions`, reusing `previous` when sessions were only appended */
+    static update(previous: StudyIndex | null, sessions: readonly IndexedSession[]): StudyIndex {
+        if (previous && previous.extends(sessions)) {
+            for (let i = previous.size; i < sessions.length; i++) previous.add(sessions[i]);
+            previous.source = sessions;
+            return previous;
+        }
+        const index = new StudyIndex();
+        for (const s of sessions) index.add(s);
+        index.source = sessions;
+        return index;
+    }
+
+    static from(sessions: readonly IndexedSession[]): StudyIndex {
+        return StudyIndex.update(null, sessions);
+    }
+
+    get size(): number {
+        return this.times.length;
+    }
+
+    /** Whether `sessions` starts with exactly the sessions indexed so far */
+    private extends(sessions: readonly IndexedSession[]): boolean {
+        const n = this.size;
+        if (sessions === this.source) return true;
+        if (sessions.length < n) return false;
+        // Appends copy the array but keep every element, so identity at both ends is enough
+        return n === 0 || (sessions[0] === this.source[0] && sessions[n - 1] === this.source[n - 1]);
+    }
+
+    add(session: IndexedSession) {
+        const time = Date.parse(session.date);
+        this.times.push(time);
+        addTo(this.courseTotals, session.courseId, session.hours);
+        if (Number.isNaN(time)) return;
+
+        const last = this.lastStudiedAt.get(session.courseId);
+        if (last === undefined || time > last) this.lastStudiedAt.set(session.courseId, time);
+
+        const key = isoWeekStart(time);
+        let week = this.weeks.get(key);
+        if (!week) {
+            week = { hours: 0, byCourse: new Map(), entries: [] };
+            this.weeks.set(key, week);
+            if (key < this.minWeek) this.minWeek = key;
+            if (key > this.maxWeek) this.maxWeek = key;
+        }
+        week.hours += session.hours;
+        addTo(week.byCourse, session.courseId, session.hours);
+        week.entries.push({ time, courseId: session.courseId, hours: session.hours });
+    }
+
+    /** All hours ever logged for a course */
+    hoursFor(courseId: string): number {
+        return this.courseTotals.get(courseId) ?? 0;
+    }
+
+    /** Date of the course's latest session (epoch ms), or -Infinity */
+    lastStudied(courseId: string): number {
+        return this.lastStudiedAt.get(courseId) ?? -Infinity;
+    }
+
+    /** Hours logged in [from, to) */
+    hoursBetween(from: number, to = Infinity): number {
+        let hours = 0;
+        this.scan(from, to,
+            week => { hours += week.hours; },
+            entry => { hours += entry.hours; });
+        return hours;
+    }
+
+    /** Course id → hours logged in [from, to) */
+    hoursByCourseBetween(from: number, to = Infinity): Map<string, number> {
+        const map = new Map<string, number>();
+        this.scan(from, to,
+            week => { for (const [id, h] of week.byCourse) addTo(map, id, h); },
+            entry => addTo(map, entry.courseId, entry.hours));
+        return map;
+    }
+
+    /** Visit whole weeks inside [from, to) via `whole`, and edge-week sessions inside it via `partial` */
+    private scan(
+        from: number, to: number,
+        whole: (week: WeekBucket) => void,
+        partial: (entry: WeekBucket['entries'][number]) => void
+    ) {
+        if (this.weeks.size === 0 || !(from < to)) return;
+        const first = Math.max(isoWeekStart(Math.max(from, this.minWeek)), this.minWeek);
+        const last = Math.min(Number.isFinite(to) ? isoWeekStart(to) : this.maxWeek, this.maxWeek);
+        if (first > last) return;
+
+        const visit = (key: number, week: WeekBucket) => {
+            if (key >= from && key + WEEK <= to) {
+                whole(week);
+            } else {
+                for (const e of week.entries) if (e.time >= from && e.time < to) partial(e);
+            }
+        };
+
+        // Walk the range week by week unless it spans more weeks than are stored
+        if ((last - first) / WEEK < this.weeks.size) {
+            for (let key = first; key <= last; key += WEEK) {
+                const week = this.weeks.get(key);
+                if (week) visit(key, week);
+            }
+        } else {
+            for (const [key, week] of this.weeks) if (key >= first && key <= last) visit(key, week);
+        }
+    }
+}
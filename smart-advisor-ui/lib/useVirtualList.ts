@@ -0,0 +1,77 @@
+"use client";
+
+import { useState, useEffect, useRef, type RefObject } from "react";
+
+/**
+ * Windowing for long lists of fixed-height rows: only rows inside the
+ * viewport (plus `overscan` on each side) are rendered, and the rest is
+ * replaced by two spacers of `padTop` / `padBottom` pixels.
+ *
+ * `scroller: "self"` — the element the ref is attached to scrolls itself
+ * (e.g. a `max-h-64 overflow-y-auto` box). `scroller: "window"` — the ref
+ * is on the list element and the page scrolls.
+ *
+ * Lists of `threshold` rows or fewer render in full, so short lists keep
+ * their natural layout and nothing is measured.
+ */
+export interface VirtualListOptions {
+    scroller?: "self" | "window";
+    overscan?: number;
+    threshold?: number;
+}
+
+export interface VirtualList<E extends HTMLElement> {
+    ref: RefObject<E | null>;
+    start: number;
+    end: number;
+    padTop: number;
+    padBottom: number;
+}
+
+export function useVirtualList<E extends HTMLElement>(
+    count: number,
+    rowHeight: number,
+    { scroller = "window", overscan = 8, threshold = 60 }: VirtualListOptions = {}
+): VirtualList<E> {
+    const ref = useRef<E>(null);
+    const enabled = count > threshold;
+    const [range, setRange] = useState({ start: 0, end: threshold });
+
+    useEffect(() => {
+        const el = ref.current;
+        if (!enabled || !el) return;
+
+        let frame = 0;
+        const measure = () => {
+            frame = 0;
+            let top: number, height: number;
+            if (scroller === "self") {
+                top = el.scrollTop;
+                height = el.clientHeight;
+            } else {
+                top = -el.getBoundingClientRect().top;
+                height = window.innerHeight;
+            }
+            const start = Math.max(0, Math.floor(top / rowHeight) - overscan);
+            const end = Math.max(start, Math.min(count, Math.ceil((top + height) / rowHeight) + overscan));
+            setRange(r => (r.start === start && r.end === end ? r : { start, end }));
+        };
+        // Coalesce scroll bursts into one state update per frame
+        const schedule = () => { if (!frame) frame = requestAnimationFrame(measure); };
+
+        measure();
+        const target = scroller === "self" ? el : window;
+        target.addEventListener("scroll", schedule, { passive: true });
+        window.addEventListener("resize", schedule);
+        return () => {
+            target.removeEventListener("scroll", schedule);
+            window.removeEventListener("resize", schedule);
+            if (frame) cancelAnimationFrame(frame);
+        };
+    }, [enabled, count, rowHeight, overscan, scroller]);
+
+    if (!enabled) return { ref, start: 0, end: count, padTop: 0, padBottom: 0 };
+    const end = Math.min(range.end, count);
+    const start = Math.min(range.start, end);
+    return { ref, start, end, padTop: start * rowHeight, padBottom: (count - end) * rowHeight };
+}
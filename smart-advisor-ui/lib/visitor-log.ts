@@ -0,0 +1,192 @@
+import { sql } from './db';
+import { ensureSchema } from './migrations';
+import type { VisitorLog } from './database';
+
+/**
+ * In-process buffer for visitor_logs.
+ *
+ * Requests only push onto an array; rows are written by a background flush
+ * every FLUSH_INTERVAL_MS or as soon as FLUSH_BATCH_SIZE rows are queued,
+ * as one multi-row INSERT (UNNEST over column arrays) that also bumps the
+ * stats rollups. The queue is bounded: when it is full new visits are
+ * dropped and counted rather than growing memory without limit.
+ */
+
+const FLUSH_BATCH_SIZE = Number(process.env.VISITOR_LOG_BATCH_SIZE) || 200;
+const FLUSH_INTERVAL_MS = Number(process.env.VISITOR_LOG_FLUSH_MS) || 2000;
+const MAX_QUEUE = Number(process.env.VISITOR_LOG_MAX_QUEUE) || 10_000;
+
+interface QueuedVisit extends VisitorLog {
+    visited_at: string;
+}
+
+let queue: QueuedVisit[] = [];
+let timer: ReturnType<typeof setTimeout> | null = null;
+let flushing: Promise<void> | null = null;
+
+const counters = {
+    enqueued: 0,
+    written: 0,
+    dropped: 0,
+    failed: 0,
+    flushes: 0,
+};
+
+export function getVisitorLogStats() {
+    return { ...counters, queued: queue.length, maxQueue: MAX_QUEUE };
+}
+
+/** Queue a visit. Never waits on the database. */
+export function enqueueVisit(data: VisitorLog): void {
+    if (queue.length >= MAX_QUEUE) {
+        counters.dropped++;
+        return;
+    }
+    queue.push({ ...data, visited_at: new Date().toISOString() });
+    counters.enqueued++;
+    registerShutdownFlush();
+
+    if (queue.length >= FLUSH_BATCH_SIZE) {
+        void flushVisitorLogs();
+    } else if (!timer) {
+        timer = setTimeout(() => { void flushVisitorLogs(); }, FLUSH_INTERVAL_MS);
+        timer.unref?.();
+    }
+}
+
+async function writeBatch(batch: QueuedVisit[]): Promise<void> {
+    const col = <K extends keyof QueuedVisit>(key: K) => batch.map(v => v[key] ?? null);
+    await sql`
+        WITH v AS (
+            INSERT INTO visitor_logs (
+                student_id, ip_address, user_agent, device_vendor, device_model, os_name, os_version, browser_name, visited_at
+            )
+            SELECT * FROM UNNEST(
+                ${col('student_id')}::text[], ${col('ip_address')}::text[], ${col('user_agent')}::text[],
+                ${col('device_vendor')}::text[], ${col('device_model')}::text[], ${col('os_name')}::text[],
+                ${col('os_version')}::text[], ${col('browser_name')}::text[], ${col('visited_at')}::timestamptz[]
+            )
+            RETURNING visited_at, os_name, browser_name
+        ), daily AS (
+            INSERT INTO stats_daily_traffic (day, visits)
+            SELECT visited_at::date, COUNT(*) FROM v GROUP BY 1
+            ON CONFLICT (day) DO UPDATE SET visits = stats_daily_traffic.visits + EXCLUDED.visits
+        ), heat AS (
+            INSERT INTO stats_heatmap (dow, hour, visits)
+            SELECT EXTRACT(DOW FROM visited_at)::int, EXTRACT(HOUR FROM visited_at)::int, COUNT(*) FROM v GROUP BY 1, 2
+            ON CONFLICT (dow, hour) DO UPDATE SET visits = stats_heatmap.visits + EXCLUDED.visits
+        )
+        INSERT INTO stats_device (os, browser, visits)
+        SELECT COALESCE(os_name, 'Unknown'), COALESCE(browser_name, 'Unknown'), COUNT(*) FROM v GROUP BY 1, 2
+        ON CONFLICT (os, browser) DO UPDATE SET visits = stats_device.visits + EXCLUDED.visits
+    `;
+}
+
+/** Write everything queued so far. Concurrent calls share the running flush. */
+export function flushVisitorLogs(): Promise<void> {
+    if (timer) {
+        clearTimeout(timer);
+        timer = null;
+    }
+    if (flushing) return flushing;
+
+    flushing = (async () => {
+        while (queue.length > 0) {
+            const batch = queue.slice(0, FLUSH_BATCH_SIZE);
+            queue = queue.slice(batch.length);
+            counters.flushes++;
+            try {
+                await writeBatch(batch);
+                counters.written += batch.length;
+            } catch (e) {
+                // Not retried: a failing database shouldn't pin memory
+                counters.failed += batch.length;
+                console.error("Failed to flush visitor logs:", e);
+            }
+        }
+    })().finally(() => { flushing = null; });
+
+    return flushing;
+}
+
+let shutdownRegistered = false;
+
+/** Best-effort flush when the process is asked to stop */
+function registerShutdownFlush() {
+    if (shutdownRegistered || typeof process === 'undefined' || !process.once) return;
+    shutdownRegistered = true;
+
+    process.once('beforeExit', () => { void flushVisitorLogs(); });
+    for (const signal of ['SIGTERM', 'SIGINT'] as const) {
+        process.once(signal, () => {
+            flushVisitorLogs().finally(() => {
+                // Only re-raise if nothing else (e.g. Next's own handler) is taking care of exiting
+                if (process.listenerCount(signal) === 0) process.kill(process.pid, signal);
+            });
+        });
+    }
+}
+
+// ─── Retention ──────────────────────────────────────────────────────────────
+
+const RETENTION_DAYS = Number(process.env.VISITOR_LOG_RETENTION_DAYS) || 90;
+const PRUNE_BATCH_SIZE = 5000;
+const PRUNE_INTERVAL_MS = 6 * 60 * 60 * 1000;
+
+/**
+ * Delete raw visits older than `retentionDays`, folding them into
+ * visitor_logs_daily (day × hour × os × browser) in the same statement so
+ * the stats rollups can still be rebuilt. Works in batches; returns the
+ * number of raw rows removed.
+ */
+export async function pruneVisitorLogs(retentionDays = RETENTION_DAYS): Promise<number> {
+    let total = 0;
+    for (; ;) {
+        const { rows } = await sql`
+            WITH old AS (
+                DELETE FROM visitor_logs
+                WHERE id IN (
+                    SELECT id FROM visitor_logs
+                    WHERE visited_at < NOW() - make_interval(days => ${retentionDays})
+                    ORDER BY visited_at
+                    LIMIT ${PRUNE_BATCH_SIZE}
+                )
+                RETURNING visited_at, os_name, browser_name
+            ), folded AS (
+                INSERT INTO visitor_logs_daily (day, hour, os, browser, visits)
+                SELECT
+                    visited_at::date,
+                    EXTRACT(HOUR FROM visited_at)::int,
+                    COALESCE(os_name, 'Unknown'),
+                    COALESCE(browser_name, 'Unknown'),
+                    COUNT(*)
+                FROM old
+                GROUP BY 1, 2, 3, 4
+                ON CONFLICT (day, hour, os, browser) DO UPDATE SET
+                    visits = visitor_logs_daily.visits + EXCLUDED.visits
+            )
+            SELECT COUNT(*) AS n FROM old
+        `;
+        const n = Number(rows[0].n);
+        total += n;
+        if (n < PRUNE_BATCH_SIZE) return total;
+    }
+}
+
+let retentionTimer: ReturnType<typeof setInterval> | null = null;
+
+/** Prune on start and then every PRUNE_INTERVAL_MS (called from instrumentation.ts) */
+export function startRetentionJob(): void {
+    if (retentionTimer) return;
+    // Each run waits for the schema, so the job still starts on an instance
+    // that booted while the database was unreachable
+    const run = () => {
+        ensureSchema()
+            .then(() => pruneVisitorLogs())
+            .then(n => { if (n > 0) console.log(`Pruned ${n} visitor logs older than ${RETENTION_DAYS} days`); })
+            .catch(e => console.error("Visitor log retention failed:", e));
+    };
+    run();
+    retentionTimer = setInterval(run, PRUNE_INTERVAL_MS);
+    retentionTimer.unref?.();
+}
@@ -0,0 +1,130 @@
+#!/usr/bin/env node
+/**
+ * Minimal in-memory Google Calendar API stand-in for exercising the exam
+ * export offline (see benchmarks/calendar_export.py).
+ *
+ *   node scripts/gcal-stub.mjs                   # listens on :4020
+ *   GOOGLE_CALENDAR_API_URL=http://localhost:4020/calendar/v3 \
+ *   GOOGLE_OAUTH_TOKEN_URL=http://localhost:4020/token npm start
+ *
+ * Implements token exchange and events insert/update/delete/list on any
+ * calendar. Like Google it keeps deleted events as `cancelled`, answers 409
+ * for an insert with an existing id, and 429 when a token exceeds RATE
+ * requests/second. STUB_FAIL_RATE (0..1) injects random 503s.
+ *
+ * GET  /__stats  → request counts, 429s, peak concurrency, live events
+ * POST /__reset  → forget everything
+ */
+import http from 'node:http';
+import { randomUUID } from 'node:crypto';
+
+const PORT = Number(process.env.PORT) || 4020;
+const RATE = Number(process.env.STUB_RATE) || 10;
+const FAIL_RATE = Number(process.env.STUB_FAIL_RATE) || 0;
+const LATENCY_MS = Number(process.env.STUB_LATENCY_MS) || 120;
+
+let events, stats, windows;
+function reset() {
+    events = new Map();
+    stats = { requests: 0, byRoute: {}, throttled: 0, injectedFailures: 0, inFlight: 0, peakInFlight: 0 };
+    windows = new Map();
+}
+reset();
+
+function throttled(token) {
+    const now = Date.now();
+    const recent = (windows.get(token) ?? []).filter(t => now - t < 1000);
+    windows.set(token, recent);
+    if (recent.length >= RATE) return true;
+    recent.push(now);
+    return false;
+}
+
+function send(res, status, body, headers = {}) {
+    res.writeHead(status, { 'Content-Type': 'application/json', ...headers });
+    res.end(body === null ? '' : JSON.stringify(body));
+}
+
+const error = (res, status, reason, message) => send(res, status, { error: { code: status, message, errors: [{ reason, message }] } });
+
+async function readBody(req) {
+    let raw = '';
+    for await (const chunk of req) raw += chunk;
+    return raw;
+}
+
+const server = http.createServer(async (req, res) => {
+    const url = new URL(req.url, `http://localhost:${PORT}`);
+    const path = url.pathname;
+
+    if (path === '/__stats') {
+        const live = [...events.values()].filter(e => e.status !== 'cancelled');
+        return send(res, 200, { ...stats, events: live.length, cancelled: events.size - live.length });
+    }
+    if (path === '/__reset' && req.method === 'POST') {
+        reset();
+        return send(res, 200, { ok: true });
+    }
+
+    const match = path.match(/^\/calendar\/v3\/calendars\/([^/]+)\/events(?:\/([^/]+))?$/);
+    const route = path === '/token' ? `${req.method} /token` : match ? `${req.method} events${match[2] ? '/:id' : ''}` : `${req.method} ${path}`;
+    stats.requests++;
+    stats.byRoute[route] = (stats.byRoute[route] ?? 0) + 1;
+    stats.inFlight++;
+    stats.peakInFlight = Math.max(stats.peakInFlight, stats.inFlight);
+
+    try {
+        const raw = await readBody(req);
+        await new Promise(r => setTimeout(r, LATENCY_MS));
+
+        if (route === 'POST /token') {
+            return send(res, 200, { access_token: `stub-${randomUUID()}`, refresh_token: 'stub-refresh', expires_in: 3600, token_type: 'Bearer' });
+        }
+        if (!match) return error(res, 404, 'notFound', `Unsupported: ${route}`);
+
+        if (throttled(req.headers.authorization ?? '')) {
+            stats.throttled++;
+            return error(res, 429, 'rateLimitExceeded', 'Rate Limit Exceeded');
+        }
+        if (Math.random() < FAIL_RATE) {
+            stats.injectedFailures++;
+            return error(res, 503, 'backendError', 'Injected failure');
+        }
+
+        const [, calendar, id] = match;
+        const key = `${calendar}/${id}`;
+        const body = raw ? JSON.parse(raw) : {};
+
+        if (req.method === 'GET' && !id) {
+            const items = [...events.values()].filter(e => e.calendar === calendar && e.status !== 'cancelled');
+            return send(res, 200, { kind: 'calendar#events', items });
+        }
+        if (req.method === 'POST' && !id) {
+            const eventId = body.id ?? randomUUID().replace(/-/g, '');
+            if (events.has(`${calendar}/${eventId}`)) return error(res, 409, 'duplicate', 'The requested identifier already exists.');
+            const event = { ...body, id: eventId, calendar, status: body.status ?? 'confirmed' };
+            events.set(`${calendar}/${eventId}`, event);
+            return send(res, 200, event);
+        }
+        if (req.method === 'PUT' && id) {
+            if (!events.has(key)) return error(res, 404, 'notFound', 'Not Found');
+            const event = { ...body, id, calendar, status: body.status ?? 'confirmed' };
+            events.set(key, event);
+            return send(res, 200, event);
+        }
+        if (req.method === 'DELETE' && id) {
+            const event = events.get(key);
+            if (!event) return error(res, 404, 'notFound', 'Not Found');
+            if (event.status === 'cancelled') return error(res, 410, 'deleted', 'Resource has been deleted');
+            event.status = 'cancelled';
+            return send(res, 204, null);
+        }
+        return error(res, 405, 'methodNotAllowed', `Unsupported: ${route}`);
+    } catch (e) {
+        return error(res, 500, 'backendError', String(e));
+    } finally {
+        stats.inFlight--;
+    }
+});
+
+server.listen(PORT, () => console.log(`Google Calendar stub listening on http://localhost:${PORT} (${RATE} req/s per token)`));
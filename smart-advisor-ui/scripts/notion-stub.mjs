@@ -0,0 +1,129 @@
+#!/usr/bin/env node
+/**
+ * Minimal in-memory Notion API stand-in for exercising the Notion sync offline.
+ *
+ *   node scripts/notion-stub.mjs                 # listens on :4010
+ *   NOTION_API_URL=http://localhost:4010 npm start
+ *
+ * Implements the endpoints the app uses: oauth/token, search, pages
+ * (create/update/archive), databases (create/retrieve). Like Notion it
+ * answers 429 with Retry-After when a token exceeds RATE requests/second,
+ * and STUB_FAIL_RATE (0..1) injects random 503s to exercise retries.
+ *
+ * GET  /__stats  → request counts, 429s, peak concurrency, stored objects
+ * POST /__reset  → forget everything
+ * Any bearer token is accepted.
+ */
+import http from 'node:http';
+import { randomUUID } from 'node:crypto';
+
+const PORT = Number(process.env.PORT) || 4010;
+const RATE = Number(process.env.STUB_RATE) || 3;
+const FAIL_RATE = Number(process.env.STUB_FAIL_RATE) || 0;
+const LATENCY_MS = Number(process.env.STUB_LATENCY_MS) || 150;
+
+let pages, databases, stats, windows;
+function reset() {
+    const root = { object: 'page', id: randomUUID(), parent: { type: 'workspace', workspace: true }, archived: false, properties: {} };
+    pages = new Map([[root.id, root]]);
+    databases = new Map();
+    stats = { requests: 0, byRoute: {}, throttled: 0, injectedFailures: 0, inFlight: 0, peakInFlight: 0 };
+    windows = new Map();
+}
+reset();
+
+/** true if this token has used up its requests for the current second */
+function throttled(token) {
+    const now = Date.now();
+    const recent = (windows.get(token) ?? []).filter(t => now - t < 1000);
+    windows.set(token, recent);
+    if (recent.length >= RATE) return true;
+    recent.push(now);
+    return false;
+}
+
+function send(res, status, body, headers = {}) {
+    res.writeHead(status, { 'Content-Type': 'application/json', ...headers });
+    res.end(JSON.stringify(body));
+}
+
+const notFound = (res, id) => send(res, 404, { object: 'error', status: 404, code: 'object_not_found', message: `Could not find ${id}` });
+
+async function readBody(req) {
+    let raw = '';
+    for await (const chunk of req) raw += chunk;
+    return raw ? JSON.parse(raw) : {};
+}
+
+const server = http.createServer(async (req, res) => {
+    const url = new URL(req.url, `http://localhost:${PORT}`);
+    const path = url.pathname;
+
+    if (path === '/__stats') {
+        return send(res, 200, { ...stats, pages: pages.size, databases: databases.size });
+    }
+    if (path === '/__reset' && req.method === 'POST') {
+        reset();
+        return send(res, 200, { ok: true });
+    }
+
+    const route = `${req.method} ${path.replace(/[0-9a-f-]{36}/g, ':id')}`;
+    stats.requests++;
+    stats.byRoute[route] = (stats.byRoute[route] ?? 0) + 1;
+    stats.inFlight++;
+    stats.peakInFlight = Math.max(stats.peakInFlight, stats.inFlight);
+
+    try {
+        const body = await readBody(req);
+        await new Promise(r => setTimeout(r, LATENCY_MS));
+
+        const token = req.headers.authorization ?? '';
+        if (path !== '/v1/oauth/token' && throttled(token)) {
+            stats.throttled++;
+            return send(res, 429, { object: 'error', status: 429, code: 'rate_limited', message: 'Rate limited' }, { 'Retry-After': '1' });
+        }
+        if (Math.random() < FAIL_RATE) {
+            stats.injectedFailures++;
+            return send(res, 503, { object: 'error', status: 503, code: 'service_unavailable', message: 'Injected failure' });
+        }
+
+        if (route === 'POST /v1/oauth/token') {
+            return send(res, 200, { access_token: `stub-${randomUUID()}`, workspace_id: 'stub-workspace', bot_id: 'stub-bot' });
+        }
+        if (route === 'POST /v1/search') {
+            const results = [...pages.values(), ...databases.values()].filter(o => !o.archived).slice(0, body.page_size ?? 100);
+            return send(res, 200, { object: 'list', results, has_more: false });
+        }
+        if (route === 'POST /v1/databases') {
+            if (!pages.has(body.parent?.page_id)) return notFound(res, body.parent?.page_id);
+            const db = { object: 'database', id: randomUUID(), parent: { type: 'page_id', ...body.parent }, title: body.title, properties: body.properties, archived: false };
+            databases.set(db.id, db);
+            return send(res, 200, db);
+        }
+        if (route === 'GET /v1/databases/:id') {
+            const db = databases.get(path.split('/').pop());
+            return db ? send(res, 200, db) : notFound(res, path);
+        }
+        if (route === 'POST /v1/pages') {
+            const parentId = body.parent?.database_id ?? body.parent?.page_id;
+            if (!databases.has(parentId) && !pages.has(parentId)) return notFound(res, parentId);
+            const page = { object: 'page', id: randomUUID(), parent: body.parent, properties: body.properties ?? {}, archived: false };
+            pages.set(page.id, page);
+            return send(res, 200, page);
+        }
+        if (route === 'PATCH /v1/pages/:id') {
+            const page = pages.get(path.split('/').pop());
+            if (!page) return notFound(res, path);
+            if (body.properties) Object.assign(page.properties, body.properties);
+            if (body.archived !== undefined) page.archived = body.archived;
+            return send(res, 200, page);
+        }
+        return send(res, 400, { object: 'error', status: 400, code: 'invalid_request_url', message: `Unsupported: ${route}` });
+    } catch (e) {
+        return send(res, 500, { object: 'error', status: 500, message: String(e) });
+    } finally {
+        stats.inFlight--;
+    }
+});
+
+server.listen(PORT, () => console.log(`Notion stub listening on http://localhost:${PORT} (${RATE} req/s per token)`));
@@ -4,6 +4,7 @@ BASE_URL = "http://localhost:3000"
 STUDENT_ID = "S12345"
 PASSWORD = "secret"
 TIMEOUT = 30
+MAJOR = "data_science"
 
 def test_post_progress_save_enforces_prerequisites_and_saves_courses():
     session = requests.Session()
@@ -28,12 +29,12 @@ def test_post_progress_save_enforces_prerequisites_and_saves_courses():
         )
 
     # 1. Negative test: attempt to save a course with unmet prerequisite
-    # Example: try to save CS103 without completing CS102
-    # According to prereq rule: PREFIXnnn requires PREFIX+(nnn-1)
+    # Data Structures & Algorithms (40201201) requires Programming (40201100),
+    # which in turn requires Fundamentals of Computing (40303130)
     incomplete_courses_body = {
-        "major": "Computer Science",
+        "major": MAJOR,
         "completed": [
-            {"code": "CS103", "name": "Course CS103"}  # prereq CS102 not completed
+            {"code": "40201201", "name": "Data Structures & Algorithms"}  # prereq 40201100 not completed
         ]
     }
     resp = save_progress(incomplete_courses_body)
@@ -41,58 +42,76 @@ def test_post_progress_save_enforces_prerequisites_and_saves_courses():
     json_resp = resp.json()
     assert "error" in json_resp and json_resp["error"] == "prerequisite_not_met", f"Unexpected error response: {json_resp}"
     assert "details" in json_resp and isinstance(json_resp["details"], list), "Expected details list in error response"
+    assert json_resp["details"][0]["code"] == "40201201", f"Unexpected violation: {json_resp}"
+    assert "40201100" in json_resp["details"][0]["missing"], f"Missing prereq not reported: {json_resp}"
+
+    # Every violation in the set is reported, not just the first: two independent
+    # violations, plus a course whose prereq is in the set and so doesn't violate
+    resp = save_progress({
+        "major": MAJOR,
+        "completed": [
+            {"code": "40201100", "name": "Programming"},  # prereq 40303130 not completed
+            {"code": "40201201", "name": "Data Structures & Algorithms"},  # prereq 40201100 in the set
+            {"code": "10204210", "name": "Data Analytics"}  # prereq 40303121 not completed
+        ]
+    })
+    assert resp.status_code == 400, "Expected 400 for unmet prerequisites"
+    details = {d["code"]: d for d in resp.json()["details"]}
+    assert set(details) == {"40201100", "10204210"}, f"Unexpected violations: {set(details)}"
+    assert "40303130" in details["40201100"]["missing"], f"Missing prereq not reported: {details}"
+    assert "40303121" in details["10204210"]["missing"], f"Missing prereq not reported: {details}"
+
+    # Unknown majors are rejected
+    resp = save_progress({"major": "Computer Science", "completed": []})
+    assert resp.status_code == 400, "Expected 400 for unknown major"
 
     # 2. Positive test: save courses with all prerequisites met
-    # Save CS101, CS102, then CS103 in order (simulate progress)
     try:
-        # Save CS101 first (no prereq)
-        body_cs101 = {
-            "major": "Computer Science",
+        body_first = {
+            "major": MAJOR,
             "completed": [
-                {"code": "CS101", "name": "Intro to CS"}
+                {"code": "40303130", "name": "Fundamentals of Computing"}
             ]
         }
-        r1 = save_progress(body_cs101)
-        assert r1.status_code == 200 and r1.json().get("success") is True, f"Failed to save CS101: {r1.text}"
+        r1 = save_progress(body_first)
+        assert r1.status_code == 200 and r1.json().get("success") is True, f"Failed to save 40303130: {r1.text}"
 
-        # Save CS102 with CS101 completed
-        body_cs102 = {
-            "major": "Computer Science",
+        body_second = {
+            "major": MAJOR,
             "completed": [
-                {"code": "CS101", "name": "Intro to CS"},
-                {"code": "CS102", "name": "Data Structures"}
+                {"code": "40303130", "name": "Fundamentals of Computing"},
+                {"code": "40201100", "name": "Programming"}
             ]
         }
-        r2 = save_progress(body_cs102)
-        assert r2.status_code == 200 and r2.json().get("success") is True, f"Failed to save CS102: {r2.text}"
+        r2 = save_progress(body_second)
+        assert r2.status_code == 200 and r2.json().get("success") is True, f"Failed to save 40201100: {r2.text}"
 
-        # Save CS103 with CS102 completed
-        body_cs103 = {
-            "major": "Computer Science",
+        body_third = {
+            "major": MAJOR,
             "completed": [
-                {"code": "CS101", "name": "Intro to CS"},
-                {"code": "CS102", "name": "Data Structures"},
-                {"code": "CS103", "name": "Algorithms"}
+                {"code": "40303130", "name": "Fundamentals of Computing"},
+                {"code": "40201100", "name": "Programming"},
+                {"code": "40201201", "name": "Data Structures & Algorithms"}
             ]
         }
-        r3 = save_progress(body_cs103)
-        assert r3.status_code == 200 and r3.json().get("success") is True, f"Failed to save CS103: {r3.text}"
+        r3 = save_progress(body_third)
+        assert r3.status_code == 200 and r3.json().get("success") is True, f"Failed to save 40201201: {r3.text}"
 
         # Verify saved progress via GET
         get_resp = session.get(
             f"{BASE_URL}/api/progress/{STUDENT_ID}",
-            params={"major": "Computer Science"},
+            params={"major": MAJOR},
             timeout=TIMEOUT
         )
         assert get_resp.status_code == 200, f"Failed to get progress: {get_resp.text}"
         completed_courses = get_resp.json().get("completed", [])
         codes = {c["code"] for c in completed_courses}
-        assert {"CS101", "CS102", "CS103"}.issubset(codes), f"Saved courses missing or incomplete: {codes}"
+        assert {"40303130", "40201100", "40201201"}.issubset(codes), f"Saved courses missing or incomplete: {codes}"
 
     finally:
         # Cleanup: Remove all saved courses progress for the student for this major by saving empty completed
         cleanup_body = {
-            "major": "Computer Science",
+            "major": MAJOR,
             "completed": []
         }
         cleanup_resp = save_progress(cleanup_body)
@@ -45,6 +45,11 @@ def test_get_admin_stats_requires_valid_admin_secret():
         assert "recentActivity" in data and isinstance(data["recentActivity"], list)
         assert "heatmap" in data and isinstance(data["heatmap"], list)
         assert "studentData" in data and isinstance(data["studentData"], list)
+        # Aggregates cover every student; the list is bounded
+        assert sum(data["majorDistribution"].values()) == data["totalStudents"]
+        assert sum(data["progressDistribution"].values()) == data["totalStudents"]
+        assert sum(m["count"] for m in data["majorStats"].values()) == data["totalStudents"]
+        assert len(data["studentData"]) <= min(200, data["totalStudents"])
     except requests.RequestException as e:
         assert False, f"Request failed for valid header case: {e}"
 
@@ -0,0 +1,90 @@
+import requests
+
+BASE_URL = "http://localhost:3000"
+STUDENT_ID = "S12345"
+PASSWORD = "secret"
+TIMEOUT = 30
+MAJOR = "data_science"
+
+def test_post_progress_delta_applies_ops_and_rejects_stale_versions():
+    session = requests.Session()
+
+    # Authenticate to get session cookie
+    auth_resp = session.post(
+        f"{BASE_URL}/api/auth/signin/credentials",
+        json={"student_id": STUDENT_ID, "password": PASSWORD},
+        timeout=TIMEOUT
+    )
+    assert auth_resp.status_code == 200, f"Authentication failed: {auth_resp.text}"
+
+    def save_full(completed):
+        return session.post(
+            f"{BASE_URL}/api/progress/{STUDENT_ID}/save",
+            json={"major": MAJOR, "completed": completed},
+            timeout=TIMEOUT
+        )
+
+    def delta(version, add=None, remove=None):
+        return session.post(
+            f"{BASE_URL}/api/progress/{STUDENT_ID}/delta",
+            json={"major": MAJOR, "version": version, "add": add or [], "remove": remove or []},
+            timeout=TIMEOUT
+        )
+
+    def load():
+        resp = session.get(f"{BASE_URL}/api/progress/{STUDENT_ID}", params={"major": MAJOR}, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Failed to get progress: {resp.text}"
+        return resp.json()
+
+    try:
+        # Start from a known state; the full save reports the new version
+        r = save_full([{"code": "40303130", "name": "Fundamentals of Computing"}])
+        assert r.status_code == 200, f"Full save failed: {r.text}"
+        version = r.json()["version"]
+        assert load()["version"] == version, "GET should report the same version"
+
+        # Add two courses in one delta
+        r = delta(version, add=[
+            {"code": "40201100", "name": "Programming"},
+            {"code": "40302111", "name": "Professional Skills"}
+        ])
+        assert r.status_code == 200 and r.json().get("success") is True, f"Delta failed: {r.text}"
+        assert r.json()["version"] == version + 1, "Version should be bumped by one"
+        stale_version = version
+        version = r.json()["version"]
+
+        codes = {c["code"] for c in load()["completed"]}
+        assert codes == {"40303130", "40201100", "40302111"}, f"Unexpected state after add: {codes}"
+
+        # A delta built on an old version is rejected and nothing is lost
+        r = delta(stale_version, remove=["40302111"])
+        assert r.status_code == 409, f"Expected 409 for stale version, got {r.status_code}"
+        body = r.json()
+        assert body["error"] == "version_conflict"
+        assert body["version"] == version, "Conflict should carry the current version"
+        assert {c["code"] for c in body["completed"]} == codes, "Conflict should carry the current state"
+
+        # Deltas are validated against prerequisites too
+        r = delta(version, remove=["40303130"])
+        assert r.status_code == 400, f"Expected 400 when removing a needed prerequisite, got {r.status_code}"
+        assert r.json()["error"] == "prerequisite_not_met"
+
+        # Removing a course and what depends on it together is fine
+        r = delta(version, remove=["40303130", "40201100"])
+        assert r.status_code == 200, f"Delta remove failed: {r.text}"
+        codes = {c["code"] for c in load()["completed"]}
+        assert codes == {"40302111"}, f"Unexpected state after remove: {codes}"
+
+        # Without a session the endpoint is off limits
+        r = requests.post(
+            f"{BASE_URL}/api/progress/{STUDENT_ID}/delta",
+            json={"major": MAJOR, "version": 0, "add": [], "remove": []},
+            timeout=TIMEOUT
+        )
+        assert r.status_code == 401, f"Expected 401 without session, got {r.status_code}"
+
+    finally:
+        cleanup_resp = save_full([])
+        assert cleanup_resp.status_code == 200, f"Cleanup failed: {cleanup_resp.text}"
+
+test_post_progress_delta_applies_ops_and_rejects_stale_versions()
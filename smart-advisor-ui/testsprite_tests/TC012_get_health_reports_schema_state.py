@@ -0,0 +1,19 @@
+import requests
+
+BASE_URL = "http://localhost:3000"
+TIMEOUT = 30
+
+def test_get_health_reports_schema_state():
+    resp = requests.get(f"{BASE_URL}/api/health", timeout=TIMEOUT)
+    assert resp.status_code == 200, f"Expected 200, got {resp.status_code}: {resp.text}"
+
+    data = resp.json()
+    assert data.get("status") == "ok", f"Unexpected status: {data}"
+    schema = data.get("schema")
+    assert isinstance(schema, dict), "Response missing 'schema' object"
+    assert schema.get("ready") is True, "Schema should be ready once the server has bootstrapped it"
+    assert schema.get("version") == schema.get("latest"), f"Schema not at latest version: {schema}"
+    assert schema.get("pending") == [], f"Unexpected pending migrations: {schema.get('pending')}"
+    assert schema.get("error") is None, f"Unexpected schema error: {schema.get('error')}"
+
+test_get_health_reports_schema_state()
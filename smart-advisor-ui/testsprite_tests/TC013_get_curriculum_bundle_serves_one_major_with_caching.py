@@ -0,0 +1,37 @@
+import requests
+
+BASE_URL = "http://localhost:3000"
+TIMEOUT = 30
+
+def test_get_curriculum_bundle_serves_one_major_with_caching():
+    major = "computer_science"
+
+    # Unversioned request: revalidated by ETag
+    resp = requests.get(f"{BASE_URL}/api/curriculum/{major}", headers={"Accept-Encoding": "gzip"}, timeout=TIMEOUT)
+    assert resp.status_code == 200, f"Expected 200, got {resp.status_code}: {resp.text}"
+    assert resp.headers.get("Content-Encoding") == "gzip", f"Expected a gzip body, got {resp.headers.get('Content-Encoding')}"
+    assert "no-cache" in resp.headers.get("Cache-Control", ""), "Unversioned bundle must be revalidated"
+    etag = resp.headers.get("ETag")
+    assert etag, "Response missing ETag"
+
+    data = resp.json()
+    assert data.get("major") == major, f"Unexpected major: {data.get('major')}"
+    for key in ("university_requirements", "college_requirements", "department_requirements", "electives"):
+        assert isinstance(data["data"].get(key), list), f"Bundle data missing '{key}'"
+    assert "degree_types" in data.get("rules", {}), "Bundle missing degree rules"
+
+    # Versioned request: immutable
+    version = etag.strip('"')
+    resp = requests.get(f"{BASE_URL}/api/curriculum/{major}?v={version}", timeout=TIMEOUT)
+    assert resp.status_code == 200, f"Expected 200, got {resp.status_code}"
+    assert "immutable" in resp.headers.get("Cache-Control", ""), f"Expected immutable caching, got {resp.headers.get('Cache-Control')}"
+
+    # Conditional request
+    resp = requests.get(f"{BASE_URL}/api/curriculum/{major}", headers={"If-None-Match": etag}, timeout=TIMEOUT)
+    assert resp.status_code == 304, f"Expected 304, got {resp.status_code}"
+
+    # Unknown major
+    resp = requests.get(f"{BASE_URL}/api/curriculum/not_a_major", timeout=TIMEOUT)
+    assert resp.status_code == 404, f"Expected 404, got {resp.status_code}"
+
+test_get_curriculum_bundle_serves_one_major_with_caching()
@@ -0,0 +1,70 @@
+import uuid
+import requests
+
+BASE_URL = "http://localhost:3000"
+STUDENT_ID = "S12345"
+PASSWORD = "secret"
+TIMEOUT = 30
+
+def test_get_planner_overview_returns_summaries_and_deltas():
+    session = requests.Session()
+    signin_url = f"{BASE_URL}/api/auth/signin/credentials"
+    planner_url = f"{BASE_URL}/api/planner"
+    overview_url = f"{BASE_URL}/api/planner/overview"
+
+    try:
+        signin_resp = session.post(signin_url, json={"student_id": STUDENT_ID, "password": PASSWORD}, timeout=TIMEOUT)
+        assert signin_resp.status_code == 200, f"Signin failed: {signin_resp.text}"
+
+        semester = {
+            "id": f"tc014-{uuid.uuid4().hex[:8]}",
+            "name": "TC014 Semester",
+            "courses": [
+                {"id": "c1", "name": "Course A", "credits": 3, "hasMidterm": False, "status": "Completed", "grade": "D"},
+                {"id": "c2", "name": "Course B", "credits": 3, "hasMidterm": False, "status": "Completed", "grade": "P"},
+                {"id": "c3", "name": "Course C", "credits": 2, "hasMidterm": False, "status": "In Progress", "grade": None},
+            ],
+            "studySessions": [],
+        }
+        save_resp = session.post(planner_url, json=semester, timeout=TIMEOUT)
+        assert save_resp.status_code == 200, f"Planner save failed: {save_resp.text}"
+
+        # Full overview: the just-saved semester is active and summarized
+        resp = session.get(overview_url, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Overview failed: {resp.text}"
+        etag = resp.headers.get("ETag")
+        assert etag, "Overview missing ETag"
+        data = resp.json()
+        assert data["activeId"] == semester["id"], f"Unexpected active semester: {data['activeId']}"
+        assert data["active"]["courses"] == semester["courses"], "Active semester should be returned in full"
+        summary = next(s for s in data["semesters"] if s["id"] == semester["id"])
+        assert summary["gpa"] == 3.2, f"Expected GPA 3.2, got {summary['gpa']}"
+        assert summary["creditHours"] == 8 and summary["courseCount"] == 3, f"Unexpected summary: {summary}"
+        for s in data["semesters"]:
+            assert "courses" not in s, "Summaries must not carry full course lists"
+
+        # Unchanged: 304 on If-None-Match, nothing but ids with since=cursor
+        resp = session.get(overview_url, headers={"If-None-Match": etag}, timeout=TIMEOUT)
+        assert resp.status_code == 304, f"Expected 304, got {resp.status_code}"
+        resp = session.get(overview_url, params={"since": data["cursor"]}, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Delta overview failed: {resp.text}"
+        delta = resp.json()
+        assert delta["semesters"] == [], f"Expected no changed semesters, got {delta['semesters']}"
+        assert "active" not in delta, "Unchanged active semester should be omitted"
+        assert semester["id"] in delta["ids"], "ids should list every semester"
+
+        # Full semester on demand
+        resp = session.get(planner_url, params={"semester": semester["id"]}, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Semester load failed: {resp.text}"
+        assert resp.json()["courses"] == semester["courses"]
+
+        resp = session.get(overview_url, params={"since": "yesterday"}, timeout=TIMEOUT)
+        assert resp.status_code == 400, f"Expected 400 for a malformed cursor, got {resp.status_code}"
+
+        resp = requests.get(overview_url, timeout=TIMEOUT)
+        assert resp.status_code == 401, f"Expected 401 without auth, got {resp.status_code}"
+    finally:
+        session.close()
+
+
+test_get_planner_overview_returns_summaries_and_deltas()
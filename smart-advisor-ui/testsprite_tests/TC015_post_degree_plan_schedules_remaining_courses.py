@@ -0,0 +1,43 @@
+import requests
+
+BASE_URL = "http://localhost:3000"
+TIMEOUT = 30
+
+def test_post_degree_plan_schedules_remaining_courses():
+    major = "electrical_engineering"
+
+    # Nothing completed: every semester within the cap, plan no shorter than its lower bound
+    resp = requests.post(f"{BASE_URL}/api/degree-plan", json={"major": major, "completed": [], "maxCredits": 18}, timeout=TIMEOUT)
+    assert resp.status_code == 200, f"Expected 200, got {resp.status_code}: {resp.text}"
+    assert "scheduler;dur=" in resp.headers.get("Server-Timing", ""), "Missing scheduler Server-Timing"
+    plan = resp.json()
+    assert plan["semesters"], "Expected a non-empty plan"
+    assert len(plan["semesters"]) >= plan["lowerBound"] > 0, f"Plan shorter than its lower bound: {plan['lowerBound']}"
+    seen = set()
+    for semester in plan["semesters"]:
+        assert semester["credits"] <= 18, f"Semester {semester['index']} over the cap: {semester['credits']}"
+        codes = [c["code"] for c in semester["courses"]]
+        assert not seen.intersection(codes), "A course was scheduled twice"
+        seen.update(codes)
+    assert plan["plannedCredits"] + plan["completedCredits"] + plan["shortfallCredits"] == plan["totalCredits"]
+
+    # Completing the first semester shortens the plan and drops those courses
+    first = [c["code"] for c in plan["semesters"][0]["courses"]]
+    resp = requests.post(f"{BASE_URL}/api/degree-plan", json={"major": major, "completed": first}, timeout=TIMEOUT)
+    assert resp.status_code == 200, f"Expected 200, got {resp.status_code}"
+    later = resp.json()
+    assert len(later["semesters"]) <= len(plan["semesters"]), "Plan got longer after completing courses"
+    remaining = {c["code"] for s in later["semesters"] for c in s["courses"]}
+    assert not remaining.intersection(first), "Completed courses were scheduled again"
+
+    # Validation
+    resp = requests.post(f"{BASE_URL}/api/degree-plan", json={"major": "not_a_major", "completed": []}, timeout=TIMEOUT)
+    assert resp.status_code == 404, f"Expected 404, got {resp.status_code}"
+    resp = requests.post(f"{BASE_URL}/api/degree-plan", json={"major": major, "completed": [], "maxCredits": 100}, timeout=TIMEOUT)
+    assert resp.status_code == 400, f"Expected 400, got {resp.status_code}"
+
+    # Saved progress requires a session
+    resp = requests.post(f"{BASE_URL}/api/degree-plan", json={"major": major}, timeout=TIMEOUT)
+    assert resp.status_code == 401, f"Expected 401, got {resp.status_code}"
+
+test_post_degree_plan_schedules_remaining_courses()
@@ -0,0 +1,33 @@
+import requests
+
+BASE_URL = "http://localhost:3000"
+ADMIN_SECRET = "ADMIN_SECRET"
+TIMEOUT = 120
+
+def test_admin_analytics_run_and_read():
+    # Both methods are admin-only
+    for method in ("get", "post"):
+        resp = requests.request(method, f"{BASE_URL}/api/admin/analytics", timeout=TIMEOUT)
+        assert resp.status_code == 401, f"Expected 401 for {method.upper()} without secret, got {resp.status_code}"
+
+    headers = {"x-admin-secret": ADMIN_SECRET}
+    resp = requests.post(f"{BASE_URL}/api/admin/analytics", headers=headers, timeout=TIMEOUT)
+    assert resp.status_code == 200, f"Expected 200, got {resp.status_code}: {resp.text}"
+    run = resp.json()
+    assert run["students"] >= 0 and run["durationMs"] >= 0, f"Unexpected run result: {run}"
+
+    resp = requests.get(f"{BASE_URL}/api/admin/analytics?limit=5", headers=headers, timeout=TIMEOUT)
+    assert resp.status_code == 200, f"Expected 200, got {resp.status_code}: {resp.text}"
+    data = resp.json()
+    assert data["lastRun"]["id"] == run["runId"] and data["lastRun"]["status"] == "done"
+    assert data["majors"], "Expected one summary row per major"
+    for major in data["majors"]:
+        assert len(major["histogram"]) == 10, "Expected ten histogram buckets"
+        assert sum(h["students"] for h in major["histogram"]) == major["students"]
+    per_major = {}
+    for b in data["bottlenecks"]:
+        per_major[b["major"]] = per_major.get(b["major"], 0) + 1
+        assert b["score"] > 0 and b["blockedStudents"] > 0
+    assert all(n <= 5 for n in per_major.values()), "More bottlenecks than the limit"
+
+test_admin_analytics_run_and_read()
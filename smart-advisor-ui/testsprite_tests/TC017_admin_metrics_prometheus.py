@@ -0,0 +1,26 @@
+import requests
+
+BASE_URL = "http://localhost:3000"
+ADMIN_SECRET = "ADMIN_SECRET"
+TIMEOUT = 30
+
+def test_admin_metrics_prometheus():
+    resp = requests.get(f"{BASE_URL}/api/admin/metrics", timeout=TIMEOUT)
+    assert resp.status_code == 401, f"Expected 401 without secret, got {resp.status_code}"
+
+    # Any instrumented route answers with a Server-Timing breakdown
+    resp = requests.get(f"{BASE_URL}/api/courses", timeout=TIMEOUT)
+    assert resp.status_code == 200, f"Expected 200, got {resp.status_code}"
+    timing = resp.headers.get("Server-Timing", "")
+    assert "total;dur=" in timing, f"Missing Server-Timing total: {timing!r}"
+
+    for headers in ({"x-admin-secret": ADMIN_SECRET}, {"Authorization": f"Bearer {ADMIN_SECRET}"}):
+        resp = requests.get(f"{BASE_URL}/api/admin/metrics", headers=headers, timeout=TIMEOUT)
+        assert resp.status_code == 200, f"Expected 200, got {resp.status_code}: {resp.text}"
+        assert resp.headers["Content-Type"].startswith("text/plain")
+        body = resp.text
+        assert "# TYPE http_request_duration_seconds histogram" in body
+        assert 'http_request_duration_seconds_bucket{route="/api/courses",method="GET",status="200",le="+Inf"}' in body
+        assert "db_pool_max_connections" in body
+
+test_admin_metrics_prometheus()
@@ -0,0 +1,40 @@
+import requests
+
+BASE_URL = "http://localhost:3000"
+TIMEOUT = 30
+
+def test_planner_what_if_solver():
+    url = f"{BASE_URL}/api/planner/what-if"
+
+    resp = requests.post(url, json={"target": 5, "courses": []}, timeout=TIMEOUT)
+    assert resp.status_code == 400, f"Expected 400 for an out-of-range target, got {resp.status_code}"
+    resp = requests.post(url, json={"target": 3.2, "courses": [{"credits": 2.5}]}, timeout=TIMEOUT)
+    assert resp.status_code == 400, f"Expected 400 for fractional credits, got {resp.status_code}"
+
+    # One Pass already; 9 CH at 3.2 needs 36 units, so the two 3-CH courses need D + M
+    courses = [
+        {"credits": 3, "grade": "P"},
+        {"id": "a", "name": "Course A", "credits": 3},
+        {"id": "b", "name": "Course B", "credits": 3},
+    ]
+    resp = requests.post(url, json={"target": "VG", "courses": courses}, timeout=TIMEOUT)
+    assert resp.status_code == 200, f"Expected 200, got {resp.status_code}: {resp.text}"
+    assert "solver;dur=" in resp.headers.get("Server-Timing", "")
+    data = resp.json()
+    assert data["target"] == 3.2 and data["reachable"] is True
+    assert data["minimumEffort"] == 9, f"Expected 9 CH-steps, got {data['minimumEffort']}"
+    for a in data["assignments"]:
+        assert sorted(g["grade"] for g in a["grades"]) == ["D", "M"], f"Unexpected assignment: {a}"
+        assert a["gpa"] == 3.2
+    assert 0 < data["probability"] < 1
+    assert data["band"]["low"] <= data["band"]["median"] <= data["band"]["high"]
+    assert [c["short"] for c in data["classifications"]] == ["EX", "VG", "Good", "SAT", "LOW"]
+
+    # Out of reach: even Distinction everywhere can't lift three U's to Excellent
+    courses = [{"credits": 3, "grade": "U"}] * 3 + [{"credits": 3}]
+    resp = requests.post(url, json={"target": "EX", "courses": courses}, timeout=TIMEOUT)
+    data = resp.json()
+    assert data["reachable"] is False and data["minimumEffort"] is None and data["assignments"] == []
+    assert data["probability"] == 0
+
+test_planner_what_if_solver()